@@ -0,0 +1,101 @@
+"""Paridade e tempo das abas do dashboard: groupby sobre os arremessos vs rollup do cubo.
+
+Os arremessos sintéticos recebem probabilidades e POE como o batch_scoring
+(viés removido por temporada/time); as tabelas das abas Visão Geral, POE e
+Erros são calculadas como no dashboard e pelo cubo, e precisam bater.
+
+    python benchmarks/bench_aggregate_cube.py --rows 1000000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BASE_DIR, '..', 'src'))
+
+import aggregate_cube  # noqa: E402
+import batch_scoring  # noqa: E402
+from synthetic import generate_shots  # noqa: E402
+
+
+def scored_shots(n_rows):
+    df = generate_shots(n_rows, seed=5)
+    rng = np.random.default_rng(5)
+    df['shot_probability'] = np.clip(rng.normal(0.46, 0.15, n_rows), 0.01, 0.99).astype(np.float32)
+    # POE como no batch_scoring: viés removido em cada bloco (temporada, time)
+    df = pd.concat([batch_scoring.add_poe(part.copy(), part['shot_probability'])
+                    for _, part in df.groupby(['season', 'team_id'], sort=False)]).sort_index()
+    df['predicted_outcome'] = batch_scoring.predicted_outcome(df['shot_probability'])
+    return df
+
+
+def dashboard_tables(df_team):
+    """Mesmas expressões das abas de frontend/app.py."""
+    zone_perf = df_team.groupby('shot_zone_basic').agg(
+        FG_Real=('shot_made_flag', 'mean'),
+        FG_Esperado=('shot_probability', 'mean')
+    ).rename(columns={'FG_Real': 'Aproveitamento Real', 'FG_Esperado': 'Aproveitamento Esperado (xFG)'})
+    player_poe = df_team.groupby('player_id').agg(
+        total_adjusted_poe=('adjusted_poe', 'sum'),
+        avg_adjusted_poe_per_shot=('adjusted_poe', 'mean'),
+        total_shots=('game_id', 'count')
+    ).sort_values(by='total_adjusted_poe', ascending=False).reset_index()
+    fp = df_team[(df_team['shot_made_flag'] == 0) & (df_team['predicted_outcome'] == 1)]
+    fn = df_team[(df_team['shot_made_flag'] == 1) & (df_team['predicted_outcome'] == 0)]
+    return zone_perf, player_poe, fp['action_type'].value_counts(), fn['action_type'].value_counts()
+
+
+def cube_tables(cube):
+    return (aggregate_cube.zone_performance(cube), aggregate_cube.player_poe(cube),
+            aggregate_cube.error_counts(cube, 'false_positives'), aggregate_cube.error_counts(cube, 'false_negatives'))
+
+
+def check_parity(df_team, cube):
+    expected, actual = dashboard_tables(df_team), cube_tables(cube)
+    pd.testing.assert_frame_equal(actual[0].sort_index(), expected[0].sort_index(), check_dtype=False, rtol=1e-6)
+    pd.testing.assert_frame_equal(actual[1].set_index('player_id').sort_index(),
+                                  expected[1].set_index('player_id').sort_index(), check_dtype=False, rtol=1e-6)
+    for actual_counts, expected_counts in zip(actual[2:], expected[2:]):
+        assert actual_counts.sort_index().to_dict() == expected_counts.sort_index().to_dict()
+
+
+def _best_of(func, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run(n_rows):
+    df = scored_shots(n_rows)
+    start = time.perf_counter()
+    cube = aggregate_cube.build_cube(df)
+    build_time = time.perf_counter() - start
+    print(f"Cubo: {len(df):,} arremessos -> {len(cube):,} células em {build_time:.2f}s")
+
+    season, team_id = df['season'].iloc[-1], df['team_id'].iloc[-1]
+    df_team = df[(df['season'] == season) & (df['team_id'] == team_id)]
+    team_cube = cube[(cube['season'] == season) & (cube['team_id'] == team_id)]
+    check_parity(df_team, team_cube)
+    print(f"Paridade OK para o time {team_id} em {season}")
+
+    groupby_time = _best_of(lambda: dashboard_tables(df_team))
+    rollup_time = _best_of(lambda: cube_tables(team_cube))
+    print(f"Abas do dashboard ({len(df_team):,} arremessos, {len(team_cube):,} células): "
+          f"groupby {groupby_time * 1000:.1f} ms | cubo {rollup_time * 1000:.1f} ms")
+    return {'rows': n_rows, 'cells': len(cube), 'build_seconds': build_time,
+            'team_shots': len(df_team), 'team_cells': len(team_cube),
+            'groupby_ms': groupby_time * 1000, 'rollup_ms': rollup_time * 1000}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    args = parser.parse_args()
+    run(args.rows)
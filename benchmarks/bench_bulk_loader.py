@@ -0,0 +1,84 @@
+"""Compara linhas/s do caminho DataFrame.to_sql com o bulk_loader em arremessos sintéticos.
+
+    python benchmarks/bench_bulk_loader.py --rows 1000000
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BASE_DIR, '..', 'src'))
+sys.path.append(os.path.join(BASE_DIR, '..', 'configs'))
+
+import bulk_loader  # noqa: E402
+from database_setup import create_database  # noqa: E402
+from synthetic import game_frame, generate_shots  # noqa: E402
+
+
+def _partitions(df):
+    for (season, team_id), df_partition in df.groupby(['season', 'team_id'], sort=False):
+        df_teams = df_partition[['team_id']].drop_duplicates().rename(columns={'team_id': 'id'})
+        df_teams['team_name'] = f"Team {team_id}"
+        df_teams['team_abbreviation'] = str(team_id)[-3:]
+        df_players = df_partition[['player_id']].drop_duplicates().rename(columns={'player_id': 'id'})
+        df_players['player_name'] = 'Player ' + df_players['id'].astype(str)
+        df_games = game_frame(df_partition)
+        yield season, team_id, df_teams, df_players, df_games, df_partition[bulk_loader.SHOT_COLUMNS]
+
+
+def load_with_to_sql(conn, partitions):
+    """Caminho original: quatro to_sql por partição, PRAGMAs padrão e um commit por chamada."""
+    for _, _, df_teams, df_players, df_games, df_shots in partitions:
+        for table, df_table in [('teams', df_teams), ('players', df_players), ('games', df_games)]:
+            try:
+                df_table.to_sql(table, conn, if_exists='append', index=False)
+            except sqlite3.IntegrityError:
+                pass
+        df_shots.to_sql('game_shot_charts', conn, if_exists='append', index=False)
+
+
+def load_with_bulk_loader(conn, partitions):
+    with bulk_loader.bulk_load_session(conn), bulk_loader.deferred_indexes(conn):
+        for season, team_id, df_teams, df_players, df_games, df_shots in partitions:
+            bulk_loader.load_partition(
+                conn, season, int(team_id),
+                bulk_loader.to_rows(df_shots, bulk_loader.SHOT_COLUMNS),
+                bulk_loader.to_rows(df_teams, ['id', 'team_name', 'team_abbreviation']),
+                bulk_loader.to_rows(df_players, ['id', 'player_name']),
+                bulk_loader.to_rows(df_games, bulk_loader.GAME_COLUMNS),
+                replace=False,
+            )
+
+
+def run(n_rows):
+    # O particionamento em pandas é comum aos dois caminhos e fica fora da medição
+    partitions = list(_partitions(generate_shots(n_rows)))
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, load in [('to_sql', load_with_to_sql), ('bulk_loader', load_with_bulk_loader)]:
+            db_path = os.path.join(tmp_dir, f"{name}.sqlite")
+            create_database(db_path)
+            conn = sqlite3.connect(db_path)
+            # Ambos partem do esquema atual, com os índices secundários já criados
+            bulk_loader.create_secondary_indexes(conn)
+            start = time.perf_counter()
+            load(conn, partitions)
+            elapsed = time.perf_counter() - start
+            players_loaded = conn.execute('SELECT COUNT(*) FROM players').fetchone()[0]
+            conn.close()
+            results[name] = {'seconds': elapsed, 'rows_per_second': n_rows / elapsed,
+                             'players': players_loaded}
+            print(f"{name:>12}: {elapsed:8.2f}s  {n_rows / elapsed:12,.0f} linhas/s  "
+                  f"({players_loaded} jogadores carregados)")
+    print(f"Speedup: {results['to_sql']['seconds'] / results['bulk_loader']['seconds']:.1f}x")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    args = parser.parse_args()
+    run(args.rows)
@@ -0,0 +1,92 @@
+"""Coleta contra o servidor falso: passadas separadas sem keep-alive vs passada única (src/collect_data.py).
+
+Sobe o src/fake_stats_server.py em processo e coleta --seasons temporadas de
+três formas, cada uma em um catálogo novo:
+
+- separadas: uma passada de shotchart e outra de roster, uma conexão TCP por
+  requisição (como o requests.get usado antes) e sem cache em disco;
+- passada única: os dois endpoints por (temporada, time) no mesmo scheduler,
+  com a sessão keep-alive compartilhada e gravando no cache;
+- replay do cache: --full-refresh só com as respostas em disco (--offline).
+
+    python benchmarks/bench_collect.py --seasons 2 --delay 0.02 --rate 20
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import requests
+from nba_api.stats.library.http import STATS_HEADERS
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BASE_DIR, '..', 'src'))
+sys.path.append(os.path.join(BASE_DIR, '..', 'configs'))
+
+import collect_data  # noqa: E402
+import fake_stats_server  # noqa: E402
+import fetch_scheduler  # noqa: E402
+from seasons_config import AVAILABLE_SEASONS  # noqa: E402
+
+
+def _new_session():
+    """Uma sessão por requisição: cada busca abre a sua conexão TCP."""
+    session = requests.Session()
+    session.headers.update(STATS_HEADERS)
+    return session
+
+
+def collect(server, seasons, passes, db_path, cache_dir, **kwargs):
+    """Roda as passadas em silêncio; retorna (segundos, requisições, conexões, unidades com falha)."""
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    requests_before, connections_before = server.stats['requests'], server.stats['connections']
+    failed = 0
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for collectors in passes:
+            stats = collect_data.run_etl_pipeline(seasons, refresh_seasons=[], db_name=db_path,
+                                                  collectors=collectors, cache_dir=cache_dir, **kwargs)
+            failed += sum(counts['failed_teams'] for counts in stats.values())
+    return (time.perf_counter() - start, server.stats['requests'] - requests_before,
+            server.stats['connections'] - connections_before, failed)
+
+
+def run(n_seasons, delay, error_rate, rate):
+    seasons = AVAILABLE_SEASONS[:n_seasons]
+    server, base_url = fake_stats_server.start_server(delay=delay, error_rate=error_rate, retry_after=0)
+    fetch_scheduler.STATS_BASE_URL = base_url
+    collect_data.REQUESTS_PER_SECOND = rate
+    shared_session = fetch_scheduler.get_session
+
+    print(f"{n_seasons} temporadas x 30 times, latência {delay * 1000:.0f} ms, {error_rate:.0%} de erros, "
+          f"{rate:g} req/s")
+    print(f"  {'':<30}{'tempo':>8}{'requisições':>13}{'conexões':>10}{'falhas':>8}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        fetch_scheduler.get_session = _new_session
+        separate = collect(server, seasons, [['shotchart'], ['roster']],
+                           os.path.join(tmp_dir, 'separadas', 'nba_shots.sqlite'), None)
+        fetch_scheduler.get_session = shared_session
+
+        cache_dir = os.path.join(tmp_dir, 'cache')
+        db_path = os.path.join(tmp_dir, 'unica', 'nba_shots.sqlite')
+        merged = collect(server, seasons, [list(collect_data.COLLECTORS)], db_path, cache_dir)
+        replay = collect(server, seasons, [list(collect_data.COLLECTORS)], db_path, cache_dir,
+                         full_refresh=True, offline=True)
+        for name, (seconds, n_requests, n_connections, failed) in [
+                ('separadas, sem keep-alive', separate), ('passada única, keep-alive', merged),
+                ('replay do cache (--offline)', replay)]:
+            print(f"  {name:<30}{seconds:>7.1f}s{n_requests:>13}{n_connections:>10}{failed:>8}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seasons', type=int, default=2)
+    parser.add_argument('--delay', type=float, default=0.02, help='Latência média do servidor falso (s)')
+    parser.add_argument('--error-rate', type=float, default=0.05)
+    parser.add_argument('--rate', type=float, default=20.0, help='Limite de requisições/segundo do scheduler')
+    args = parser.parse_args()
+    run(args.seasons, args.delay, args.error_rate, args.rate)
@@ -0,0 +1,133 @@
+"""Paridade e tempo do módulo features contra o pipeline original do notebook 02.
+
+O caminho de referência é o código do notebook (DataFrame.apply por linha,
+pd.get_dummies e sklearn normalize); a paridade é conferida em uma amostra e
+o tempo da referência só é medido até --reference-max-rows. O FeatureTransformer
+ajustado é conferido contra build_features e medido em lote (buffer
+pré-alocado) e por arremesso.
+
+    python benchmarks/bench_features.py --rows 1000000 10000000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import normalize
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BASE_DIR, '..', 'src'))
+
+import features  # noqa: E402
+from synthetic import generate_shots  # noqa: E402
+
+
+def calculate_time_remaining(row):
+    """Cópia da função do notebook 02, aplicada linha a linha."""
+    period = row['period']
+    minutes = row['minutes_remaining']
+    seconds = row['seconds_remaining']
+    total_seconds_in_game = 48 * 60
+    seconds_elapsed_prior_periods = (period - 1) * 12 * 60
+    seconds_elapsed_current_period = (12 * 60) - (minutes * 60 + seconds)
+    total_seconds_elapsed = seconds_elapsed_prior_periods + seconds_elapsed_current_period
+    if period > 4:
+        overtime_seconds = (period - 5) * 300 + (300 - (minutes * 60 + seconds))
+        return -overtime_seconds
+    return total_seconds_in_game - total_seconds_elapsed
+
+
+def build_features_reference(df):
+    df = df.copy()
+    df['time_remaining_in_game'] = df.apply(calculate_time_remaining, axis=1)
+    df['shot_angle'] = np.rad2deg(np.arctan2(df['loc_x'], df['loc_y'])) + 90
+    X = df[features.FEATURES_TO_USE]
+    y = df[features.TARGET]
+    X_encoded = pd.get_dummies(X, columns=features.CATEGORICAL_FEATURES, drop_first=True)
+    for column in features.NORMALIZED_FEATURES:
+        X_encoded[column] = normalize([X_encoded[column]], norm='max')[0]
+    return X, X_encoded, y
+
+
+def check_parity(n_rows=200_000):
+    df = generate_shots(n_rows, seed=7)
+    # Nulos em categóricas e prorrogações precisam bater com o get_dummies/apply
+    df.loc[df.sample(frac=0.01, random_state=1).index, 'shot_zone_area'] = None
+    expected_X, expected_encoded, expected_y = build_features_reference(df)
+    X, X_encoded, y = features.build_features(df)
+    pd.testing.assert_frame_equal(X, expected_X, check_dtype=False)
+    pd.testing.assert_frame_equal(X_encoded, expected_encoded, check_dtype=False, rtol=1e-12)
+    pd.testing.assert_series_equal(y, expected_y)
+    assert list(X_encoded.columns) == list(expected_encoded.columns)
+    print(f"Paridade OK em {n_rows:,} linhas ({X_encoded.shape[1]} colunas em X_encoded)")
+
+
+def check_transformer_parity(n_rows=200_000):
+    df = generate_shots(n_rows, seed=7)
+    _, X_encoded, _ = features.build_features(df)
+    expected = X_encoded.drop(columns=features.ID_COLUMNS)
+    transformer = features.FeatureTransformer().fit(df)
+    assert transformer.feature_names == list(expected.columns)
+    np.testing.assert_array_equal(transformer.transform(df), expected.to_numpy(dtype=np.float32))
+
+    # Lote com uma única categoria: get_dummies mudaria as colunas, o transformador não
+    single = df[df['shot_zone_basic'] == 'Mid-Range'].head(1000)
+    np.testing.assert_array_equal(transformer.transform(single),
+                                  expected.loc[single.index].to_numpy(dtype=np.float32))
+    for _, shot in single.head(100).iterrows():
+        np.testing.assert_array_equal(transformer.transform_one(shot.to_dict()),
+                                      expected.loc[shot.name].to_numpy(dtype=np.float32))
+    print(f"Paridade do FeatureTransformer OK ({transformer.n_features} colunas)")
+    return transformer
+
+
+def time_transformer(transformer, df, batch_size=1024, single_shots=10_000):
+    buffer = transformer.allocate(batch_size)
+    start = time.perf_counter()
+    for batch_start in range(0, len(df), batch_size):
+        transformer.transform(df.iloc[batch_start:batch_start + batch_size], out=buffer)
+    batched = time.perf_counter() - start
+
+    shots = df.head(single_shots).to_dict('records')
+    row = np.empty(transformer.n_features, dtype=np.float32)
+    start = time.perf_counter()
+    for shot in shots:
+        transformer.transform_one(shot, out=row)
+    per_shot = (time.perf_counter() - start) / len(shots)
+    return batched, per_shot
+
+
+def run(row_counts, reference_max_rows):
+    check_parity()
+    transformer = check_transformer_parity()
+    results = {}
+    for n_rows in row_counts:
+        df = generate_shots(n_rows)
+        start = time.perf_counter()
+        features.build_features(df)
+        vectorized = time.perf_counter() - start
+        results[n_rows] = {'vectorized': vectorized}
+        line = f"{n_rows:>12,} linhas: vetorizado {vectorized:7.2f}s"
+        if n_rows <= reference_max_rows:
+            start = time.perf_counter()
+            build_features_reference(df)
+            reference = time.perf_counter() - start
+            results[n_rows]['reference'] = reference
+            line += f"  | notebook {reference:7.2f}s  ({reference / vectorized:.0f}x)"
+        print(line)
+        batched, per_shot = time_transformer(transformer, df)
+        results[n_rows].update({'transformer_batched': batched, 'transformer_per_shot': per_shot})
+        print(f"{'':>19}transformador em lotes de 1024: {batched:7.2f}s "
+              f"| por arremesso: {per_shot * 1e6:.1f}us")
+        del df
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000, 10_000_000])
+    parser.add_argument('--reference-max-rows', type=int, default=1_000_000)
+    args = parser.parse_args()
+    run(args.rows, args.reference_max_rows)
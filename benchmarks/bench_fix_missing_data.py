@@ -0,0 +1,138 @@
+"""fix_missing_data depois de uma carga noturna: varredura em pandas vs reconciliação incremental em SQL.
+
+Para cada tamanho de histórico, carrega os arremessos sintéticos, reconcilia
+uma vez e então carrega uma partição nova (um time em uma temporada nova),
+como numa rodagem noturna. A partir de cópias do mesmo banco, mede o
+caminho original (DISTINCT para o pandas, isin contra sets, to_sql e
+COUNT/LEFT JOIN completos) e o fix_missing_data atual, e confere que players
+e games terminam iguais.
+
+    python benchmarks/bench_fix_missing_data.py --history-rows 250000 1000000 3000000
+"""
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BASE_DIR, '..', 'src'))
+sys.path.append(os.path.join(BASE_DIR, '..', 'configs'))
+
+import bulk_loader  # noqa: E402
+import collect_shotchart  # noqa: E402
+import static_index  # noqa: E402
+from database_setup import create_database  # noqa: E402
+from synthetic import generate_shots  # noqa: E402
+
+# Arremessos sintéticos da temporada nova; só os de um time (~1/30) entram na carga noturna
+NIGHTLY_ROWS = 90_000
+
+
+def fix_missing_data_scan(conn):
+    """Caminho original: ids distintos no pandas, diff com isin, to_sql e verificações por varredura."""
+    unique_player_ids = pd.read_sql_query('SELECT DISTINCT player_id FROM game_shot_charts ORDER BY player_id', conn)
+    existing_player_ids = set(pd.read_sql_query('SELECT id FROM players', conn)['id'].tolist())
+    missing_player_ids = unique_player_ids[~unique_player_ids['player_id'].isin(existing_player_ids)]
+    if not missing_player_ids.empty:
+        missing_players_df = pd.DataFrame({
+            'id': missing_player_ids['player_id'],
+            'player_name': static_index.map_player_names(missing_player_ids['player_id'])
+        }).dropna(subset=['player_name'])
+        if not missing_players_df.empty:
+            missing_players_df.to_sql('players', conn, if_exists='append', index=False)
+
+    unique_game_ids = pd.read_sql_query('''
+        SELECT DISTINCT game_id, MIN(game_event_id) as first_event, MIN(season) as season
+        FROM game_shot_charts GROUP BY game_id ORDER BY game_id
+    ''', conn)
+    existing_game_ids = set(pd.read_sql_query('SELECT id FROM games', conn)['id'].tolist())
+    missing_game_ids = unique_game_ids[~unique_game_ids['game_id'].isin(existing_game_ids)]
+    if not missing_game_ids.empty:
+        pd.DataFrame({'id': missing_game_ids['game_id'], 'season': missing_game_ids['season']}).to_sql(
+            'games', conn, if_exists='append', index=False)
+
+    for table in ['teams', 'players', 'games', 'game_shot_charts']:
+        pd.read_sql_query(f'SELECT COUNT(*) as count FROM {table}', conn)
+    pd.read_sql_query('''
+        SELECT COUNT(DISTINCT gsc.player_id) FROM game_shot_charts gsc
+        LEFT JOIN players p ON gsc.player_id = p.id WHERE p.id IS NULL
+    ''', conn)
+    pd.read_sql_query('''
+        SELECT COUNT(DISTINCT gsc.game_id) FROM game_shot_charts gsc
+        LEFT JOIN games g ON gsc.game_id = g.id WHERE g.id IS NULL
+    ''', conn)
+    conn.commit()
+
+
+def load_shots(conn, df):
+    with bulk_loader.bulk_load_session(conn):
+        for (season, team_id), df_partition in df.groupby(['season', 'team_id'], sort=False):
+            bulk_loader.load_partition(conn, season, int(team_id),
+                                       bulk_loader.to_rows(df_partition, bulk_loader.SHOT_COLUMNS), replace=False)
+
+
+def _dimensions(db_path):
+    with contextlib.closing(sqlite3.connect(db_path)) as conn:
+        return (sorted(conn.execute('SELECT id, player_name FROM players')),
+                sorted(conn.execute('SELECT id, game_date, season FROM games')))
+
+
+def _timed_fix(db_path, fix):
+    conn = sqlite3.connect(db_path)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        fix(conn)
+    elapsed = time.perf_counter() - start
+    conn.close()
+    return elapsed
+
+
+def run(history_sizes):
+    static_index.player_names()
+    nightly = generate_shots(NIGHTLY_ROWS, seed=99, seasons=('2025-26',))
+    nightly = nightly[nightly['team_id'] == nightly['team_id'].iloc[0]]
+    print(f"Carga noturna: {len(nightly):,} arremessos de um time em 2025-26")
+    print(f"{'histórico':>12}{'varredura':>12}{'SQL incremental':>17}{'ganho':>8}")
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for n_rows in history_sizes:
+            db_path = os.path.join(tmp_dir, f'history_{n_rows}.sqlite')
+            with contextlib.redirect_stdout(io.StringIO()):
+                create_database(db_path)
+                conn = sqlite3.connect(db_path)
+                load_shots(conn, generate_shots(n_rows, seed=3))
+                collect_shotchart.fix_missing_data(conn)
+                load_shots(conn, nightly)
+                conn.close()
+
+            scan_path, sql_path = f"{db_path}.scan", f"{db_path}.sql"
+            shutil.copy(db_path, scan_path)
+            shutil.copy(db_path, sql_path)
+            scan_seconds = _timed_fix(scan_path, fix_missing_data_scan)
+            sql_seconds = _timed_fix(sql_path, collect_shotchart.fix_missing_data)
+            assert _dimensions(scan_path) == _dimensions(sql_path), "players/games divergem entre os caminhos"
+            with contextlib.closing(sqlite3.connect(sql_path)) as conn:
+                counted = bulk_loader.row_counts(conn)
+                assert counted == bulk_loader.recount(conn), "table_counts diverge de COUNT(*)"
+            for path in (db_path, scan_path, sql_path):
+                os.remove(path)
+
+            print(f"{n_rows:>12,}{scan_seconds * 1000:>10.0f} ms{sql_seconds * 1000:>14.1f} ms"
+                  f"{scan_seconds / sql_seconds:>7.0f}x")
+            results.append({'history_rows': n_rows, 'scan_seconds': scan_seconds, 'sql_seconds': sql_seconds})
+    print("Paridade OK: players, games e table_counts iguais nos dois caminhos")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--history-rows', type=int, nargs='+', default=[250_000, 1_000_000, 3_000_000])
+    args = parser.parse_args()
+    run(args.history_rows)
@@ -0,0 +1,94 @@
+"""Contexto de jogo por arremesso: junção ordenada (features.game_context) vs busca por linha.
+
+Gera arremessos sintéticos e, para cada jogo, os eventos 1..699 de game_events
+com um placar em passeio aleatório. Mede o caminho por linha (dicionário
+(game_id, event_number) -> placar consultado arremesso a arremesso) e
+features.game_context (np.searchsorted sobre as chaves ordenadas) e confere
+que os dois devolvem o mesmo contexto.
+
+    python benchmarks/bench_game_context.py --rows 1000000 3000000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BASE_DIR, '..', 'src'))
+
+import features  # noqa: E402
+from synthetic import game_frame, generate_shots  # noqa: E402
+
+REPEATS = 3
+EVENTS_PER_GAME = 699
+
+
+def synthetic_events(df, seed=7):
+    """Eventos 1..EVENTS_PER_GAME de cada jogo, em ordem de (game_id, event_number), com placar acumulado."""
+    rng = np.random.default_rng(seed)
+    game_ids = np.sort(df['game_id'].unique())
+    steps = rng.choice([-3, -2, 0, 0, 0, 2, 3], size=(len(game_ids), EVENTS_PER_GAME))
+    return pd.DataFrame({
+        'game_id': np.repeat(game_ids, EVENTS_PER_GAME),
+        'event_number': np.tile(np.arange(1, EVENTS_PER_GAME + 1), len(game_ids)),
+        'score_margin': np.cumsum(steps, axis=1).ravel(),
+    })
+
+
+def game_context_per_row(shots, events, games):
+    """Mesma regra de features.game_context, com um dicionário consultado arremesso a arremesso."""
+    margin_by_event = dict(zip(zip(events['game_id'], events['event_number']), events['score_margin']))
+    teams_by_game = dict(zip(games['id'], zip(games['home_team_id'], games['visitor_team_id'])))
+    rows = []
+    for shot in shots.itertuples(index=False):
+        margin_after = margin_by_event.get((shot.game_id, shot.game_event_id))
+        home, visitor = teams_by_game.get(shot.game_id, (None, None))
+        side = 1 if shot.team_id == home else -1 if shot.team_id == visitor else None
+        if margin_after is None or side is None:
+            score_margin = np.nan
+        else:
+            points = (3 if shot.shot_type == features.THREE_POINT_SHOT_TYPE else 2) * shot.shot_made_flag
+            score_margin = side * margin_after - points
+        clock = shot.minutes_remaining * 60 + shot.seconds_remaining
+        rows.append((score_margin, score_margin < 0,
+                     shot.period >= 4 and clock <= features.CLUTCH_SECONDS
+                     and abs(score_margin) <= features.CLUTCH_MARGIN))
+    return pd.DataFrame(rows, columns=features.GAME_CONTEXT_FEATURES, index=shots.index)
+
+
+def _best_of(func):
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def run(sizes):
+    print(f"{'arremessos':>12}{'eventos':>12}{'por linha':>12}{'ordenada':>12}{'ganho':>8}")
+    results = []
+    for n_rows in sizes:
+        df = generate_shots(n_rows, seed=11)
+        events = synthetic_events(df)
+        games = game_frame(df)
+        row_seconds, df_row = _best_of(lambda: game_context_per_row(df, events, games))
+        join_seconds, df_join = _best_of(lambda: features.game_context(df, events, games))
+        pd.testing.assert_frame_equal(df_row.astype(df_join.dtypes.to_dict()), df_join)
+
+        print(f"{n_rows:>12,}{len(events):>12,}{row_seconds:>10.2f} s{join_seconds:>10.2f} s"
+              f"{row_seconds / join_seconds:>7.0f}x")
+        results.append({'rows': n_rows, 'events': len(events), 'per_row_seconds': row_seconds,
+                        'join_seconds': join_seconds})
+    print("Paridade OK: mesmo placar, desvantagem e momento decisivo pelos dois caminhos")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000, 3_000_000])
+    args = parser.parse_args()
+    run(args.rows)
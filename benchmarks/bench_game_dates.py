@@ -0,0 +1,95 @@
+"""Janela de tempo (últimos N dias) com games indexada por data vs leitura da temporada inteira.
+
+Carrega arremessos sintéticos com as datas reais dos jogos em games e mede,
+para a última semana da temporada mais recente, o caminho sem datas
+utilizáveis (ler a temporada inteira e filtrar no pandas pela data do jogo)
+e queries.shots_between (busca por intervalo em idx_games_date e junção por
+idx_shots_game_event). Confere que os dois devolvem os mesmos arremessos.
+
+    python benchmarks/bench_game_dates.py --rows 1000000 3000000 --days 7
+"""
+import argparse
+import contextlib
+import io
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BASE_DIR, '..', 'src'))
+sys.path.append(os.path.join(BASE_DIR, '..', 'configs'))
+
+import bulk_loader  # noqa: E402
+import queries  # noqa: E402
+from database_setup import create_database  # noqa: E402
+from synthetic import game_frame, generate_shots  # noqa: E402
+
+REPEATS = 5
+
+
+def load(db_path, df):
+    conn = sqlite3.connect(db_path)
+    with bulk_loader.bulk_load_session(conn), bulk_loader.deferred_indexes(conn):
+        for (season, team_id), df_partition in df.groupby(['season', 'team_id'], sort=False):
+            bulk_loader.load_partition(conn, season, int(team_id),
+                                       bulk_loader.to_rows(df_partition, bulk_loader.SHOT_COLUMNS),
+                                       game_rows=bulk_loader.to_rows(game_frame(df_partition),
+                                                                     bulk_loader.GAME_COLUMNS),
+                                       replace=False)
+    return conn
+
+
+def window_by_season_scan(conn, season, start_date, end_date):
+    """Sem datas indexadas: a temporada inteira é lida e filtrada pela data do jogo."""
+    df = queries.load_shots(conn, season)
+    games = pd.read_sql_query('SELECT id AS game_id, game_date FROM games', conn)
+    df = df.merge(games, on='game_id')
+    return df[(df['game_date'] >= start_date) & (df['game_date'] <= end_date)].drop(columns='game_date')
+
+
+def _best_of(func):
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def run(sizes, days):
+    print(f"{'arremessos':>12}{'na janela':>11}{'temporada inteira':>19}{'shots_between':>15}{'ganho':>8}")
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for n_rows in sizes:
+            db_path = os.path.join(tmp_dir, f'games_{n_rows}.sqlite')
+            with contextlib.redirect_stdout(io.StringIO()):
+                create_database(db_path)
+            conn = load(db_path, generate_shots(n_rows, seed=5))
+
+            end_date = queries.last_game_date(conn)
+            start_date = (pd.Timestamp(end_date) - pd.Timedelta(days=days - 1)).strftime('%Y%m%d')
+            season = conn.execute('SELECT season FROM games WHERE game_date = ?', (end_date,)).fetchone()[0]
+            scan_seconds, df_scan = _best_of(lambda: window_by_season_scan(conn, season, start_date, end_date))
+            index_seconds, df_index = _best_of(lambda: queries.shots_between(conn, start_date, end_date))
+            assert sorted(df_scan['id']) == sorted(df_index['id']), "arremessos da janela divergem"
+            conn.close()
+            os.remove(db_path)
+
+            print(f"{n_rows:>12,}{len(df_index):>11,}{scan_seconds * 1000:>16.1f} ms{index_seconds * 1000:>12.1f} ms"
+                  f"{scan_seconds / index_seconds:>7.0f}x")
+            results.append({'rows': n_rows, 'window_shots': len(df_index), 'scan_seconds': scan_seconds,
+                            'index_seconds': index_seconds})
+    print(f"Paridade OK: mesmos arremessos nos últimos {days} dias pelos dois caminhos")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000, 3_000_000])
+    parser.add_argument('--days', type=int, default=7)
+    args = parser.parse_args()
+    run(args.rows, args.days)
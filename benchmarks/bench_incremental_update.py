@@ -0,0 +1,106 @@
+"""Tempo e qualidade da atualização noturna: continuação do boosting (src/incremental_update.py) vs retreino completo.
+
+Treina um modelo base nas temporadas 2022-23 e 2023-24 sintéticas e libera os
+jogos de 2024-25 em --nights lotes, um por "noite". A cada noite roda a
+atualização incremental e, para comparação, um retreino do zero com todos os
+arremessos disponíveis e os parâmetros do modelo de produção. Os dois são
+avaliados nos mesmos jogos de holdout da temporada nova.
+
+    python benchmarks/bench_incremental_update.py --rows 300000 --nights 4
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BASE_DIR, '..', 'src'))
+sys.path.append(os.path.join(BASE_DIR, '..', 'configs'))
+
+import bulk_loader  # noqa: E402
+import features  # noqa: E402
+import incremental_update  # noqa: E402
+from database_setup import create_database  # noqa: E402
+from synthetic import generate_shots  # noqa: E402
+
+PRODUCTION_MODEL = os.path.join(BASE_DIR, '..', 'models', 'xgb_best_model.joblib')
+
+
+def insert_shots(db_path, df):
+    conn = sqlite3.connect(db_path)
+    with bulk_loader.bulk_load_session(conn):
+        for (season, team_id), df_partition in df.groupby(['season', 'team_id'], sort=False):
+            bulk_loader.load_partition(conn, season, int(team_id),
+                                       bulk_loader.to_rows(df_partition, bulk_loader.SHOT_COLUMNS), replace=False)
+    conn.close()
+
+
+def full_retrain(params, transformer, df):
+    """Retreino do zero com os parâmetros do modelo de produção."""
+    model = incremental_update.xgb.XGBClassifier(**params)
+    model.fit(transformer.to_frame(transformer.transform(df)), df[features.TARGET])
+    return model
+
+
+def run(n_rows, n_nights):
+    df = generate_shots(n_rows, seed=11)
+    df_base = df[df['season'].isin(incremental_update.BASE_SEASONS)]
+    df_season = df[df['season'] == '2024-25']
+    season_games = np.array(sorted(df_season['game_id'].unique()), dtype=object)
+    nights = np.array_split(season_games, n_nights)
+    df_test = df_season[df_season['game_id'].isin(season_games[incremental_update.holdout_mask(season_games)])]
+    y_test = df_test[features.TARGET].to_numpy()
+
+    params = joblib.load(PRODUCTION_MODEL).get_params()
+    params.update(n_jobs=1)
+    transformer = features.FeatureTransformer().fit(df_base)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'shots.sqlite')
+        model_path = os.path.join(tmp_dir, os.path.basename(incremental_update.MODEL_PATH))
+        registry_dir = os.path.join(tmp_dir, 'versions')
+        create_database(db_path)
+        insert_shots(db_path, df_base)
+        start = time.perf_counter()
+        joblib.dump(full_retrain(params, transformer, df_base), model_path)
+        transformer.save(features.transformer_path(model_path))
+        print(f"Modelo base: {len(df_base):,} arremessos, {params['n_estimators']} árvores "
+              f"({time.perf_counter() - start:.1f}s)")
+
+        print(f"{'noite':>6}{'jogos':>7}{'incremental':>13}{'retreino':>11}"
+              f"{'log loss incr.':>16}{'log loss retreino':>19}")
+        results = []
+        for night, games in enumerate(nights, start=1):
+            insert_shots(db_path, df_season[df_season['game_id'].isin(games)])
+            start = time.perf_counter()
+            entry = incremental_update.run_update(db_path, model_path, ['2024-25'], registry_dir=registry_dir)
+            incremental_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            df_available = df[df['game_id'].isin(set(df_base['game_id']) | set(np.concatenate(nights[:night])))]
+            df_available = df_available[~df_available.index.isin(df_test.index)]
+            retrained = full_retrain(params, transformer, df_available)
+            retrain_seconds = time.perf_counter() - start
+
+            X_test = transformer.transform(df_test)
+            row = {'night': night, 'games': len(games), 'status': entry['status'] if entry else None,
+                   'incremental_seconds': incremental_seconds, 'retrain_seconds': retrain_seconds,
+                   'incremental_logloss': incremental_update.log_loss(
+                       y_test, joblib.load(model_path).predict_proba(X_test)[:, 1]),
+                   'retrain_logloss': incremental_update.log_loss(y_test, retrained.predict_proba(X_test)[:, 1])}
+            results.append(row)
+            print(f"{night:>6}{len(games):>7}{incremental_seconds:>12.1f}s{retrain_seconds:>10.1f}s"
+                  f"{row['incremental_logloss']:>16.4f}{row['retrain_logloss']:>19.4f}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=300_000)
+    parser.add_argument('--nights', type=int, default=4)
+    args = parser.parse_args()
+    run(args.rows, args.nights)
@@ -0,0 +1,92 @@
+"""Tempo de leitura e memória: CSVs de handoff vs datasets Parquet particionados.
+
+Gera os arquivos como os notebooks (df.csv e o X_test.csv largo, com one-hot)
+e os datasets 'shots'/'test_shots' do parquet_store a partir dos mesmos dados.
+
+    python benchmarks/bench_parquet.py --rows 1000000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BASE_DIR, '..', 'src'))
+
+import features  # noqa: E402
+import parquet_store  # noqa: E402
+from synthetic import generate_shots  # noqa: E402
+
+# Colunas que o dashboard precisa para um time (features do modelo + análise)
+DASHBOARD_COLUMNS = ['game_id', 'player_id', 'team_id', 'shot_made_flag'] + \
+    features.NORMALIZED_FEATURES + features.CATEGORICAL_FEATURES
+
+
+def _disk_size(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files)
+
+
+def _timed_read(read):
+    start = time.perf_counter()
+    frames = read()
+    elapsed = time.perf_counter() - start
+    memory = sum(frame.memory_usage(deep=True).sum() for frame in frames)
+    return elapsed, memory, sum(len(frame) for frame in frames)
+
+
+def _write_files(df, data_dir):
+    X, X_encoded, y = features.build_features(df)
+    df_handoff = X.assign(shot_made_flag=y)
+    test_index = df_handoff.sample(frac=0.2, random_state=42).index
+    df_handoff.to_csv(os.path.join(data_dir, 'df.csv'), index=False)
+    X_encoded.loc[test_index].drop(columns=features.ID_COLUMNS).to_csv(
+        os.path.join(data_dir, 'X_test.csv'), index=False)
+
+    df_dataset = df_handoff.assign(season=df['season'])
+    parquet_store.write_dataset(df_dataset, parquet_store.SHOTS_DATASET, data_dir)
+    parquet_store.write_dataset(df_dataset.loc[test_index], parquet_store.TEST_SHOTS_DATASET, data_dir)
+    return int(df['team_id'].iloc[0])
+
+
+def run(n_rows):
+    df = generate_shots(n_rows)
+    results = {}
+    with tempfile.TemporaryDirectory() as data_dir:
+        team_id = _write_files(df, data_dir)
+        del df
+        csv = lambda name: os.path.join(data_dir, name)  # noqa: E731
+        cases = {
+            'dashboard (CSV: X_test + df)': (
+                lambda: [pd.read_csv(csv('X_test.csv'), engine='pyarrow'),
+                         pd.read_csv(csv('df.csv'), engine='pyarrow')],
+                _disk_size(csv('X_test.csv')) + _disk_size(csv('df.csv'))),
+            'dashboard (Parquet: 1 time)': (
+                lambda: [parquet_store.read_dataset(parquet_store.TEST_SHOTS_DATASET, DASHBOARD_COLUMNS,
+                                                    team_ids=[team_id], data_dir=data_dir)],
+                _disk_size(parquet_store.dataset_path(parquet_store.TEST_SHOTS_DATASET, data_dir))),
+            'completo (CSV: df)': (
+                lambda: [pd.read_csv(csv('df.csv'), engine='pyarrow')],
+                _disk_size(csv('df.csv'))),
+            'completo (Parquet: shots)': (
+                lambda: [parquet_store.read_dataset(parquet_store.SHOTS_DATASET, data_dir=data_dir)],
+                _disk_size(parquet_store.dataset_path(parquet_store.SHOTS_DATASET, data_dir))),
+        }
+        print(f"{'leitura':<32}{'tempo':>9}{'memória':>12}{'em disco':>12}{'linhas':>12}")
+        for name, (read, disk_bytes) in cases.items():
+            elapsed, memory, rows = _timed_read(read)
+            results[name] = {'seconds': elapsed, 'memory_bytes': int(memory),
+                             'disk_bytes': disk_bytes, 'rows': rows}
+            print(f"{name:<32}{elapsed:>8.2f}s{memory / 1e6:>10.1f}MB{disk_bytes / 1e6:>10.1f}MB{rows:>12,}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    args = parser.parse_args()
+    run(args.rows)
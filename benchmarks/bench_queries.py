@@ -0,0 +1,110 @@
+"""Latência das consultas de queries.py sem e com os índices das migrações de esquema.
+
+Confere também, via EXPLAIN QUERY PLAN, que cada consulta usa o índice esperado.
+
+    python benchmarks/bench_queries.py --rows 1000000
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BASE_DIR, '..', 'src'))
+sys.path.append(os.path.join(BASE_DIR, '..', 'configs'))
+
+import bulk_loader  # noqa: E402
+import queries  # noqa: E402
+from database_setup import GAME_INDEXES, create_database  # noqa: E402
+from synthetic import game_frame, generate_shots  # noqa: E402
+
+
+def _load(conn, df):
+    with bulk_loader.bulk_load_session(conn), bulk_loader.deferred_indexes(conn):
+        for (season, team_id), df_partition in df.groupby(['season', 'team_id'], sort=False):
+            df_players = df_partition[['player_id']].drop_duplicates()
+            df_players['player_name'] = 'Player ' + df_players['player_id'].astype(str)
+            bulk_loader.load_partition(
+                conn, season, int(team_id),
+                bulk_loader.to_rows(df_partition, bulk_loader.SHOT_COLUMNS),
+                player_rows=bulk_loader.to_rows(df_players, ['player_id', 'player_name']),
+                game_rows=bulk_loader.to_rows(game_frame(df_partition), bulk_loader.GAME_COLUMNS),
+                replace=False,
+            )
+
+
+def _workload(df):
+    """Consultas típicas do dashboard/notebooks com parâmetros fixos por rodada."""
+    season = df['season'].iloc[0]
+    team_id = int(df['team_id'].iloc[0])
+    player_id = int(df['player_id'].iloc[0])
+    game_id = df['game_id'].iloc[0]
+    game_date = df['game_date'].iloc[0]
+    return {
+        'shots_for_team': lambda conn: queries.shots_for_team(conn, team_id, season),
+        'shots_for_team (todas temp.)': lambda conn: queries.shots_for_team(conn, team_id),
+        'shots_for_player': lambda conn: queries.shots_for_player(conn, player_id),
+        'shots_for_game': lambda conn: queries.shots_for_game(conn, game_id),
+        'missing_players': queries.missing_player_count,
+        'missing_games': queries.missing_game_count,
+        'pending_games': bulk_loader.pending_game_count,
+        'games_between': lambda conn: queries.games_between(conn, game_date, game_date),
+    }
+
+
+def _measure(conn, workload, repeats):
+    timings = {}
+    for name, query in workload.items():
+        start = time.perf_counter()
+        for _ in range(repeats):
+            query(conn)
+        timings[name] = (time.perf_counter() - start) / repeats
+    return timings
+
+
+def run(n_rows, repeats):
+    df = generate_shots(n_rows)
+    workload = _workload(df)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'queries.sqlite')
+        create_database(db_path)
+        conn = sqlite3.connect(db_path)
+        _load(conn, df)
+
+        bulk_loader.drop_secondary_indexes(conn)
+        for index_name in GAME_INDEXES:
+            conn.execute(f'DROP INDEX {index_name}')
+        before = _measure(conn, workload, repeats)
+
+        bulk_loader.create_secondary_indexes(conn)
+        for ddl in GAME_INDEXES.values():
+            conn.execute(ddl)
+        conn.execute('ANALYZE')
+        plans = queries.check_query_plans(conn)
+        after = _measure(conn, workload, repeats)
+        conn.close()
+
+    print("\nEXPLAIN QUERY PLAN:")
+    for name, (ok, plan) in plans.items():
+        print(f"  [{'OK' if ok else 'FALHA'}] {name}: {' | '.join(plan)}")
+
+    print(f"\nLatência média ({repeats} repetições, {n_rows:,} linhas):")
+    print(f"  {'consulta':<30}{'sem índices':>14}{'com índices':>14}{'speedup':>10}")
+    for name in workload:
+        print(f"  {name:<30}{before[name] * 1000:>12.1f}ms{after[name] * 1000:>12.1f}ms"
+              f"{before[name] / after[name]:>9.1f}x")
+
+    failed = [name for name, (ok, _) in plans.items() if not ok]
+    if failed:
+        raise SystemExit(f"Consultas sem o índice esperado: {', '.join(failed)}")
+    return {'before': before, 'after': after}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+    run(args.rows, args.repeats)
@@ -0,0 +1,112 @@
+"""Tempo da troca de jogador na aba 3: Matplotlib/seaborn a cada rerun vs shot_rendering.
+
+O caminho antigo repete o código do dashboard (draw_court + scatter + dois
+sns.histplot com kde=True sobre o time inteiro, figuras nunca fechadas). O
+novo prepara uma vez por time as camadas fixas (quadra; eixos e distribuição
+do time no DistanceChart); a primeira troca para um jogador só desenha a
+camada dele, e as seguintes saem do RenderCache.
+
+    python benchmarks/bench_rendering.py --team-shots 7000 --players 15
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+import seaborn as sns  # noqa: E402
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BASE_DIR, '..', 'src'))
+
+import shot_rendering  # noqa: E402
+from synthetic import generate_shots  # noqa: E402
+
+
+def team_shots(n_shots, n_players):
+    df = generate_shots(n_shots, seed=21)
+    df['player_id'] = np.arange(len(df)) % n_players
+    rng = np.random.default_rng(21)
+    df['predicted_outcome'] = (rng.random(len(df)) < 0.5).astype(int)
+    return df.sort_values('player_id', kind='stable').reset_index(drop=True)
+
+
+def render_old(df_team, df_player):
+    """Cópia do código da aba 3 antes do shot_rendering, salvando as figuras como o st.pyplot."""
+    conditions = [
+        (df_player['shot_made_flag'] == 1) & (df_player['predicted_outcome'] == 1),
+        (df_player['shot_made_flag'] == 0) & (df_player['predicted_outcome'] == 0),
+        (df_player['shot_made_flag'] == 0) & (df_player['predicted_outcome'] == 1),
+        (df_player['shot_made_flag'] == 1) & (df_player['predicted_outcome'] == 0)
+    ]
+    colors = np.select(conditions, ['green', 'red', 'orange', 'purple'], default='black')
+    fig, ax = plt.subplots(figsize=(6, 5.5))
+    shot_rendering.draw_court(ax)
+    ax.scatter(df_player['loc_x'], df_player['loc_y'], c=colors, alpha=0.8, s=40)
+    plt.axis('off')
+    fig.savefig(io.BytesIO(), format='png')
+    fig2, ax2 = plt.subplots(figsize=(8, 4.5))
+    sns.histplot(df_team['shot_distance'], bins=30, color='gray', stat='density', kde=True, ax=ax2)
+    sns.histplot(df_player['shot_distance'], bins=15, color='blue', stat='density', kde=True, ax=ax2)
+    ax2.legend(['time', 'jogador'])
+    fig2.savefig(io.BytesIO(), format='png')
+
+
+def render_new(cache, distance_chart, df_player, player_id):
+    cache.get_or_render(('bench', player_id, 'shots'), lambda: shot_rendering.render_shot_chart(
+        df_player['loc_x'], df_player['loc_y'], df_player['shot_made_flag'], df_player['predicted_outcome'],
+        f"Shot Chart de {player_id}"))
+    cache.get_or_render(('bench', player_id, 'distance'), lambda: distance_chart.render(player_id, str(player_id)))
+
+
+def run(n_shots, n_players):
+    df_team = team_shots(n_shots, n_players)
+    players = [(player_id, df_team[df_team['player_id'] == player_id]) for player_id in range(n_players)]
+    results = {}
+
+    start = time.perf_counter()
+    for _, df_player in players:
+        render_old(df_team, df_player)
+    results['old_ms'] = (time.perf_counter() - start) / n_players * 1000
+    open_figures = len(plt.get_fignums())
+    plt.close('all')
+
+    cache = shot_rendering.RenderCache()
+    start = time.perf_counter()
+    player_ranges = {player_id: (int(df_player.index[0]), int(df_player.index[-1]) + 1)
+                     for player_id, df_player in players}
+    distance_chart = shot_rendering.DistanceChart(df_team['shot_distance'], player_ranges, 'time')
+    shot_rendering.court_background()
+    results['setup_ms'] = (time.perf_counter() - start) * 1000
+    timings = []
+    for player_id, df_player in players:
+        start = time.perf_counter()
+        render_new(cache, distance_chart, df_player, player_id)
+        timings.append(time.perf_counter() - start)
+    results['cold_ms'] = float(np.mean(timings) * 1000)
+    results['cold_max_ms'] = float(np.max(timings) * 1000)
+    start = time.perf_counter()
+    for player_id, df_player in players:
+        render_new(cache, distance_chart, df_player, player_id)
+    results['cached_ms'] = (time.perf_counter() - start) / n_players * 1000
+
+    print(f"Time com {n_shots:,} arremessos, {n_players} jogadores")
+    print(f"  antigo (pyplot + seaborn kde): {results['old_ms']:.1f} ms por troca, "
+          f"{open_figures} figuras abertas ao final")
+    print(f"  novo, preparo do time (camadas + perfis): {results['setup_ms']:.1f} ms")
+    print(f"  novo, 1ª renderização: {results['cold_ms']:.1f} ms por troca (máx. {results['cold_max_ms']:.1f} ms)")
+    print(f"  novo, em cache: {results['cached_ms']:.3f} ms por troca; "
+          f"figuras pyplot abertas: {len(plt.get_fignums())}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--team-shots', type=int, default=7000)
+    parser.add_argument('--players', type=int, default=15)
+    args = parser.parse_args()
+    run(args.team_shots, args.players)
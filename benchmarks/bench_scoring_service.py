@@ -0,0 +1,174 @@
+"""Teste de carga do scoring_service contra uma instância local do uvicorn.
+
+Sobe o serviço em um subprocesso para cada janela de micro-batching, dispara
+requisições de um arremesso a partir de --clients threads concorrentes por
+--duration segundos e compara latência (p50/p99 no cliente e no /metrics) e
+vazão. Uma rodada extra mede /predict/batch com --batch-shots por requisição.
+
+    python benchmarks/bench_scoring_service.py --windows 0 2 5 --clients 32 --duration 10
+
+Se não houver models/feature_transformer.joblib (gerado pelo notebook 02), um
+transformador com as colunas do modelo é montado a partir dos nomes das
+features e das escalas dos dados sintéticos, suficiente para medir latência.
+"""
+import argparse
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import joblib
+import numpy as np
+import requests
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(BASE_DIR, '..', 'src')
+sys.path.append(SRC_DIR)
+
+import features  # noqa: E402
+import tree_predictor  # noqa: E402
+from synthetic import generate_shots  # noqa: E402
+
+MODEL_PATH = os.path.join(BASE_DIR, '..', 'models', 'xgb_best_model.joblib')
+SHOT_FIELDS = ['loc_x', 'loc_y', 'shot_distance', 'period', 'minutes_remaining', 'seconds_remaining'] + \
+    features.CATEGORICAL_FEATURES
+STARTUP_TIMEOUT = 60
+
+
+def transformer_from_model(model, df_shots):
+    """Transformador com exatamente as colunas do modelo e escalas ajustadas em df_shots.
+
+    A categoria de referência (drop_first) não aparece nos nomes das features e
+    fica como um marcador vazio.
+    """
+    names = model.get_booster().feature_names
+    categories = {column: [''] + [name[len(column) + 1:] for name in names if name.startswith(f"{column}_")]
+                  for column in features.CATEGORICAL_FEATURES}
+    scales = features.FeatureTransformer().fit(df_shots).scales
+    return features.FeatureTransformer(categories, scales)
+
+
+def prepare_model_dir(model_path, df_shots, model_dir):
+    """Copia o modelo (e o transformador e o preditor NumPy, se existirem) para um diretório temporário."""
+    target = os.path.join(model_dir, os.path.basename(model_path))
+    shutil.copy(model_path, target)
+    # O preditor NumPy exportado continua válido: a cópia tem o mesmo sha1
+    if os.path.exists(tree_predictor.predictor_path(model_path)):
+        shutil.copy(tree_predictor.predictor_path(model_path), tree_predictor.predictor_path(target))
+    transformer_file = features.transformer_path(model_path)
+    if os.path.exists(transformer_file):
+        shutil.copy(transformer_file, features.transformer_path(target))
+    else:
+        print("Transformador não encontrado; usando um montado a partir das colunas do modelo")
+        transformer_from_model(joblib.load(model_path), df_shots).save(features.transformer_path(target))
+    return target
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_service(model_path, window_ms):
+    port = _free_port()
+    env = dict(os.environ, SCORING_MODEL_PATH=model_path, SCORING_BATCH_WINDOW_MS=str(window_ms))
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'scoring_service:app', '--app-dir', SRC_DIR,
+         '--port', str(port), '--log-level', 'warning'], env=env)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.perf_counter() + STARTUP_TIMEOUT
+    while time.perf_counter() < deadline:
+        try:
+            if requests.get(f"{url}/health", timeout=1).ok:
+                return process, url
+        except requests.ConnectionError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"Serviço não respondeu em {STARTUP_TIMEOUT}s")
+
+
+def stop_service(process):
+    process.terminate()
+    process.wait(timeout=10)
+
+
+def run_load(url, endpoint, payloads, clients, duration):
+    """Cada cliente envia requisições em sequência até o fim de duration."""
+    latencies = [[] for _ in range(clients)]
+    errors = [0] * clients
+    stop_at = time.perf_counter() + duration
+
+    def client(position):
+        session = requests.Session()
+        rng = np.random.default_rng(position)
+        while time.perf_counter() < stop_at:
+            payload = payloads[rng.integers(len(payloads))]
+            start = time.perf_counter()
+            response = session.post(f"{url}{endpoint}", json=payload)
+            if response.ok:
+                latencies[position].append(time.perf_counter() - start)
+            else:
+                errors[position] += 1
+
+    threads = [threading.Thread(target=client, args=(position,)) for position in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    values = np.concatenate([np.asarray(v, dtype=np.float64) for v in latencies]) * 1000
+    p50, p99 = np.percentile(values, [50, 99]) if len(values) else (float('nan'), float('nan'))
+    return {'requests': len(values), 'errors': sum(errors), 'requests_per_s': len(values) / elapsed,
+            'p50_ms': p50, 'p99_ms': p99}
+
+
+def run(model_path=MODEL_PATH, windows=(0, 2, 5), clients=32, duration=10.0, batch_shots=1000):
+    df_shots = generate_shots(20_000, seed=3)
+    shots = df_shots[SHOT_FIELDS].to_dict('records')
+    single_payloads = shots[:5000]
+    batch_payloads = [{'shots': shots[start:start + batch_shots]}
+                      for start in range(0, len(shots) - batch_shots + 1, batch_shots)]
+    results = {}
+    with tempfile.TemporaryDirectory() as model_dir:
+        service_model = prepare_model_dir(model_path, df_shots, model_dir)
+        print(f"{'cenário':<28}{'req/s':>9}{'p50':>10}{'p99':>10}{'srv p50':>10}{'srv p99':>10}"
+              f"{'linhas/lote':>13}")
+        scenarios = [(f"/predict janela {w}ms", '/predict', single_payloads, w, clients) for w in windows]
+        scenarios.append((f"/predict/batch x{batch_shots}", '/predict/batch', batch_payloads, windows[-1],
+                          max(1, clients // 8)))
+        for name, endpoint, payloads, window_ms, n_clients in scenarios:
+            process, url = start_service(service_model, window_ms)
+            try:
+                # Aquecimento: primeira chamada ao modelo e conexões
+                run_load(url, endpoint, payloads, n_clients, min(1.0, duration))
+                load = run_load(url, endpoint, payloads, n_clients, duration)
+                # Métricas do servidor desde o startup (incluem o aquecimento)
+                server = requests.get(f"{url}/metrics").json()
+            finally:
+                stop_service(process)
+            server_latency = server['latency'][endpoint.strip('/').replace('/', '_')]
+            results[name] = dict(load, server=server)
+            print(f"{name:<28}{load['requests_per_s']:>9.0f}{load['p50_ms']:>8.1f}ms{load['p99_ms']:>8.1f}ms"
+                  f"{server_latency['p50_ms']:>8.1f}ms{server_latency['p99_ms']:>8.1f}ms"
+                  f"{server['mean_batch_rows']:>13.1f}")
+            if load['errors']:
+                print(f"  {load['errors']} requisições com erro")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--windows', type=float, nargs='+', default=[0, 2, 5],
+                        help='Janelas de micro-batching (ms) a comparar')
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--batch-shots', type=int, default=1000)
+    args = parser.parse_args()
+    run(args.model, args.windows, args.clients, args.duration, args.batch_shots)
@@ -0,0 +1,118 @@
+"""Escrita paralela e consultas por temporada: banco único vs um arquivo por temporada (src/season_store.py).
+
+Cada temporada é carregada por um processo próprio, uma transação por
+(temporada, time), como nos coletores. No banco único todos os processos
+disputam o mesmo lock de escrita; com o season_store cada um grava o seu
+arquivo. Depois compara a latência de shots_for_team de uma temporada no
+banco único, na conexão federada com só aquela temporada e com todas.
+
+    python benchmarks/bench_season_store.py --rows-per-season 200000 --seasons 4
+"""
+import argparse
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BASE_DIR, '..', 'src'))
+sys.path.append(os.path.join(BASE_DIR, '..', 'configs'))
+
+import bulk_loader  # noqa: E402
+import queries  # noqa: E402
+import season_store  # noqa: E402
+from database_setup import create_database  # noqa: E402
+from seasons_config import AVAILABLE_SEASONS  # noqa: E402
+from synthetic import generate_shots  # noqa: E402
+
+QUERY_REPEATS = 20
+
+
+def worker(mode, db_path, season, position, rows):
+    """Carrega uma temporada no processo atual, uma transação por time; imprime o tempo nas transações em JSON."""
+    df = generate_shots(rows, seed=position, seasons=(season,))
+    if mode == 'unico':
+        conn = sqlite3.connect(db_path, timeout=season_store.BUSY_TIMEOUT)
+    else:
+        conn = season_store.open_season(season, db_path)
+    transaction_seconds = []
+    with bulk_loader.bulk_load_session(conn):
+        for team_id, df_partition in df.groupby('team_id', sort=False):
+            rows = bulk_loader.to_rows(df_partition, bulk_loader.SHOT_COLUMNS)
+            start = time.perf_counter()
+            bulk_loader.load_partition(conn, season, int(team_id), rows)
+            transaction_seconds.append(time.perf_counter() - start)
+    conn.close()
+    print(json.dumps({'total': sum(transaction_seconds), 'max': max(transaction_seconds)}))
+
+
+def parallel_load(mode, db_path, seasons, rows):
+    """Um processo por temporada, todos ao mesmo tempo.
+
+    Returns:
+        tuple: (segundos no total, segundos somados dentro das transações, maior transação)
+    """
+    start = time.perf_counter()
+    processes = [subprocess.Popen([sys.executable, os.path.abspath(__file__), '--worker', mode, '--db', db_path,
+                                   '--season', season, '--position', str(position), '--rows-per-season', str(rows)],
+                                  stdout=subprocess.PIPE, text=True)
+                 for position, season in enumerate(seasons)]
+    outputs = [process.communicate()[0] for process in processes]
+    if any(process.returncode != 0 for process in processes):
+        raise RuntimeError(f"Carga paralela ({mode}) falhou")
+    elapsed = time.perf_counter() - start
+    stats = [json.loads(output.strip().splitlines()[-1]) for output in outputs]
+    return elapsed, sum(stat['total'] for stat in stats), max(stat['max'] for stat in stats)
+
+
+def query_ms(conn, season):
+    start = time.perf_counter()
+    for team_id in list(range(1610612737, 1610612767))[:QUERY_REPEATS]:
+        queries.shots_for_team(conn, team_id, [season])
+    return (time.perf_counter() - start) / QUERY_REPEATS * 1000
+
+
+def run(rows, n_seasons):
+    seasons = AVAILABLE_SEASONS[:n_seasons]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        single_path = os.path.join(tmp_dir, 'unico.sqlite')
+        catalog_path = os.path.join(tmp_dir, 'nba_shots.sqlite')
+        create_database(single_path)
+        sqlite3.connect(single_path).execute('PRAGMA journal_mode = WAL').connection.close()
+
+        print(f"Carga de {n_seasons} temporadas x {rows:,} arremessos, um processo por temporada")
+        print(f"  {'':<24}{'total':>8}{'em transações':>16}{'maior transação':>18}")
+        for name, mode, path in [('banco único', 'unico', single_path),
+                                 ('arquivo por temporada', 'temporadas', catalog_path)]:
+            elapsed, in_transactions, longest = parallel_load(mode, path, seasons, rows)
+            print(f"  {name:<24}{elapsed:>7.1f}s{in_transactions:>15.1f}s{longest * 1000:>15.0f} ms")
+        for season in seasons[1:]:
+            season_store.seal(season, catalog_path)
+
+        single = sqlite3.connect(single_path)
+        one_season = season_store.connect(catalog_path, [seasons[0]])
+        all_seasons = season_store.connect(catalog_path)
+        print(f"shots_for_team de {seasons[0]} (média de {QUERY_REPEATS} times)")
+        for name, conn in [('banco único', single), ('federado, 1 temporada', one_season),
+                           ('federado, todas', all_seasons)]:
+            query_ms(conn, seasons[0])
+            print(f"  {name:<24}{query_ms(conn, seasons[0]):>7.2f} ms")
+            conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows-per-season', type=int, default=200_000)
+    parser.add_argument('--seasons', type=int, default=4)
+    parser.add_argument('--worker', choices=['unico', 'temporadas'], help=argparse.SUPPRESS)
+    parser.add_argument('--db', help=argparse.SUPPRESS)
+    parser.add_argument('--season', help=argparse.SUPPRESS)
+    parser.add_argument('--position', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        worker(args.worker, args.db, args.season, args.position, args.rows_per_season)
+    else:
+        run(args.rows_per_season, args.seasons)
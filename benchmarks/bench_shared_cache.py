@@ -0,0 +1,152 @@
+"""Memória por sessão e tempo de seleção de time/jogador: cópias por sessão vs cache mapeado.
+
+Simula --sessions sessões do Streamlit. No modo antigo, cada sessão recebe
+uma cópia (pickle) dos frames completos, como o st.cache_data faz, e filtra o
+time com máscara booleana + .copy(). No modo novo, todas abrem o mesmo cache
+Arrow/NumPy mapeado em memória e pegam o time por faixa de linhas. A memória
+anônima do processo (Anonymous em /proc/self/smaps_rollup) mede o que cada
+modo aloca de fato; páginas do arquivo mapeado ficam no cache do sistema e
+são compartilhadas entre processos. Por fim, o rerun da aba de jogador
+(lista de jogadores + filtro) é medido com máscaras de texto e com o índice
+de faixas por (time, jogador).
+
+    python benchmarks/bench_shared_cache.py --rows 1000000 --sessions 5
+"""
+import argparse
+import gc
+import os
+import pickle
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BASE_DIR, '..', 'src'))
+
+import features  # noqa: E402
+import shared_cache  # noqa: E402
+from synthetic import generate_shots  # noqa: E402
+
+
+def anonymous_memory():
+    """Memória anônima (heap, arrays) do processo em bytes; None fora do Linux."""
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                if line.startswith('Anonymous:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+
+
+def analysis_data(n_rows):
+    df = generate_shots(n_rows, seed=9)
+    transformer = features.FeatureTransformer().fit(df)
+    model_input = transformer.transform(df)
+    df = features.add_engineered_features(df)
+    df['player_display'] = df['player_id'].astype(str)
+    df['team_name'] = 'Team ' + df['team_id'].astype(str)
+    return df, transformer.to_frame(model_input)
+
+
+def old_sessions(df_analysis, df_features, n_sessions, team_name):
+    """st.cache_data: cada sessão desserializa sua própria cópia dos frames completos."""
+    payload = pickle.dumps((df_features, df_analysis), protocol=pickle.HIGHEST_PROTOCOL)
+    sessions, select_times = [], []
+    for _ in range(n_sessions):
+        session_features, session_analysis = pickle.loads(payload)
+        start = time.perf_counter()
+        team_indices = session_analysis[session_analysis['team_name'] == team_name].index
+        team = (session_analysis.loc[team_indices].copy(), session_features.loc[team_indices].copy())
+        select_times.append(time.perf_counter() - start)
+        sessions.append((session_features, session_analysis, team))
+    return sessions, select_times
+
+
+def new_sessions(cache_dir, n_sessions, team_id):
+    """st.cache_resource: um único SharedDataset mapeado; cada sessão só materializa o seu time."""
+    shared = shared_cache.open_dataset('bench', cache_dir)
+    sessions, select_times = [], []
+    for _ in range(n_sessions):
+        start = time.perf_counter()
+        team = (shared.team_frame(team_id), shared.team_features(team_id))
+        select_times.append(time.perf_counter() - start)
+        sessions.append(team)
+    return [shared] + sessions, select_times
+
+
+def _measure(label, create):
+    gc.collect()
+    before = anonymous_memory()
+    sessions, select_times = create()
+    gc.collect()
+    after = anonymous_memory()
+    growth = (after - before) if before is not None else float('nan')
+    select_ms = np.median(select_times) * 1000
+    print(f"{label:<28}{growth / 1e6:>12.0f}MB{select_ms:>14.2f}ms")
+    del sessions
+    return {'memory_growth_bytes': growth, 'select_ms': select_ms}
+
+
+def _best_of(func, repeat=20):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def player_rerun(df_team, shared, team_id):
+    """Lista de jogadores + linhas do jogador selecionado, como em cada rerun da aba de jogador."""
+    def with_masks():
+        player_list = sorted(df_team['player_display'].unique())
+        return df_team[df_team['player_display'] == player_list[len(player_list) // 2]]
+
+    team_frame = shared.team_frame(team_id)
+    player_ranges = shared.team_player_ranges(team_id)
+    player_options = {team_frame['player_display'].iat[start]: player_id
+                      for player_id, (start, _) in sorted(player_ranges.items())}
+
+    def with_index():
+        player_list = list(player_options)
+        start, stop = player_ranges[player_options[player_list[len(player_list) // 2]]]
+        return team_frame.iloc[start:stop]
+
+    assert len(with_masks()) == len(with_index())
+    return _best_of(with_masks), _best_of(with_index)
+
+
+def run(n_rows, n_sessions):
+    df_analysis, df_features = analysis_data(n_rows)
+    team_id = int(df_analysis['team_id'].iloc[0])
+    team_name = f"Team {team_id}"
+    results = {}
+    with tempfile.TemporaryDirectory() as cache_dir:
+        start = time.perf_counter()
+        shared_cache.build('bench', df_analysis, df_features.to_numpy(), 'bench', cache_dir)
+        print(f"Cache construído em {time.perf_counter() - start:.2f}s "
+              f"({sum(os.path.getsize(os.path.join(cache_dir, f)) for f in os.listdir(cache_dir)) / 1e6:.0f} MB)")
+        print(f"{'modo':<28}{'memória':>14}{'seleção time':>16}")
+        results['copias_por_sessao'] = _measure(
+            f"cópias ({n_sessions} sessões)",
+            lambda: old_sessions(df_analysis, df_features, n_sessions, team_name))
+        results['cache_mapeado'] = _measure(
+            f"mapeado ({n_sessions} sessões)", lambda: new_sessions(cache_dir, n_sessions, team_id))
+        shared = shared_cache.open_dataset('bench', cache_dir)
+        df_team = df_analysis[df_analysis['team_id'] == team_id]
+        mask_time, index_time = player_rerun(df_team, shared, team_id)
+        print(f"Aba de jogador ({len(df_team):,} arremessos do time): máscaras {mask_time * 1000:.2f} ms | "
+              f"índice {index_time * 1000:.3f} ms")
+        results['aba_jogador_ms'] = {'mascaras': mask_time * 1000, 'indice': index_time * 1000}
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--sessions', type=int, default=5)
+    args = parser.parse_args()
+    run(args.rows, args.sessions)
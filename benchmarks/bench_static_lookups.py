@@ -0,0 +1,57 @@
+"""Tempo gasto em lookups de times/jogadores no ETL: padrão antigo (por time) vs static_index.
+
+    python benchmarks/bench_static_lookups.py --seasons 3
+"""
+import argparse
+import os
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BASE_DIR, '..', 'src'))
+
+from nba_api.stats.static import players, teams  # noqa: E402
+
+import static_index  # noqa: E402
+from synthetic import generate_shots  # noqa: E402
+
+
+def lookups_before(partitions):
+    """Reproduz o loop original: get_players() + dict e varredura de get_teams() a cada time."""
+    for team_id, df_partition in partitions:
+        team_info = [t for t in teams.get_teams() if t['id'] == team_id]
+        nba_players = players.get_players()
+        player_names = {p['id']: p['full_name'] for p in nba_players}
+        df_partition['player_id'].drop_duplicates().map(player_names)
+        assert team_info
+
+
+def lookups_after(partitions):
+    for team_id, df_partition in partitions:
+        team_info = static_index.team_info(team_id)
+        static_index.map_player_names(df_partition['player_id'].drop_duplicates())
+        assert team_info
+
+
+def run(n_seasons):
+    seasons = tuple(f"{year}-{str(year + 1)[-2:]}" for year in range(2024 - n_seasons + 1, 2025))
+    df = generate_shots(30 * 1000 * n_seasons, seasons=seasons)
+    partitions = [(int(team_id), df_partition)
+                  for (_, team_id), df_partition in df.groupby(['season', 'team_id'])]
+
+    results = {}
+    for name, lookups in [('antes', lookups_before), ('depois', lookups_after)]:
+        start = time.perf_counter()
+        lookups(partitions)
+        results[name] = time.perf_counter() - start
+        print(f"{name:>7}: {results[name]:.3f}s em lookups para {len(partitions)} partições")
+    print(f"Speedup: {results['antes'] / results['depois']:.0f}x")
+    print(static_index.lookup_report())
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seasons', type=int, default=3)
+    args = parser.parse_args()
+    run(args.seasons)
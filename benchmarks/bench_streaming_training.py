@@ -0,0 +1,129 @@
+"""Pico de RSS e tempo do treino por número de temporadas: tudo em memória vs streaming em blocos.
+
+Monta um SQLite sintético com --rows-per-season arremessos por temporada e
+treina, em um processo separado por rodada, com 1, 2, 4... temporadas. O modo
+em memória repete o notebook 03 (todos os arremessos num DataFrame, matriz
+float32 completa, XGBClassifier.fit); os modos em blocos usam
+src/streaming_training.py com QuantileDMatrix e com memória externa. O pico de
+RSS é o VmHWM de cada processo.
+
+    python benchmarks/bench_streaming_training.py --rows-per-season 250000 --seasons 1 2 4 8
+"""
+import argparse
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BASE_DIR, '..', 'src'))
+sys.path.append(os.path.join(BASE_DIR, '..', 'configs'))
+
+import bulk_loader  # noqa: E402
+import features  # noqa: E402
+import queries  # noqa: E402
+import streaming_training  # noqa: E402
+from database_setup import create_database  # noqa: E402
+from seasons_config import AVAILABLE_SEASONS  # noqa: E402
+from synthetic import generate_shots  # noqa: E402
+
+MODES = ['memoria', 'quantile', 'externa']
+
+
+def build_database(db_path, seasons, rows_per_season):
+    """Uma temporada por vez, para que o próprio preparo não dependa do total."""
+    create_database(db_path)
+    conn = sqlite3.connect(db_path)
+    with bulk_loader.bulk_load_session(conn), bulk_loader.deferred_indexes(conn):
+        for position, season in enumerate(seasons):
+            df = generate_shots(rows_per_season, seed=position, seasons=(season,))
+            for team_id, df_partition in df.groupby('team_id', sort=False):
+                bulk_loader.load_partition(conn, season, int(team_id),
+                                           bulk_loader.to_rows(df_partition, bulk_loader.SHOT_COLUMNS),
+                                           replace=False)
+    conn.close()
+
+
+def train_in_memory(db_path, seasons, rounds, model_dir):
+    """Caminho do notebook 03: DataFrame completo, matriz completa e XGBClassifier.fit."""
+    conn = sqlite3.connect(db_path)
+    df = queries.load_shots(conn, seasons, streaming_training.TRAINING_COLUMNS)
+    conn.close()
+    transformer = features.FeatureTransformer.load(os.path.join(model_dir, features.TRANSFORMER_FILENAME))
+    X = transformer.to_frame(transformer.transform(df))
+    params = {key: value for key, value in streaming_training.DEFAULT_PARAMS.items() if key != 'seed'}
+    model = streaming_training.xgb.XGBClassifier(n_estimators=rounds, random_state=42,
+                                                 max_bin=streaming_training.MAX_BIN, **params)
+    model.fit(X, df[features.TARGET])
+
+
+def worker(mode, db_path, seasons, rounds, model_dir):
+    """Uma rodada no processo atual; imprime o pico de RSS em JSON na última linha."""
+    if mode == 'memoria':
+        train_in_memory(db_path, seasons, rounds, model_dir)
+    else:
+        streaming_training.train_streaming(seasons, source='sqlite', rounds=rounds,
+                                           external_memory=mode == 'externa', db_name=db_path,
+                                           output_path=os.path.join(model_dir, f"{mode}.joblib"))
+    print(json.dumps({'peak_rss_bytes': streaming_training.peak_rss()}))
+
+
+def run_worker(mode, db_path, seasons, rounds, model_dir):
+    """Executa uma rodada em um processo novo e devolve (segundos, pico de RSS em bytes)."""
+    command = [sys.executable, os.path.abspath(__file__), '--worker', mode, '--db', db_path,
+               '--model-dir', model_dir, '--rounds', str(rounds), '--seasons-list', *seasons]
+    start = time.perf_counter()
+    completed = subprocess.run(command, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if completed.returncode != 0:
+        raise RuntimeError(f"{mode} com {len(seasons)} temporadas falhou:\n{completed.stderr}")
+    return elapsed, json.loads(completed.stdout.strip().splitlines()[-1])['peak_rss_bytes']
+
+
+def run(rows_per_season, season_counts, rounds, output=None):
+    seasons = AVAILABLE_SEASONS[:max(season_counts)]
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'shots.sqlite')
+        start = time.perf_counter()
+        build_database(db_path, seasons, rows_per_season)
+        print(f"Banco sintético: {len(seasons)} temporadas x {rows_per_season:,} arremessos "
+              f"({time.perf_counter() - start:.0f}s)")
+        # Transformador ajustado uma vez sobre tudo: as rodadas medem só leitura + treino
+        transformer = streaming_training.fit_transformer(
+            streaming_training.iter_chunks('sqlite', seasons, db_name=db_path))
+        transformer.save(os.path.join(tmp_dir, features.TRANSFORMER_FILENAME))
+
+        print(f"{'temporadas':>10}{'arremessos':>12}" + ''.join(f"{mode:>22}" for mode in MODES))
+        for count in season_counts:
+            row = {'seasons': count, 'rows': count * rows_per_season}
+            for mode in MODES:
+                seconds, peak = run_worker(mode, db_path, seasons[:count], rounds, tmp_dir)
+                row[mode] = {'seconds': seconds, 'peak_rss_bytes': peak}
+            results.append(row)
+            print(f"{count:>10}{row['rows']:>12,}" + ''.join(
+                f"{row[mode]['seconds']:>10.1f}s {row[mode]['peak_rss_bytes'] / 1e6:>7.0f}MB" for mode in MODES))
+    if output:
+        with open(output, 'w') as f:
+            json.dump(results, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows-per-season', type=int, default=250_000)
+    parser.add_argument('--seasons', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--rounds', type=int, default=50)
+    parser.add_argument('--output', help='Grava os resultados em JSON')
+    parser.add_argument('--worker', choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument('--db', help=argparse.SUPPRESS)
+    parser.add_argument('--model-dir', help=argparse.SUPPRESS)
+    parser.add_argument('--seasons-list', nargs='+', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        worker(args.worker, args.db, args.seasons_list, args.rounds, args.model_dir)
+    else:
+        run(args.rows_per_season, sorted(args.seasons), args.rounds, args.output)
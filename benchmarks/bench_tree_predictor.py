@@ -0,0 +1,95 @@
+"""Paridade e latência do TreePredictor (NumPy) contra o predict_proba do XGBoost.
+
+A paridade é conferida em arremessos sintéticos codificados com as colunas do
+modelo, incluindo linhas com valores ausentes (NaN) para exercitar default_left.
+A latência compara o tempo de carga (joblib vs .npz) e o custo por chamada em
+lotes de vários tamanhos.
+
+    python benchmarks/bench_tree_predictor.py --batch-sizes 1 16 256 4096 65536
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BASE_DIR, '..', 'src'))
+
+import tree_predictor  # noqa: E402
+from bench_scoring_service import transformer_from_model  # noqa: E402
+from synthetic import generate_shots  # noqa: E402
+
+MODEL_PATH = os.path.join(BASE_DIR, '..', 'models', 'xgb_best_model.joblib')
+# Diferença máxima aceita entre as probabilidades (somas em float32 no XGBoost)
+PROBABILITY_TOLERANCE = 1e-5
+
+
+def encoded_shots(model, n_rows):
+    df_shots = generate_shots(n_rows, seed=11)
+    X = transformer_from_model(model, df_shots).transform(df_shots)
+    # Um terço das linhas recebe ausentes em colunas aleatórias
+    rng = np.random.default_rng(0)
+    rows = rng.choice(n_rows, n_rows // 3, replace=False)
+    X[rows, rng.integers(0, X.shape[1], len(rows))] = np.nan
+    return X
+
+
+def check_parity(model, predictor, X):
+    expected = model.predict_proba(X)
+    actual = predictor.predict_proba(X)
+    max_diff = float(np.abs(expected - actual).max())
+    assert max_diff <= PROBABILITY_TOLERANCE, f"Diferença máxima {max_diff:.2e}"
+    assert np.array_equal(expected[:, 1] >= 0.5, actual[:, 1] >= 0.5) or max_diff < 1e-6
+    print(f"Paridade OK em {len(X):,} linhas (diferença máxima {max_diff:.2e})")
+    return max_diff
+
+
+def _per_call(predict, X, batch_size, min_seconds=1.0):
+    batches = [X[start:start + batch_size] for start in range(0, len(X) - batch_size + 1, batch_size)]
+    calls = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < min_seconds:
+        predict(batches[calls % len(batches)])
+        calls += 1
+    return (time.perf_counter() - start) / calls
+
+
+def run(model_path=MODEL_PATH, batch_sizes=(1, 16, 256, 4096, 65536), parity_rows=200_000):
+    start = time.perf_counter()
+    model = joblib.load(model_path)
+    joblib_load = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'model' + tree_predictor.PREDICTOR_SUFFIX)
+        tree_predictor.TreePredictor.from_booster(model.get_booster()).save(path)
+        start = time.perf_counter()
+        predictor = tree_predictor.TreePredictor.load(path)
+        npz_load = time.perf_counter() - start
+        npz_size = os.path.getsize(path)
+    print(f"Carga: joblib {joblib_load * 1000:.0f} ms ({os.path.getsize(model_path) / 1e3:.0f} KB) | "
+          f".npz {npz_load * 1000:.1f} ms ({npz_size / 1e3:.0f} KB), {predictor.n_trees} árvores")
+
+    X = encoded_shots(model, max(parity_rows, max(batch_sizes)))
+    results = {'load_ms': {'joblib': joblib_load * 1000, 'npz': npz_load * 1000},
+               'max_abs_diff': check_parity(model, predictor, X[:parity_rows]), 'per_call_ms': {}}
+
+    print(f"{'lote':>8}{'XGBoost':>12}{'NumPy':>12}{'ganho':>8}")
+    for batch_size in batch_sizes:
+        xgb_time = _per_call(model.predict_proba, X, batch_size)
+        numpy_time = _per_call(predictor.predict_proba, X, batch_size)
+        results['per_call_ms'][batch_size] = {'xgboost': xgb_time * 1000, 'numpy': numpy_time * 1000}
+        print(f"{batch_size:>8}{xgb_time * 1000:>10.3f}ms{numpy_time * 1000:>10.3f}ms{xgb_time / numpy_time:>7.1f}x")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 16, 256, 4096, 65536])
+    parser.add_argument('--parity-rows', type=int, default=200_000)
+    args = parser.parse_args()
+    run(args.model, args.batch_sizes, args.parity_rows)
@@ -0,0 +1,92 @@
+"""CPU e qualidade da busca de hiperparâmetros: RandomizedSearchCV do notebook 03 vs ASHA do src/tuning.py.
+
+Os dois recebem as mesmas features sintéticas de treino e o mesmo número de
+candidatos. O RandomizedSearchCV repete a última busca do notebook (cv=3,
+n_estimators até 1000, sem early stopping); o ASHA usa os degraus, o early
+stopping e os folds montados uma vez do src/tuning.py. O melhor modelo de
+cada um é avaliado numa temporada separada.
+
+    python benchmarks/bench_tuning.py --rows 60000 --trials 12
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from scipy.stats import randint, uniform
+from sklearn.metrics import log_loss
+from sklearn.model_selection import RandomizedSearchCV
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BASE_DIR, '..', 'src'))
+
+import features  # noqa: E402
+import tuning  # noqa: E402
+from synthetic import generate_shots  # noqa: E402
+
+
+def shot_features(n_rows):
+    df = generate_shots(n_rows, seed=17)
+    transformer = features.FeatureTransformer().fit(df)
+    train, test = df[df['season'] != '2024-25'], df[df['season'] == '2024-25']
+    return (transformer.transform(train), train[features.TARGET].to_numpy(),
+            transformer.transform(test), test[features.TARGET].to_numpy())
+
+
+def notebook_search(X, y, n_trials):
+    """Última RandomizedSearchCV do notebook 03, com um processo e uma thread."""
+    param_dist = {
+        'n_estimators': randint(100, 1000),
+        'learning_rate': uniform(0.01, 0.3),
+        'max_depth': randint(3, 10),
+        'subsample': uniform(0.6, 0.4),
+        'colsample_bytree': uniform(0.6, 0.4),
+        'gamma': uniform(0, 0.5)
+    }
+    model = tuning.xgb.XGBClassifier(objective='binary:logistic', eval_metric='logloss', scale_pos_weight=1.35,
+                                     tree_method='hist', n_jobs=1, random_state=42)
+    search = RandomizedSearchCV(estimator=model, param_distributions=param_dist, n_iter=n_trials,
+                                scoring='neg_log_loss', cv=3, n_jobs=1, refit=True, random_state=42)
+    search.fit(X, y)
+    return search.best_estimator_, -search.best_score_
+
+
+def run(n_rows, n_trials, workers):
+    X, y, X_test, y_test = shot_features(n_rows)
+    print(f"{len(y):,} arremessos de treino, {len(y_test):,} de teste, {n_trials} candidatos")
+    results = {}
+
+    start, cpu_start = time.perf_counter(), time.process_time()
+    model, cv_score = notebook_search(X, y, n_trials)
+    results['randomized_search'] = {
+        'seconds': time.perf_counter() - start, 'cpu_seconds': time.process_time() - cpu_start,
+        'cv_logloss': cv_score, 'test_logloss': log_loss(y_test, model.predict_proba(X_test)[:, 1])}
+
+    with tempfile.TemporaryDirectory() as search_dir:
+        start = time.perf_counter()
+        tuning.prepare_search(search_dir, X, y, seed=42)
+        best = tuning.run_search(search_dir, n_trials, workers, seed=42)
+        cpu_seconds = sum(record['cpu_seconds'] for record in tuning.load_trials(search_dir))
+        refit_cpu = time.process_time()
+        booster, _ = tuning.train_best(best, X, y)
+        cpu_seconds += time.process_time() - refit_cpu
+        probabilities = booster.predict(tuning.xgb.DMatrix(X_test))
+        results['asha'] = {'seconds': time.perf_counter() - start, 'cpu_seconds': cpu_seconds,
+                           'cv_logloss': best['score'], 'test_logloss': log_loss(y_test, probabilities)}
+
+    print(f"{'busca':<20}{'tempo':>10}{'CPU':>10}{'log loss CV':>14}{'log loss teste':>16}")
+    for name, result in results.items():
+        print(f"{name:<20}{result['seconds']:>9.1f}s{result['cpu_seconds']:>9.1f}s"
+              f"{result['cv_logloss']:>14.4f}{result['test_logloss']:>16.4f}")
+    print(f"CPU: {results['randomized_search']['cpu_seconds'] / results['asha']['cpu_seconds']:.1f}x menos com ASHA")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=60_000)
+    parser.add_argument('--trials', type=int, default=12)
+    parser.add_argument('--workers', type=int)
+    args = parser.parse_args()
+    run(args.rows, args.trials, args.workers)
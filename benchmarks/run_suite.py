@@ -0,0 +1,227 @@
+"""Suíte ponta a ponta: tempo de cada etapa do pipeline em 100k, 1M e 10M de arremessos sintéticos.
+
+Para cada tamanho, um processo próprio (memória de pico isolada) gera os
+arremessos com benchmarks/synthetic.py e mede as etapas que rodam de fato:
+
+- sqlite_load: carga de game_shot_charts pelo bulk_loader, uma transação por
+  (temporada, time), com os índices construídos no final;
+- fix_missing_data: preenchimento de players e games a partir dos arremessos;
+- features: FeatureTransformer.transform, em blocos de CHUNK_ROWS linhas;
+- predict_proba: modelo de produção sobre as mesmas features, em blocos;
+- analytical_data: batch_scoring.analytical_data (predição, acerto previsto e
+  POE) sobre o time com mais arremessos, a função chamada por
+  get_analytical_data no dashboard;
+- score_frame: batch_scoring.score_frame (features + predição + POE) do mesmo time;
+- team_cube: aggregate_cube.build_cube sobre o time pontuado;
+- dashboard_rollups: rollups das abas Visão Geral, POE e Erros sobre o cubo
+  (aggregate_cube.zone_performance, player_poe e error_counts), como no dashboard.
+
+Tudo roda offline. O resultado (tempos, memória de pico, versões e commit) é
+gravado em JSON; com --compare, cada etapa é comparada com uma rodada
+anterior e a suíte termina com erro se alguma ficar mais lenta que
+REGRESSION_TOLERANCE.
+
+    python benchmarks/run_suite.py --sizes 100000 1000000 10000000
+    python benchmarks/run_suite.py --sizes 100000 --compare benchmarks/results/suite_20250101_120000.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import joblib
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BASE_DIR, '..', 'src'))
+sys.path.append(os.path.join(BASE_DIR, '..', 'configs'))
+
+import aggregate_cube  # noqa: E402
+import batch_scoring  # noqa: E402
+import bulk_loader  # noqa: E402
+import collect_shotchart  # noqa: E402
+from bench_scoring_service import transformer_from_model  # noqa: E402
+from database_setup import create_database  # noqa: E402
+from synthetic import generate_shots  # noqa: E402
+
+SIZES = [100_000, 1_000_000, 10_000_000]
+MODEL_PATH = os.path.join(BASE_DIR, '..', 'models', 'xgb_best_model.joblib')
+RESULTS_DIR = os.path.join(BASE_DIR, 'results')
+# Linhas por bloco em features/predict_proba: a matriz completa de 10M não cabe na memória
+CHUNK_ROWS = 1_000_000
+# Repetições das etapas do dashboard (fica o melhor tempo)
+DASHBOARD_REPEATS = 3
+# Lentidão relativa tolerada no --compare, e tempo mínimo para a etapa entrar na comparação
+REGRESSION_TOLERANCE = 0.20
+MIN_COMPARE_SECONDS = 0.01
+
+
+def _best_of(func, repeat=DASHBOARD_REPEATS):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def dashboard_rollups(cube):
+    """Tabelas das abas do dashboard a partir do cubo do time."""
+    return (aggregate_cube.zone_performance(cube), aggregate_cube.player_poe(cube),
+            aggregate_cube.error_counts(cube, 'false_positives'), aggregate_cube.error_counts(cube, 'false_negatives'))
+
+
+def load_sqlite(db_path, df):
+    conn = sqlite3.connect(db_path)
+    with bulk_loader.bulk_load_session(conn), bulk_loader.deferred_indexes(conn):
+        for (season, team_id), df_partition in df.groupby(['season', 'team_id'], sort=False):
+            bulk_loader.load_partition(conn, season, int(team_id),
+                                       bulk_loader.to_rows(df_partition, bulk_loader.SHOT_COLUMNS), replace=False)
+    return conn
+
+
+def run_size(n_rows, seed=42):
+    """Mede todas as etapas para n_rows arremessos. Retorna {'rows', 'stages', 'peak_rss_mb', ...}."""
+    stages = {}
+
+    def timed(name, func):
+        start = time.perf_counter()
+        result = func()
+        stages[name] = time.perf_counter() - start
+        return result
+
+    df = timed('generate', lambda: generate_shots(n_rows, seed=seed))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'nba_shots.sqlite')
+        create_database(db_path)
+        conn = timed('sqlite_load', lambda: load_sqlite(db_path, df))
+        with contextlib.redirect_stdout(io.StringIO()):
+            timed('fix_missing_data', lambda: collect_shotchart.fix_missing_data(conn))
+        conn.close()
+
+    model = joblib.load(MODEL_PATH)
+    model.set_params(n_jobs=1)
+    transformer = transformer_from_model(model, df)
+    buffer = transformer.allocate(min(CHUNK_ROWS, n_rows))
+    probabilities = np.empty(n_rows, dtype=np.float32)
+    feature_seconds = predict_seconds = 0.0
+    for start in range(0, n_rows, CHUNK_ROWS):
+        chunk_start = time.perf_counter()
+        X = transformer.transform(df.iloc[start:start + CHUNK_ROWS], out=buffer)
+        feature_seconds += time.perf_counter() - chunk_start
+        chunk_start = time.perf_counter()
+        probabilities[start:start + len(X)] = model.predict_proba(X)[:, 1]
+        predict_seconds += time.perf_counter() - chunk_start
+    stages['features'] = feature_seconds
+    stages['predict_proba'] = predict_seconds
+
+    # Time com mais arremessos na última temporada: o caso mais pesado do dashboard
+    season = df['season'].max()
+    team_id = df.loc[df['season'] == season, 'team_id'].value_counts().idxmax()
+    df_team = df[(df['season'] == season) & (df['team_id'] == team_id)].reset_index(drop=True)
+    team_input = transformer.transform(df_team)
+    stages['analytical_data'] = _best_of(
+        lambda: batch_scoring.analytical_data(model, team_input, df_team.copy()))
+    stages['score_frame'] = _best_of(lambda: batch_scoring.score_frame(model, transformer, df_team))
+    df_team = batch_scoring.analytical_data(model, team_input, df_team)
+    stages['team_cube'] = _best_of(lambda: aggregate_cube.build_cube(df_team))
+    team_cube = aggregate_cube.build_cube(df_team)
+    stages['dashboard_rollups'] = _best_of(lambda: dashboard_rollups(team_cube))
+
+    return {'rows': n_rows, 'team_shots': len(df_team), 'mean_probability': float(probabilities.mean()),
+            'stages': stages, 'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    return {'created_at': datetime.now().isoformat(timespec='seconds'), 'git_commit': _git_commit(),
+            'python': platform.python_version(), 'platform': platform.platform(), 'cpu_count': os.cpu_count(),
+            'versions': {'numpy': np.__version__, 'pandas': pd.__version__, 'xgboost': xgb.__version__,
+                         'sqlite': sqlite3.sqlite_version}}
+
+
+def print_results(results):
+    stage_names = list(next(iter(results.values()))['stages'])
+    print(f"{'etapa':<22}" + ''.join(f"{int(size):>12,}" for size in results))
+    for name in stage_names:
+        print(f"{name:<22}" + ''.join(f"{result['stages'][name]:>11.3f}s" for result in results.values()))
+    print(f"{'memória de pico':<22}" + ''.join(f"{result['peak_rss_mb']:>9.0f} MB" for result in results.values()))
+
+
+def compare(results, baseline):
+    """Imprime a razão atual/anterior de cada etapa; retorna as etapas mais lentas que REGRESSION_TOLERANCE."""
+    regressions = []
+    print(f"\nComparação com {baseline.get('git_commit') or '?'} ({baseline.get('created_at')}):")
+    for size, result in results.items():
+        previous = baseline['results'].get(size)
+        if previous is None:
+            continue
+        for name, seconds in result['stages'].items():
+            before = previous['stages'].get(name)
+            if before is None or max(before, seconds) < MIN_COMPARE_SECONDS:
+                continue
+            ratio = seconds / before
+            flag = ''
+            if ratio > 1 + REGRESSION_TOLERANCE:
+                flag = '  <- regressão'
+                regressions.append((size, name, ratio))
+            print(f"  {int(size):>12,} {name:<22}{before:>9.3f}s ->{seconds:>9.3f}s  ({ratio:.2f}x){flag}")
+    return regressions
+
+
+def run(sizes, output=None, baseline_path=None):
+    results = {}
+    for n_rows in sizes:
+        print(f"Medindo {n_rows:,} arremessos...", flush=True)
+        # Um processo por tamanho: a memória de pico de um não contamina o próximo
+        completed = subprocess.run([sys.executable, os.path.abspath(__file__), '--worker', str(n_rows)],
+                                   stdout=subprocess.PIPE, text=True, check=True)
+        results[str(n_rows)] = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    report = {**environment(), 'chunk_rows': CHUNK_ROWS, 'results': results}
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"suite_{datetime.now():%Y%m%d_%H%M%S}.json")
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print_results(results)
+    print(f"\nResultados gravados em {output}")
+
+    if baseline_path:
+        with open(baseline_path) as f:
+            regressions = compare(results, json.load(f))
+        if regressions:
+            print(f"{len(regressions)} etapa(s) mais lenta(s) que {REGRESSION_TOLERANCE:.0%}")
+            sys.exit(1)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--output', help='Arquivo JSON de saída (padrão: benchmarks/results/suite_<data>.json)')
+    parser.add_argument('--compare', help='JSON de uma rodada anterior para detectar regressões')
+    parser.add_argument('--worker', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        print(json.dumps(run_size(args.worker)))
+    else:
+        run(args.sizes, args.output, args.compare)
@@ -0,0 +1,157 @@
+"""Gerador determinístico de arremessos sintéticos no formato de game_shot_charts."""
+import numpy as np
+import pandas as pd
+
+TEAM_IDS = list(range(1610612737, 1610612767))
+PLAYERS_PER_TEAM = 15
+GAMES_PER_TEAM = 82
+
+# Zona básica: (frequência, FG%, ações mais comuns)
+ZONES = {
+    'Restricted Area': (0.30, 0.65, ['Layup Shot', 'Driving Layup Shot', 'Dunk Shot', 'Cutting Layup Shot',
+                                     'Driving Finger Roll Layup Shot', 'Putback Layup Shot', 'Tip Layup Shot',
+                                     'Running Dunk Shot', 'Alley Oop Dunk Shot']),
+    'In The Paint (Non-RA)': (0.15, 0.43, ['Floating Jump shot', 'Driving Floating Jump Shot', 'Turnaround Hook Shot',
+                                           'Hook Shot', 'Jump Shot', 'Driving Hook Shot']),
+    'Mid-Range': (0.13, 0.42, ['Jump Shot', 'Pullup Jump shot', 'Fadeaway Jump Shot', 'Step Back Jump shot',
+                               'Turnaround Fadeaway shot', 'Turnaround Jump Shot']),
+    'Above the Break 3': (0.32, 0.36, ['Jump Shot', 'Pullup Jump shot', 'Step Back Jump shot', 'Running Jump Shot']),
+    'Left Corner 3': (0.045, 0.39, ['Jump Shot']),
+    'Right Corner 3': (0.045, 0.39, ['Jump Shot']),
+    'Backcourt': (0.01, 0.03, ['Jump Shot']),
+}
+# Peso das ações dentro de cada zona (a primeira é a mais frequente)
+ACTION_DECAY = 0.55
+
+
+def _zone_coordinates(rng, zone, n):
+    """Sorteia (loc_x, loc_y), em décimos de pé, coerentes com a zona."""
+    if zone == 'Restricted Area':
+        r, theta = rng.uniform(0, 40, n), rng.uniform(-0.3, np.pi + 0.3, n)
+    elif zone == 'In The Paint (Non-RA)':
+        r, theta = rng.uniform(40, 140, n), rng.uniform(0.5, np.pi - 0.5, n)
+    elif zone == 'Mid-Range':
+        r, theta = rng.uniform(80, 230, n), rng.uniform(0.1, np.pi - 0.1, n)
+    elif zone == 'Above the Break 3':
+        r, theta = rng.uniform(237, 290, n), rng.uniform(0.38, np.pi - 0.38, n)
+    elif zone in ('Left Corner 3', 'Right Corner 3'):
+        side = -1 if zone == 'Left Corner 3' else 1
+        x = side * rng.uniform(220, 248, n)
+        y = rng.uniform(-47, 92, n)
+        return np.round(x).astype(int), np.round(y).astype(int)
+    else:
+        r, theta = rng.uniform(470, 800, n), rng.uniform(0.4, np.pi - 0.4, n)
+    x = r * np.cos(theta)
+    y = np.maximum(r * np.sin(theta), -47)
+    return np.round(x).astype(int), np.round(y).astype(int)
+
+
+def _labels(names, codes):
+    """Expande códigos em um array object que reutiliza os mesmos objetos str.
+
+    Evita arrays de unicode de largura fixa e uma str nova por linha, o que em
+    10M de linhas custaria gigabytes por coluna categórica.
+    """
+    return np.array(names, dtype=object)[codes]
+
+
+def _zone_area(loc_x, loc_y, is_backcourt):
+    # Arremessos abaixo da linha da cesta (loc_y < 0) contam como 0 ou 180 graus
+    angle = np.rad2deg(np.arctan2(np.maximum(loc_y, 0), loc_x))
+    codes = np.select([is_backcourt, angle > 126, angle > 90 + 18, angle >= 72, angle >= 54], [0, 1, 2, 3, 4],
+                      default=5)
+    return _labels(['Back Court(BC)', 'Left Side(L)', 'Left Side Center(LC)', 'Center(C)',
+                    'Right Side Center(RC)', 'Right Side(R)'], codes)
+
+
+def _zone_range(distance, is_backcourt):
+    codes = np.select([is_backcourt, distance < 8, distance < 16, distance < 24], [0, 1, 2, 3], default=4)
+    return _labels(['Back Court Shot', 'Less Than 8 ft.', '8-16 ft.', '16-24 ft.', '24+ ft.'], codes)
+
+
+def generate_shots(n_rows, seed=42, seasons=("2022-23", "2023-24", "2024-25")):
+    """Gera n_rows arremessos distribuídos entre 30 times e as temporadas informadas.
+
+    Args:
+        n_rows (int): Número de arremessos
+        seed (int): Semente do gerador (mesma semente -> mesmos dados)
+        seasons (tuple): Temporadas no formato "YYYY-YY"
+
+    Returns:
+        pd.DataFrame: Colunas de game_shot_charts (sem id) mais game_date
+    """
+    rng = np.random.default_rng(seed)
+    zone_names = list(ZONES)
+    zone_probs = np.array([ZONES[z][0] for z in zone_names])
+    zone_code = rng.choice(len(zone_names), n_rows, p=zone_probs / zone_probs.sum())
+    zone = _labels(zone_names, zone_code)
+
+    loc_x = np.empty(n_rows, dtype=int)
+    loc_y = np.empty(n_rows, dtype=int)
+    action_type = np.empty(n_rows, dtype=object)
+    made = np.empty(n_rows, dtype=int)
+    for code, (name, (_, fg_pct, actions)) in enumerate(ZONES.items()):
+        mask = zone_code == code
+        n = int(mask.sum())
+        if n == 0:
+            continue
+        loc_x[mask], loc_y[mask] = _zone_coordinates(rng, name, n)
+        weights = ACTION_DECAY ** np.arange(len(actions))
+        action_type[mask] = np.array(actions, dtype=object)[rng.choice(len(actions), n, p=weights / weights.sum())]
+        made[mask] = rng.random(n) < fg_pct
+
+    distance = np.round(np.hypot(loc_x, loc_y) / 10).astype(int)
+    is_three = np.isin(zone_code, [zone_names.index(z) for z in
+                                   ['Above the Break 3', 'Left Corner 3', 'Right Corner 3', 'Backcourt']])
+    is_backcourt = zone_code == zone_names.index('Backcourt')
+
+    season_index = rng.integers(0, len(seasons), n_rows)
+    season = _labels(seasons, season_index)
+    team_index = rng.integers(0, len(TEAM_IDS), n_rows)
+    # Uso dos jogadores segue uma distribuição decrescente (titulares arremessam mais)
+    usage = 0.8 ** np.arange(PLAYERS_PER_TEAM)
+    player_slot = rng.choice(PLAYERS_PER_TEAM, n_rows, p=usage / usage.sum())
+    # Reservas (slots >= 12) trocam de time a cada temporada, como em trocas reais
+    player_team = np.where(player_slot >= 12, (team_index + season_index) % len(TEAM_IDS), team_index)
+    game_number = rng.integers(0, GAMES_PER_TEAM, n_rows)
+    game_seq = team_index * GAMES_PER_TEAM + game_number + 1
+
+    period = np.where(rng.random(n_rows) < 0.02, rng.integers(5, 7, n_rows), rng.integers(1, 5, n_rows))
+    minutes = np.where(period > 4, rng.integers(0, 5, n_rows), rng.integers(0, 12, n_rows))
+    # Strings de game_id/game_date formatadas só uma vez por jogo e expandidas por índice
+    game_key, game_inverse = np.unique(season_index * 10**5 + game_seq, return_inverse=True)
+    key_season, key_seq = game_key // 10**5, game_key % 10**5
+    key_year = np.array([int(s[:4]) for s in seasons])[key_season]
+    game_ids = np.array([f"002{y % 100:02d}{q:05d}" for y, q in zip(key_year, key_seq)], dtype=object)
+    key_number = (key_seq - 1) % GAMES_PER_TEAM
+    season_start = np.array([f"{s[:4]}-10-22" for s in seasons], dtype='datetime64[D]')[key_season]
+    game_dates = pd.DatetimeIndex(season_start + key_number * 2).strftime('%Y%m%d').to_numpy(dtype=object)
+
+    df = pd.DataFrame({
+        'game_id': game_ids[game_inverse],
+        'game_event_id': rng.integers(1, 700, n_rows),
+        'player_id': 1626000 + player_team * 100 + player_slot,
+        'team_id': np.array(TEAM_IDS)[team_index],
+        'period': period,
+        'minutes_remaining': minutes,
+        'seconds_remaining': rng.integers(0, 60, n_rows),
+        'shot_made_flag': made,
+        'loc_x': loc_x,
+        'loc_y': loc_y,
+        'shot_distance': distance,
+        'action_type': action_type,
+        'shot_type': _labels(['2PT Field Goal', '3PT Field Goal'], is_three.astype(int)),
+        'shot_zone_basic': zone,
+        'shot_zone_area': _zone_area(loc_x, loc_y, is_backcourt),
+        'shot_zone_range': _zone_range(distance, is_backcourt),
+        'season': season,
+        'game_date': game_dates[game_inverse],
+    })
+    return df
+
+
+def game_frame(df):
+    """Uma linha por jogo nas colunas de games (mandante: o time dos arremessos, visitante desconhecido)."""
+    df_games = df.drop_duplicates('game_id')
+    return pd.DataFrame({'id': df_games['game_id'], 'game_date': df_games['game_date'], 'season': df_games['season'],
+                         'home_team_id': df_games['team_id'], 'visitor_team_id': None})
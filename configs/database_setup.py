@@ -1,9 +1,17 @@
 import sqlite3
 
-def create_database(db_name="nba_shots.sqlite"):
-    """Cria o banco de dados SQLite e as tabelas necessárias se não existirem."""
-    conn = sqlite3.connect(db_name)
-    cursor = conn.cursor()
+# Índices secundários de game_shot_charts, um para cada padrão de acesso real:
+# - (season, team_id): dashboard/notebooks por time e substituição de partições no ETL
+# - (player_id, season): análises por jogador; cobre o DISTINCT player_id do fix_missing_data
+# - (game_id, game_event_id): junções com games/game_events; cobre o MIN(game_event_id) por jogo
+SHOT_CHART_INDEXES = {
+    'idx_shots_season_team': 'CREATE INDEX IF NOT EXISTS idx_shots_season_team ON game_shot_charts (season, team_id)',
+    'idx_shots_player_season': 'CREATE INDEX IF NOT EXISTS idx_shots_player_season ON game_shot_charts (player_id, season)',
+    'idx_shots_game_event': 'CREATE INDEX IF NOT EXISTS idx_shots_game_event ON game_shot_charts (game_id, game_event_id)',
+}
+
+def _create_base_tables(cursor):
+    """Migração 1: tabelas base do projeto."""
 
     # Usamos 'TEXT' para maior flexibilidade e 'INTEGER PRIMARY KEY' para autoincremento
     # A sintaxe é ligeiramente ajustada para ser compatível com SQLite
@@ -49,6 +57,7 @@ def create_database(db_name="nba_shots.sqlite"):
         shot_zone_basic TEXT,
         shot_zone_area TEXT,
         shot_zone_range TEXT,
+        season TEXT NOT NULL,
         FOREIGN KEY (game_id) REFERENCES games (id),
         FOREIGN KEY (player_id) REFERENCES players (id),
         FOREIGN KEY (team_id) REFERENCES teams (id)
@@ -73,12 +82,150 @@ def create_database(db_name="nba_shots.sqlite"):
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         player_name TEXT NOT NULL,
         player_id INTEGER NOT NULL,
-        position TEXT NOT NULL,        
+        position TEXT NOT NULL,
+        team_id INTEGER,
+        season TEXT,
         FOREIGN KEY (player_id) REFERENCES players (id)
     );
     ''')
 
-    conn.commit()
+
+def _add_player_positions_partition(cursor):
+    """Migração 2: colunas de partição (team_id, season) em player_positions."""
+    columns = {row[1] for row in cursor.execute('PRAGMA table_info(player_positions)')}
+    for column, column_type in [('team_id', 'INTEGER'), ('season', 'TEXT')]:
+        if column not in columns:
+            cursor.execute(f'ALTER TABLE player_positions ADD COLUMN {column} {column_type}')
+
+
+def _create_shot_chart_indexes(cursor):
+    """Migração 3: índices compostos/cobrindo de game_shot_charts."""
+    for ddl in SHOT_CHART_INDEXES.values():
+        cursor.execute(ddl)
+    cursor.execute('ANALYZE game_shot_charts')
+
+
+# Tabelas cujo número de linhas é mantido em table_counts pelo bulk_loader
+COUNTED_TABLES = ['teams', 'players', 'games', 'game_shot_charts']
+
+def _create_integrity_tables(cursor):
+    """Migração 4: contadores de linhas, jogadores sem nome e marca d'água da reconciliação."""
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS table_counts (
+        table_name TEXT PRIMARY KEY,
+        row_count INTEGER NOT NULL
+    );
+    ''')
+    # player_ids dos arremessos sem linha em players (nome desconhecido no nba_api)
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS orphan_players (
+        player_id INTEGER PRIMARY KEY
+    );
+    ''')
+    # Maior game_shot_charts.id já reconciliado: o fix_missing_data só olha os arremessos novos
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS integrity_state (
+        name TEXT PRIMARY KEY,
+        value INTEGER NOT NULL
+    );
+    ''')
+    cursor.execute("INSERT OR IGNORE INTO integrity_state (name, value) VALUES ('shots_watermark', 0)")
+    # Contagem inicial: a última varredura completa dessas tabelas
+    for table in COUNTED_TABLES:
+        cursor.execute(f"INSERT OR REPLACE INTO table_counts (table_name, row_count) "
+                       f"SELECT '{table}', COUNT(*) FROM {table}")
+
+
+# Índices de games: busca por intervalo de datas e jogos ainda sem data ou sem mandante/visitante
+GAME_INDEXES = {
+    'idx_games_date': 'CREATE INDEX IF NOT EXISTS idx_games_date ON games (game_date)',
+    'idx_games_pending': ('CREATE INDEX IF NOT EXISTS idx_games_pending ON games (id) '
+                          'WHERE game_date IS NULL OR home_team_id IS NULL'),
+}
+# Data fixa gravada pelo fix_missing_data, até a migração 5, para jogos sem data conhecida
+LEGACY_PLACEHOLDER_DATE = '20241101'
+# Temporada em que essa data também pode ser a de um jogo real
+LEGACY_PLACEHOLDER_SEASON = '2024-25'
+
+def _add_game_metadata(cursor):
+    """Migração 5: temporada, mandante e visitante em games, com game_date opcional e indexada."""
+    # game_date deixa de ser NOT NULL: o SQLite só muda restrições recriando a tabela
+    cursor.execute('''
+    CREATE TABLE games_new (
+        id TEXT PRIMARY KEY,
+        game_date TEXT, -- YYYYMMDD; NULL enquanto a data real não foi coletada
+        season TEXT,
+        home_team_id INTEGER,
+        visitor_team_id INTEGER,
+        FOREIGN KEY (home_team_id) REFERENCES teams (id),
+        FOREIGN KEY (visitor_team_id) REFERENCES teams (id)
+    );
+    ''')
+    # A temporada vem de um arremesso do jogo (índice (game_id, game_event_id)). A data fixa
+    # é descartada, exceto na temporada em que ela pode ser a data real do jogo
+    cursor.execute('''
+    INSERT INTO games_new (id, game_date, season)
+    SELECT id, CASE WHEN game_date = ? AND season IS NOT ? THEN NULL ELSE game_date END, season
+    FROM (SELECT id, game_date, (SELECT season FROM game_shot_charts WHERE game_id = games.id LIMIT 1) AS season
+          FROM games)
+    ''', (LEGACY_PLACEHOLDER_DATE, LEGACY_PLACEHOLDER_SEASON))
+    cursor.execute('DROP TABLE games')
+    cursor.execute('ALTER TABLE games_new RENAME TO games')
+    for ddl in GAME_INDEXES.values():
+        cursor.execute(ddl)
+
+
+def _create_empty_play_by_play(cursor):
+    """Migração 6: jogos cujo lance a lance veio vazio, para não serem buscados a cada coleta."""
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS empty_play_by_play (
+        game_id TEXT PRIMARY KEY,
+        checked_at TEXT NOT NULL
+    );
+    ''')
+
+
+# Migrações versionadas: cada uma é aplicada uma única vez, em ordem, e a versão
+# aplicada fica registrada em PRAGMA user_version. Novas mudanças de esquema
+# devem ser adicionadas ao final desta lista.
+MIGRATIONS = [
+    (1, _create_base_tables),
+    (2, _add_player_positions_partition),
+    (3, _create_shot_chart_indexes),
+    (4, _create_integrity_tables),
+    (5, _add_game_metadata),
+    (6, _create_empty_play_by_play),
+]
+
+
+def get_schema_version(conn):
+    """Retorna a versão de esquema registrada no banco (0 para bancos sem migração)."""
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def migrate(conn):
+    """Aplica as migrações pendentes, cada uma em sua própria transação."""
+    current_version = get_schema_version(conn)
+    for version, migration in MIGRATIONS:
+        if version <= current_version:
+            continue
+        cursor = conn.cursor()
+        try:
+            cursor.execute('BEGIN')
+            migration(cursor)
+            cursor.execute(f'PRAGMA user_version = {version}')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        print(f"Migração de esquema {version} aplicada: {migration.__doc__.split(':', 1)[1].strip()}")
+    return get_schema_version(conn)
+
+
+def create_database(db_name="nba_shots.sqlite"):
+    """Cria o banco de dados SQLite e aplica as migrações de esquema pendentes."""
+    conn = sqlite3.connect(db_name)
+    migrate(conn)
     conn.close()
     print(f"Banco de dados '{db_name}' e tabelas verificados/criados com sucesso.")
 
@@ -1,15 +1,23 @@
 import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
-import seaborn as sns
-from matplotlib.patches import Arc
 import os
-import sqlite3
 import joblib
 import numpy as np
+import sys
 
 # --- Caminhos Absolutos para os Dados, DB e Modelo ---
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(BASE_DIR, '..', 'src'))
+import queries
+import season_store
+import features
+import parquet_store
+import batch_scoring
+import aggregate_cube
+import shared_cache
+import shot_rendering
+import instrumentation
 DATA_DIR = os.path.join(BASE_DIR, '..', 'data')
 DB_PATH = os.path.join(BASE_DIR, '..', 'nba_shots.sqlite')
 MODEL_PATH = os.path.join(BASE_DIR, '..', 'models', 'xgb_best_model.joblib')
@@ -17,6 +25,22 @@ MODEL_PATH = os.path.join(BASE_DIR, '..', 'models', 'xgb_best_model.joblib')
 X_TEST_PATH = os.path.join(DATA_DIR, 'X_test.csv')
 DF_ORIGINAL_PATH = os.path.join(DATA_DIR, 'df.csv')
 
+# Colunas lidas do dataset Parquet: entradas do modelo + campos usados nas análises
+DASHBOARD_COLUMNS = ['game_id', 'player_id', 'team_id', 'shot_made_flag'] + \
+    features.NORMALIZED_FEATURES + features.CATEGORICAL_FEATURES
+
+# Colunas lidas dos scores pré-calculados pelo batch_scoring
+SCORES_COLUMNS = ['game_id', 'player_id', 'team_id', 'shot_made_flag', 'loc_x', 'loc_y', 'shot_distance',
+                  'action_type', 'shot_type', 'shot_zone_basic', 'shot_probability', 'poe', 'adjusted_poe']
+
+TEAM_ID_MAP = { 1610612737: "Atlanta Hawks", 1610612738: "Boston Celtics", 1610612739: "Cleveland Cavaliers", 1610612740: "New Orleans Pelicans", 1610612741: "Chicago Bulls", 1610612742: "Dallas Mavericks", 1610612743: "Denver Nuggets", 1610612744: "Golden State Warriors", 1610612745: "Houston Rockets", 1610612746: "LA Clippers", 1610612747: "Los Angeles Lakers", 1610612748: "Miami Heat", 1610612749: "Milwaukee Bucks", 1610612750: "Minnesota Timberwolves", 1610612751: "Brooklyn Nets", 1610612752: "New York Knicks", 1610612753: "Orlando Magic", 1610612754: "Indiana Pacers", 1610612755: "Philadelphia 76ers", 1610612756: "Phoenix Suns", 1610612757: "Portland Trail Blazers", 1610612758: "Sacramento Kings", 1610612759: "San Antonio Spurs", 1610612760: "Oklahoma City Thunder", 1610612761: "Toronto Raptors", 1610612762: "Utah Jazz", 1610612763: "Memphis Grizzlies", 1610612764: "Washington Wizards", 1610612765: "Detroit Pistons", 1610612766: "Charlotte Hornets"}
+TEAM_NAME_TO_ID = {team_name: team_id for team_id, team_name in TEAM_ID_MAP.items()}
+
+# --- Instrumentação (log estruturado, /metrics e cProfile por NBA_METRICS_LOG, NBA_METRICS_PORT, NBA_METRICS_HOST, NBA_PROFILE_DIR) ---
+@st.cache_resource
+def start_instrumentation():
+    instrumentation.configure_from_env()
+
 # --- Carregamento do Modelo (feito uma vez) ---
 @st.cache_resource
 def load_model():
@@ -28,46 +52,110 @@ def load_model():
         st.error(f"Arquivo do modelo não encontrado em {MODEL_PATH}.")
         return None
 
-# --- Funções Auxiliares de Desenho ---
-def draw_court(ax=None, color='gray', lw=2, zorder=0):
-    if ax is None: ax = plt.gca()
-    hoop = plt.Circle((0, 0), radius=7.5, linewidth=lw, color=color, fill=False, zorder=zorder)
-    backboard = plt.Rectangle((-30, -7.5), 60, -1, linewidth=lw, color=color, zorder=zorder)
-    outer_box = plt.Rectangle((-80, -47.5), 160, 190, linewidth=lw, color=color, fill=False, zorder=zorder)
-    inner_box = plt.Rectangle((-60, -47.5), 120, 190, linewidth=lw, color=color, fill=False, zorder=zorder)
-    three_point_arc = Arc((0, 0), 475, 475, theta1=22, theta2=158, linewidth=lw, color=color, fill=False, zorder=zorder)
-    ax.plot([-220, -220], [-47.5, 92.5], linewidth=lw, color=color, zorder=zorder)
-    ax.plot([220, 220], [-47.5, 92.5], linewidth=lw, color=color, zorder=zorder)
-    for element in [hoop, backboard, outer_box, inner_box, three_point_arc]:
-        ax.add_patch(element)
-    return ax
+@st.cache_resource
+def load_feature_transformer():
+    """Carrega o transformador de features salvo ao lado do modelo (None se ausente)."""
+    transformer_path = features.transformer_path(MODEL_PATH)
+    if not os.path.exists(transformer_path):
+        return None
+    return features.FeatureTransformer.load(transformer_path)
 
-# --- Carregamento e Preparação dos Dados ---
-@st.cache_data
-def load_data():
-    """Carrega e prepara os dados para o dashboard."""
-    try:
-        df_features = pd.read_csv(X_TEST_PATH, engine='pyarrow')
-        df_original = pd.read_csv(DF_ORIGINAL_PATH, engine='pyarrow')
-    except FileNotFoundError as e:
-        st.error(f"Erro ao carregar arquivos CSV: {e}.")
-        return None, None
+# --- Cache dos Gráficos Renderizados (compartilhado entre sessões) ---
+@st.cache_resource
+def load_render_cache():
+    """PNGs da aba de jogador por (versão, time, temporada, jogador, gráfico), com descarte LRU."""
+    return shot_rendering.RenderCache()
 
-    df_analysis = df_original.loc[df_features.index].copy()
-    
+# --- Carregamento e Preparação dos Dados ---
+def add_player_display(df_analysis):
+    """Adiciona o nome de exibição dos jogadores (nome do DB ou, na falta dele, o player_id)."""
     try:
-        conn = sqlite3.connect(DB_PATH)
-        query = "SELECT id as player_id, player_name FROM players"
-        df_players = pd.read_sql_query(query, conn)
-        conn.close()
+        # Um arquivo por temporada: nomes de todos os grupos de temporadas anexadas
+        df_players = pd.concat([queries.player_names(conn) for conn in season_store.iter_connections(DB_PATH)],
+                               ignore_index=True).drop_duplicates('player_id')
         df_analysis = pd.merge(df_analysis, df_players, on='player_id', how='left')
         df_analysis['player_display'] = df_analysis['player_name'].fillna(df_analysis['player_id'].astype(str))
     except Exception as e:
         st.warning(f"Não foi possível ler os nomes do DB. Usando 'player_id'. Erro: {e}")
         df_analysis['player_display'] = df_analysis['player_id'].astype(str)
+    return df_analysis
+
+@instrumentation.timed('load_data', source='parquet')
+def load_parquet_source():
+    """Dataset de teste com as features recalculadas pelo transformador do treino."""
+    df_analysis = parquet_store.read_dataset(parquet_store.TEST_SHOTS_DATASET, DASHBOARD_COLUMNS, as_category=False)
+    model_input = load_feature_transformer().transform(df_analysis)
+    df_analysis = add_player_display(df_analysis)
+    df_analysis['team_name'] = df_analysis['team_id'].map(TEAM_ID_MAP)
+    return df_analysis, model_input
+
+@st.cache_resource
+def load_shared_dataset(use_parquet, transformer_fingerprint=''):
+    """Dados de análise e features mapeados em memória, um único conjunto para todas as sessões.
+
+    O cache em data/cache/ é refeito quando a fonte (dataset Parquet de teste
+    ou CSVs antigos) ou o transformador mudam.
+    """
+    if use_parquet:
+        version = shared_cache.source_version(
+            [parquet_store.dataset_path(parquet_store.TEST_SHOTS_DATASET)], transformer_fingerprint)
+        return shared_cache.open_or_build('dashboard_test_shots', version, load_parquet_source)
+    if not (os.path.exists(X_TEST_PATH) and os.path.exists(DF_ORIGINAL_PATH)):
+        st.error(f"Arquivos CSV não encontrados em {DATA_DIR}.")
+        return None
+    version = shared_cache.source_version([X_TEST_PATH, DF_ORIGINAL_PATH])
+    return shared_cache.open_or_build('dashboard_csv', version, load_csv_source)
+
+def load_scores_key():
+    """Chave dos scores pré-calculados para o modelo e o transformador atuais (None se ausentes)."""
+    try:
+        scores_key = batch_scoring.current_scores_key(MODEL_PATH)
+    except FileNotFoundError:
+        return None
+    return scores_key if batch_scoring.scores_exist(scores_key) else None
+
+@st.cache_data
+def load_scores_partitions(scores_key):
+    """Temporadas (mais recente primeiro) e times com scores, lidos só dos nomes das partições."""
+    partitions = parquet_store.list_partitions(batch_scoring.scores_dataset_name(scores_key))
+    season_list = sorted({season for season, _ in partitions}, reverse=True)
+    team_list = sorted({TEAM_ID_MAP[team_id] for _, team_id in partitions if team_id in TEAM_ID_MAP})
+    return season_list, team_list
+
+@st.cache_data
+@instrumentation.timed('load_data', source='scores')
+def load_team_scores(scores_key, team_id, season):
+    """Scores pré-calculados do time na temporada: nenhuma predição é feita no dashboard.
+
+    Returns:
+        tuple: (frame ordenado por jogador, faixas de linhas de cada player_id)
+    """
+    df_team = batch_scoring.read_scores(scores_key, SCORES_COLUMNS, seasons=[season], team_ids=[team_id],
+                                        as_category=True)
+    df_team['predicted_outcome'] = batch_scoring.predicted_outcome(df_team['shot_probability'])
+    df_team = add_player_display(df_team)
+    df_team['player_display'] = df_team['player_display'].astype('category')
+    df_team['team_name'] = df_team['team_id'].map(TEAM_ID_MAP)
+    order, _, player_offsets = shared_cache.sort_by_team_player(df_team)
+    return df_team.iloc[order].reset_index(drop=True), player_offsets.get(team_id, {})
+
+@st.cache_data
+def load_team_cube(scores_key, team_id, season):
+    """Células do cubo de agregados do time na temporada (None se o cubo não foi construído)."""
+    if not aggregate_cube.cube_exists(scores_key):
+        return None
+    return aggregate_cube.read_cube(scores_key, seasons=[season], team_ids=[team_id])
+
+@instrumentation.timed('load_data', source='csv')
+def load_csv_source():
+    """Carrega e prepara os dados dos CSVs antigos para o cache compartilhado."""
+    df_features = pd.read_csv(X_TEST_PATH, engine='pyarrow')
+    df_original = pd.read_csv(DF_ORIGINAL_PATH, engine='pyarrow')
+
+    df_analysis = df_original.loc[df_features.index].copy()
+    df_analysis = add_player_display(df_analysis)
     
-    team_id_map = { 1610612737: "Atlanta Hawks", 1610612738: "Boston Celtics", 1610612739: "Cleveland Cavaliers", 1610612740: "New Orleans Pelicans", 1610612741: "Chicago Bulls", 1610612742: "Dallas Mavericks", 1610612743: "Denver Nuggets", 1610612744: "Golden State Warriors", 1610612745: "Houston Rockets", 1610612746: "LA Clippers", 1610612747: "Los Angeles Lakers", 1610612748: "Miami Heat", 1610612749: "Milwaukee Bucks", 1610612750: "Minnesota Timberwolves", 1610612751: "Brooklyn Nets", 1610612752: "New York Knicks", 1610612753: "Orlando Magic", 1610612754: "Indiana Pacers", 1610612755: "Philadelphia 76ers", 1610612756: "Phoenix Suns", 1610612757: "Portland Trail Blazers", 1610612758: "Sacramento Kings", 1610612759: "San Antonio Spurs", 1610612760: "Oklahoma City Thunder", 1610612761: "Toronto Raptors", 1610612762: "Utah Jazz", 1610612763: "Memphis Grizzlies", 1610612764: "Washington Wizards", 1610612765: "Detroit Pistons", 1610612766: "Charlotte Hornets"}
-    df_analysis['team_name'] = df_analysis['team_id'].map(team_id_map)
+    df_analysis['team_name'] = df_analysis['team_id'].map(TEAM_ID_MAP)
 
     df_analysis.dropna(subset=['team_name'], inplace=True)
     
@@ -75,32 +163,47 @@ def load_data():
     df_features = df_features.loc[common_indices]
     df_analysis = df_analysis.loc[common_indices]
 
-    return df_features, df_analysis
+    return df_analysis, df_features.to_numpy(dtype=np.float32)
 
 # --- Função de Predição e Análise ---
-def get_analytical_data(model, df_team_features, df_team_analysis):
-    df_predicted = df_team_analysis.copy()
-    
-    probabilities = model.predict_proba(df_team_features)[:, 1]
-    df_predicted['shot_probability'] = probabilities
-    df_predicted['predicted_outcome'] = (df_predicted['shot_probability'] >= 0.5).astype(int)
-    
-    mean_poe_bias = (df_predicted['shot_made_flag'] - df_predicted['shot_probability']).mean()
-    df_predicted['poe'] = df_predicted['shot_made_flag'] - df_predicted['shot_probability']
-    df_predicted['adjusted_poe'] = df_predicted['poe'] - mean_poe_bias
+def get_analytical_data(model, model_input, df_predicted):
+    """Adiciona probabilidades e POE ao frame do time (um frame próprio, vindo do cache compartilhado)."""
+    with instrumentation.span('get_analytical_data') as s, instrumentation.profiled('get_analytical_data'):
+        # Mesmo cálculo do batch_scoring (e medido por benchmarks/run_suite.py)
+        batch_scoring.analytical_data(model, model_input, df_predicted)
+        s['rows'] = len(df_predicted)
 
     return df_predicted
 
 # --- Interface Principal ---
 st.set_page_config(layout="wide")
+start_instrumentation()
 st.title("Dashboard de Análise de Arremessos da NBA")
 
 model = load_model()
-df_features, df_analysis = load_data()
+transformer = load_feature_transformer()
+if model is not None and transformer is not None:
+    try:
+        transformer.check_model(model)
+    except ValueError as e:
+        st.warning(f"Transformador de features incompatível com o modelo; usando os arquivos CSV. Erro: {e}")
+        transformer = None
+
+# Prioridade: scores pré-calculados (python src/batch_scoring.py); depois o dataset Parquet de teste
+# com o transformador, lido por time sob demanda; por fim, os CSVs antigos
+scores_key = load_scores_key()
+season_list = []
+shared = None
+if scores_key is not None:
+    season_list, team_list = load_scores_partitions(scores_key)
+else:
+    use_parquet = transformer is not None and parquet_store.dataset_exists(parquet_store.TEST_SHOTS_DATASET)
+    shared = load_shared_dataset(use_parquet, transformer.fingerprint() if use_parquet else '')
+    team_list = sorted(TEAM_ID_MAP[team_id] for team_id in shared.team_ids if team_id in TEAM_ID_MAP) \
+        if shared is not None else []
 
-if all(df is not None for df in [model, df_features, df_analysis]):
+if (scores_key is not None or model is not None) and team_list:
     st.sidebar.header("Filtros")
-    team_list = sorted(df_analysis['team_name'].unique())
     
     # Gerencia o estado da seleção para o filtro funcionar corretamente
     if 'selected_team' not in st.session_state:
@@ -113,27 +216,58 @@ if all(df is not None for df in [model, df_features, df_analysis]):
         if 'df_team_predicted' in st.session_state:
             del st.session_state['df_team_predicted']
 
+    selected_season = None
+    if season_list:
+        selected_season = st.sidebar.selectbox("Selecione a Temporada:", season_list)
+        if selected_season != st.session_state.get('selected_season'):
+            st.session_state['selected_season'] = selected_season
+            if 'df_team_predicted' in st.session_state:
+                del st.session_state['df_team_predicted']
+
     st.header(f"Análises para: {selected_team}")
 
     if st.sidebar.button("Analisar Time"):
         with st.spinner("Analisando arremessos..."):
-            team_indices = df_analysis[df_analysis['team_name'] == selected_team].index
-            df_team_analysis = df_analysis.loc[team_indices].copy()
-            df_team_features = df_features.loc[team_indices].copy()
-            df_team_predicted = get_analytical_data(model, df_team_features, df_team_analysis)
+            team_id = TEAM_NAME_TO_ID[selected_team]
+            if scores_key is not None:
+                df_team_predicted, player_ranges = load_team_scores(scores_key, team_id, selected_season)
+                df_team_predicted = df_team_predicted.copy()
+            else:
+                # Faixa de linhas do time no cache mapeado: slice sem cópia das features
+                df_team_predicted = get_analytical_data(model, shared.team_features(team_id),
+                                                        shared.team_frame(team_id))
+                player_ranges = shared.team_player_ranges(team_id)
+            # Chave dos gráficos em cache: muda quando o modelo ou os dados mudam
+            version = scores_key or f"{batch_scoring.model_version(MODEL_PATH)}_{shared.version}"
+            st.session_state['analysis_key'] = (version, team_id, selected_season)
+            # Camada fixa do perfil de distância (eixos + time), desenhada uma vez por análise
+            st.session_state['distance_chart'] = shot_rendering.DistanceChart(
+                df_team_predicted['shot_distance'], player_ranges, f'Média ({selected_team})')
+            # As tabelas das abas saem de rollups do cubo (O(grupos)), não de groupbys sobre os arremessos
+            team_cube = None
+            if scores_key is not None:
+                team_cube = load_team_cube(scores_key, TEAM_NAME_TO_ID[selected_team], selected_season)
+            if team_cube is None:
+                team_cube = aggregate_cube.build_cube(df_team_predicted)
             st.session_state['df_team_predicted'] = df_team_predicted
+            st.session_state['team_cube'] = team_cube
+            # Linhas ordenadas por jogador: nomes e filtros saem do índice de faixas, em O(jogadores)
+            player_names = {player_id: df_team_predicted['player_display'].iat[start]
+                            for player_id, (start, _) in player_ranges.items()}
+            st.session_state['player_ranges'] = player_ranges
+            st.session_state['player_display'] = player_names
+            st.session_state['player_options'] = {name: player_id for player_id, name in
+                                                  sorted(player_names.items(), key=lambda item: item[1])}
     
     if 'df_team_predicted' in st.session_state:
         df_team_predicted = st.session_state['df_team_predicted']
+        team_cube = st.session_state['team_cube']
 
         tab1, tab2, tab3, tab4 = st.tabs(["Visão Geral", "Análise de POE", "Análise por Jogador", "Análise de Erros"])
 
         with tab1:
             st.subheader("Performance do Modelo por Zona de Arremesso")
-            zone_perf = df_team_predicted.groupby('shot_zone_basic').agg(
-                FG_Real=('shot_made_flag', 'mean'),
-                FG_Esperado=('shot_probability', 'mean')
-            ).rename(columns={'FG_Real': 'Aproveitamento Real', 'FG_Esperado': 'Aproveitamento Esperado (xFG)'})
+            zone_perf = aggregate_cube.zone_performance(team_cube)
 
 
             fig, ax = plt.subplots(figsize=(12, 6))
@@ -146,14 +280,12 @@ if all(df is not None for df in [model, df_features, df_analysis]):
             for container in ax.containers:
                 ax.bar_label(container, fmt='%.2f')
             st.pyplot(fig)
+            plt.close(fig)
 
         with tab2:
             st.subheader("Pontos Acima da Expectativa (POE)")
-            player_poe = df_team_predicted.groupby('player_display').agg(
-                total_adjusted_poe=('adjusted_poe', 'sum'),
-                avg_adjusted_poe_per_shot=('adjusted_poe', 'mean'),
-                total_shots=('game_id', 'count')
-            ).sort_values(by='total_adjusted_poe', ascending=False).reset_index()
+            player_poe = aggregate_cube.player_poe(team_cube)
+            player_poe.insert(0, 'player_display', player_poe.pop('player_id').map(st.session_state['player_display']))
 
             st.write("#### Performance Geral (Total de POE Ajustado)")
             st.bar_chart(player_poe.set_index('player_display')['total_adjusted_poe'])
@@ -168,61 +300,53 @@ if all(df is not None for df in [model, df_features, df_analysis]):
 
         with tab3:
             st.subheader("Análise Individual por Jogador")
-            player_list = sorted(df_team_predicted['player_display'].unique())
-            selected_player = st.selectbox("Selecione um Jogador:", player_list)
+            player_options = st.session_state['player_options']
+            selected_player = st.selectbox("Selecione um Jogador:", list(player_options))
 
             if selected_player:
-                df_player = df_team_predicted[df_team_predicted['player_display'] == selected_player]
-                
+                player_id = player_options[selected_player]
+                start, stop = st.session_state['player_ranges'][player_id]
+                df_player = df_team_predicted.iloc[start:stop]
+                render_cache = load_render_cache()
+                player_key = st.session_state['analysis_key'] + (player_id,)
+
                 # Layout em colunas para os gráficos
                 col_shot, col_dist = st.columns([1, 1.2])
 
                 with col_shot:
                     st.write(f"**Shot Chart de {selected_player}**")
-                    conditions = [
-                        (df_player['shot_made_flag'] == 1) & (df_player['predicted_outcome'] == 1),
-                        (df_player['shot_made_flag'] == 0) & (df_player['predicted_outcome'] == 0),
-                        (df_player['shot_made_flag'] == 0) & (df_player['predicted_outcome'] == 1),
-                        (df_player['shot_made_flag'] == 1) & (df_player['predicted_outcome'] == 0)
-                    ]
-                    colors = ['green', 'red', 'orange', 'purple']
-                    df_player['result_color'] = pd.Series(np.select(conditions, colors, default='black'), index=df_player.index)
-                    
-                    # --- CORREÇÃO NO TAMANHO DO GRÁFICO ---
-                    fig, ax = plt.subplots(figsize=(6, 5.5)) # Reduzindo o tamanho da figura base
-                    draw_court(ax)
-                    ax.scatter(df_player['loc_x'], df_player['loc_y'], c=df_player['result_color'], alpha=0.8, s=40)
-                    ax.set_title(f"Shot Chart de {selected_player}", fontsize=10)
-                    plt.axis('off')
-                    st.pyplot(fig) # Removido o use_container_width para usar o figsize
-                    # --- FIM DA CORREÇÃO ---
-                    st.markdown("- **Verde**: Acerto Correto\n- **Vermelho**: Erro Correto\n- **Laranja**: Falso Positivo\n- **Roxo**: Falso Negativo")
+                    chart_type = st.radio("Visualização:", ["Resultado da predição", "Densidade de arremessos"],
+                                          horizontal=True)
+                    if chart_type == "Resultado da predição":
+                        st.image(render_cache.get_or_render(player_key + ('shots',), lambda: shot_rendering.render_shot_chart(
+                            df_player['loc_x'], df_player['loc_y'], df_player['shot_made_flag'],
+                            df_player['predicted_outcome'], f"Shot Chart de {selected_player}")))
+                        st.markdown("- **Verde**: Acerto Correto\n- **Vermelho**: Erro Correto\n- **Laranja**: Falso Positivo\n- **Roxo**: Falso Negativo")
+                    else:
+                        st.image(render_cache.get_or_render(player_key + ('density',), lambda: shot_rendering.render_density_chart(
+                            shot_rendering.density_grid(df_player['loc_x'], df_player['loc_y']),
+                            f"Densidade de Arremessos de {selected_player}")))
 
                 with col_dist:
                     st.write(f"**Perfil de Arremessos vs. Média do Time**")
-                    fig2, ax2 = plt.subplots(figsize=(8, 4.5))
-                    sns.histplot(df_team_predicted['shot_distance'], bins=30, color='gray', stat='density', label=f'Média ({selected_team})', kde=True, ax=ax2)
-                    sns.histplot(df_player['shot_distance'], bins=15, color='blue', stat='density', label=selected_player, kde=True, ax=ax2)
-                    ax2.set_title(f"Distribuição da Distância dos Arremessos", fontsize=10)
-                    ax2.set_xlabel('Distância (pés)')
-                    ax2.legend()
-                    st.pyplot(fig2)
+                    st.image(render_cache.get_or_render(player_key + ('distance',), lambda: st.session_state[
+                        'distance_chart'].render(player_id, selected_player)))
 
         with tab4:
             st.subheader("Análise de Erros do Modelo para o Time")
-            fp = df_team_predicted[(df_team_predicted['shot_made_flag'] == 0) & (df_team_predicted['predicted_outcome'] == 1)]
-            fn = df_team_predicted[(df_team_predicted['shot_made_flag'] == 1) & (df_team_predicted['predicted_outcome'] == 0)]
+            fp = aggregate_cube.error_counts(team_cube, 'false_positives')
+            fn = aggregate_cube.error_counts(team_cube, 'false_negatives')
             
             col1, col2 = st.columns(2)
             with col1:
-                st.write(f"**Falsos Positivos (FP): {len(fp)} arremessos**")
+                st.write(f"**Falsos Positivos (FP): {fp.sum()} arremessos**")
                 st.write("O modelo previu 'Cesta', mas o jogador errou.")
                 if not fp.empty:
-                    st.dataframe(fp['action_type'].value_counts().head())
+                    st.dataframe(fp.head())
             with col2:
-                st.write(f"**Falsos Negativos (FN): {len(fn)} arremessos**")
+                st.write(f"**Falsos Negativos (FN): {fn.sum()} arremessos**")
                 st.write("O modelo previu 'Erro', mas o jogador acertou.")
                 if not fn.empty:
-                    st.dataframe(fn['action_type'].value_counts().head())
+                    st.dataframe(fn.head())
     else:
         st.info("Clique em 'Analisar Time' na barra lateral para carregar as visualizações.")
\ No newline at end of file
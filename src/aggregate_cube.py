@@ -0,0 +1,124 @@
+"""Cubo de agregados (temporada, time, jogador, zona, tipo de arremesso) dos scores.
+
+    python src/aggregate_cube.py [--scores-key <chave>] [--force]
+
+Cada célula guarda contagens e somas (arremessos, acertos, probabilidades,
+POE, falsos positivos/negativos), de modo que as tabelas e gráficos do
+dashboard saem de um rollup das células do time (O(grupos)) em vez de um
+groupby sobre todos os arremessos a cada rerun. O cubo é gravado em
+data/cubes/<chave dos scores>/ com o mesmo particionamento (season, team_id)
+dos scores; run_batch_scoring atualiza só as partições que acabou de pontuar,
+e este script constrói as que faltarem.
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+import parquet_store
+
+CUBES_DATASET = 'cubes'
+CUBE_KEYS = ['season', 'team_id', 'player_id', 'shot_zone_basic', 'action_type']
+CUBE_MEASURES = ['shots', 'made', 'probability_sum', 'poe_sum', 'adjusted_poe_sum',
+                 'false_positives', 'false_negatives']
+# Limiar de predicted_outcome usado no dashboard
+DECISION_THRESHOLD = 0.5
+
+
+def cube_dataset_name(scores_key):
+    return os.path.join(CUBES_DATASET, scores_key)
+
+
+def build_cube(df_scored):
+    """Agrega arremessos pontuados (shot_probability, poe, adjusted_poe) nas células do cubo."""
+    predicted = df_scored['shot_probability'].to_numpy() >= DECISION_THRESHOLD
+    made = df_scored['shot_made_flag'].to_numpy() == 1
+    keys = [key for key in CUBE_KEYS if key in df_scored.columns]
+    cells = pd.DataFrame({
+        'shots': np.ones(len(df_scored), dtype=np.int32),
+        'made': made.astype(np.int32),
+        'probability_sum': df_scored['shot_probability'].to_numpy(dtype=np.float64),
+        'poe_sum': df_scored['poe'].to_numpy(dtype=np.float64),
+        'adjusted_poe_sum': df_scored['adjusted_poe'].to_numpy(dtype=np.float64),
+        'false_positives': (predicted & ~made).astype(np.int32),
+        'false_negatives': (~predicted & made).astype(np.int32),
+    })
+    for key in keys:
+        cells[key] = df_scored[key].to_numpy()
+    return cells.groupby(keys, observed=True, dropna=False, sort=False)[CUBE_MEASURES].sum().reset_index()
+
+
+def write_cube_partitions(df_scored, scores_key, data_dir=parquet_store.DATA_DIR):
+    """Atualiza no cubo só as partições (season, team_id) presentes em df_scored."""
+    cube = build_cube(df_scored)
+    parquet_store.write_dataset(cube, cube_dataset_name(scores_key), data_dir, overwrite=False)
+    return cube
+
+
+def cube_exists(scores_key, data_dir=parquet_store.DATA_DIR):
+    return parquet_store.dataset_exists(cube_dataset_name(scores_key), data_dir)
+
+
+def read_cube(scores_key, seasons=None, team_ids=None, data_dir=parquet_store.DATA_DIR):
+    return parquet_store.read_dataset(cube_dataset_name(scores_key), seasons=seasons, team_ids=team_ids,
+                                      as_category=False, data_dir=data_dir)
+
+
+def rollup(cube, by):
+    """Soma as medidas do cubo pelas chaves em by (lista ou nome de coluna)."""
+    return cube.groupby(by, observed=True, dropna=False)[CUBE_MEASURES].sum()
+
+
+def zone_performance(cube):
+    """Aproveitamento real e esperado (xFG) por zona básica."""
+    zones = rollup(cube, 'shot_zone_basic')
+    return pd.DataFrame({'Aproveitamento Real': zones['made'] / zones['shots'],
+                         'Aproveitamento Esperado (xFG)': zones['probability_sum'] / zones['shots']})
+
+
+def player_poe(cube):
+    """POE ajustado total e por arremesso de cada jogador, do maior para o menor total."""
+    players = rollup(cube, 'player_id')
+    return pd.DataFrame({
+        'player_id': players.index,
+        'total_adjusted_poe': players['adjusted_poe_sum'].to_numpy(),
+        'avg_adjusted_poe_per_shot': (players['adjusted_poe_sum'] / players['shots']).to_numpy(),
+        'total_shots': players['shots'].to_numpy(),
+    }).sort_values(by='total_adjusted_poe', ascending=False).reset_index(drop=True)
+
+
+def error_counts(cube, measure):
+    """Contagem de false_positives ou false_negatives por action_type, em ordem decrescente."""
+    counts = rollup(cube, 'action_type')[measure]
+    return counts[counts > 0].sort_values(ascending=False).rename('count')
+
+
+def build_missing_partitions(scores_key, force=False, data_dir=parquet_store.DATA_DIR):
+    """Constrói o cubo das partições de scores que ainda não têm células."""
+    from batch_scoring import SCORES_DATASET, read_scores
+    scores_name = os.path.join(SCORES_DATASET, scores_key)
+    partitions = parquet_store.list_partitions(scores_name, data_dir)
+    if not force and cube_exists(scores_key, data_dir):
+        done = set(parquet_store.list_partitions(cube_dataset_name(scores_key), data_dir))
+        partitions = [partition for partition in partitions if partition not in done]
+    print(f"Cubo '{scores_key}': {len(partitions)} partições a agregar")
+    for season in sorted({season for season, _ in partitions}):
+        team_ids = [team_id for partition_season, team_id in partitions if partition_season == season]
+        df_scored = read_scores(scores_key, CUBE_KEYS + ['shot_made_flag', 'shot_probability', 'poe',
+                                                         'adjusted_poe'],
+                                seasons=[season], team_ids=team_ids, data_dir=data_dir)
+        cube = write_cube_partitions(df_scored, scores_key, data_dir)
+        print(f"  -> {season}: {len(df_scored)} arremessos em {len(cube)} células")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scores-key', help='Chave dos scores (padrão: modelo e transformador atuais)')
+    parser.add_argument('--force', action='store_true', help='Reconstrói todas as partições')
+    parser.add_argument('--data-dir', default=parquet_store.DATA_DIR)
+    args = parser.parse_args()
+    if args.scores_key is None:
+        from batch_scoring import current_scores_key
+        args.scores_key = current_scores_key()
+    build_missing_partitions(args.scores_key, args.force, args.data_dir)
@@ -0,0 +1,178 @@
+"""Pontuação offline de todos os arremessos de game_shot_charts.
+
+    python src/batch_scoring.py [--seasons 2024-25] [--workers 4] [--force]
+
+Cada partição (season, team_id) é lida do SQLite, codificada pelo
+FeatureTransformer e pontuada pelo modelo em um pool de processos. O
+resultado (shot_probability, poe e adjusted_poe, mais as colunas usadas nas
+análises) vai para o dataset Parquet data/scores/<versão do modelo>_<hash
+das features>/, de modo que o dashboard só lê resultados prontos. Partições
+já pontuadas para a mesma chave são puladas, salvo com --force. Cada lote
+gravado também atualiza as partições correspondentes do cubo de agregados
+(src/aggregate_cube.py).
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+
+import aggregate_cube
+import features
+import parquet_store
+import queries
+import season_store
+from tree_predictor import model_version
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_NAME = os.path.join(BASE_DIR, '..', 'nba_shots.sqlite')
+MODEL_PATH = os.path.join(BASE_DIR, '..', 'models', 'xgb_best_model.joblib')
+SCORES_DATASET = 'scores'
+
+# Colunas lidas do banco: entradas do transformador + campos usados nas análises
+SCORING_COLUMNS = ['id', 'game_id', 'game_event_id', 'player_id', 'team_id', 'season', 'period',
+                   'minutes_remaining', 'seconds_remaining', 'shot_made_flag', 'loc_x', 'loc_y',
+                   'shot_distance'] + features.CATEGORICAL_FEATURES
+# Partições acumuladas antes de cada escrita no Parquet
+WRITE_BATCH_PARTITIONS = 30
+
+# Estado de cada processo do pool, carregado uma única vez pelo initializer
+_worker = {}
+
+
+def scores_dataset_name(model_key):
+    return os.path.join(SCORES_DATASET, model_key)
+
+
+def current_scores_key(model_path=MODEL_PATH):
+    """Chave '<versão do modelo>_<hash das features>' dos artefatos em disco."""
+    transformer = features.FeatureTransformer.load(features.transformer_path(model_path))
+    return f"{model_version(model_path)}_{transformer.fingerprint()}"
+
+
+def add_poe(df_scored, probabilities):
+    """Grava shot_probability, poe (acerto - probabilidade) e adjusted_poe em df_scored.
+
+    O viés médio do POE é removido dentro do frame recebido: um bloco
+    (season, team_id) no batch_scoring, os arremessos do time no dashboard.
+    """
+    df_scored['shot_probability'] = probabilities
+    poe = df_scored['shot_made_flag'] - df_scored['shot_probability']
+    df_scored['poe'] = poe
+    df_scored['adjusted_poe'] = poe - poe.mean()
+    return df_scored
+
+
+def predicted_outcome(probabilities):
+    """Acerto previsto (0/1) pelo limiar do dashboard e do cubo."""
+    return (np.asarray(probabilities) >= aggregate_cube.DECISION_THRESHOLD).astype(int)
+
+
+def score_frame(model, transformer, df_shots, buffer=None):
+    """Adiciona shot_probability, poe e adjusted_poe (add_poe) a um bloco de arremessos."""
+    df_scored = df_shots.copy()
+    model_input = transformer.transform(df_shots, out=buffer)
+    return add_poe(df_scored, model.predict_proba(model_input)[:, 1].astype(np.float32))
+
+
+def analytical_data(model, model_input, df_predicted):
+    """Predição, acerto previsto e POE do frame de um time, no lugar (get_analytical_data do dashboard)."""
+    add_poe(df_predicted, model.predict_proba(model_input)[:, 1])
+    df_predicted['predicted_outcome'] = predicted_outcome(df_predicted['shot_probability'])
+    return df_predicted
+
+
+def _init_worker(db_name, model_path):
+    model = joblib.load(model_path)
+    # Um processo por núcleo: cada XGBoost usa uma thread para não disputar CPU
+    model.set_params(n_jobs=1)
+    transformer = features.FeatureTransformer.load(features.transformer_path(model_path))
+    transformer.check_model(model)
+    _worker.update(db_name=db_name, conns={}, model=model, transformer=transformer, buffer=None)
+
+
+def _season_connection(season):
+    """Conexão do processo com o arquivo de uma temporada, aberta na primeira partição dela."""
+    if season not in _worker['conns']:
+        _worker['conns'][season] = season_store.connect(_worker['db_name'], [season])
+    return _worker['conns'][season]
+
+
+def _score_partition(partition):
+    season, team_id = partition
+    df_shots = queries.shots_for_team(_season_connection(season), team_id, [season], columns=SCORING_COLUMNS)
+    transformer = _worker['transformer']
+    # Buffer float32 reaproveitado entre partições do mesmo processo
+    if _worker['buffer'] is None or _worker['buffer'].shape[0] < len(df_shots):
+        _worker['buffer'] = transformer.allocate(max(len(df_shots), 16 * 1024))
+    return score_frame(_worker['model'], transformer, df_shots, _worker['buffer'])
+
+
+def run_batch_scoring(db_name=DB_NAME, model_path=MODEL_PATH, seasons=None, workers=None, force=False,
+                      data_dir=parquet_store.DATA_DIR):
+    """Pontua as partições pendentes e grava o dataset de scores da chave atual.
+
+    Returns:
+        str: Chave (versão do modelo + hash das features) do dataset gravado
+    """
+    scores_key = current_scores_key(model_path)
+    dataset_name = scores_dataset_name(scores_key)
+    partitions = [partition for conn in season_store.iter_connections(db_name, seasons)
+                  for partition in queries.shot_partitions(conn, seasons)]
+
+    if not force and parquet_store.dataset_exists(dataset_name, data_dir):
+        done = set(parquet_store.list_partitions(dataset_name, data_dir))
+        partitions = [partition for partition in partitions if partition not in done]
+    print(f"Scores '{scores_key}': {len(partitions)} partições (temporada, time) a pontuar")
+    if not partitions:
+        # Scores gravados antes do cubo existir ainda precisam das células
+        aggregate_cube.build_missing_partitions(scores_key, data_dir=data_dir)
+        return scores_key
+
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    total_rows = 0
+    pending = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(db_name, model_path)) as executor:
+        for position, df_scored in enumerate(executor.map(_score_partition, partitions), start=1):
+            pending.append(df_scored)
+            total_rows += len(df_scored)
+            if len(pending) >= WRITE_BATCH_PARTITIONS or position == len(partitions):
+                # Só as partições presentes no lote são substituídas, nos scores e no cubo
+                df_batch = pd.concat(pending, ignore_index=True)
+                parquet_store.write_dataset(df_batch, dataset_name, data_dir, overwrite=False)
+                aggregate_cube.write_cube_partitions(df_batch, scores_key, data_dir)
+                pending = []
+                print(f"  -> {position}/{len(partitions)} partições, {total_rows} arremessos pontuados")
+
+    elapsed = time.perf_counter() - start
+    print(f"Pontuação concluída: {total_rows} arremessos em {elapsed:.1f}s "
+          f"({total_rows / elapsed:,.0f} arremessos/s, {workers} processos)")
+    return scores_key
+
+
+def scores_exist(scores_key, data_dir=parquet_store.DATA_DIR):
+    return parquet_store.dataset_exists(scores_dataset_name(scores_key), data_dir)
+
+
+def read_scores(scores_key, columns=None, seasons=None, team_ids=None, as_category=False,
+                data_dir=parquet_store.DATA_DIR):
+    """Lê os scores pré-calculados de uma chave, com projeção e filtro por partição."""
+    return parquet_store.read_dataset(scores_dataset_name(scores_key), columns, seasons, team_ids,
+                                      as_category=as_category, data_dir=data_dir)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db', default=DB_NAME)
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--seasons', nargs='+')
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--force', action='store_true', help='Re-pontua partições já pontuadas')
+    parser.add_argument('--data-dir', default=parquet_store.DATA_DIR)
+    args = parser.parse_args()
+    run_batch_scoring(args.db, args.model, args.seasons, args.workers, args.force, args.data_dir)
@@ -0,0 +1,183 @@
+import os
+import sys
+from contextlib import contextmanager
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'configs'))
+from database_setup import COUNTED_TABLES, SHOT_CHART_INDEXES  # noqa: E402
+
+# Colunas de game_shot_charts na ordem usada pelos INSERTs preparados
+SHOT_COLUMNS = [
+    'game_id', 'game_event_id', 'player_id', 'team_id', 'period', 'minutes_remaining',
+    'seconds_remaining', 'shot_made_flag', 'loc_x', 'loc_y', 'shot_distance', 'action_type',
+    'shot_type', 'shot_zone_basic', 'shot_zone_area', 'shot_zone_range', 'season'
+]
+
+# Índices secundários de game_shot_charts (definidos na migração de esquema):
+# recriados depois de cargas grandes, não mantidos linha a linha
+SECONDARY_INDEXES = SHOT_CHART_INDEXES
+
+INSERT_TEAM = 'INSERT OR IGNORE INTO teams (id, team_name, team_abbreviation) VALUES (?, ?, ?)'
+INSERT_PLAYER = 'INSERT OR IGNORE INTO players (id, player_name) VALUES (?, ?)'
+# Colunas de games na ordem das tuplas de game_rows
+GAME_COLUMNS = ['id', 'game_date', 'season', 'home_team_id', 'visitor_team_id']
+INSERT_GAME = (
+    f"INSERT OR IGNORE INTO games ({', '.join(GAME_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in GAME_COLUMNS)})"
+)
+# Completa/corrige jogos já existentes (ex: inseridos sem data pelo fix_missing_data);
+# valores NULL não apagam o que já se sabe e linhas idênticas não são reescritas
+UPDATE_GAME = '''
+UPDATE games SET game_date = COALESCE(?2, game_date), season = COALESCE(?3, season),
+    home_team_id = COALESCE(?4, home_team_id), visitor_team_id = COALESCE(?5, visitor_team_id)
+WHERE id = ?1 AND (game_date IS NOT COALESCE(?2, game_date) OR season IS NOT COALESCE(?3, season)
+    OR home_team_id IS NOT COALESCE(?4, home_team_id) OR visitor_team_id IS NOT COALESCE(?5, visitor_team_id))
+'''
+INSERT_SHOT = (
+    f"INSERT INTO game_shot_charts ({', '.join(SHOT_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in SHOT_COLUMNS)})"
+)
+DELETE_SHOT_PARTITION = 'DELETE FROM game_shot_charts WHERE season = ? AND team_id = ?'
+PENDING_GAMES = 'SELECT COUNT(*) FROM games WHERE game_date IS NULL OR home_team_id IS NULL'
+ADD_ROW_COUNT = (
+    'INSERT INTO table_counts (table_name, row_count) VALUES (?, ?) '
+    'ON CONFLICT (table_name) DO UPDATE SET row_count = row_count + excluded.row_count'
+)
+
+
+def to_rows(df, columns):
+    """Converte as colunas de um DataFrame em tuplas prontas para executemany (NaN -> NULL)."""
+    values = []
+    for column in columns:
+        series = df[column]
+        # tolist() devolve tipos nativos do Python, que o sqlite3 aceita diretamente
+        if series.isna().any():
+            series = series.astype(object).where(series.notna(), None)
+        values.append(series.tolist())
+    return list(zip(*values))
+
+
+def add_row_counts(conn, deltas):
+    """Soma as variações {tabela: linhas} em table_counts, na transação atual do chamador."""
+    conn.executemany(ADD_ROW_COUNT, [(table, delta) for table, delta in deltas.items() if delta])
+
+
+def row_counts(conn):
+    """Linhas por tabela mantidas em table_counts, sem varrer as tabelas."""
+    return dict(conn.execute('SELECT table_name, row_count FROM table_counts'))
+
+
+def pending_game_count(conn):
+    """Jogos ainda sem data ou sem mandante/visitante, lidos do índice parcial idx_games_pending."""
+    return conn.execute(PENDING_GAMES).fetchone()[0]
+
+
+def recount(conn):
+    """Refaz table_counts com COUNT(*) (após cargas que não passam por load_partition)."""
+    with conn:
+        for table in COUNTED_TABLES:
+            conn.execute(f"INSERT OR REPLACE INTO table_counts (table_name, row_count) "
+                         f"SELECT '{table}', COUNT(*) FROM {table}")
+    return row_counts(conn)
+
+
+def upsert_games(conn, game_rows):
+    """Insere os jogos novos e completa os existentes, na transação atual do chamador.
+
+    Args:
+        game_rows (list): Tuplas na ordem de GAME_COLUMNS
+
+    Returns:
+        tuple: (jogos inseridos, jogos existentes atualizados)
+    """
+    before = conn.total_changes
+    conn.executemany(INSERT_GAME, game_rows)
+    inserted = conn.total_changes - before
+    conn.executemany(UPDATE_GAME, game_rows)
+    return inserted, conn.total_changes - before - inserted
+
+
+@contextmanager
+def bulk_load_session(conn, cache_size_mb=256):
+    """Ajusta os PRAGMAs do SQLite para carga em massa e restaura ao final.
+
+    WAL permite leituras concorrentes (dashboard/notebooks) durante a carga;
+    synchronous=NORMAL evita um fsync por transação, o que é seguro em WAL.
+    """
+    previous_synchronous = conn.execute('PRAGMA synchronous').fetchone()[0]
+    previous_cache_size = conn.execute('PRAGMA cache_size').fetchone()[0]
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.execute('PRAGMA synchronous = NORMAL')
+    conn.execute(f'PRAGMA cache_size = {-cache_size_mb * 1024}')
+    conn.execute('PRAGMA temp_store = MEMORY')
+    try:
+        yield conn
+    finally:
+        conn.execute(f'PRAGMA synchronous = {previous_synchronous}')
+        conn.execute(f'PRAGMA cache_size = {previous_cache_size}')
+
+
+def drop_secondary_indexes(conn):
+    for index_name in SECONDARY_INDEXES:
+        conn.execute(f'DROP INDEX IF EXISTS {index_name}')
+    conn.commit()
+
+
+def create_secondary_indexes(conn):
+    for ddl in SECONDARY_INDEXES.values():
+        conn.execute(ddl)
+    conn.commit()
+
+
+@contextmanager
+def deferred_indexes(conn):
+    """Remove os índices secundários durante uma carga grande e os recria ao final."""
+    drop_secondary_indexes(conn)
+    try:
+        yield conn
+    finally:
+        create_secondary_indexes(conn)
+
+
+def delete_partition(conn, season, team_id):
+    """Remove os arremessos de (season, team_id) na transação do chamador. Retorna as linhas removidas."""
+    deleted = conn.execute(DELETE_SHOT_PARTITION, (season, team_id)).rowcount
+    add_row_counts(conn, {'game_shot_charts': -deleted})
+    return deleted
+
+
+def load_partition(conn, season, team_id, shot_rows, team_rows=(), player_rows=(), game_rows=(),
+                   replace=True):
+    """Carrega uma partição (season, team_id) em uma única transação.
+
+    Times e jogadores são inseridos com INSERT OR IGNORE, de modo que linhas
+    já existentes não derrubam o lote inteiro, e jogos existentes recebem a
+    data, a temporada e os times que faltavam (upsert_games); os arremessos da
+    partição são substituídos no lugar. Em cargas completas sobre tabelas
+    vazias, replace=False evita o DELETE (que sem índices varre a tabela).
+    As linhas inseridas e removidas são somadas a table_counts na mesma
+    transação.
+
+    Args:
+        shot_rows (list): Tuplas na ordem de SHOT_COLUMNS
+        team_rows (list): Tuplas (id, team_name, team_abbreviation)
+        player_rows (list): Tuplas (id, player_name)
+        game_rows (list): Tuplas na ordem de GAME_COLUMNS
+
+    Returns:
+        dict: Linhas efetivamente inseridas por tabela
+    """
+    inserted = {}
+    # "with conn" abre uma única transação e faz rollback se qualquer passo falhar
+    with conn:
+        for table, sql, rows in [('teams', INSERT_TEAM, team_rows),
+                                 ('players', INSERT_PLAYER, player_rows)]:
+            before = conn.total_changes
+            conn.executemany(sql, rows)
+            inserted[table] = conn.total_changes - before
+        inserted['games'], _ = upsert_games(conn, game_rows)
+        deleted = conn.execute(DELETE_SHOT_PARTITION, (season, team_id)).rowcount if replace else 0
+        conn.executemany(INSERT_SHOT, shot_rows)
+        inserted['game_shot_charts'] = len(shot_rows)
+        add_row_counts(conn, {**inserted, 'game_shot_charts': len(shot_rows) - deleted})
+    return inserted
+
@@ -0,0 +1,472 @@
+"""Coleta de arremessos e elencos da NBA API em uma única passada por (temporada, time).
+
+    python src/collect_data.py [--seasons 2024-25 2023-24] [--full-refresh] [--offline] [--play-by-play]
+
+Para cada (temporada, time) pendente, os dois endpoints (shotchartdetail e
+commonteamroster) são buscados pelo mesmo FetchScheduler: um único rate
+limit, as mesmas re-tentativas e uma sessão HTTP keep-alive compartilhada.
+As respostas brutas vão para o cache em disco (src/response_cache.py):
+temporadas encerradas nunca expiram e as em andamento valem por CACHE_TTLS.
+Unidades com todas as respostas em cache são carregadas direto do disco, sem
+passar pelo rate limit; com --offline nada é buscado na rede, e uma recarga
+completa (ex: depois de mudar o esquema) é só um replay do cache.
+
+As funções de requisição, carga e limpeza continuam em collect_shotchart.py
+e collect_roster.py, e cada coletor mantém suas entradas no etl_manifest.
+Jogos que ficaram sem data ou sem mandante/visitante são completados ao final
+pelo calendário da temporada (collect_games.py, uma requisição por temporada).
+Com --play-by-play, os jogos ainda sem eventos recebem o lance a lance
+(collect_play_by_play.py, uma requisição por jogo) na tabela game_events.
+Os tempos de fetch, parse, transform, load e fix-up, requisições, re-tentativas
+e bytes vão para o log estruturado data/logs/pipeline.jsonl
+(src/instrumentation.py); --metrics-port expõe os mesmos totais no formato
+do Prometheus (em 127.0.0.1, salvo --metrics-host) e --profile-dir grava um perfil cProfile do laço de carga.
+"""
+import argparse
+import os
+import time
+from contextlib import ExitStack
+
+import pandas as pd
+
+import bulk_loader
+import collect_games
+import collect_play_by_play
+import collect_roster
+import collect_shotchart
+import etl_manifest
+import instrumentation
+import response_cache
+import season_store
+import static_index
+from fetch_scheduler import FetchScheduler, load_response
+
+# --- CONFIGURAÇÃO ---
+SEASONS = collect_shotchart.SEASONS
+DB_NAME = collect_shotchart.DB_NAME
+REFRESH_SEASONS = collect_shotchart.REFRESH_SEASONS
+# Requisições simultâneas e limite de taxa (requisições/segundo) para a NBA API
+MAX_WORKERS = 4
+REQUESTS_PER_SECOND = 1.0
+# Validade (s) das respostas em cache das temporadas em REFRESH_SEASONS; as demais não expiram
+CACHE_TTLS = {
+    collect_shotchart.COLLECTOR: 12 * 3600,
+    collect_roster.COLLECTOR: 24 * 3600,
+    collect_games.COLLECTOR: 6 * 3600,
+}
+
+# Por coletor: (requisição sem envio, busca, carga no SQLite, limpeza na recarga completa)
+COLLECTORS = {
+    collect_shotchart.COLLECTOR: (collect_shotchart.shot_chart_request, collect_shotchart.fetch_shot_data_for_team,
+                                  collect_shotchart.load_team_shots, collect_shotchart.clear_tables,
+                                  collect_shotchart.clear_partition),
+    collect_roster.COLLECTOR: (collect_roster.roster_request, collect_roster.fetch_roster_for_team,
+                               collect_roster.load_team_roster, collect_roster.clear_tables,
+                               collect_roster.clear_partition),
+}
+
+
+def _first_frame(result):
+    """Primeiro DataFrame de uma resposta do nba_api (None se vazia)."""
+    if isinstance(result, list):
+        result = result[0] if result else None
+    return result if isinstance(result, pd.DataFrame) else None
+
+
+def cached_frames(collector, season, team_ids=None, cache_dir=response_cache.CACHE_DIR):
+    """Respostas em cache de um coletor em uma temporada, já em DataFrame, sem acessar a rede.
+
+    Para re-processar as respostas brutas (ex: nos notebooks) sem nova coleta.
+    Times sem resposta em cache são omitidos.
+    """
+    request_fn = COLLECTORS[collector][0]
+    cache = response_cache.ResponseCache(cache_dir)
+    frames = []
+    for team_id in team_ids or static_index.team_ids_by_name().values():
+        endpoint = request_fn(team_id, season)
+        body = cache.get(response_cache.request_key(endpoint.endpoint, endpoint.parameters))
+        if body is not None:
+            frames.append(_first_frame(load_response(endpoint, body).get_data_frames()))
+    frames = [df for df in frames if df is not None]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def fill_game_metadata(connections, cache=None, offline=False, refresh_seasons=REFRESH_SEASONS, scheduler=None):
+    """Completa data, mandante e visitante dos jogos pendentes de cada temporada.
+
+    Só temporadas com jogos pendentes (índice parcial idx_games_pending) são
+    tocadas. O calendário da temporada (leaguegamelog, uma requisição com
+    todos os jogos) é a fonte principal; se ele não estiver disponível (ex:
+    --offline sem o calendário em cache), as respostas de arremessos já em
+    cache são re-processadas. Jogos fora do calendário continuam pendentes.
+
+    Returns:
+        dict: {temporada: jogos ainda pendentes}
+    """
+    pending = {season: bulk_loader.pending_game_count(conn) for season, conn in connections.items()}
+    seasons = [season for season, count in pending.items() if count]
+    if not seasons:
+        return pending
+    print(f"\nJogos sem data ou sem mandante/visitante: "
+          + ', '.join(f"{season}: {pending[season]}" for season in seasons))
+
+    def ttl(season):
+        return None if offline or season not in refresh_seasons else CACHE_TTLS[collect_games.COLLECTOR]
+
+    def fetch(season):
+        return collect_games.fetch_schedule(season, cache=cache, ttl=ttl(season))
+
+    scheduled = set()
+
+    def consume(season, result, error):
+        if error is not None:
+            print(f"  -> Erro ao buscar o calendário de {season}: {error}")
+            instrumentation.count('units', collector=collect_games.COLLECTOR, status='fetch_failed')
+            return
+        df = _first_frame(result)
+        if df is None or df.empty:
+            print(f"  -> Calendário de {season} vazio.")
+            instrumentation.count('units', collector=collect_games.COLLECTOR, status='empty')
+            return
+        collect_games.load_games(connections[season], collect_games.schedule_game_rows(df, season),
+                                 f"calendário {season}")
+        scheduled.add(season)
+        instrumentation.count('units', collector=collect_games.COLLECTOR, status='loaded')
+
+    def is_cached(season):
+        endpoint = collect_games.schedule_request(season)
+        return cache is not None and cache.is_fresh(
+            response_cache.request_key(endpoint.endpoint, endpoint.parameters), ttl(season))
+
+    if offline:
+        for season in seasons:
+            if not is_cached(season):
+                consume(season, None, 'Resposta ausente do cache (modo offline)')
+                continue
+            # Como no FetchScheduler: uma resposta corrompida vira erro da unidade, não da coleta
+            try:
+                result, error = fetch(season), None
+            except Exception as e:
+                result, error = None, e
+            consume(season, result, error)
+    else:
+        scheduler = scheduler or FetchScheduler(max_workers=MAX_WORKERS, rate=REQUESTS_PER_SECOND)
+        scheduler.run(seasons, fetch, consume)
+
+    # Sem calendário: os arremessos em cache trazem a data e as abreviações dos times
+    for season in seasons:
+        if cache is not None and season not in scheduled:
+            df_shots = cached_frames(collect_shotchart.COLLECTOR, season, cache_dir=cache.cache_dir)
+            if not df_shots.empty:
+                collect_games.load_games(connections[season], collect_shotchart.shot_game_rows(df_shots, season),
+                                         f"arremessos em cache {season}")
+        pending[season] = bulk_loader.pending_game_count(connections[season])
+        print(f"Temporada {season}: {pending[season]} jogos ainda pendentes")
+    return pending
+
+
+def run_game_metadata(seasons_list, db_name=DB_NAME, offline=False, refresh_seasons=REFRESH_SEASONS,
+                      cache_dir=response_cache.CACHE_DIR):
+    """Etapa de metadados de jogos sem coleta de arremessos (ex: depois de --split de um banco antigo)."""
+    cache = response_cache.ResponseCache(cache_dir) if cache_dir else None
+    connections = {season: season_store.open_season(season, db_name) for season in seasons_list}
+    try:
+        return fill_game_metadata(connections, cache, offline, refresh_seasons)
+    finally:
+        for conn in connections.values():
+            conn.close()
+
+
+def fill_play_by_play(connections, cache=None, offline=False, scheduler=None):
+    """Coleta o lance a lance (game_events) dos jogos com arremessos e ainda sem eventos.
+
+    Uma requisição por jogo, pelo mesmo FetchScheduler e cache dos demais
+    coletores; jogos com a resposta em cache são carregados sem passar pelo
+    rate limit. O lance a lance de um jogo encerrado não muda: as respostas
+    em cache nunca expiram.
+
+    Returns:
+        dict: {temporada: jogos carregados}
+    """
+    units = [(season, game_id) for season, conn in connections.items()
+             for game_id in collect_play_by_play.pending_game_ids(conn)]
+    loaded = {season: 0 for season in connections}
+    if not units:
+        return loaded
+
+    def fetch(unit):
+        return collect_play_by_play.fetch_play_by_play(unit[1], cache=cache)
+
+    def is_cached(unit):
+        endpoint = collect_play_by_play.play_by_play_request(unit[1])
+        return cache is not None and cache.is_fresh(response_cache.request_key(endpoint.endpoint, endpoint.parameters))
+
+    def consume(unit, result, error):
+        season, game_id = unit
+        if error is not None:
+            print(f"  -> Erro ao buscar o lance a lance de {game_id}: {error}")
+            instrumentation.count('units', collector=collect_play_by_play.COLLECTOR, status='fetch_failed')
+            return
+        df = _first_frame(result)
+        if df is None or df.empty:
+            print(f"  -> Nenhum evento encontrado para o jogo {game_id}.")
+            # Resposta válida, porém vazia: registrada para não ser buscada a cada coleta
+            collect_play_by_play.mark_empty(connections[season], game_id)
+            instrumentation.count('units', collector=collect_play_by_play.COLLECTOR, status='empty')
+            return
+        collect_play_by_play.load_game_events(connections[season], df, game_id)
+        instrumentation.count('units', collector=collect_play_by_play.COLLECTOR, status='loaded')
+        loaded[season] += 1
+        if sum(loaded.values()) % 100 == 0:
+            print(f"  -> {sum(loaded.values())}/{len(units)} jogos com lance a lance carregados")
+
+    cached = {unit for unit in units if is_cached(unit)}
+    cached_units = [unit for unit in units if unit in cached]
+    network_units = [unit for unit in units if unit not in cached]
+    print(f"\nLance a lance de {len(units)} jogos ({len(cached_units)} no cache, {len(network_units)} na rede)")
+    with ExitStack() as stack:
+        for conn in connections.values():
+            stack.enter_context(bulk_loader.bulk_load_session(conn))
+        for unit in cached_units:
+            try:
+                result, error = fetch(unit), None
+            except Exception as e:
+                result, error = None, e
+            consume(unit, result, error)
+        if offline:
+            for unit in network_units:
+                consume(unit, None, 'Resposta ausente do cache (modo offline)')
+        else:
+            scheduler = scheduler or FetchScheduler(max_workers=MAX_WORKERS, rate=REQUESTS_PER_SECOND)
+            scheduler.run(network_units, fetch, consume)
+    for season, count in loaded.items():
+        print(f"Temporada {season}: lance a lance de {count} jogos carregado")
+    return loaded
+
+
+def run_play_by_play(seasons_list, db_name=DB_NAME, offline=False, cache_dir=response_cache.CACHE_DIR):
+    """Etapa de lance a lance sem coleta de arremessos (jogos já carregados no banco)."""
+    cache = response_cache.ResponseCache(cache_dir) if cache_dir else None
+    connections = {season: season_store.open_season(season, db_name) for season in seasons_list}
+    try:
+        loaded = fill_play_by_play(connections, cache, offline)
+        if cache is not None:
+            print(cache.report())
+        return loaded
+    finally:
+        for conn in connections.values():
+            conn.close()
+
+
+def run_etl_pipeline(seasons_list, refresh_seasons=REFRESH_SEASONS, full_refresh=False, db_name=DB_NAME,
+                     collectors=tuple(COLLECTORS), offline=False, cache_dir=response_cache.CACHE_DIR,
+                     play_by_play=False):
+    """Executa o pipeline de ETL incremental dos coletores para uma lista de temporadas.
+
+    As requisições rodam em paralelo no FetchScheduler (rate limit token-bucket e
+    backoff guiado pela resposta), enquanto a transformação e a carga são feitas
+    nesta thread à medida que os resultados chegam. Cada temporada é gravada no
+    seu próprio arquivo do season_store.
+
+    Cada (season, team_id) é registrado no etl_manifest, por coletor: unidades
+    já concluídas são puladas, as que falharam são re-tentadas e as temporadas
+    em refresh_seasons são re-coletadas, recarregando só as partições cujo
+    conteúdo mudou. Com full_refresh=True as tabelas e os manifestos são limpos
+    antes da coleta; com offline=True só respostas do cache são usadas e com
+    cache_dir=None o cache em disco não é lido nem gravado. Com
+    play_by_play=True, os jogos ainda sem eventos recebem o lance a lance
+    (game_events) ao final.
+    """
+    cache = response_cache.ResponseCache(cache_dir) if cache_dir else None
+    # Arquivos novos recebem o esquema completo; os existentes, as migrações pendentes
+    connections = {season: season_store.open_season(season, db_name) for season in seasons_list}
+
+    if full_refresh:
+        for conn in connections.values():
+            for collector in collectors:
+                COLLECTORS[collector][3](conn)
+                etl_manifest.reset_manifest(conn, collector)
+            if play_by_play:
+                collect_play_by_play.clear_tables(conn)
+
+    all_teams = static_index.team_ids_by_name()
+    team_names = {team_id: team_name for team_name, team_id in all_teams.items()}
+    all_units = [(season, team_id) for season in seasons_list for team_id in all_teams.values()]
+
+    # Coletores pendentes de cada unidade (cada coletor tem suas entradas no manifesto)
+    pending = {}
+    for season, conn in connections.items():
+        season_units = [unit for unit in all_units if unit[0] == season]
+        for collector in collectors:
+            for unit in etl_manifest.pending_units(conn, collector, season_units, refresh_seasons):
+                pending.setdefault(unit, []).append(collector)
+    units = [unit for unit in all_units if unit in pending]
+
+    def ttl(collector, season):
+        return None if offline or season not in refresh_seasons else CACHE_TTLS[collector]
+
+    def is_cached(unit):
+        season, team_id = unit
+        if cache is None:
+            return False
+        for collector in pending[unit]:
+            endpoint = COLLECTORS[collector][0](team_id, season)
+            if not cache.is_fresh(response_cache.request_key(endpoint.endpoint, endpoint.parameters),
+                                  ttl(collector, season)):
+                return False
+        return True
+
+    cached = {unit for unit in units if is_cached(unit)}
+    cached_units = [unit for unit in units if unit in cached]
+    network_units = [unit for unit in units if unit not in cached]
+    print(f"Iniciando coleta de {', '.join(collectors)} para {len(all_teams)} times em {len(seasons_list)} temporadas...")
+    print(f"Unidades (temporada, time) pendentes: {len(units)} de {len(all_units)} "
+          f"({len(cached_units)} no cache, {len(network_units)} na rede)")
+
+    # Contadores para estatísticas, por coletor
+    stats = {collector: {'successful_teams': 0, 'empty_teams': 0, 'failed_teams': 0} for collector in collectors}
+    progress = {'units': 0}
+
+    def fetch(unit):
+        season, team_id = unit
+        # Em uma re-tentativa, as respostas já obtidas voltam do cache
+        return {collector: COLLECTORS[collector][1](team_id, season, cache=cache, ttl=ttl(collector, season))
+                for collector in pending[unit]}
+
+    def consume(unit, results, error):
+        season, team_id = unit
+        conn = connections[season]
+        team_name = team_names[team_id]
+        progress['units'] += 1
+        print(f"Processando {progress['units']}/{len(units)}: {team_name} (ID: {team_id}) na temporada {season}")
+
+        for collector in pending[unit]:
+            load_fn = COLLECTORS[collector][2]
+            if error is not None:
+                print(f"  -> Erro ao buscar {collector} para {team_name}: {error}")
+                etl_manifest.mark_failed(conn, collector, season, team_id, error)
+                instrumentation.count('units', collector=collector, status='fetch_failed')
+                stats[collector]['failed_teams'] += 1
+                continue
+
+            df = _first_frame(results[collector])
+            if df is None or df.empty:
+                # Resposta válida, porém vazia (ex: franquia inexistente na temporada): a partição
+                # também fica vazia no banco, na mesma transação do manifesto com 0 linhas
+                with conn:
+                    deleted = COLLECTORS[collector][4](conn, season, team_id)
+                    etl_manifest.mark_done(conn, collector, season, team_id, 0, etl_manifest.EMPTY_CONTENT_HASH,
+                                           commit=False)
+                print(f"  -> Nenhum dado de {collector} encontrado para {team_name} na temporada {season}"
+                      + (f"; {deleted} linhas antigas removidas." if deleted else "."))
+                instrumentation.count('units', collector=collector, status='empty')
+                stats[collector]['empty_teams'] += 1
+                continue
+
+            digest = etl_manifest.content_hash(df)
+            if etl_manifest.is_unchanged(conn, collector, season, team_id, digest):
+                print(f"  -> Dados de {collector} de {team_name} inalterados desde a última carga. Pulando...")
+                etl_manifest.mark_done(conn, collector, season, team_id, len(df), digest)
+                instrumentation.count('units', collector=collector, status='unchanged')
+                stats[collector]['successful_teams'] += 1
+                continue
+
+            # --- Transform and Load ---
+            try:
+                # Após a limpeza da recarga completa as partições não existem: o DELETE é dispensável
+                load_fn(conn, df, team_id, team_name, season, replace=not full_refresh)
+                etl_manifest.mark_done(conn, collector, season, team_id, len(df), digest)
+                instrumentation.count('units', collector=collector, status='loaded')
+                stats[collector]['successful_teams'] += 1
+            except Exception as e:
+                conn.rollback()
+                print(f"  -> Erro ao processar {collector} para {team_name}: {e}")
+                etl_manifest.mark_failed(conn, collector, season, team_id, e)
+                instrumentation.count('units', collector=collector, status='load_failed')
+                stats[collector]['failed_teams'] += 1
+
+    scheduler = FetchScheduler(max_workers=MAX_WORKERS, rate=REQUESTS_PER_SECOND)
+    pipeline_start = time.perf_counter()
+    with ExitStack() as stack:
+        # Só a thread de carga aparece no cProfile; as de busca, com py-spy
+        stack.enter_context(instrumentation.profiled('collect_data'))
+        for conn in connections.values():
+            stack.enter_context(bulk_loader.bulk_load_session(conn))
+            if full_refresh:
+                # Carga completa: os índices secundários são construídos só ao final
+                stack.enter_context(bulk_loader.deferred_indexes(conn))
+            else:
+                bulk_loader.create_secondary_indexes(conn)
+
+        # Respostas em cache não passam pelo rate limit nem pelo pool de threads
+        for unit in cached_units:
+            try:
+                results, error = fetch(unit), None
+            except Exception as e:
+                results, error = None, e
+            consume(unit, results, error)
+        if offline:
+            for unit in network_units:
+                consume(unit, None, 'Resposta ausente do cache (modo offline)')
+        else:
+            scheduler.run(network_units, fetch, consume)
+
+    # Corrigir dados faltantes e verificar os elencos
+    for season, conn in connections.items():
+        print(f"\nTemporada {season}:")
+        if collect_shotchart.COLLECTOR in collectors:
+            collect_shotchart.fix_missing_data(conn)
+        if collect_roster.COLLECTOR in collectors:
+            collect_roster.verify_data_integrity(conn)
+    if collect_shotchart.COLLECTOR in collectors:
+        # Jogos inseridos sem data pelo fix_missing_data (ou vindos de um banco antigo)
+        fill_game_metadata(connections, cache, offline, refresh_seasons, scheduler)
+    if play_by_play:
+        fill_play_by_play(connections, cache, offline, scheduler)
+
+    print(f"\n{static_index.lookup_report()}")
+    if cache is not None:
+        print(cache.report())
+    print(instrumentation.report())
+    instrumentation.log_event('pipeline_done', seasons=list(seasons_list), collectors=list(collectors),
+                              seconds=round(time.perf_counter() - pipeline_start, 3), stats=stats)
+    print(f"\nPipeline de ETL concluído!")
+    for collector, counts in stats.items():
+        successful_teams, failed_teams = counts['successful_teams'], counts['failed_teams']
+        print(f"{collector}: {successful_teams} times processados com sucesso, {counts['empty_teams']} sem dados, "
+              f"{failed_teams} com falha", end='')
+        if successful_teams + failed_teams > 0:
+            print(f" (taxa de sucesso: {successful_teams/(successful_teams+failed_teams)*100:.1f}%)", end='')
+        print()
+    for conn in connections.values():
+        conn.close()
+    return stats
+
+
+if __name__ == "__main__":
+    # Temporadas diferentes podem ser coletadas em processos paralelos (um arquivo por temporada)
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seasons', nargs='+', default=SEASONS)
+    parser.add_argument('--collectors', nargs='+', choices=list(COLLECTORS), default=list(COLLECTORS))
+    parser.add_argument('--full-refresh', action='store_true')
+    parser.add_argument('--offline', action='store_true', help='Só respostas do cache em disco, sem rede')
+    parser.add_argument('--play-by-play', action='store_true',
+                        help='Coleta também o lance a lance (uma requisição por jogo) para game_events')
+    parser.add_argument('--db', default=DB_NAME)
+    parser.add_argument('--cache-dir', default=response_cache.CACHE_DIR)
+    parser.add_argument('--no-cache', action='store_true', help='Não lê nem grava o cache em disco')
+    parser.add_argument('--metrics-log', default=os.environ.get('NBA_METRICS_LOG', instrumentation.LOG_PATH),
+                        help='Log estruturado (JSON por linha) dos spans e contadores')
+    parser.add_argument('--metrics-port', type=int, default=os.environ.get('NBA_METRICS_PORT'),
+                        help='Expõe /metrics no formato do Prometheus durante a coleta')
+    parser.add_argument('--metrics-host', default=os.environ.get('NBA_METRICS_HOST'),
+                        help=f'Interface do /metrics (padrão: {instrumentation.METRICS_HOST}, só a máquina local)')
+    parser.add_argument('--profile-dir', default=os.environ.get('NBA_PROFILE_DIR'),
+                        help='Grava um perfil cProfile (.prof) do laço de carga')
+    args = parser.parse_args()
+    if args.offline and args.no_cache:
+        parser.error('--offline depende do cache em disco')
+    instrumentation.configure(args.metrics_log, args.metrics_port, args.profile_dir, args.metrics_host)
+    run_etl_pipeline(args.seasons, refresh_seasons=REFRESH_SEASONS, full_refresh=args.full_refresh, db_name=args.db,
+                     collectors=args.collectors, offline=args.offline,
+                     cache_dir=None if args.no_cache else args.cache_dir, play_by_play=args.play_by_play)
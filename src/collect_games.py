@@ -0,0 +1,82 @@
+import argparse
+import pandas as pd
+from nba_api.stats.endpoints import leaguegamelog
+from fetch_scheduler import send_stats_request
+import bulk_loader
+import instrumentation
+
+# --- CONFIGURAÇÃO ---
+# Defina as temporadas cujos jogos você quer completar
+SEASONS = ["2024-25", "2023-24", "2022-23"]
+# Catálogo de temporadas: cada temporada é gravada no seu próprio arquivo (src/season_store.py)
+DB_NAME = "nba_shots.sqlite"
+# Nome deste coletor nas métricas e no cache de respostas
+COLLECTOR = "games"
+
+def schedule_request(season):
+    """Endpoint leaguegamelog (uma linha por time em cada jogo da temporada), ainda sem requisição."""
+    return leaguegamelog.LeagueGameLog(
+        season=season,
+        season_type_all_star='Regular Season',
+        player_or_team_abbreviation='T',
+        get_request=False
+    )
+
+def fetch_schedule(season, cache=None, ttl=None):
+    """Busca o calendário de uma temporada: uma única requisição para todos os jogos.
+
+    Como nos demais coletores, o rate limit e as re-tentativas ficam com o
+    FetchScheduler do collect_data; com um ResponseCache, respostas com menos
+    de ttl segundos são lidas do disco.
+    """
+    schedule = schedule_request(season)
+    send_stats_request(schedule, cache=cache, ttl=ttl)
+
+    df_list = schedule.get_data_frames()
+    if df_list and len(df_list) > 0:
+        return df_list
+    return None
+
+def schedule_game_rows(df_log, season):
+    """Linhas de games (na ordem de bulk_loader.GAME_COLUMNS) a partir do leaguegamelog.
+
+    Cada jogo aparece uma vez por time; MATCHUP traz "vs." para o mandante e
+    "@" para o visitante. GAME_DATE (AAAA-MM-DD) é gravada como YYYYMMDD, o
+    formato das respostas de arremessos.
+    """
+    is_home = df_log['MATCHUP'].str.contains(' vs. ', regex=False)
+    home = df_log.loc[is_home].drop_duplicates('GAME_ID').set_index('GAME_ID')['TEAM_ID']
+    visitor = df_log.loc[~is_home].drop_duplicates('GAME_ID').set_index('GAME_ID')['TEAM_ID']
+    df_games = df_log.drop_duplicates('GAME_ID')
+    df_games = pd.DataFrame({
+        'id': df_games['GAME_ID'],
+        'game_date': pd.to_datetime(df_games['GAME_DATE']).dt.strftime('%Y%m%d'),
+        'season': season,
+        'home_team_id': df_games['GAME_ID'].map(home).astype('Int64'),
+        'visitor_team_id': df_games['GAME_ID'].map(visitor).astype('Int64'),
+    })
+    return bulk_loader.to_rows(df_games, bulk_loader.GAME_COLUMNS)
+
+def load_games(conn, game_rows, source):
+    """Grava jogos novos e completa os existentes em uma única transação.
+
+    Returns:
+        tuple: (jogos inseridos, jogos existentes atualizados)
+    """
+    with instrumentation.span('load', collector=COLLECTOR, source=source) as s, conn:
+        inserted, updated = bulk_loader.upsert_games(conn, game_rows)
+        bulk_loader.add_row_counts(conn, {'games': inserted})
+        s['rows'] = len(game_rows)
+    print(f"  -> {source}: {inserted} jogos novos, {updated} jogos completados ({len(game_rows)} lidos)")
+    return inserted, updated
+
+if __name__ == "__main__":
+    # Completa data, temporada e times dos jogos sem coletar arremessos
+    import collect_data
+    parser = argparse.ArgumentParser(description="Metadados de jogos (data, mandante, visitante) para o SQLite")
+    parser.add_argument('--seasons', nargs='+', default=SEASONS)
+    parser.add_argument('--offline', action='store_true', help='Só respostas do cache em disco, sem rede')
+    parser.add_argument('--db', default=DB_NAME)
+    args = parser.parse_args()
+    instrumentation.configure_from_env(instrumentation.LOG_PATH)
+    collect_data.run_game_metadata(args.seasons, db_name=args.db, offline=args.offline)
@@ -0,0 +1,116 @@
+import argparse
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+from nba_api.stats.endpoints import playbyplayv2
+from fetch_scheduler import send_stats_request
+import bulk_loader
+import instrumentation
+
+# --- CONFIGURAÇÃO ---
+# Defina as temporadas cujos jogos você quer coletar lance a lance
+SEASONS = ["2024-25", "2023-24", "2022-23"]
+# Catálogo de temporadas: cada temporada é gravada no seu próprio arquivo (src/season_store.py)
+DB_NAME = "nba_shots.sqlite"
+# Nome deste coletor nas métricas e no cache de respostas
+COLLECTOR = "play_by_play"
+
+# Colunas de game_events na ordem das tuplas carregadas
+EVENT_COLUMNS = ['game_id', 'event_number', 'event_message_type', 'home_description', 'visitor_description',
+                 'score_margin']
+INSERT_EVENT = (
+    f"INSERT INTO game_events ({', '.join(EVENT_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in EVENT_COLUMNS)})"
+)
+
+def clear_tables(conn):
+    """Limpa os eventos antes de uma recarga completa."""
+    print("\n=== LIMPANDO TABELAS PARA NOVA RODAGEM ===")
+    with conn:
+        deleted_count = conn.execute('DELETE FROM game_events').rowcount
+        conn.execute('DELETE FROM empty_play_by_play')
+    print(f"  -> Tabela 'game_events' limpa: {deleted_count} registros removidos")
+    print("=== LIMPEZA CONCLUÍDA ===\n")
+
+def pending_game_ids(conn):
+    """Jogos com arremessos, ainda sem eventos e cujo lance a lance não veio vazio, em ordem de game_id.
+
+    Os NOT EXISTS/EXISTS são buscas nos índices (game_id, event_number) e
+    (game_id, game_event_id) e na chave de empty_play_by_play: nenhuma tabela
+    de fatos é varrida.
+    """
+    rows = conn.execute('''
+        SELECT g.id FROM games g
+        WHERE EXISTS (SELECT 1 FROM game_shot_charts s WHERE s.game_id = g.id)
+          AND NOT EXISTS (SELECT 1 FROM game_events e WHERE e.game_id = g.id)
+          AND NOT EXISTS (SELECT 1 FROM empty_play_by_play p WHERE p.game_id = g.id)
+        ORDER BY g.id
+    ''').fetchall()
+    return [row[0] for row in rows]
+
+def mark_empty(conn, game_id):
+    """Registra um jogo cujo lance a lance veio vazio: pending_game_ids deixa de devolvê-lo."""
+    with conn:
+        conn.execute('INSERT OR REPLACE INTO empty_play_by_play (game_id, checked_at) VALUES (?, ?)',
+                     (game_id, datetime.now(timezone.utc).isoformat(timespec='seconds')))
+
+def play_by_play_request(game_id):
+    """Endpoint playbyplayv2 de um jogo, ainda sem requisição (get_request=False)."""
+    return playbyplayv2.PlayByPlayV2(game_id=game_id, get_request=False)
+
+def fetch_play_by_play(game_id, cache=None, ttl=None):
+    """Busca os eventos (lance a lance) de um jogo.
+
+    Como nos demais coletores, o rate limit e as re-tentativas ficam com o
+    FetchScheduler do collect_data; com um ResponseCache, respostas com menos
+    de ttl segundos são lidas do disco.
+    """
+    play_by_play = play_by_play_request(game_id)
+    send_stats_request(play_by_play, cache=cache, ttl=ttl)
+
+    df_list = play_by_play.get_data_frames()
+    if df_list and len(df_list) > 0:
+        return df_list
+    return None
+
+def running_score_margin(score_margin):
+    """Placar (mandante - visitante) depois de cada evento, a partir de SCOREMARGIN.
+
+    A API só preenche SCOREMARGIN nos eventos que mudam o placar ("TIE" no
+    empate); nos demais o placar anterior é repetido, começando em 0.
+    """
+    margin = pd.to_numeric(score_margin.replace('TIE', '0'), errors='coerce')
+    return margin.ffill().fillna(0).astype(np.int64)
+
+def load_game_events(conn, df_pbp, game_id):
+    """Transforma e carrega os eventos de um jogo, substituindo os anteriores em uma única transação."""
+    with instrumentation.span('transform', collector=COLLECTOR) as s:
+        # Eventos em ordem cronológica (a da resposta) para acumular o placar
+        df_events = pd.DataFrame({
+            'game_id': df_pbp['GAME_ID'].astype(str),
+            'event_number': df_pbp['EVENTNUM'],
+            'event_message_type': df_pbp['EVENTMSGTYPE'],
+            'home_description': df_pbp['HOMEDESCRIPTION'],
+            'visitor_description': df_pbp['VISITORDESCRIPTION'],
+            'score_margin': running_score_margin(df_pbp['SCOREMARGIN']),
+        }).drop_duplicates('event_number', keep='last')
+        rows = bulk_loader.to_rows(df_events, EVENT_COLUMNS)
+        s['rows'] = len(rows)
+
+    with instrumentation.span('load', collector=COLLECTOR) as s, conn:
+        conn.execute('DELETE FROM game_events WHERE game_id = ?', (game_id,))
+        conn.executemany(INSERT_EVENT, rows)
+        s['rows'] = len(rows)
+    return len(rows)
+
+if __name__ == "__main__":
+    # Coleta só o lance a lance dos jogos já carregados; src/collect_data.py --play-by-play faz o mesmo ao final
+    import collect_data
+    parser = argparse.ArgumentParser(description="Coleta lance a lance (game_events) da NBA API para o SQLite")
+    parser.add_argument('--seasons', nargs='+', default=SEASONS)
+    parser.add_argument('--offline', action='store_true', help='Só respostas do cache em disco, sem rede')
+    parser.add_argument('--db', default=DB_NAME)
+    args = parser.parse_args()
+    instrumentation.configure_from_env(instrumentation.LOG_PATH)
+    collect_data.run_play_by_play(args.seasons, db_name=args.db, offline=args.offline)
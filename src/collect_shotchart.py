@@ -1,17 +1,20 @@
-import time
+import argparse
 import pandas as pd
 from nba_api.stats.endpoints import shotchartdetail
-from nba_api.stats.static import teams, players
-import sqlite3
-import os
-import random
+from fetch_scheduler import send_stats_request
+import bulk_loader
+import instrumentation
+import static_index
 
 # --- CONFIGURAÇÃO ---
 # Defina as temporadas que você quer coletar
 SEASONS = ["2024-25", "2023-24", "2022-23"]
+# Catálogo de temporadas: cada temporada é gravada no seu próprio arquivo (src/season_store.py)
 DB_NAME = "nba_shots.sqlite"
-# Arquivo para marcar que o setup inicial foi feito e evitar recriação
-SETUP_DONE_FILE = "db_setup.done"
+# Temporadas re-coletadas mesmo se já concluídas no manifesto (ex: temporada em andamento)
+REFRESH_SEASONS = ["2024-25"]
+# Nome deste coletor na tabela etl_manifest
+COLLECTOR = "shotchart"
 
 def clear_tables(conn):
     """Limpa as tabelas antes de inserir novos dados para garantir dados apenas da rodagem atual."""
@@ -28,358 +31,209 @@ def clear_tables(conn):
             print(f"  -> Tabela '{table}' limpa: {deleted_count} registros removidos")
         except Exception as e:
             print(f"  -> Erro ao limpar tabela '{table}': {e}")
-    
-    print("=== LIMPEZA CONCLUÍDA ===\n")
 
-def setup_database():
-    """Cria o banco de dados e as tabelas se ainda não foram criados."""
-    if not os.path.exists(SETUP_DONE_FILE):
-        print("Executando o setup inicial do banco de dados...")
-        # Apaga o banco de dados antigo para garantir um estado limpo
-        if os.path.exists(DB_NAME):
-            os.remove(DB_NAME)
-            print(f"Banco de dados '{DB_NAME}' antigo removido.")
-            
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-        
-        # Criação das tabelas
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS teams (
-            id INTEGER PRIMARY KEY, team_name TEXT NOT NULL, team_abbreviation TEXT NOT NULL
-        );''')
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS players (
-            id INTEGER PRIMARY KEY, player_name TEXT
-        );''')
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS games (
-            id TEXT PRIMARY KEY, game_date TEXT NOT NULL
-        );''')
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS game_shot_charts (
-            id INTEGER PRIMARY KEY AUTOINCREMENT, game_id TEXT NOT NULL, game_event_id INTEGER,
-            player_id INTEGER NOT NULL, team_id INTEGER NOT NULL, period INTEGER,
-            minutes_remaining INTEGER, seconds_remaining INTEGER, shot_made_flag INTEGER NOT NULL,
-            loc_x INTEGER, loc_y INTEGER, shot_distance INTEGER, action_type TEXT, shot_type TEXT,
-            shot_zone_basic TEXT, shot_zone_area TEXT, shot_zone_range TEXT, season TEXT NOT NULL,
-            FOREIGN KEY (game_id) REFERENCES games (id),
-            FOREIGN KEY (player_id) REFERENCES players (id),
-            FOREIGN KEY (team_id) REFERENCES teams (id)
-        );''')
-        
-        conn.commit()
-        conn.close()
-        # Cria o arquivo marcador para não executar esta função novamente
-        with open(SETUP_DONE_FILE, 'w') as f:
-            f.write('done')
-        print(f"Banco de dados '{DB_NAME}' criado com sucesso.")
-    else:
-        print("Setup do banco de dados já foi realizado.")
+    # Contadores e jogadores sem nome voltam ao estado das tabelas vazias
+    with conn:
+        conn.execute('DELETE FROM orphan_players')
+    bulk_loader.recount(conn)
+
+    print("=== LIMPEZA CONCLUÍDA ===\n")
 
 def get_all_team_ids():
     """Busca os IDs de todos os times da NBA."""
-    nba_teams = teams.get_teams()
-    return {team['full_name']: team['id'] for team in nba_teams}
+    return static_index.team_ids_by_name()
 
-def fetch_shot_data_for_team(team_id, season, max_retries=3):
-    """Busca os dados de arremessos para um time em uma temporada."""
-    for attempt in range(max_retries):
-        try:
-            print(f"  -> Buscando dados de arremessos para o time {team_id}... (tentativa {attempt + 1}/{max_retries})")
-            
-            # Delay aleatório entre 1.5 e 3 segundos para evitar rate limiting
-            delay = random.uniform(1.5, 3.0)
-            time.sleep(delay)
-            
-            # O parâmetro season_nullable é a chave para filtrar por temporada [1]
-            shot_chart = shotchartdetail.ShotChartDetail(
-                team_id=team_id,
-                player_id=0,
-                context_measure_simple='FGA',
-                season_nullable=season,
-                season_type_all_star='Regular Season'
-            )
-            
-            df_list = shot_chart.get_data_frames()
-            if df_list and len(df_list) > 0:
-                print(f"  -> Dados obtidos com sucesso para o time {team_id}")
-                return df_list
-            else:
-                print(f"  -> Nenhum dado encontrado para o time {team_id}")
-                return None
-                
-        except Exception as e:
-            error_msg = str(e)
-            print(f"  -> Erro ao buscar dados para o time {team_id} (tentativa {attempt + 1}): {error_msg}")
-            
-            # Se for timeout, esperar mais tempo antes da próxima tentativa
-            if "timeout" in error_msg.lower() or "read timed out" in error_msg.lower():
-                wait_time = (attempt + 1) * 5  # Espera progressiva: 5s, 10s, 15s
-                print(f"  -> Timeout detectado. Aguardando {wait_time} segundos antes da próxima tentativa...")
-                time.sleep(wait_time)
-            else:
-                # Para outros erros, esperar um pouco menos
-                time.sleep(2)
-            
-            # Se for a última tentativa, retornar None
-            if attempt == max_retries - 1:
-                print(f"  -> Falha após {max_retries} tentativas para o time {team_id}")
-                return None
-    
+def shot_chart_request(team_id, season):
+    """Endpoint de arremessos de um time em uma temporada, ainda sem requisição (get_request=False)."""
+    # O parâmetro season_nullable é a chave para filtrar por temporada [1]
+    return shotchartdetail.ShotChartDetail(
+        team_id=team_id,
+        player_id=0,
+        context_measure_simple='FGA',
+        season_nullable=season,
+        season_type_all_star='Regular Season',
+        get_request=False
+    )
+
+def fetch_shot_data_for_team(team_id, season, cache=None, ttl=None):
+    """Busca os dados de arremessos para um time em uma temporada.
+
+    Não faz pausas nem re-tentativas: o FetchScheduler controla o rate limit e
+    re-tenta as falhas transitórias (RetryableFetchError). Com um ResponseCache,
+    respostas com menos de ttl segundos são lidas do disco.
+    """
+    shot_chart = shot_chart_request(team_id, season)
+    send_stats_request(shot_chart, cache=cache, ttl=ttl)
+
+    df_list = shot_chart.get_data_frames()
+    if df_list and len(df_list) > 0:
+        return df_list
     return None
 
+def _stage_static_players(conn):
+    """Copia {player_id: nome} do nba_api para uma tabela temporária da conexão (uma vez por conexão)."""
+    conn.execute('CREATE TEMP TABLE IF NOT EXISTS static_players (id INTEGER PRIMARY KEY, player_name TEXT NOT NULL)')
+    if conn.execute('SELECT 1 FROM temp.static_players LIMIT 1').fetchone() is None:
+        with conn:
+            conn.executemany('INSERT INTO temp.static_players (id, player_name) VALUES (?, ?)',
+                             static_index.player_names().items())
+
+@instrumentation.timed('fix_missing_data')
 def fix_missing_data(conn):
-    """Corrige dados faltantes nas tabelas players e games extraindo dados únicos de game_shot_charts."""
-    
+    """Corrige dados faltantes nas tabelas players e games a partir dos arremessos, inteiramente em SQL.
+
+    Só os arremessos carregados desde a última reconciliação (id acima da
+    marca d'água em integrity_state) são examinados, junto com os jogadores
+    ainda sem nome em orphan_players: o custo depende do que chegou, não do
+    histórico. Os inserts são INSERT ... SELECT ... WHERE NOT EXISTS contra a
+    lista estática de jogadores, em uma única transação, e os totais saem de
+    table_counts, mantida pelo bulk_loader durante a carga. Jogos sem linha em
+    games entram só com a temporada; a data e os times vêm depois da etapa de
+    metadados de jogos (src/collect_games.py).
+    """
     print("\n=== VERIFICANDO E CORRIGINDO DADOS FALTANTES ===")
-    
-    # 1. Corrigir tabela players
-    print("\n1. Verificando tabela players...")
-    
-    # Buscar todos os player_ids únicos dos shot charts
-    unique_player_ids = pd.read_sql_query('''
-        SELECT DISTINCT player_id 
-        FROM game_shot_charts 
-        ORDER BY player_id
-    ''', conn)
-    
-    print(f"Total de player_ids únicos nos shot charts: {len(unique_player_ids)}")
-    
-    # Verificar quais já existem na tabela players
-    existing_players = pd.read_sql_query('SELECT id FROM players', conn)
-    existing_player_ids = set(existing_players['id'].tolist())
-    
-    # Encontrar player_ids que não estão na tabela players
-    missing_player_ids = unique_player_ids[~unique_player_ids['player_id'].isin(existing_player_ids)]
-    
-    print(f"Player_ids faltando na tabela players: {len(missing_player_ids)}")
-    
-    if not missing_player_ids.empty:
-        # Buscar nomes dos jogadores da API
-        nba_players = players.get_players()
-        player_names = {p['id']: p['full_name'] for p in nba_players}
-        
-        # Criar DataFrame com os jogadores faltantes
-        missing_players_df = pd.DataFrame({
-            'id': missing_player_ids['player_id'],
-            'player_name': missing_player_ids['player_id'].map(player_names)
-        })
-        
-        # Remover jogadores sem nome (não encontrados na API)
-        missing_players_df = missing_players_df.dropna(subset=['player_name'])
-        
-        if not missing_players_df.empty:
-            # Inserir jogadores faltantes
-            missing_players_df.to_sql('players', conn, if_exists='append', index=False)
-            print(f"Inseridos {len(missing_players_df)} jogadores na tabela players")
-        else:
-            print("Nenhum jogador válido encontrado para inserir")
-    
-    # 2. Corrigir tabela games
-    print("\n2. Verificando tabela games...")
-    
-    # Buscar todos os game_ids únicos dos shot charts
-    unique_game_ids = pd.read_sql_query('''
-        SELECT DISTINCT game_id, MIN(game_event_id) as first_event
-        FROM game_shot_charts 
-        GROUP BY game_id
-        ORDER BY game_id
-    ''', conn)
-    
-    print(f"Total de game_ids únicos nos shot charts: {len(unique_game_ids)}")
-    
-    # Verificar quais já existem na tabela games
-    existing_games = pd.read_sql_query('SELECT id FROM games', conn)
-    existing_game_ids = set(existing_games['id'].tolist())
-    
-    # Encontrar game_ids que não estão na tabela games
-    missing_game_ids = unique_game_ids[~unique_game_ids['game_id'].isin(existing_game_ids)]
-    
-    print(f"Game_ids faltando na tabela games: {len(missing_game_ids)}")
-    
-    if not missing_game_ids.empty:
-        # Para games, vamos usar uma data padrão já que não temos a data real
-        # Você pode ajustar isso conforme necessário
-        missing_games_df = pd.DataFrame({
-            'id': missing_game_ids['game_id'],
-            'game_date': '20241101'  # Data padrão - você pode ajustar
-        })
-        
-        # Inserir games faltantes
-        missing_games_df.to_sql('games', conn, if_exists='append', index=False)
-        print(f"Inseridos {len(missing_games_df)} jogos na tabela games")
-    
-    # 3. Verificar resultados finais
-    print("\n3. Resultados finais...")
-    
-    final_counts = {}
+    _stage_static_players(conn)
+
+    with conn:
+        watermark = conn.execute("SELECT value FROM integrity_state WHERE name = 'shots_watermark'").fetchone()[0]
+        high_watermark = conn.execute('SELECT MAX(id) FROM game_shot_charts').fetchone()[0] or 0
+        print(f"Arremessos novos desde a última reconciliação: {max(high_watermark - watermark, 0)} ids")
+
+        # 1. Jogadores dos arremessos novos e os que ainda estavam sem nome
+        conn.execute('DROP TABLE IF EXISTS temp.new_shot_players')
+        conn.execute("""
+            CREATE TEMP TABLE new_shot_players AS
+            SELECT player_id FROM game_shot_charts WHERE id > ? AND id <= ?
+            UNION SELECT player_id FROM orphan_players
+        """, (watermark, high_watermark))
+        inserted_players = conn.execute("""
+            INSERT INTO players (id, player_name)
+            SELECT n.player_id, s.player_name
+            FROM temp.new_shot_players n JOIN temp.static_players s ON s.id = n.player_id
+            WHERE NOT EXISTS (SELECT 1 FROM players p WHERE p.id = n.player_id)
+        """).rowcount
+        conn.execute('DELETE FROM orphan_players')
+        conn.execute("""
+            INSERT INTO orphan_players (player_id)
+            SELECT n.player_id FROM temp.new_shot_players n
+            WHERE NOT EXISTS (SELECT 1 FROM players p WHERE p.id = n.player_id)
+        """)
+        conn.execute('DROP TABLE temp.new_shot_players')
+
+        # 2. Jogos dos arremessos novos, sem data até a etapa de metadados de jogos
+        inserted_games = conn.execute("""
+            INSERT INTO games (id, season)
+            SELECT s.game_id, MIN(s.season) FROM game_shot_charts s
+            WHERE s.id > ? AND s.id <= ?
+              AND NOT EXISTS (SELECT 1 FROM games g WHERE g.id = s.game_id)
+            GROUP BY s.game_id
+        """, (watermark, high_watermark)).rowcount
+
+        bulk_loader.add_row_counts(conn, {'players': inserted_players, 'games': inserted_games})
+        conn.execute("UPDATE integrity_state SET value = ? WHERE name = 'shots_watermark'", (high_watermark,))
+
+    print(f"Inseridos {inserted_players} jogadores na tabela players")
+    print(f"Inseridos {inserted_games} jogos na tabela games")
+
+    # 3. Totais dos contadores mantidos durante a carga, sem varrer as tabelas
+    print("\nResultados finais...")
+    final_counts = bulk_loader.row_counts(conn)
     for table in ['teams', 'players', 'games', 'game_shot_charts']:
-        count = pd.read_sql_query(f'SELECT COUNT(*) as count FROM {table}', conn)
-        final_counts[table] = count.iloc[0,0]
-        print(f"{table}: {final_counts[table]} linhas")
-    
-    # Verificar se ainda há dados faltantes
-    missing_players_final = pd.read_sql_query('''
-        SELECT COUNT(DISTINCT gsc.player_id) as missing_players
-        FROM game_shot_charts gsc
-        LEFT JOIN players p ON gsc.player_id = p.id
-        WHERE p.id IS NULL
-    ''', conn)
-    
-    missing_games_final = pd.read_sql_query('''
-        SELECT COUNT(DISTINCT gsc.game_id) as missing_games
-        FROM game_shot_charts gsc
-        LEFT JOIN games g ON gsc.game_id = g.id
-        WHERE g.id IS NULL
-    ''', conn)
-    
+        print(f"{table}: {final_counts.get(table, 0)} linhas")
+
+    missing_players = conn.execute('SELECT COUNT(*) FROM orphan_players').fetchone()[0]
+    pending_games = bulk_loader.pending_game_count(conn)
     print(f"\nDados ainda faltando:")
-    print(f"Players: {missing_players_final.iloc[0,0]}")
-    print(f"Games: {missing_games_final.iloc[0,0]}")
-    
+    print(f"Players: {missing_players} (sem nome no nba_api)")
+    print(f"Games: {pending_games} (sem data ou sem mandante/visitante)")
+
     print("\n=== VERIFICAÇÃO CONCLUÍDA ===")
+    return {'players': inserted_players, 'games': inserted_games, 'missing_players': missing_players,
+            'pending_games': pending_games}
 
-def run_etl_pipeline(seasons_list):
-    """Executa o pipeline completo de ETL para uma lista de temporadas."""
-    setup_database()
-    conn = sqlite3.connect(DB_NAME)
-    
-    # Limpar tabelas antes de inserir novos dados
-    clear_tables(conn)
-    
-    all_teams = get_all_team_ids()
-    print(f"Iniciando coleta de dados para {len(all_teams)} times em {len(seasons_list)} temporadas...")
-
-    # Contadores para estatísticas
-    successful_teams = 0
-    failed_teams = 0
-
-    for season in seasons_list:
-        print(f"\n================ PROCESSANDO TEMPORADA: {season} ================")
-        for i, (team_name, team_id) in enumerate(all_teams.items(), 1):
-            print(f"Processando time {i}/{len(all_teams)}: {team_name} (ID: {team_id})")
-            
-            df_shots = fetch_shot_data_for_team(team_id, season)
-            
-            # Check if df_shots is a list and extract the first DataFrame
-            if isinstance(df_shots, list) and len(df_shots) > 0:
-                df_shots = df_shots[0]
-            elif not isinstance(df_shots, pd.DataFrame):
-                print(f"  -> Nenhum dado de arremesso encontrado para {team_name} na temporada {season}.")
-                failed_teams += 1
-                continue
-            
-            if df_shots.empty:
-                print(f"  -> Nenhum dado de arremesso encontrado para {team_name} na temporada {season}.")
-                failed_teams += 1
-                continue
-
-            # --- Transform and Load ---
-            
-            try:
-                # Ensure df_shots is a DataFrame
-                if not isinstance(df_shots, pd.DataFrame):
-                    print(f"  -> Dados inválidos para {team_name}")
-                    failed_teams += 1
-                    continue
-                
-                # 1. Popular tabela 'teams'
-                df_teams = df_shots.loc[:, ['TEAM_ID']].drop_duplicates()
-                df_teams.columns = ['id']
-                team_info = [t for t in teams.get_teams() if t['id'] == team_id]
-                if team_info:
-                    df_teams['team_name'] = team_info[0]['full_name']
-                    df_teams['team_abbreviation'] = team_info[0]['abbreviation']
-                    try:
-                        df_teams.to_sql('teams', conn, if_exists='append', index=False)
-                        print(f"  -> Time {team_name} inserido na tabela teams")
-                    except sqlite3.IntegrityError:
-                        # Skip duplicate teams
-                        print(f"  -> Time {team_name} já existe na tabela teams")
-
-                # 2. Popular tabela 'players'
-                df_players = df_shots.loc[:, ['PLAYER_ID']].drop_duplicates()
-                df_players.columns = ['id']
-                
-                # Buscar nomes dos jogadores da API
-                nba_players = players.get_players()
-                player_names = {p['id']: p['full_name'] for p in nba_players}
-                
-                # Adicionar nomes dos jogadores
-                df_players['player_name'] = df_players['id'].map(player_names)
-                
-                # Remover linhas onde player_name é NaN (jogadores não encontrados)
-                df_players = df_players.dropna(subset=['player_name'])
-                
-                if not df_players.empty:
-                    try:
-                        df_players.to_sql('players', conn, if_exists='append', index=False)
-                        print(f"  -> {len(df_players)} jogadores inseridos na tabela players")
-                    except sqlite3.IntegrityError:
-                        # Skip duplicate players
-                        print(f"  -> Jogadores já existem na tabela players")
-                else:
-                    print(f"  -> Nenhum jogador válido encontrado para {team_name}")
-
-                # 3. Popular tabela 'games'
-                df_games = df_shots.loc[:, ['GAME_ID', 'GAME_DATE']].drop_duplicates()
-                df_games.columns = ['id', 'game_date']
-                
-                if not df_games.empty:
-                    try:
-                        df_games.to_sql('games', conn, if_exists='append', index=False)
-                        print(f"  -> {len(df_games)} jogos inseridos na tabela games")
-                    except sqlite3.IntegrityError:
-                        # Skip duplicate games
-                        print(f"  -> Jogos já existem na tabela games")
-                else:
-                    print(f"  -> Nenhum jogo encontrado para {team_name}")
-
-                # 4. Popular tabela 'game_shot_charts'
-                column_mapping = {
-                    'GAME_ID': 'game_id', 'GAME_EVENT_ID': 'game_event_id', 'PLAYER_ID': 'player_id',
-                    'TEAM_ID': 'team_id', 'PERIOD': 'period', 'MINUTES_REMAINING': 'minutes_remaining',
-                    'SECONDS_REMAINING': 'seconds_remaining', 'SHOT_MADE_FLAG': 'shot_made_flag',
-                    'LOC_X': 'loc_x', 'LOC_Y': 'loc_y', 'SHOT_DISTANCE': 'shot_distance',
-                    'ACTION_TYPE': 'action_type', 'SHOT_TYPE': 'shot_type',
-                    'SHOT_ZONE_BASIC': 'shot_zone_basic', 'SHOT_ZONE_AREA': 'shot_zone_area',
-                    'SHOT_ZONE_RANGE': 'shot_zone_range'
-                }
-                
-                # Use a more compatible approach for column selection
-                df_shots_renamed = pd.DataFrame(df_shots).copy()
-                df_shots_renamed = df_shots_renamed.rename(columns=column_mapping)
-                
-                # Select only the columns that exist in the DataFrame
-                available_columns = [col for col in column_mapping.values() if col in df_shots_renamed.columns]
-                df_final_shots = df_shots_renamed.loc[:, available_columns]
-                
-                # Adicionar a coluna 'season'
-                df_final_shots['season'] = season
-                
-                df_final_shots.to_sql('game_shot_charts', conn, if_exists='append', index=False)
-                
-                print(f"  -> {len(df_shots)} arremessos de {team_name} processados e salvos.")
-                successful_teams += 1
-                
-            except Exception as e:
-                print(f"  -> Erro ao processar dados para {team_name}: {e}")
-                failed_teams += 1
-            
-            # Pausa a cada 5 times para dar um respiro na API
-            if i % 5 == 0:
-                print(f"  -> Pausa de 10 segundos após processar {i} times...")
-                time.sleep(10)
-
-    # Corrigir dados faltantes automaticamente
-    fix_missing_data(conn)
-    
-    print(f"\nPipeline de ETL concluído!")
-    print(f"Times processados com sucesso: {successful_teams}")
-    print(f"Times com falha: {failed_teams}")
-    print(f"Taxa de sucesso: {successful_teams/(successful_teams+failed_teams)*100:.1f}%")
-    conn.close()
+# Mapeamento das colunas da API para as colunas de game_shot_charts
+SHOT_COLUMN_MAPPING = {
+    'GAME_ID': 'game_id', 'GAME_EVENT_ID': 'game_event_id', 'PLAYER_ID': 'player_id',
+    'TEAM_ID': 'team_id', 'PERIOD': 'period', 'MINUTES_REMAINING': 'minutes_remaining',
+    'SECONDS_REMAINING': 'seconds_remaining', 'SHOT_MADE_FLAG': 'shot_made_flag',
+    'LOC_X': 'loc_x', 'LOC_Y': 'loc_y', 'SHOT_DISTANCE': 'shot_distance',
+    'ACTION_TYPE': 'action_type', 'SHOT_TYPE': 'shot_type',
+    'SHOT_ZONE_BASIC': 'shot_zone_basic', 'SHOT_ZONE_AREA': 'shot_zone_area',
+    'SHOT_ZONE_RANGE': 'shot_zone_range'
+}
+
+def shot_game_rows(df_shots, season):
+    """Linhas de games (na ordem de bulk_loader.GAME_COLUMNS) a partir de uma resposta de arremessos.
+
+    GAME_DATE já vem como YYYYMMDD; HTM/VTM são as abreviações do mandante e do
+    visitante (NULL se desconhecidas no nba_api).
+    """
+    df_games = df_shots.drop_duplicates('GAME_ID')
+    df_games = pd.DataFrame({
+        'id': df_games['GAME_ID'],
+        'game_date': df_games['GAME_DATE'].astype(str),
+        'season': season,
+        'home_team_id': static_index.map_team_ids(df_games['HTM']) if 'HTM' in df_games else None,
+        'visitor_team_id': static_index.map_team_ids(df_games['VTM']) if 'VTM' in df_games else None,
+    })
+    return bulk_loader.to_rows(df_games, bulk_loader.GAME_COLUMNS)
+
+def clear_partition(conn, season, team_id):
+    """Remove os arremessos de um time em uma temporada (resposta vazia da API), na transação do chamador."""
+    return bulk_loader.delete_partition(conn, season, team_id)
+
+def load_team_shots(conn, df_shots, team_id, team_name, season, replace=True):
+    """Transforma e carrega no SQLite os arremessos de um time em uma temporada.
+
+    Todas as tabelas são gravadas pelo bulk_loader em uma única transação:
+    teams/players com INSERT OR IGNORE, games com a data e os times reais
+    (completando jogos que o fix_missing_data inseriu sem data) e a partição
+    de arremessos substituída no lugar.
+    """
+    with instrumentation.span('transform', collector=COLLECTOR) as s:
+        # 1. Linhas da tabela 'teams'
+        team_rows = []
+        team_info = static_index.team_info(team_id)
+        if team_info:
+            team_rows = [(int(tid), team_info[0], team_info[1]) for tid in df_shots['TEAM_ID'].unique()]
+
+        # 2. Linhas da tabela 'players'
+        df_players = df_shots.loc[:, ['PLAYER_ID']].drop_duplicates()
+        df_players.columns = ['id']
+
+        # Adicionar nomes dos jogadores (índice estático construído uma vez por processo)
+        df_players['player_name'] = static_index.map_player_names(df_players['id'])
+
+        # Remover linhas onde player_name é NaN (jogadores não encontrados)
+        df_players = df_players.dropna(subset=['player_name'])
+        player_rows = bulk_loader.to_rows(df_players, ['id', 'player_name'])
+
+        # 3. Linhas da tabela 'games' (data e times reais de cada jogo)
+        game_rows = shot_game_rows(df_shots, season)
+
+        # 4. Linhas da tabela 'game_shot_charts' (colunas ausentes na resposta viram NULL)
+        df_final_shots = df_shots.rename(columns=SHOT_COLUMN_MAPPING)
+        df_final_shots = df_final_shots.assign(season=season).reindex(columns=bulk_loader.SHOT_COLUMNS)
+        shot_rows = bulk_loader.to_rows(df_final_shots, bulk_loader.SHOT_COLUMNS)
+        s['rows'] = len(shot_rows)
+
+    with instrumentation.span('load', collector=COLLECTOR) as s:
+        inserted = bulk_loader.load_partition(conn, season, team_id, shot_rows, team_rows, player_rows, game_rows,
+                                              replace=replace)
+        s['rows'] = len(shot_rows)
+    print(f"  -> Novos registros: {inserted['teams']} times, {inserted['players']} jogadores, "
+          f"{inserted['games']} jogos")
+    print(f"  -> {len(df_shots)} arremessos de {team_name} processados e salvos.")
 
 if __name__ == "__main__":
-    run_etl_pipeline(SEASONS)
\ No newline at end of file
+    # Coleta só os arremessos; src/collect_data.py coleta arremessos e elencos na mesma passada
+    import collect_data
+    parser = argparse.ArgumentParser(description="Coleta de arremessos da NBA API para o SQLite")
+    parser.add_argument('--seasons', nargs='+', default=SEASONS)
+    parser.add_argument('--full-refresh', action='store_true')
+    parser.add_argument('--offline', action='store_true', help='Só respostas do cache em disco, sem rede')
+    parser.add_argument('--db', default=DB_NAME)
+    args = parser.parse_args()
+    instrumentation.configure_from_env(instrumentation.LOG_PATH)
+    collect_data.run_etl_pipeline(args.seasons, refresh_seasons=REFRESH_SEASONS, full_refresh=args.full_refresh,
+                                  db_name=args.db, collectors=[COLLECTOR], offline=args.offline)
@@ -0,0 +1,102 @@
+import hashlib
+from datetime import datetime, timezone
+
+import pandas as pd
+
+# Status possíveis de uma unidade (collector, season, team_id) no manifesto
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+# Hash de uma resposta válida e vazia (o mesmo de content_hash sobre um DataFrame vazio)
+EMPTY_CONTENT_HASH = hashlib.sha1(b'').hexdigest()
+
+
+def ensure_manifest_table(conn):
+    """Cria a tabela de manifesto do ETL se ela ainda não existir."""
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS etl_manifest (
+        collector TEXT NOT NULL,
+        season TEXT NOT NULL,
+        team_id INTEGER NOT NULL,
+        status TEXT NOT NULL,
+        row_count INTEGER,
+        content_hash TEXT,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        error TEXT,
+        updated_at TEXT NOT NULL,
+        PRIMARY KEY (collector, season, team_id)
+    );''')
+    conn.commit()
+
+
+def reset_manifest(conn, collector):
+    """Remove todas as entradas de um coletor (usado em uma recarga completa)."""
+    conn.execute('DELETE FROM etl_manifest WHERE collector = ?', (collector,))
+    conn.commit()
+
+
+def content_hash(df):
+    """Hash estável do conteúdo de um DataFrame, independente da ordem das linhas."""
+    row_hashes = pd.util.hash_pandas_object(df, index=False).sort_values()
+    return hashlib.sha1(row_hashes.values.tobytes()).hexdigest()
+
+
+def get_manifest(conn, collector):
+    """Retorna {(season, team_id): (status, content_hash)} para um coletor."""
+    cursor = conn.execute(
+        'SELECT season, team_id, status, content_hash FROM etl_manifest WHERE collector = ?',
+        (collector,)
+    )
+    return {(season, team_id): (status, digest) for season, team_id, status, digest in cursor}
+
+
+def pending_units(conn, collector, units, refresh_seasons=()):
+    """Filtra as unidades (season, team_id) que ainda precisam ser coletadas.
+
+    Unidades concluídas são puladas, exceto as das temporadas em refresh_seasons
+    (ex: a temporada atual, re-coletada toda noite).
+    """
+    manifest = get_manifest(conn, collector)
+    return [
+        unit for unit in units
+        if unit[0] in refresh_seasons or manifest.get(unit, (None, None))[0] != STATUS_DONE
+    ]
+
+
+def is_unchanged(conn, collector, season, team_id, digest):
+    """Indica se a partição já foi carregada com exatamente o mesmo conteúdo."""
+    row = conn.execute(
+        'SELECT status, content_hash FROM etl_manifest WHERE collector = ? AND season = ? AND team_id = ?',
+        (collector, season, team_id)
+    ).fetchone()
+    return row is not None and row[0] == STATUS_DONE and row[1] == digest
+
+
+def _upsert(conn, collector, season, team_id, status, row_count, digest, error, commit=True):
+    conn.execute('''
+        INSERT INTO etl_manifest (collector, season, team_id, status, row_count, content_hash, attempts, error, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, 1, ?, ?)
+        ON CONFLICT (collector, season, team_id) DO UPDATE SET
+            status = excluded.status,
+            row_count = COALESCE(excluded.row_count, etl_manifest.row_count),
+            content_hash = COALESCE(excluded.content_hash, etl_manifest.content_hash),
+            attempts = etl_manifest.attempts + 1,
+            error = excluded.error,
+            updated_at = excluded.updated_at
+    ''', (collector, season, team_id, status, row_count, digest, error,
+          datetime.now(timezone.utc).isoformat(timespec='seconds')))
+    if commit:
+        conn.commit()
+
+
+def mark_done(conn, collector, season, team_id, row_count, digest, commit=True):
+    """Registra a partição como carregada com sucesso.
+
+    Com commit=False, o registro entra na transação aberta pelo chamador (por
+    exemplo, junto com o DELETE da partição de uma resposta vazia).
+    """
+    _upsert(conn, collector, season, team_id, STATUS_DONE, row_count, digest, None, commit)
+
+
+def mark_failed(conn, collector, season, team_id, error):
+    """Registra a falha para que a unidade seja re-tentada na próxima rodagem."""
+    _upsert(conn, collector, season, team_id, STATUS_FAILED, None, None, str(error))
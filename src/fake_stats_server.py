@@ -0,0 +1,191 @@
+"""Servidor HTTP falso que imita os endpoints da stats.nba.com usados pelos coletores.
+
+Permite exercitar o FetchScheduler localmente, com latência e erros injetados:
+
+    python src/fake_stats_server.py --port 8765 --delay 0.5 --error-rate 0.2
+    NBA_STATS_BASE_URL=http://127.0.0.1:8765/stats/{endpoint} python src/collect_data.py
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from nba_api.stats.static import teams
+
+SHOT_HEADERS = [
+    'GRID_TYPE', 'GAME_ID', 'GAME_EVENT_ID', 'PLAYER_ID', 'PLAYER_NAME', 'TEAM_ID', 'TEAM_NAME',
+    'PERIOD', 'MINUTES_REMAINING', 'SECONDS_REMAINING', 'EVENT_TYPE', 'ACTION_TYPE', 'SHOT_TYPE',
+    'SHOT_ZONE_BASIC', 'SHOT_ZONE_AREA', 'SHOT_ZONE_RANGE', 'SHOT_DISTANCE', 'LOC_X', 'LOC_Y',
+    'SHOT_ATTEMPTED_FLAG', 'SHOT_MADE_FLAG', 'GAME_DATE', 'HTM', 'VTM'
+]
+ROSTER_HEADERS = ['TeamID', 'SEASON', 'LeagueID', 'PLAYER', 'PLAYER_ID', 'POSITION']
+PLAY_BY_PLAY_HEADERS = ['GAME_ID', 'EVENTNUM', 'EVENTMSGTYPE', 'EVENTMSGACTIONTYPE', 'PERIOD', 'PCTIMESTRING',
+                        'HOMEDESCRIPTION', 'VISITORDESCRIPTION', 'SCORE', 'SCOREMARGIN']
+# Eventos por jogo falso: cobrem os GAME_EVENT_ID de todos os arremessos
+N_EVENTS = 400
+GAME_LOG_HEADERS = ['SEASON_ID', 'TEAM_ID', 'TEAM_ABBREVIATION', 'TEAM_NAME', 'GAME_ID', 'GAME_DATE', 'MATCHUP']
+# Jogos por temporada: todos os times "jogam" os mesmos jogos, cada um com mandante e visitante fixos
+N_GAMES = 5
+TEAMS = sorted(teams.get_teams(), key=lambda team: team['id'])
+
+
+def _game(season, game_number):
+    """(game_id, data YYYYMMDD, mandante, visitante) de um jogo falso."""
+    year = int(season[:4])
+    home, visitor = TEAMS[2 * game_number], TEAMS[2 * game_number + 1]
+    return f"002{year % 100:02d}{game_number:05d}", f"{year}11{game_number % 28 + 1:02d}", home, visitor
+
+
+def _shot_rows(team_id, season, n_shots):
+    rng = random.Random(f"{team_id}-{season}")
+    rows = []
+    for i in range(n_shots):
+        game_id, game_date, home, visitor = _game(season, min(i // 90, N_GAMES - 1))
+        made = rng.random() < 0.46
+        rows.append([
+            'Shot Chart Detail', game_id, i, 1_000_000 + rng.randint(0, 14),
+            'Player', team_id, 'Team', rng.randint(1, 4), rng.randint(0, 11), rng.randint(0, 59),
+            'Made Shot' if made else 'Missed Shot', 'Jump Shot', '2PT Field Goal', 'Mid-Range',
+            'Center(C)', '8-16 ft.', rng.randint(0, 30), rng.randint(-250, 250), rng.randint(-47, 400),
+            1, int(made), game_date, home['abbreviation'], visitor['abbreviation']
+        ])
+    return rows
+
+
+def _play_by_play_rows(game_id):
+    rng = random.Random(game_id)
+    home_score = visitor_score = 0
+    rows = []
+    for event_number in range(N_EVENTS):
+        period = min(event_number * 4 // N_EVENTS + 1, 4)
+        clock = 720 - (event_number * 4 * 720 // N_EVENTS) % 720
+        score = margin = None
+        if rng.random() < 0.4:
+            points = rng.choice([2, 2, 3, 1])
+            if rng.random() < 0.5:
+                home_score += points
+            else:
+                visitor_score += points
+            score = f"{visitor_score} - {home_score}"
+            margin = 'TIE' if home_score == visitor_score else str(home_score - visitor_score)
+        rows.append([game_id, event_number, 1 if score else 2, 1, period, f"{clock // 60}:{clock % 60:02d}",
+                     'Home play' if rng.random() < 0.5 else None, 'Visitor play', score, margin])
+    return rows
+
+
+def _game_log_rows(season):
+    rows = []
+    for game_number in range(N_GAMES):
+        game_id, game_date, home, visitor = _game(season, game_number)
+        iso_date = f"{game_date[:4]}-{game_date[4:6]}-{game_date[6:]}"
+        for team, matchup in [(home, f"{home['abbreviation']} vs. {visitor['abbreviation']}"),
+                              (visitor, f"{visitor['abbreviation']} @ {home['abbreviation']}")]:
+            rows.append([f"2{season[:4]}", team['id'], team['abbreviation'], team['full_name'], game_id,
+                         iso_date, matchup])
+    return rows
+
+
+def _payload(endpoint, params):
+    team_id = int(params.get('TeamID', ['0'])[0])
+    season = params.get('Season', ['2024-25'])[0] or '2024-25'
+    if endpoint == 'shotchartdetail':
+        result_sets = [
+            {'name': 'Shot_Chart_Detail', 'headers': SHOT_HEADERS, 'rowSet': _shot_rows(team_id, season, 400)},
+            {'name': 'LeagueAverages', 'headers': ['GRID_TYPE'], 'rowSet': []},
+        ]
+    elif endpoint == 'commonteamroster':
+        rows = [[team_id, season[:4], '00', f"Player {i}", 1_000_000 + i, 'G'] for i in range(15)]
+        result_sets = [
+            {'name': 'CommonTeamRoster', 'headers': ROSTER_HEADERS, 'rowSet': rows},
+            {'name': 'Coaches', 'headers': ['COACH_ID'], 'rowSet': []},
+        ]
+    elif endpoint == 'playbyplayv2':
+        game_id = params.get('GameID', [''])[0]
+        result_sets = [
+            {'name': 'PlayByPlay', 'headers': PLAY_BY_PLAY_HEADERS, 'rowSet': _play_by_play_rows(game_id)},
+            {'name': 'AvailableVideo', 'headers': ['VIDEO_AVAILABLE_FLAG'], 'rowSet': [[0]]},
+        ]
+    elif endpoint == 'leaguegamelog':
+        result_sets = [{'name': 'LeagueGameLog', 'headers': GAME_LOG_HEADERS, 'rowSet': _game_log_rows(season)}]
+    else:
+        return None
+    return {'resource': endpoint, 'parameters': {k: v[0] for k, v in params.items()}, 'resultSets': result_sets}
+
+
+def make_handler(delay=0.0, error_rate=0.0, retry_after=1, stats=None):
+    """Handler HTTP/1.1 (keep-alive); stats, se informado, conta conexões e requisições."""
+    class FakeStatsHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def setup(self):
+            super().setup()
+            if stats is not None:
+                stats['connections'] += 1
+
+        def do_GET(self):
+            if stats is not None:
+                stats['requests'] += 1
+            url = urlparse(self.path)
+            endpoint = url.path.rstrip('/').split('/')[-1].lower()
+            time.sleep(random.uniform(0, 2 * delay))
+
+            if random.random() < error_rate:
+                if random.random() < 0.5:
+                    self.send_response(429)
+                    self.send_header('Retry-After', str(retry_after))
+                else:
+                    self.send_response(503)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+
+            payload = _payload(endpoint, parse_qs(url.query, keep_blank_values=True))
+            if payload is None:
+                self.send_response(404)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return FakeStatsHandler
+
+
+def start_server(port=0, delay=0.0, error_rate=0.0, retry_after=1):
+    """Sobe o servidor em uma thread daemon e retorna (server, base_url).
+
+    server.stats conta as conexões TCP abertas e as requisições atendidas.
+    """
+    stats = {'connections': 0, 'requests': 0}
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(delay, error_rate, retry_after, stats))
+    server.stats = stats
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/stats/{{endpoint}}"
+    return server, base_url
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--delay', type=float, default=0.5, help='Latência média por requisição (s)')
+    parser.add_argument('--error-rate', type=float, default=0.1, help='Fração de respostas 429/503')
+    args = parser.parse_args()
+
+    server, base_url = start_server(args.port, args.delay, args.error_rate)
+    print(f"Servidor falso ouvindo em {base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,337 @@
+"""Engenharia de features dos arremessos, em expressões vetorizadas do NumPy.
+
+Reproduz o pipeline do notebook 02_engenharia_features (tempo restante, ângulo,
+one-hot com drop_first e normalização pelo máximo) sem DataFrame.apply, para
+que notebooks, dashboard e treinamento usem exatamente as mesmas features.
+"""
+import hashlib
+import json
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+
+# Features selecionadas para o modelo (ordem do notebook)
+FEATURES_TO_USE = [
+    'game_id', 'player_id', 'team_id', 'loc_x', 'loc_y', 'shot_distance', 'action_type',
+    'shot_type', 'shot_zone_basic', 'shot_zone_area', 'shot_zone_range',
+    'time_remaining_in_game', 'shot_angle'
+]
+TARGET = 'shot_made_flag'
+CATEGORICAL_FEATURES = ['action_type', 'shot_type', 'shot_zone_basic', 'shot_zone_area', 'shot_zone_range']
+# Colunas numéricas escaladas para [-1, 1] dividindo pelo máximo absoluto
+NORMALIZED_FEATURES = ['loc_x', 'loc_y', 'shot_distance', 'time_remaining_in_game', 'shot_angle']
+# Identificadores mantidos em X_encoded e removidos antes do treino
+ID_COLUMNS = ['game_id', 'player_id', 'team_id']
+
+# Transformador ajustado, salvo na mesma pasta do modelo (models/)
+TRANSFORMER_FILENAME = 'feature_transformer.joblib'
+
+REGULATION_SECONDS = 48 * 60
+PERIOD_SECONDS = 12 * 60
+OVERTIME_SECONDS = 5 * 60
+
+# Contexto do jogo a partir do lance a lance (game_events), fora do modelo atual
+GAME_CONTEXT_FEATURES = ['score_margin', 'is_trailing', 'is_clutch']
+# Definição de "clutch" da NBA: últimos 5 minutos do 4º período ou prorrogação, diferença de até 5 pontos
+CLUTCH_SECONDS = 5 * 60
+CLUTCH_MARGIN = 5
+THREE_POINT_SHOT_TYPE = '3PT Field Goal'
+# Espaço de event_number dentro da chave inteira (game_id, event_number)
+EVENT_KEY_SPAN = 1 << 16
+
+
+def time_remaining_in_game(period, minutes_remaining, seconds_remaining):
+    """Segundos restantes no tempo regulamentar; negativo durante prorrogações.
+
+    Cada prorrogação (período > 4) dura 5 minutos e conta para baixo a partir de 0.
+    """
+    period = np.asarray(period, dtype=np.int64)
+    clock = np.asarray(minutes_remaining, dtype=np.int64) * 60 + np.asarray(seconds_remaining, dtype=np.int64)
+    regulation = REGULATION_SECONDS - ((period - 1) * PERIOD_SECONDS + (PERIOD_SECONDS - clock))
+    overtime = -((period - 5) * OVERTIME_SECONDS + (OVERTIME_SECONDS - clock))
+    return np.where(period > 4, overtime, regulation)
+
+
+def shot_angle(loc_x, loc_y):
+    """Ângulo do arremesso em graus, com 90 graus correspondendo à frente da cesta."""
+    return np.rad2deg(np.arctan2(np.asarray(loc_x, dtype=np.float64), np.asarray(loc_y, dtype=np.float64))) + 90
+
+
+def add_engineered_features(df):
+    """Adiciona time_remaining_in_game e shot_angle a uma cópia de df."""
+    df = df.copy()
+    df['time_remaining_in_game'] = time_remaining_in_game(
+        df['period'].to_numpy(), df['minutes_remaining'].to_numpy(), df['seconds_remaining'].to_numpy())
+    df['shot_angle'] = shot_angle(df['loc_x'].to_numpy(), df['loc_y'].to_numpy())
+    return df
+
+
+def event_keys(game_ids, event_numbers):
+    """Chave inteira (game_id, event_number) que preserva a ordem do índice de game_events.
+
+    Cada game_id distinto é convertido para número uma única vez (centenas de
+    jogos contra milhões de eventos) e expandido pelos códigos do factorize.
+    """
+    codes, unique_ids = pd.factorize(np.asarray(game_ids))
+    game_codes = pd.to_numeric(pd.Series(unique_ids)).to_numpy(dtype=np.int64)[codes]
+    return game_codes * EVENT_KEY_SPAN + np.asarray(event_numbers, dtype=np.int64)
+
+
+def game_context(shots, events, games):
+    """Placar e momento do jogo de cada arremesso, por uma junção ordenada em vez de buscas por linha.
+
+    Os eventos chegam ordenados por (game_id, event_number), como no índice
+    UNIQUE de game_events; cada arremesso é localizado pelo seu evento
+    (game_event_id) com um único np.searchsorted sobre as chaves inteiras.
+    score_margin de game_events é o placar mandante - visitante depois do
+    evento: a vantagem do time do arremesso antes dele desconta os pontos do
+    próprio arremesso e troca de sinal para o visitante.
+
+    Args:
+        shots (pd.DataFrame): game_id, game_event_id, team_id, period,
+            minutes_remaining, seconds_remaining, shot_made_flag, shot_type
+        events (pd.DataFrame): game_id, event_number, score_margin
+        games (pd.DataFrame): id, home_team_id, visitor_team_id
+
+    Returns:
+        pd.DataFrame: GAME_CONTEXT_FEATURES no índice de shots (score_margin
+            NaN para arremessos sem evento ou de jogo sem mandante conhecido)
+    """
+    keys = event_keys(events['game_id'], events['event_number'])
+    margins = events['score_margin'].to_numpy(dtype=np.float64)
+    if len(keys) and np.any(np.diff(keys) < 0):
+        order = np.argsort(keys, kind='stable')
+        keys, margins = keys[order], margins[order]
+
+    shot_keys = event_keys(shots['game_id'], shots['game_event_id'])
+    margin_after = np.full(len(shot_keys), np.nan)
+    if len(keys):
+        position = np.minimum(np.searchsorted(keys, shot_keys), len(keys) - 1)
+        found = keys[position] == shot_keys
+        margin_after[found] = margins[position[found]]
+
+    # Mandante/visitante por jogo: um get_indexer (hash) sobre os ids, não um merge
+    games = games.drop_duplicates('id')
+    game_position = pd.Index(games['id']).get_indexer(shots['game_id'])
+    home = np.append(games['home_team_id'].to_numpy(dtype=np.float64), np.nan)[game_position]
+    visitor = np.append(games['visitor_team_id'].to_numpy(dtype=np.float64), np.nan)[game_position]
+    team = shots['team_id'].to_numpy(dtype=np.float64)
+    side = np.where(team == home, 1.0, np.where(team == visitor, -1.0, np.nan))
+
+    points = np.where(shots['shot_type'].to_numpy() == THREE_POINT_SHOT_TYPE, 3, 2) * \
+        shots['shot_made_flag'].to_numpy(dtype=np.int64)
+    score_margin = side * margin_after - points
+    period = shots['period'].to_numpy(dtype=np.int64)
+    clock = (shots['minutes_remaining'].to_numpy(dtype=np.int64) * 60
+             + shots['seconds_remaining'].to_numpy(dtype=np.int64))
+    is_clutch = (period >= 4) & (clock <= CLUTCH_SECONDS) & (np.abs(score_margin) <= CLUTCH_MARGIN)
+    return pd.DataFrame({'score_margin': score_margin, 'is_trailing': score_margin < 0, 'is_clutch': is_clutch},
+                        index=shots.index)
+
+
+def add_game_context(df, events, games):
+    """Adiciona GAME_CONTEXT_FEATURES (game_context) a uma cópia de df."""
+    return pd.concat([df, game_context(df, events, games)], axis=1)
+
+
+def one_hot_encode(X, categorical_features=CATEGORICAL_FEATURES, drop_first=True):
+    """One-hot encoding equivalente a pd.get_dummies(..., drop_first=True).
+
+    Cada coluna é fatorada uma única vez (categorias em ordem alfabética) e a
+    matriz booleana sai de uma comparação vetorizada dos códigos; valores nulos
+    ficam com todas as colunas em False, como no get_dummies.
+    """
+    encoded = {column: X[column] for column in X.columns if column not in categorical_features}
+    for column in categorical_features:
+        codes, categories = pd.factorize(X[column], sort=True)
+        start = 1 if drop_first else 0
+        dummies = codes[:, None] == np.arange(start, len(categories))
+        for position, category in enumerate(categories[start:]):
+            encoded[f"{column}_{category}"] = dummies[:, position]
+    return pd.DataFrame(encoded, index=X.index)
+
+
+def max_normalize(values):
+    """Divide pelo máximo absoluto (normalize(norm='max') do scikit-learn sobre a coluna)."""
+    values = np.asarray(values, dtype=np.float64)
+    scale = np.abs(values).max() if len(values) else 0.0
+    return values / scale if scale else values
+
+
+def build_features(df):
+    """Executa o pipeline completo do notebook 02 sobre os arremessos brutos.
+
+    Returns:
+        tuple: (X, X_encoded, y) com as features selecionadas, as features
+            codificadas/normalizadas e o alvo
+    """
+    df = add_engineered_features(df)
+    X = df[FEATURES_TO_USE]
+    y = df[TARGET]
+    X_encoded = one_hot_encode(X)
+    for column in NORMALIZED_FEATURES:
+        X_encoded[column] = max_normalize(X_encoded[column].to_numpy())
+    return X, X_encoded, y
+
+
+def transformer_path(model_path):
+    """Caminho do transformador salvo ao lado do arquivo do modelo."""
+    return os.path.join(os.path.dirname(model_path), TRANSFORMER_FILENAME)
+
+
+def _numeric_values(shots):
+    """Colunas numéricas do modelo, calculando as features derivadas se ausentes.
+
+    Aceita um DataFrame ou um dict de um único arremesso.
+    """
+    values = {}
+    for column in NORMALIZED_FEATURES:
+        if column in shots:
+            values[column] = shots[column]
+        elif column == 'time_remaining_in_game':
+            values[column] = time_remaining_in_game(
+                shots['period'], shots['minutes_remaining'], shots['seconds_remaining'])
+        elif column == 'shot_angle':
+            values[column] = shot_angle(shots['loc_x'], shots['loc_y'])
+        else:
+            raise KeyError(column)
+    return values
+
+
+class FeatureTransformer:
+    """Vocabulários e escalas ajustados uma vez e reaplicados a qualquer lote de arremessos.
+
+    Produz a mesma matriz que build_features (sem as colunas de id), em float32
+    e na ordem de colunas do modelo, independente das categorias presentes no
+    lote: categorias desconhecidas ou nulas ficam com todas as colunas em zero.
+    """
+
+    def __init__(self, categories=None, scales=None):
+        self.categories = categories or {}
+        self.scales = scales or {}
+        self._build_index()
+
+    def _build_index(self):
+        self.feature_names = list(NORMALIZED_FEATURES)
+        self._offsets = {}
+        self._vocabularies = {}
+        self._positions = {}
+        for column in CATEGORICAL_FEATURES:
+            vocabulary = list(self.categories.get(column, []))
+            self._offsets[column] = len(self.feature_names)
+            self._vocabularies[column] = pd.Index(vocabulary)
+            # A primeira categoria (drop_first) é a referência e não tem coluna própria
+            self._positions[column] = {category: position for position, category in enumerate(vocabulary[1:])}
+            self.feature_names.extend(f"{column}_{category}" for category in vocabulary[1:])
+
+    @property
+    def n_features(self):
+        return len(self.feature_names)
+
+    def fit(self, df):
+        """Aprende as categorias (em ordem alfabética) e o máximo absoluto de cada coluna numérica."""
+        self.categories = {column: pd.factorize(df[column], sort=True)[1].tolist()
+                           for column in CATEGORICAL_FEATURES}
+        self.scales = {column: float(np.abs(np.asarray(values, dtype=np.float64)).max())
+                       for column, values in _numeric_values(df).items()}
+        self._build_index()
+        return self
+
+    def partial_fit(self, df):
+        """Atualiza vocabulários e escalas com mais um bloco de arremessos.
+
+        Ajustar bloco a bloco dá o mesmo resultado de fit sobre a união dos
+        blocos, sem precisar carregar todos de uma vez.
+        """
+        for column in CATEGORICAL_FEATURES:
+            seen = set(self.categories.get(column, []))
+            seen.update(pd.factorize(df[column])[1].tolist())
+            self.categories[column] = sorted(seen)
+        if len(df):
+            for column, values in _numeric_values(df).items():
+                scale = float(np.abs(np.asarray(values, dtype=np.float64)).max())
+                self.scales[column] = max(self.scales.get(column, 0.0), scale)
+        self._build_index()
+        return self
+
+    def allocate(self, n_rows):
+        """Buffer float32 reutilizável para transform(out=...)."""
+        return np.empty((n_rows, self.n_features), dtype=np.float32)
+
+    def transform(self, df, out=None):
+        """Escreve as features de df em um array float32 (n_linhas, n_features).
+
+        Args:
+            df (pd.DataFrame): Arremessos brutos ou já com as features derivadas
+            out (np.ndarray): Buffer pré-alocado com pelo menos len(df) linhas
+
+        Returns:
+            np.ndarray: Visão de out (ou um novo array) com as len(df) primeiras linhas preenchidas
+        """
+        n_rows = len(df)
+        if out is None:
+            out = self.allocate(n_rows)
+        elif out.dtype != np.float32 or out.shape[0] < n_rows or out.shape[1] != self.n_features:
+            raise ValueError(f"Buffer incompatível: esperado float32 com ({n_rows}+, {self.n_features}), "
+                             f"recebido {out.dtype} {out.shape}")
+        out = out[:n_rows]
+        for position, (column, values) in enumerate(_numeric_values(df).items()):
+            scale = self.scales[column]
+            values = np.asarray(values, dtype=np.float64)
+            out[:, position] = values / scale if scale else values
+        out[:, len(NORMALIZED_FEATURES):] = 0
+        for column in CATEGORICAL_FEATURES:
+            codes = self._vocabularies[column].get_indexer(df[column])
+            rows = np.flatnonzero(codes > 0)
+            out[rows, self._offsets[column] + codes[rows] - 1] = 1
+        return out
+
+    def transform_one(self, shot, out=None):
+        """Features de um único arremesso (dict) em tempo constante, sem montar um DataFrame."""
+        row = np.zeros(self.n_features, dtype=np.float32) if out is None else out
+        if out is not None:
+            row[:] = 0
+        for position, (column, value) in enumerate(_numeric_values(shot).items()):
+            scale = self.scales[column]
+            row[position] = float(value) / scale if scale else float(value)
+        for column in CATEGORICAL_FEATURES:
+            position = self._positions[column].get(shot.get(column))
+            if position is not None:
+                row[self._offsets[column] + position] = 1
+        return row
+
+    def fingerprint(self):
+        """Hash curto de vocabulários e escalas: muda sempre que as features geradas mudam."""
+        state = json.dumps({'categories': self.categories, 'scales': self.scales}, sort_keys=True)
+        return hashlib.sha1(state.encode('utf-8')).hexdigest()[:12]
+
+    def to_frame(self, features_array, index=None):
+        """DataFrame com os nomes de colunas do modelo (para SHAP, CSVs e inspeção)."""
+        return pd.DataFrame(features_array, columns=self.feature_names, index=index)
+
+    def check_model(self, model):
+        """Garante que as colunas geradas são exatamente as que o modelo espera.
+
+        Aceita o XGBClassifier ou o TreePredictor exportado (src/tree_predictor.py).
+        """
+        booster = model.get_booster() if hasattr(model, 'get_booster') else model
+        expected = booster.feature_names
+        if expected is not None and list(expected) != self.feature_names:
+            missing = sorted(set(expected) - set(self.feature_names))
+            extra = sorted(set(self.feature_names) - set(expected))
+            raise ValueError(f"Colunas do transformador não batem com o modelo "
+                             f"(faltando: {missing}, sobrando: {extra})")
+
+    def save(self, path):
+        joblib.dump({'categories': self.categories, 'scales': self.scales,
+                     'feature_names': self.feature_names}, path)
+
+    @classmethod
+    def load(cls, path):
+        state = joblib.load(path)
+        transformer = cls(state['categories'], state['scales'])
+        if transformer.feature_names != state['feature_names']:
+            raise ValueError(f"Transformador corrompido em {path}: colunas não batem com os vocabulários")
+        return transformer
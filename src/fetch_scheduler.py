@@ -0,0 +1,256 @@
+import os
+import queue
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import requests
+from nba_api.stats.library.http import NBAStatsResponse, STATS_HEADERS
+from requests.adapters import HTTPAdapter
+
+import instrumentation
+import response_cache
+
+# --- CONFIGURAÇÃO ---
+# URL base da API de estatísticas. Pode ser apontada para o servidor falso local
+# (src/fake_stats_server.py) através da variável de ambiente NBA_STATS_BASE_URL.
+STATS_BASE_URL = os.environ.get("NBA_STATS_BASE_URL", "https://stats.nba.com/stats/{endpoint}")
+REQUEST_TIMEOUT = 30
+# Status HTTP que indicam sobrecarga/limite da API e devem ser re-tentados
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+# Conexões keep-alive mantidas abertas pela sessão compartilhada (>= threads de coleta)
+POOL_SIZE = 8
+
+_session = None
+_session_lock = threading.Lock()
+# Token bucket do FetchScheduler que executa a busca na thread atual (ver rate_limited)
+_rate_limit = threading.local()
+
+
+class RetryableFetchError(Exception):
+    """Erro transitório da API (rate limit, 5xx, timeout) que pode ser re-tentado."""
+
+    def __init__(self, message, status_code=None, retry_after=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Rate limiter token-bucket compartilhado entre as threads de coleta.
+
+    A taxa é adaptativa: cai pela metade a cada resposta 429 e volta a subir
+    gradualmente a cada sucesso, até o limite configurado.
+    """
+
+    def __init__(self, rate, capacity=1, min_rate=0.05):
+        self.max_rate = float(rate)
+        self.rate = float(rate)
+        self.min_rate = min_rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._last = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self):
+        """Bloqueia até existir um token disponível."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self._blocked_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = max(self._blocked_until - now, (1 - self._tokens) / self.rate)
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """Suspende a emissão de tokens para todas as threads (ex: Retry-After)."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+            self._tokens = 0
+
+    def penalize(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = max(self.min_rate, self.rate / 2)
+
+    def reward(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = min(self.max_rate, self.rate * 1.1)
+
+
+def _parse_retry_after(value):
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+def get_session():
+    """Sessão HTTP compartilhada pelas threads: conexões keep-alive reaproveitadas entre requisições."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            _session.headers.update(STATS_HEADERS)
+            adapter = HTTPAdapter(pool_connections=2, pool_maxsize=POOL_SIZE)
+            _session.mount('http://', adapter)
+            _session.mount('https://', adapter)
+        return _session
+
+
+def load_response(endpoint, text, status_code=200, url=None):
+    """Preenche um endpoint do nba_api com o corpo de uma resposta (da rede ou do cache)."""
+    with instrumentation.span('parse', endpoint=endpoint.endpoint) as s:
+        endpoint.nba_response = NBAStatsResponse(response=text, status_code=status_code, url=url)
+        endpoint.load_response()
+        s['bytes'] = len(text)
+    return endpoint
+
+
+@contextmanager
+def rate_limited(bucket):
+    """Faz as requisições de send_stats_request nesta thread consumirem um token de bucket cada."""
+    previous = getattr(_rate_limit, 'bucket', None)
+    _rate_limit.bucket = bucket
+    try:
+        yield bucket
+    finally:
+        _rate_limit.bucket = previous
+
+
+def send_stats_request(endpoint, timeout=REQUEST_TIMEOUT, cache=None, ttl=None):
+    """Executa a requisição de um endpoint do nba_api criado com get_request=False.
+
+    Ao contrário do nba_api, o status HTTP é verificado: respostas 429/5xx e
+    timeouts viram RetryableFetchError (com o Retry-After, se informado).
+    Com um ResponseCache, uma resposta com menos de ttl segundos (qualquer
+    idade, se ttl=None) é lida do disco sem acessar a rede, e cada resposta
+    buscada é gravada no cache. Dentro de um FetchScheduler, cada requisição
+    que vai à rede consome um token do rate limit; leituras do cache não.
+    """
+    key = None
+    if cache is not None:
+        key = response_cache.request_key(endpoint.endpoint, endpoint.parameters)
+        body = cache.get(key, ttl)
+        if body is not None:
+            instrumentation.count('cache_hits', endpoint=endpoint.endpoint)
+            return load_response(endpoint, body)
+
+    url = STATS_BASE_URL.format(endpoint=endpoint.endpoint)
+    parameters = sorted(endpoint.parameters.items(), key=lambda kv: kv[0])
+    bucket = getattr(_rate_limit, 'bucket', None)
+    if bucket is not None:
+        bucket.acquire()
+    try:
+        with instrumentation.span('fetch', endpoint=endpoint.endpoint) as s:
+            response = get_session().get(url, params=parameters, timeout=timeout)
+            s['bytes'] = len(response.content)
+    except (requests.Timeout, requests.ConnectionError) as e:
+        instrumentation.count('requests', endpoint=endpoint.endpoint, status='network_error')
+        raise RetryableFetchError(f"Falha de rede: {e}") from e
+    instrumentation.count('requests', endpoint=endpoint.endpoint, status=response.status_code)
+
+    if response.status_code in RETRYABLE_STATUS:
+        raise RetryableFetchError(
+            f"HTTP {response.status_code} em {endpoint.endpoint}",
+            status_code=response.status_code,
+            retry_after=_parse_retry_after(response.headers.get("Retry-After")),
+        )
+    response.raise_for_status()
+
+    if cache is not None:
+        cache.put(key, response.text, response.url)
+    return load_response(endpoint, response.text, response.status_code, response.url)
+
+
+class FetchScheduler:
+    """Executa buscas concorrentes na API com rate limit e backoff por resposta.
+
+    As buscas rodam em um pool de threads; os resultados são consumidos na
+    thread que chamou run(), de modo que a transformação e a carga no SQLite
+    (que exigem a conexão da thread principal) se sobrepõem às requisições.
+    O rate limit vale por requisição HTTP, não por unidade: uma unidade que
+    busca vários endpoints consome um token para cada um que não vem do cache.
+    """
+
+    def __init__(self, max_workers=4, rate=1.0, burst=2, max_retries=5,
+                 base_backoff=2.0, max_backoff=60.0):
+        self.max_workers = max_workers
+        self.bucket = TokenBucket(rate, capacity=burst)
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+
+    def _backoff(self, attempt, error):
+        if error.retry_after is not None:
+            return error.retry_after
+        # Backoff exponencial com jitter completo
+        return random.uniform(0, min(self.max_backoff, self.base_backoff * 2 ** attempt))
+
+    def _fetch_with_retry(self, unit, fetch_fn):
+        for attempt in range(self.max_retries):
+            try:
+                with rate_limited(self.bucket):
+                    result = fetch_fn(unit)
+                self.bucket.reward()
+                return result, None
+            except RetryableFetchError as e:
+                wait_time = self._backoff(attempt, e)
+                if e.status_code == 429:
+                    # A pausa vale para as demais unidades, mesmo depois da última tentativa desta
+                    self.bucket.penalize()
+                    self.bucket.pause(wait_time)
+                if attempt == self.max_retries - 1:
+                    # Última tentativa: esperar o backoff só atrasaria a falha
+                    print(f"  -> {unit}: {e} (tentativa {attempt + 1}/{self.max_retries}).")
+                    break
+                instrumentation.count('retries', status=e.status_code or 'network_error')
+                print(f"  -> {unit}: {e} (tentativa {attempt + 1}/{self.max_retries}). "
+                      f"Aguardando {wait_time:.1f}s...")
+                time.sleep(wait_time)
+            except Exception as e:
+                return None, e
+        instrumentation.count('fetch_failures')
+        return None, RetryableFetchError(f"Falha após {self.max_retries} tentativas")
+
+    def run(self, units, fetch_fn, consume_fn):
+        """Busca todas as unidades e entrega cada resultado a consume_fn.
+
+        Args:
+            units (list): Unidades de trabalho (ex: tuplas (season, team_id))
+            fetch_fn (callable): fetch_fn(unit) -> resultado; pode lançar RetryableFetchError
+            consume_fn (callable): consume_fn(unit, result, error), chamada na thread atual
+
+        Uma exceção de consume_fn cancela as buscas que ainda não começaram e é
+        propagada sem esperar as que estão em andamento (com o rate limit, a
+        fila pode levar horas).
+        """
+        results = queue.Queue()
+
+        def worker(unit):
+            result, error = self._fetch_with_retry(unit, fetch_fn)
+            results.put((unit, result, error))
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            for unit in units:
+                executor.submit(worker, unit)
+            for _ in range(len(units)):
+                unit, result, error = results.get()
+                consume_fn(unit, result, error)
+        except BaseException:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        executor.shutdown()
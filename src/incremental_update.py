@@ -0,0 +1,300 @@
+"""Atualização incremental do modelo com os jogos coletados desde a última versão.
+
+    python src/incremental_update.py [--seasons 2024-25] [--rounds 25]
+    python src/incremental_update.py --list
+    python src/incremental_update.py --rollback v0002
+
+Em vez de retreinar do zero, continua o boosting do booster de
+models/xgb_best_model.joblib com mais --rounds árvores treinadas só nos
+arremessos dos jogos novos (jogos que nenhuma versão anterior viu). Uma fração
+fixa dos jogos novos (escolhida pelo hash do game_id, então sempre a mesma)
+vira holdout e se acumula entre as noites. O candidato só é promovido se não
+piorar o log loss, nem no holdout acumulado das versões anteriores nem no
+holdout desta noite, e se as árvores novas mudarem alguma probabilidade;
+deriva de calibração e da distribuição de distâncias é registrada junto. Toda
+versão, promovida ou rejeitada, fica em models/versions/<id>/ com o modelo, o
+transformador e os jogos vistos, e o registry.json aponta a versão atual; a
+promoção troca o arquivo do modelo de forma atômica, e --rollback volta a
+qualquer versão salva.
+"""
+import argparse
+import json
+import os
+import shutil
+import time
+from datetime import datetime, timezone
+
+import joblib
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+import features
+import queries
+import season_store
+import tree_predictor
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_NAME = os.path.join(BASE_DIR, '..', 'nba_shots.sqlite')
+MODEL_PATH = os.path.join(BASE_DIR, '..', 'models', 'xgb_best_model.joblib')
+REGISTRY_DIR = os.path.join(BASE_DIR, '..', 'models', 'versions')
+REGISTRY_FILENAME = 'registry.json'
+GAMES_FILENAME = 'games.json'
+
+# Temporada re-coletada toda noite (REFRESH_SEASONS do collect_shotchart)
+UPDATE_SEASONS = ['2024-25']
+# Temporadas de treino do notebook 03: jogos já vistos pelo modelo original
+BASE_SEASONS = ['2022-23', '2023-24']
+UPDATE_COLUMNS = ['game_id', 'period', 'minutes_remaining', 'seconds_remaining', 'loc_x', 'loc_y',
+                  'shot_distance', features.TARGET] + features.CATEGORICAL_FEATURES
+UPDATE_ROUNDS = 25
+MIN_NEW_SHOTS = 500
+# Porcentagem dos jogos novos reservada para o holdout
+HOLDOUT_PERCENT = 20
+# Piora máxima de log loss aceita em cada holdout para promover o candidato
+MAX_REGRESSION = 0.002
+# Diferença máxima de probabilidade para considerar o candidato idêntico ao modelo atual
+UNCHANGED_TOLERANCE = 1e-7
+# PSI acima deste valor indica mudança relevante na distribuição das distâncias
+DRIFT_PSI_WARNING = 0.2
+DISTANCE_BINS = np.array([0, 3, 8, 16, 24, 30, 100])
+
+
+def holdout_mask(game_ids):
+    """Jogos do holdout: decididos pelo hash do game_id, estáveis entre execuções e máquinas."""
+    hashes = pd.util.hash_array(np.asarray(game_ids, dtype=object))
+    return hashes % 100 < HOLDOUT_PERCENT
+
+
+def log_loss(y, probabilities):
+    probabilities = np.clip(probabilities, 1e-7, 1 - 1e-7)
+    return float(-np.mean(y * np.log(probabilities) + (1 - y) * np.log(1 - probabilities)))
+
+
+def population_stability(expected, actual, bins=DISTANCE_BINS):
+    """PSI entre duas amostras (0 = mesma distribuição; acima de 0.2, mudança relevante)."""
+    expected_share = np.histogram(expected, bins)[0] / max(len(expected), 1) + 1e-4
+    actual_share = np.histogram(actual, bins)[0] / max(len(actual), 1) + 1e-4
+    return float(np.sum((actual_share - expected_share) * np.log(actual_share / expected_share)))
+
+
+def evaluate(model, transformer, df):
+    """Log loss e desvio de calibração (prob. média - acerto real) de um modelo em um conjunto de arremessos."""
+    if df.empty:
+        return {'shots': 0, 'log_loss': None, 'calibration_gap': None}
+    y = df[features.TARGET].to_numpy(dtype=np.float64)
+    probabilities = model.predict_proba(transformer.transform(df))[:, 1]
+    return {'shots': len(df), 'log_loss': log_loss(y, probabilities),
+            'calibration_gap': float(probabilities.mean() - y.mean())}
+
+
+def _version_dir(registry_dir, version_id):
+    return os.path.join(registry_dir, version_id)
+
+
+def load_registry(registry_dir=REGISTRY_DIR):
+    path = os.path.join(registry_dir, REGISTRY_FILENAME)
+    if not os.path.exists(path):
+        return {'current': None, 'versions': []}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _save_json(data, path):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def load_games(registry_dir, version_id):
+    with open(os.path.join(_version_dir(registry_dir, version_id), GAMES_FILENAME)) as f:
+        games = json.load(f)
+    return set(games['trained']), set(games['holdout'])
+
+
+def _save_version(registry_dir, version_id, model_path, transformer_path, trained, holdout):
+    """Copia modelo e transformador para a pasta da versão, com os jogos vistos por ela."""
+    version_dir = _version_dir(registry_dir, version_id)
+    os.makedirs(version_dir, exist_ok=True)
+    version_model_path = os.path.join(version_dir, os.path.basename(MODEL_PATH))
+    if os.path.abspath(model_path) != os.path.abspath(version_model_path):
+        shutil.copy2(model_path, version_model_path)
+    shutil.copy2(transformer_path, os.path.join(version_dir, features.TRANSFORMER_FILENAME))
+    _save_json({'trained': sorted(trained), 'holdout': sorted(holdout)}, os.path.join(version_dir, GAMES_FILENAME))
+
+
+def _install_model(source_path, model_path):
+    """Troca o modelo em uso de uma vez (leitores nunca veem arquivo parcial) e reexporta o preditor NumPy."""
+    tmp_path = f"{model_path}.{os.getpid()}.tmp"
+    shutil.copy2(source_path, tmp_path)
+    os.replace(tmp_path, model_path)
+    if os.path.exists(tree_predictor.predictor_path(model_path)):
+        tree_predictor.export_predictor(model_path)
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec='seconds')
+
+
+def bootstrap(conn, model_path=MODEL_PATH, registry_dir=REGISTRY_DIR, base_seasons=BASE_SEASONS):
+    """Registra o modelo atual como v0000, com os jogos das temporadas de treino como já vistos."""
+    os.makedirs(registry_dir, exist_ok=True)
+    trained = set(queries.game_ids(conn, base_seasons))
+    _save_version(registry_dir, 'v0000', model_path, features.transformer_path(model_path), trained, set())
+    registry = {'current': 'v0000', 'versions': [{
+        'id': 'v0000', 'parent': None, 'status': 'baseline', 'created_at': _now(),
+        'model_version': tree_predictor.model_version(model_path), 'base_seasons': base_seasons}]}
+    _save_json(registry, os.path.join(registry_dir, REGISTRY_FILENAME))
+    print(f"Versão base v0000 registrada: {len(trained)} jogos de {base_seasons} considerados vistos")
+    return registry
+
+
+def continue_boosting(model, X, y, rounds=UPDATE_ROUNDS):
+    """Novo XGBClassifier com rounds árvores a mais, treinadas só em (X, y); o modelo original não muda.
+
+    Um modelo com early stopping é antes cortado em best_iteration: as árvores
+    novas continuam as que o predict_proba usa, e o candidato não herda o
+    best_iteration do pai (que faria o predict_proba ignorar as árvores novas).
+    """
+    params = model.get_xgb_params()
+    booster = model.get_booster()
+    best_iteration = booster.attr('best_iteration')
+    if best_iteration is not None:
+        booster = booster[:int(best_iteration) + 1]
+    dtrain = xgb.DMatrix(X, label=y, feature_names=booster.feature_names)
+    booster = xgb.train(params, dtrain, rounds, xgb_model=booster)
+    candidate = xgb.XGBClassifier(**model.get_params())
+    candidate.load_model(bytearray(booster.save_raw('json')))
+    return candidate
+
+
+def run_update(db_name=DB_NAME, model_path=MODEL_PATH, seasons=UPDATE_SEASONS, rounds=UPDATE_ROUNDS,
+               registry_dir=REGISTRY_DIR, base_seasons=BASE_SEASONS):
+    """Continua o modelo atual com os jogos novos e promove o candidato se os holdouts não piorarem.
+
+    Returns:
+        dict: Entrada do registro da nova versão (None se não há arremessos novos suficientes)
+    """
+    start = time.perf_counter()
+    conn = season_store.connect(db_name, list(seasons) + list(base_seasons))
+    registry = load_registry(registry_dir)
+    if registry['current'] is None:
+        registry = bootstrap(conn, model_path, registry_dir, base_seasons)
+    current_id = registry['current']
+    trained, holdout = load_games(registry_dir, current_id)
+    current_entry = next(entry for entry in registry['versions'] if entry['id'] == current_id)
+    if current_entry['model_version'] != tree_predictor.model_version(model_path):
+        print(f"Aviso: {model_path} não é o modelo da versão {current_id}; continuando a partir do arquivo atual")
+
+    new_games = np.array(sorted(set(queries.game_ids(conn, seasons)) - trained - holdout), dtype=object)
+    in_holdout = holdout_mask(new_games) if len(new_games) else np.zeros(0, dtype=bool)
+    df_new = queries.shots_for_games(conn, new_games[~in_holdout], UPDATE_COLUMNS)
+    if len(df_new) < MIN_NEW_SHOTS:
+        conn.close()
+        print(f"{len(new_games)} jogos novos, {len(df_new)} arremessos de treino (< {MIN_NEW_SHOTS}): nada a atualizar")
+        return None
+    df_new_holdout = queries.shots_for_games(conn, new_games[in_holdout], UPDATE_COLUMNS)
+    df_reference = queries.shots_for_games(conn, sorted(holdout), UPDATE_COLUMNS)
+    conn.close()
+    load_seconds = time.perf_counter() - start
+
+    model = joblib.load(model_path)
+    transformer = features.FeatureTransformer.load(features.transformer_path(model_path))
+    transformer.check_model(model)
+    train_start = time.perf_counter()
+    X_new = transformer.transform(df_new)
+    candidate = continue_boosting(model, X_new, df_new[features.TARGET].to_numpy(), rounds)
+    train_seconds = time.perf_counter() - train_start
+    # Probabilidades iguais às do pai nos próprios arremessos de treino: as árvores novas não têm efeito
+    unchanged = bool(np.abs(candidate.predict_proba(X_new) - model.predict_proba(X_new)).max() <= UNCHANGED_TOLERANCE)
+
+    metrics = {name: {'current': evaluate(model, transformer, df), 'candidate': evaluate(candidate, transformer, df)}
+               for name, df in [('reference_holdout', df_reference), ('new_holdout', df_new_holdout),
+                                ('new_train', df_new)]}
+    drift_psi = population_stability(df_reference['shot_distance'], df_new['shot_distance']) \
+        if not df_reference.empty else None
+    regressions = [name for name in ('reference_holdout', 'new_holdout')
+                   if metrics[name]['current']['shots'] and
+                   metrics[name]['candidate']['log_loss'] > metrics[name]['current']['log_loss'] + MAX_REGRESSION]
+    promoted = not regressions and not unchanged
+
+    version_id = f"v{len(registry['versions']):04d}"
+    version_dir = _version_dir(registry_dir, version_id)
+    os.makedirs(version_dir, exist_ok=True)
+    candidate_path = os.path.join(version_dir, os.path.basename(MODEL_PATH))
+    joblib.dump(candidate, candidate_path)
+    # Jogos só passam a contar como vistos se a versão for promovida; rejeitados voltam na próxima noite
+    new_trained, new_holdout = (trained | set(new_games[~in_holdout]), holdout | set(new_games[in_holdout])) \
+        if promoted else (trained, holdout)
+    _save_version(registry_dir, version_id, candidate_path, features.transformer_path(model_path),
+                  new_trained, new_holdout)
+    entry = {'id': version_id, 'parent': current_id, 'status': 'promoted' if promoted else 'rejected',
+             'created_at': _now(), 'model_version': tree_predictor.model_version(candidate_path),
+             'seasons': list(seasons), 'rounds': rounds, 'new_games': len(new_games),
+             'train_shots': len(df_new), 'metrics': metrics, 'distance_psi': drift_psi,
+             'regressions': regressions, 'unchanged': unchanged, 'train_seconds': train_seconds}
+    registry['versions'].append(entry)
+    if promoted:
+        _install_model(candidate_path, model_path)
+        registry['current'] = version_id
+    _save_json(registry, os.path.join(registry_dir, REGISTRY_FILENAME))
+
+    for name, values in metrics.items():
+        if values['current']['shots']:
+            print(f"  {name:<18} {values['current']['shots']:>7} arremessos | log loss "
+                  f"{values['current']['log_loss']:.4f} -> {values['candidate']['log_loss']:.4f} | "
+                  f"calibração {values['current']['calibration_gap']:+.4f} -> {values['candidate']['calibration_gap']:+.4f}")
+    if drift_psi is not None and drift_psi > DRIFT_PSI_WARNING:
+        print(f"  Aviso: distribuição de distâncias mudou (PSI {drift_psi:.3f})")
+    if promoted:
+        outcome = 'promovida'
+    elif unchanged:
+        outcome = 'rejeitada (mesmas probabilidades do modelo atual)'
+    else:
+        outcome = f"rejeitada (piora em {', '.join(regressions)})"
+    print(f"Versão {version_id} {outcome}: "
+          f"{len(new_games)} jogos novos, {len(df_new)} arremessos, +{rounds} árvores em {train_seconds:.2f}s "
+          f"(leitura {load_seconds:.2f}s, total {time.perf_counter() - start:.2f}s)")
+    return entry
+
+
+def rollback(version_id, model_path=MODEL_PATH, registry_dir=REGISTRY_DIR):
+    """Reinstala o modelo de uma versão salva e a marca como atual."""
+    registry = load_registry(registry_dir)
+    if not any(entry['id'] == version_id for entry in registry['versions']):
+        raise ValueError(f"Versão {version_id} não encontrada em {registry_dir}")
+    _install_model(os.path.join(_version_dir(registry_dir, version_id), os.path.basename(MODEL_PATH)), model_path)
+    registry['current'] = version_id
+    _save_json(registry, os.path.join(registry_dir, REGISTRY_FILENAME))
+    print(f"Modelo da versão {version_id} reinstalado em {model_path}")
+
+
+def list_versions(registry_dir=REGISTRY_DIR):
+    registry = load_registry(registry_dir)
+    for entry in registry['versions']:
+        marker = '*' if entry['id'] == registry['current'] else ' '
+        holdout = (entry.get('metrics') or {}).get('new_holdout', {}).get('candidate', {}).get('log_loss')
+        print(f"{marker} {entry['id']}  {entry['status']:<9} {entry['created_at']}  "
+              f"arremessos: {entry.get('train_shots', '-')}  "
+              f"log loss holdout: {f'{holdout:.4f}' if holdout is not None else '-'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db', default=DB_NAME)
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--seasons', nargs='+', default=UPDATE_SEASONS)
+    parser.add_argument('--base-seasons', nargs='+', default=BASE_SEASONS,
+                        help='Temporadas já vistas pelo modelo quando não há registro de versões')
+    parser.add_argument('--rounds', type=int, default=UPDATE_ROUNDS)
+    parser.add_argument('--registry', default=REGISTRY_DIR)
+    parser.add_argument('--rollback', metavar='VERSAO')
+    parser.add_argument('--list', action='store_true')
+    args = parser.parse_args()
+    if args.list:
+        list_versions(args.registry)
+    elif args.rollback:
+        rollback(args.rollback, args.model, args.registry)
+    else:
+        run_update(args.db, args.model, args.seasons, args.rounds, args.registry, args.base_seasons)
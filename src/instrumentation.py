@@ -0,0 +1,240 @@
+"""Instrumentação leve do pipeline: spans por etapa, contadores, log estruturado e endpoint de métricas.
+
+Cada etapa (fetch, parse, transform, load, fix-up, predição no dashboard) é
+medida com span(); os totais por nome e rótulos ficam em memória e, se
+configurado, cada span vira uma linha JSON no log estruturado:
+
+    with instrumentation.span('load', collector='shotchart') as s:
+        ...
+        s['rows'] = len(df)
+
+Contadores (requisições, re-tentativas, acertos do cache) usam count(). Os
+totais podem ser expostos no formato texto do Prometheus (GET /metrics) por
+start_metrics_server(), que por padrão só escuta em 127.0.0.1 (METRICS_HOST);
+para expor a outras máquinas, passe host ou defina NBA_METRICS_HOST. profiled() envolve os laços quentes com cProfile
+quando NBA_PROFILE_DIR está definido; sem ele, não custa nada e o processo
+pode ser amostrado de fora com py-spy (py-spy record -- python src/...).
+
+Configuração por configure() ou pelas variáveis de ambiente NBA_METRICS_LOG,
+NBA_METRICS_PORT, NBA_METRICS_HOST e NBA_PROFILE_DIR (configure_from_env()).
+"""
+import cProfile
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Mesmo diretório data/ do parquet_store, sem importar o pyarrow
+LOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'logs')
+# Log estruturado padrão dos scripts de linha de comando
+LOG_PATH = os.path.join(LOG_DIR, 'pipeline.jsonl')
+# Prefixo das métricas no formato Prometheus
+METRIC_PREFIX = 'nba'
+# Interface do endpoint de métricas: só a máquina local, salvo host explícito ou NBA_METRICS_HOST
+METRICS_HOST = '127.0.0.1'
+
+# Totais por (nome, rótulos): {'count', 'seconds', 'max_seconds', 'rows', 'bytes', 'errors'}
+SPANS = {}
+# Contadores por (nome, rótulos)
+COUNTERS = {}
+
+_lock = threading.Lock()
+_log_file = None
+_profile_dir = None
+_metrics_server = None
+
+
+def _key(name, labels):
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def configure(log_path=None, metrics_port=None, profile_dir=None, metrics_host=None):
+    """Ativa o log estruturado, o endpoint de métricas e/ou o cProfile dos laços quentes."""
+    global _log_file, _profile_dir
+    with _lock:
+        if log_path and (_log_file is None or _log_file.name != log_path):
+            if _log_file is not None:
+                _log_file.close()
+            os.makedirs(os.path.dirname(os.path.abspath(log_path)), exist_ok=True)
+            _log_file = open(log_path, 'a', encoding='utf-8')
+        if profile_dir:
+            os.makedirs(profile_dir, exist_ok=True)
+            _profile_dir = profile_dir
+    if metrics_port is not None:
+        start_metrics_server(metrics_port, metrics_host)
+
+
+def configure_from_env(default_log_path=None):
+    """configure() a partir de NBA_METRICS_LOG, NBA_METRICS_PORT, NBA_METRICS_HOST e NBA_PROFILE_DIR."""
+    port = os.environ.get('NBA_METRICS_PORT')
+    configure(os.environ.get('NBA_METRICS_LOG', default_log_path), int(port) if port else None,
+              os.environ.get('NBA_PROFILE_DIR'), os.environ.get('NBA_METRICS_HOST'))
+
+
+def log_event(event, **fields):
+    """Escreve uma linha JSON no log estruturado (se configurado)."""
+    if _log_file is None:
+        return
+    line = json.dumps({'ts': round(time.time(), 3), 'event': event, 'pid': os.getpid(), **fields}, default=str)
+    with _lock:
+        _log_file.write(line + '\n')
+        _log_file.flush()
+
+
+def count(name, value=1, **labels):
+    key = _key(name, labels)
+    with _lock:
+        COUNTERS[key] = COUNTERS.get(key, 0) + value
+
+
+@contextmanager
+def span(name, **labels):
+    """Mede um bloco; o dict devolvido aceita 'rows' e 'bytes' processados no bloco."""
+    fields = {}
+    error = None
+    start = time.perf_counter()
+    try:
+        yield fields
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        seconds = time.perf_counter() - start
+        key = _key(name, labels)
+        with _lock:
+            stats = SPANS.setdefault(key, {'count': 0, 'seconds': 0.0, 'max_seconds': 0.0,
+                                           'rows': 0, 'bytes': 0, 'errors': 0})
+            stats['count'] += 1
+            stats['seconds'] += seconds
+            stats['max_seconds'] = max(stats['max_seconds'], seconds)
+            stats['rows'] += fields.get('rows', 0)
+            stats['bytes'] += fields.get('bytes', 0)
+            stats['errors'] += error is not None
+        log_event('span', span=name, seconds=round(seconds, 6), thread=threading.current_thread().name,
+                  error=repr(error) if error is not None else None, **labels, **fields)
+
+
+def timed(name, **labels):
+    """Decorador: cada chamada da função é um span."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name, **labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def profiled(name):
+    """cProfile do bloco (só da thread atual) em <NBA_PROFILE_DIR>/<nome>_<pid>.prof, se ativado."""
+    if _profile_dir is None:
+        yield
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        path = os.path.join(_profile_dir, f"{name}_{os.getpid()}_{int(time.time())}.prof")
+        profiler.dump_stats(path)
+        print(f"Perfil de {name} gravado em {path} (python -m pstats {path})")
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{v}"' for k, v in pairs) + '}'
+
+
+def prometheus_text():
+    """Totais atuais no formato de exposição texto do Prometheus."""
+    with _lock:
+        spans = {key: dict(stats) for key, stats in SPANS.items()}
+        counters = dict(COUNTERS)
+    lines = []
+    for metric, field, kind in [('span_seconds_total', 'seconds', 'counter'),
+                                ('span_calls_total', 'count', 'counter'),
+                                ('span_errors_total', 'errors', 'counter'),
+                                ('span_rows_total', 'rows', 'counter'),
+                                ('span_bytes_total', 'bytes', 'counter'),
+                                ('span_max_seconds', 'max_seconds', 'gauge')]:
+        lines.append(f"# TYPE {METRIC_PREFIX}_{metric} {kind}")
+        for (name, labels), stats in sorted(spans.items()):
+            lines.append(f"{METRIC_PREFIX}_{metric}{_format_labels(labels, [('span', name)])} {stats[field]}")
+    for name in sorted({name for name, _ in counters}):
+        lines.append(f"# TYPE {METRIC_PREFIX}_{name}_total counter")
+        for (counter, labels), value in sorted(counters.items()):
+            if counter == name:
+                lines.append(f"{METRIC_PREFIX}_{name}_total{_format_labels(labels)} {value}")
+    return '\n'.join(lines) + '\n'
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path != '/metrics':
+            self.send_error(404)
+            return
+        body = prometheus_text().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port=9108, host=None):
+    """Serve GET /metrics em uma thread daemon (uma vez por processo). Retorna o servidor.
+
+    Sem host, escuta em NBA_METRICS_HOST ou, na falta dela, em METRICS_HOST
+    (127.0.0.1): os totais e rótulos não devem ficar abertos na rede por
+    padrão. Use host='0.0.0.0' para um Prometheus em outra máquina.
+    """
+    global _metrics_server
+    host = host or os.environ.get('NBA_METRICS_HOST') or METRICS_HOST
+    with _lock:
+        if _metrics_server is None:
+            _metrics_server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            threading.Thread(target=_metrics_server.serve_forever, daemon=True).start()
+            bound_host, bound_port = _metrics_server.server_address[:2]
+            print(f"Métricas em http://{bound_host}:{bound_port}/metrics")
+    return _metrics_server
+
+
+def report():
+    """Resumo legível dos spans e contadores desde o início do processo."""
+    with _lock:
+        spans = {key: dict(stats) for key, stats in SPANS.items()}
+        counters = dict(COUNTERS)
+    lines = ["Tempo por etapa:"]
+    for (name, labels), stats in sorted(spans.items(), key=lambda item: -item[1]['seconds']):
+        line = (f"  {name}{_format_labels(labels)}: {stats['count']} chamadas, {stats['seconds']:.3f}s "
+                f"(máx. {stats['max_seconds']:.3f}s)")
+        if stats['rows']:
+            line += f", {stats['rows']:,} linhas ({stats['rows'] / stats['seconds']:,.0f}/s)" \
+                if stats['seconds'] else f", {stats['rows']:,} linhas"
+        if stats['bytes']:
+            line += f", {stats['bytes'] / 1e3:,.0f} KB"
+        if stats['errors']:
+            line += f", {stats['errors']} erros"
+        lines.append(line)
+    if counters:
+        lines.append("Contadores:")
+        for (name, labels), value in sorted(counters.items()):
+            lines.append(f"  {name}{_format_labels(labels)}: {value}")
+    return '\n'.join(lines)
+
+
+def reset():
+    """Zera os totais (ex: entre rodadas de um benchmark)."""
+    with _lock:
+        SPANS.clear()
+        COUNTERS.clear()
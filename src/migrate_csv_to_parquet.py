@@ -0,0 +1,75 @@
+"""Migra os CSVs de handoff (data/*.csv) para os datasets Parquet do parquet_store.
+
+    python src/migrate_csv_to_parquet.py [--data-dir data]
+
+- df.csv vira o dataset 'shots'. A temporada, ausente nos CSVs antigos, é
+  derivada do game_id (002YY##### -> 20YY-YY+1).
+- O conjunto de teste é reconstruído refazendo o split aleatório do notebook 03
+  (test_size=0.2, random_state=42, estratificado por shot_made_flag), que só
+  depende do número de linhas e do alvo. Os ids de X_test_id.csv confirmam que
+  as linhas batem antes de gravar 'test_shots'.
+
+Os CSVs não são apagados.
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+import parquet_store
+
+# Parâmetros do split aleatório usado pelo notebook 03 quando não há coluna season
+TEST_SIZE = 0.2
+RANDOM_STATE = 42
+
+
+def season_from_game_id(game_ids):
+    """Temporada a partir do game_id da NBA (texto ou inteiro sem zeros à esquerda)."""
+    start_year = 2000 + (pd.to_numeric(game_ids) // 100000) % 100
+    return start_year.astype(str) + '-' + ((start_year + 1) % 100).map('{:02d}'.format)
+
+
+def _read_csv(data_dir, filename):
+    path = os.path.join(data_dir, filename)
+    if not os.path.exists(path):
+        return None
+    return pd.read_csv(path, engine='pyarrow')
+
+
+def migrate(data_dir=parquet_store.DATA_DIR):
+    df = _read_csv(data_dir, 'df.csv')
+    if df is None:
+        print(f"Arquivo df.csv não encontrado em {data_dir}; nada a migrar.")
+        return
+    # game_id é texto no banco ("0022400001"); o CSV o lê como inteiro
+    df['game_id'] = df['game_id'].astype(str).str.zfill(10)
+    if 'season' not in df.columns:
+        df['season'] = season_from_game_id(df['game_id'])
+    parquet_store.write_dataset(df, parquet_store.SHOTS_DATASET, data_dir)
+    print(f"Dataset '{parquet_store.SHOTS_DATASET}': {len(df)} arremessos em "
+          f"{len(parquet_store.list_partitions(parquet_store.SHOTS_DATASET, data_dir))} partições")
+
+    x_test_id = _read_csv(data_dir, 'X_test_id.csv')
+    if x_test_id is None:
+        print("X_test_id.csv não encontrado; dataset de teste não migrado.")
+        return
+    _, test_positions = train_test_split(np.arange(len(df)), test_size=TEST_SIZE,
+                                         random_state=RANDOM_STATE, stratify=df['shot_made_flag'])
+    df_test = df.iloc[test_positions]
+    expected_ids = x_test_id[['player_id', 'team_id']].to_numpy()
+    if len(df_test) != len(x_test_id) or not np.array_equal(df_test[['player_id', 'team_id']].to_numpy(),
+                                                             expected_ids):
+        print("O split refeito não bate com X_test_id.csv (o notebook 03 usou outro split); "
+              "execute o notebook 03 para gerar o dataset de teste.")
+        return
+    parquet_store.write_dataset(df_test, parquet_store.TEST_SHOTS_DATASET, data_dir)
+    print(f"Dataset '{parquet_store.TEST_SHOTS_DATASET}': {len(df_test)} arremessos")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--data-dir', default=parquet_store.DATA_DIR)
+    args = parser.parse_args()
+    migrate(args.data_dir)
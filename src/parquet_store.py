@@ -0,0 +1,150 @@
+"""Camada de dados colunar (Parquet) particionada por temporada e time.
+
+Substitui os CSVs de handoff entre notebooks e dashboard. Cada dataset fica em
+data/<nome>/season=<temporada>/team_id=<id>/*.parquet, com tipos compactos
+(flags int8, zonas categóricas, coordenadas float32); leituras podem projetar
+só as colunas necessárias e filtrar temporadas/times, pulando as partições
+que não interessam sem abrir os arquivos.
+"""
+import os
+import shutil
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data')
+# Todos os arremessos com as features derivadas (notebook 02)
+SHOTS_DATASET = 'shots'
+# Arremessos do conjunto de teste (notebook 03), lidos pelo dashboard e pelo notebook 04
+TEST_SHOTS_DATASET = 'test_shots'
+
+PARTITION_COLUMNS = ['season', 'team_id']
+PARTITIONING = ds.partitioning(pa.schema([('season', pa.string()), ('team_id', pa.int32())]), flavor='hive')
+
+# Linhas por row group: sem um mínimo, o particionamento grava dezenas de row
+# groups minúsculos por arquivo e a leitura passa a ser dominada por overhead
+MIN_ROWS_PER_GROUP = 64 * 1024
+MAX_ROWS_PER_GROUP = 1024 * 1024
+
+# Tipos compactos aplicados antes da escrita (colunas ausentes são ignoradas)
+COMPACT_DTYPES = {
+    'id': 'int64',
+    'game_event_id': 'int16',
+    'player_id': 'int32',
+    'team_id': 'int32',
+    'period': 'int8',
+    'minutes_remaining': 'int8',
+    'seconds_remaining': 'int8',
+    'shot_made_flag': 'int8',
+    'loc_x': 'float32',
+    'loc_y': 'float32',
+    'shot_distance': 'int16',
+    'time_remaining_in_game': 'int16',
+    'shot_angle': 'float32',
+    'action_type': 'category',
+    'shot_type': 'category',
+    'shot_zone_basic': 'category',
+    'shot_zone_area': 'category',
+    'shot_zone_range': 'category',
+    'shot_probability': 'float32',
+    'poe': 'float32',
+    'adjusted_poe': 'float32',
+}
+
+
+def dataset_path(name, data_dir=DATA_DIR):
+    return os.path.join(data_dir, name)
+
+
+def dataset_exists(name, data_dir=DATA_DIR):
+    return os.path.isdir(dataset_path(name, data_dir))
+
+
+def to_compact(df):
+    """Converte as colunas conhecidas para os tipos de COMPACT_DTYPES."""
+    dtypes = {column: dtype for column, dtype in COMPACT_DTYPES.items() if column in df.columns}
+    df = df.astype(dtypes)
+    if 'season' in df.columns:
+        df['season'] = df['season'].astype(str)
+    return df
+
+
+def write_dataset(df, name, data_dir=DATA_DIR, overwrite=True):
+    """Grava df particionado por (season, team_id).
+
+    Com overwrite=True o dataset anterior é removido; com overwrite=False só
+    as partições presentes em df são substituídas (carga incremental).
+    """
+    missing = [column for column in PARTITION_COLUMNS if column not in df.columns]
+    if missing:
+        raise ValueError(f"Colunas de partição ausentes: {missing}")
+    path = dataset_path(name, data_dir)
+    if overwrite and os.path.isdir(path):
+        shutil.rmtree(path)
+    table = pa.Table.from_pandas(to_compact(df), preserve_index=False)
+    ds.write_dataset(table, path, format='parquet', partitioning=PARTITIONING,
+                     existing_data_behavior='delete_matching',
+                     min_rows_per_group=MIN_ROWS_PER_GROUP, max_rows_per_group=MAX_ROWS_PER_GROUP)
+    return path
+
+
+def _filter(seasons=None, team_ids=None):
+    expression = None
+    for column, values in [('season', seasons), ('team_id', team_ids)]:
+        if values is None:
+            continue
+        if isinstance(values, (str, int)):
+            values = [values]
+        values = [str(v) for v in values] if column == 'season' else [int(v) for v in values]
+        condition = ds.field(column).isin(values)
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+def read_dataset(name, columns=None, seasons=None, team_ids=None, as_category=True, data_dir=DATA_DIR):
+    """Lê um dataset com projeção de colunas e filtro por temporada/time.
+
+    Os filtros atuam sobre as chaves de partição, então só os arquivos das
+    partições selecionadas são abertos.
+
+    Args:
+        columns (list): Colunas a ler (None para todas)
+        seasons (list): Temporadas a incluir (None para todas)
+        team_ids (list): Times a incluir (None para todos)
+        as_category (bool): Mantém as colunas categóricas como category; False
+            converte para object, como nos antigos CSVs
+
+    Returns:
+        pd.DataFrame: Linhas das partições selecionadas, ordenadas por partição
+    """
+    dataset = ds.dataset(dataset_path(name, data_dir), format='parquet', partitioning=PARTITIONING)
+    table = dataset.to_table(columns=columns, filter=_filter(seasons, team_ids))
+    df = table.to_pandas()
+    if not as_category:
+        for column in df.columns[df.dtypes == 'category']:
+            df[column] = df[column].astype(object)
+    return df
+
+
+def iter_batches(name, columns=None, seasons=None, team_ids=None, batch_rows=256 * 1024, data_dir=DATA_DIR):
+    """Lê um dataset em DataFrames de até batch_rows linhas, sem materializar a tabela inteira.
+
+    Mesma projeção e filtro por partição de read_dataset; colunas de dicionário
+    viram object, já que cada lote traz seu próprio dicionário.
+    """
+    dataset = ds.dataset(dataset_path(name, data_dir), format='parquet', partitioning=PARTITIONING)
+    for batch in dataset.to_batches(columns=columns, filter=_filter(seasons, team_ids), batch_size=batch_rows):
+        if batch.num_rows:
+            df = batch.to_pandas()
+            for column in df.columns[df.dtypes == 'category']:
+                df[column] = df[column].astype(object)
+            yield df
+
+
+def list_partitions(name, data_dir=DATA_DIR):
+    """Pares (season, team_id) presentes no dataset, lidos só dos nomes dos diretórios."""
+    dataset = ds.dataset(dataset_path(name, data_dir), format='parquet', partitioning=PARTITIONING)
+    partitions = {(keys['season'], keys['team_id'])
+                  for keys in (ds.get_partition_keys(fragment.partition_expression)
+                               for fragment in dataset.get_fragments())}
+    return sorted(partitions)
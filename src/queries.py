@@ -0,0 +1,252 @@
+"""Consultas ao banco SQLite usadas pelo dashboard, notebooks e ETL.
+
+Todas selecionam colunas explícitas e filtram pelas colunas líderes dos índices
+de game_shot_charts (SHOT_CHART_INDEXES em configs/database_setup.py), de modo
+que nenhuma consulta por time, jogador, temporada ou jogo varre a tabela inteira.
+Janelas de tempo partem de games, indexada por data (GAME_INDEXES).
+"""
+import pandas as pd
+
+from bulk_loader import GAME_COLUMNS, PENDING_GAMES, SHOT_COLUMNS
+
+# Colunas de game_shot_charts na ordem da tabela (equivalente ao antigo SELECT *)
+SHOT_TABLE_COLUMNS = ['id'] + SHOT_COLUMNS
+
+
+def _select_shots(columns, where='', order_by=''):
+    sql = f"SELECT {', '.join(columns)} FROM game_shot_charts"
+    if where:
+        sql += f" WHERE {where}"
+    if order_by:
+        sql += f" ORDER BY {order_by}"
+    return sql
+
+
+def _in_clause(column, values):
+    return f"{column} IN ({', '.join('?' for _ in values)})"
+
+
+def _seasons_clause(conn, seasons):
+    """Filtro por temporada; sem temporadas explícitas usa todas as existentes.
+
+    Listar as temporadas mantém season como coluna líder da busca, permitindo
+    que filtros por time usem o índice (season, team_id) em vez de um scan.
+    """
+    if seasons is None:
+        seasons = shot_seasons(conn)
+    elif isinstance(seasons, str):
+        seasons = [seasons]
+    return _in_clause('season', seasons), list(seasons)
+
+
+def _shot_tables(conn):
+    """Tabelas físicas de arremessos: uma por temporada anexada pelo season_store, ou a do banco único.
+
+    Um DISTINCT sobre a view federada não usa os índices dos arquivos anexados;
+    feito em cada arquivo, volta a ler apenas o índice.
+    """
+    schemas = [row[1] for row in conn.execute('PRAGMA database_list') if row[1].startswith('season_')]
+    return [f"{schema}.game_shot_charts" for schema in schemas] or ['game_shot_charts']
+
+
+def shot_seasons(conn):
+    """Temporadas presentes em game_shot_charts (lidas apenas do índice)."""
+    sql = ' UNION '.join(f'SELECT DISTINCT season FROM {table}' for table in _shot_tables(conn))
+    rows = conn.execute(sql + ' ORDER BY season').fetchall()
+    return [row[0] for row in rows]
+
+
+def shot_partitions(conn, seasons=None):
+    """Pares (season, team_id) presentes em game_shot_charts (lidos apenas do índice)."""
+    where, params = '', []
+    if seasons is not None:
+        where, params = _seasons_clause(conn, seasons)
+        where = f' WHERE {where}'
+    tables = _shot_tables(conn)
+    sql = ' UNION '.join(f'SELECT DISTINCT season, team_id FROM {table}{where}' for table in tables)
+    return conn.execute(sql + ' ORDER BY season, team_id', params * len(tables)).fetchall()
+
+
+def load_shots(conn, seasons=None, columns=SHOT_TABLE_COLUMNS):
+    """Carrega os arremessos das temporadas informadas (todas, se None)."""
+    if seasons is None:
+        return pd.read_sql_query(_select_shots(columns), conn)
+    where, params = _seasons_clause(conn, seasons)
+    return pd.read_sql_query(_select_shots(columns, where), conn, params=params)
+
+
+def iter_shots(conn, seasons=None, columns=SHOT_TABLE_COLUMNS, chunk_rows=256 * 1024):
+    """Arremessos das temporadas informadas em blocos de até chunk_rows linhas (cursor, sem carregar tudo)."""
+    where, params = _seasons_clause(conn, seasons)
+    yield from pd.read_sql_query(_select_shots(columns, where), conn, params=params, chunksize=chunk_rows)
+
+
+def shots_for_team(conn, team_id, seasons=None, columns=SHOT_TABLE_COLUMNS):
+    """Arremessos de um time, usando o índice (season, team_id)."""
+    where, params = _seasons_clause(conn, seasons)
+    return pd.read_sql_query(_select_shots(columns, f"{where} AND team_id = ?"), conn,
+                             params=params + [int(team_id)])
+
+
+def shots_for_player(conn, player_id, seasons=None, columns=SHOT_TABLE_COLUMNS):
+    """Arremessos de um jogador, usando o índice (player_id, season)."""
+    where, params = 'player_id = ?', [int(player_id)]
+    if seasons is not None:
+        season_where, season_params = _seasons_clause(conn, seasons)
+        where, params = f"{where} AND {season_where}", params + season_params
+    return pd.read_sql_query(_select_shots(columns, where), conn, params=params)
+
+
+def shots_for_game(conn, game_id, columns=SHOT_TABLE_COLUMNS):
+    """Arremessos de um jogo em ordem de evento, usando o índice (game_id, game_event_id)."""
+    return pd.read_sql_query(_select_shots(columns, 'game_id = ?', 'game_event_id'), conn,
+                             params=[game_id])
+
+
+def game_ids(conn, seasons=None):
+    """Jogos com arremessos nas temporadas informadas (todas, se None)."""
+    where, params = _seasons_clause(conn, seasons)
+    rows = conn.execute(f'SELECT DISTINCT game_id FROM game_shot_charts WHERE {where}', params).fetchall()
+    return [row[0] for row in rows]
+
+
+def shots_for_games(conn, game_ids, columns=SHOT_TABLE_COLUMNS, batch_size=500):
+    """Arremessos de uma lista de jogos, em consultas IN de até batch_size jogos (índice (game_id, game_event_id))."""
+    game_ids = list(game_ids)
+    frames = [pd.read_sql_query(_select_shots(columns, _in_clause('game_id', batch)), conn, params=batch)
+              for batch in (game_ids[i:i + batch_size] for i in range(0, len(game_ids), batch_size))]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+
+
+def _date_key(value):
+    """Data (YYYYMMDD, AAAA-MM-DD, date ou Timestamp) no formato de games.game_date."""
+    return pd.Timestamp(value).strftime('%Y%m%d')
+
+
+def _select_games_between(columns):
+    return f"SELECT {', '.join(columns)} FROM games WHERE game_date BETWEEN ? AND ? ORDER BY game_date"
+
+
+def games_between(conn, start_date, end_date=None, columns=GAME_COLUMNS):
+    """Jogos com data em [start_date, end_date] (até o último jogo, se None), usando o índice de game_date."""
+    end_key = _date_key(end_date) if end_date is not None else '99999999'
+    return pd.read_sql_query(_select_games_between(columns), conn, params=[_date_key(start_date), end_key])
+
+
+def shots_between(conn, start_date, end_date=None, columns=SHOT_TABLE_COLUMNS):
+    """Arremessos dos jogos de um intervalo de datas, sem varrer as temporadas inteiras.
+
+    Os jogos saem de uma busca por intervalo no índice de game_date e os
+    arremessos, do índice (game_id, game_event_id).
+    """
+    return shots_for_games(conn, games_between(conn, start_date, end_date, ['id'])['id'], columns)
+
+
+def last_game_date(conn):
+    """Data (YYYYMMDD) do jogo mais recente em games, ou None; lida do índice de game_date."""
+    return conn.execute('SELECT MAX(game_date) FROM games').fetchone()[0]
+
+
+# Colunas de game_events usadas pelo contexto de jogo (features.game_context)
+EVENT_CONTEXT_COLUMNS = ['game_id', 'event_number', 'score_margin']
+
+
+def _select_events(columns, where):
+    return f"SELECT {', '.join(columns)} FROM game_events WHERE {where} ORDER BY game_id, event_number"
+
+
+def events_for_games(conn, game_ids, columns=EVENT_CONTEXT_COLUMNS, batch_size=500):
+    """Eventos de uma lista de jogos em ordem (game_id, event_number), lidos do índice UNIQUE de game_events.
+
+    Os lotes seguem a ordem dos game_ids, então o resultado concatenado já sai
+    ordenado para a junção por np.searchsorted de features.game_context.
+    """
+    game_ids = sorted(set(game_ids))
+    frames = [pd.read_sql_query(_select_events(columns, _in_clause('game_id', batch)), conn, params=batch)
+              for batch in (game_ids[i:i + batch_size] for i in range(0, len(game_ids), batch_size))]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+
+
+def load_games(conn, columns=GAME_COLUMNS):
+    """Tabela games inteira (uma linha por jogo: pequena perto dos arremessos)."""
+    return pd.read_sql_query(f"SELECT {', '.join(columns)} FROM games", conn)
+
+
+def player_names(conn):
+    """Tabela players com a coluna de junção já nomeada como player_id."""
+    return pd.read_sql_query('SELECT id AS player_id, player_name FROM players', conn)
+
+
+# Ids distintos dos arremessos (lidos só do índice cobrindo) sem linha na dimensão: um
+# NOT EXISTS por id na chave primária, em vez de um LEFT JOIN para cada arremesso
+MISSING_GAMES = '''
+    SELECT COUNT(*) FROM (SELECT DISTINCT game_id FROM game_shot_charts) s
+    WHERE NOT EXISTS (SELECT 1 FROM games g WHERE g.id = s.game_id)
+'''
+MISSING_PLAYERS = '''
+    SELECT COUNT(*) FROM (SELECT DISTINCT player_id FROM game_shot_charts) s
+    WHERE NOT EXISTS (SELECT 1 FROM players p WHERE p.id = s.player_id)
+'''
+
+
+def missing_game_count(conn):
+    """Jogos com arremessos e sem linha em games (índice (game_id, game_event_id))."""
+    return conn.execute(MISSING_GAMES).fetchone()[0]
+
+
+def missing_player_count(conn):
+    """Jogadores com arremessos e sem linha em players (índice (player_id, season))."""
+    return conn.execute(MISSING_PLAYERS).fetchone()[0]
+
+
+# Consultas representativas e o índice que o plano de execução deve usar
+QUERY_PLAN_EXPECTATIONS = {
+    'shots_for_team': (
+        _select_shots(SHOT_TABLE_COLUMNS, "season IN (?) AND team_id = ?"),
+        ('2024-25', 1610612744), 'idx_shots_season_team'),
+    'shots_for_player': (
+        _select_shots(SHOT_TABLE_COLUMNS, "player_id = ? AND season IN (?)"),
+        (201939, '2024-25'), 'idx_shots_player_season'),
+    'shots_for_game': (
+        _select_shots(SHOT_TABLE_COLUMNS, 'game_id = ?', 'game_event_id'),
+        ('0022400001',), 'idx_shots_game_event'),
+    'shot_seasons': (
+        'SELECT DISTINCT season FROM game_shot_charts ORDER BY season', (), 'idx_shots_season_team'),
+    'shot_partitions': (
+        'SELECT DISTINCT season, team_id FROM game_shot_charts ORDER BY season, team_id', (),
+        'idx_shots_season_team'),
+    'distinct_players': (
+        'SELECT DISTINCT player_id FROM game_shot_charts ORDER BY player_id', (),
+        'idx_shots_player_season'),
+    'first_event_by_game': (
+        'SELECT game_id, MIN(game_event_id) FROM game_shot_charts GROUP BY game_id ORDER BY game_id', (),
+        'idx_shots_game_event'),
+    'missing_games': (MISSING_GAMES, (), 'idx_shots_game_event'),
+    'missing_players': (MISSING_PLAYERS, (), 'idx_shots_player_season'),
+    'games_between': (
+        _select_games_between(GAME_COLUMNS), ('20241101', '20241107'), 'idx_games_date'),
+    'pending_games': (PENDING_GAMES, (), 'idx_games_pending'),
+    'events_for_games': (
+        _select_events(EVENT_CONTEXT_COLUMNS, 'game_id IN (?)'), ('0022400001',), 'sqlite_autoindex_game_events_1'),
+}
+
+
+def explain(conn, sql, params=()):
+    """Retorna as linhas de detalhe do EXPLAIN QUERY PLAN de uma consulta."""
+    return [row[-1] for row in conn.execute(f'EXPLAIN QUERY PLAN {sql}', params)]
+
+
+def check_query_plans(conn):
+    """Confere se cada consulta de QUERY_PLAN_EXPECTATIONS usa o índice esperado.
+
+    Returns:
+        dict: {nome: (ok, linhas do plano)}
+    """
+    results = {}
+    for name, (sql, params, index_name) in QUERY_PLAN_EXPECTATIONS.items():
+        plan = explain(conn, sql, params)
+        uses_index = any(index_name in detail for detail in plan)
+        full_scan = any(detail.startswith('SCAN game_shot_charts') and 'INDEX' not in detail
+                        for detail in plan)
+        results[name] = (uses_index and not full_scan, plan)
+    return results
@@ -0,0 +1,96 @@
+"""Cache em disco das respostas brutas da NBA API, endereçado por conteúdo.
+
+Cada requisição (endpoint + parâmetros) tem uma entrada em
+data/http_cache/requests/ com o sha256 do corpo recebido, a URL e o horário
+da busca; o corpo fica uma única vez em data/http_cache/objects/<sha256>.json.gz,
+de modo que respostas idênticas (ex: uma temporada encerrada re-coletada) não
+ocupam espaço de novo. Uma entrada vale enquanto for mais nova que o TTL
+pedido; ttl=None aceita qualquer idade (respostas de temporadas encerradas,
+replays offline e re-parse nos notebooks).
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+
+import parquet_store
+
+CACHE_DIR = os.path.join(parquet_store.DATA_DIR, 'http_cache')
+
+
+def request_key(endpoint, parameters):
+    """Chave estável de uma requisição: endpoint e parâmetros em ordem."""
+    payload = json.dumps([endpoint, sorted((str(k), str(v)) for k, v in dict(parameters).items())])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class ResponseCache:
+    """Respostas brutas por requisição, com TTL na leitura. Seguro entre threads e processos."""
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _request_path(self, key):
+        return os.path.join(self.cache_dir, 'requests', key[:2], f"{key}.json")
+
+    def _object_path(self, digest):
+        return os.path.join(self.cache_dir, 'objects', digest[:2], f"{digest}.json.gz")
+
+    def entry(self, key):
+        """Metadados da requisição ({'sha256', 'url', 'fetched_at'}) ou None."""
+        try:
+            with open(self._request_path(key)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def is_fresh(self, key, ttl=None):
+        entry = self.entry(key)
+        return entry is not None and (ttl is None or time.time() - entry['fetched_at'] <= ttl)
+
+    def get(self, key, ttl=None):
+        """Corpo da resposta em cache, ou None se ausente ou mais velho que ttl segundos."""
+        entry = self.entry(key)
+        body = None
+        if entry is not None and (ttl is None or time.time() - entry['fetched_at'] <= ttl):
+            try:
+                with gzip.open(self._object_path(entry['sha256']), 'rt', encoding='utf-8') as f:
+                    body = f.read()
+            except FileNotFoundError:
+                body = None
+        with self._lock:
+            if body is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return body
+
+    def put(self, key, body, url=None):
+        """Grava o corpo (se ainda não existe) e aponta a requisição para ele. Retorna o sha256."""
+        data = body.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        object_path = self._object_path(digest)
+        if not os.path.exists(object_path):
+            # compresslevel baixo: a compressão não deve atrasar a coleta
+            _write_atomic(object_path, gzip.compress(data, compresslevel=3))
+        entry = {'sha256': digest, 'url': url, 'fetched_at': time.time()}
+        _write_atomic(self._request_path(key), json.dumps(entry).encode('utf-8'))
+        return digest
+
+    def report(self):
+        total = self.hits + self.misses
+        rate = self.hits / total * 100 if total else 0.0
+        return f"Cache de respostas: {self.hits} acertos, {self.misses} buscas na rede ({rate:.0f}% do cache)"
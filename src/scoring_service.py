@@ -0,0 +1,250 @@
+"""Serviço HTTP de predição em torno de models/xgb_best_model.joblib.
+
+    uvicorn scoring_service:app --app-dir src --port 8000
+    SCORING_BATCH_WINDOW_MS=5 SCORING_MAX_BATCH_SIZE=2048 uvicorn scoring_service:app --app-dir src
+
+O modelo e o FeatureTransformer são carregados uma única vez no startup e
+compartilhados por todas as requisições. Cada requisição só codifica seus
+arremessos; o MicroBatcher junta as matrizes que chegam dentro da janela
+SCORING_BATCH_WINDOW_MS (0 desliga a espera) em uma única chamada vetorizada
+de predict_proba, executada fora do event loop. Se o preditor NumPy tiver sido
+exportado (python src/tree_predictor.py), lotes pequenos usam ele.
+
+Endpoints:
+    POST /predict        um arremesso -> shot_probability
+    POST /predict/batch  lista de arremessos -> lista de shot_probability
+    GET  /metrics        latência p50/p99, vazão e tamanho médio dos lotes
+    GET  /health         versão do modelo e hash das features carregados
+"""
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+import joblib
+import numpy as np
+import pandas as pd
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel, Field
+
+import features
+import tree_predictor
+from tree_predictor import model_version
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_PATH = os.environ.get('SCORING_MODEL_PATH', os.path.join(BASE_DIR, '..', 'models', 'xgb_best_model.joblib'))
+# Tempo máximo que uma requisição espera por outras para formar um lote
+BATCH_WINDOW_MS = float(os.environ.get('SCORING_BATCH_WINDOW_MS', '2'))
+# Linhas por chamada de predict_proba; o lote fecha antes da janela ao atingir o limite
+MAX_BATCH_SIZE = int(os.environ.get('SCORING_MAX_BATCH_SIZE', '4096'))
+# Lotes até este tamanho usam o TreePredictor (NumPy), mais rápido que o XGBoost em poucas linhas
+SMALL_BATCH_ROWS = int(os.environ.get('SCORING_SMALL_BATCH_ROWS', '8'))
+# Arremessos aceitos por requisição em /predict/batch
+MAX_REQUEST_SHOTS = 100_000
+# Latências guardadas para os percentis (janela deslizante)
+METRICS_WINDOW = 10_000
+
+
+class Shot(BaseModel):
+    """Arremesso bruto, com os mesmos campos de game_shot_charts usados pelo modelo."""
+    loc_x: float
+    loc_y: float
+    shot_distance: float
+    period: int = Field(ge=1)
+    minutes_remaining: int = Field(ge=0, le=12)
+    seconds_remaining: int = Field(ge=0, le=59)
+    action_type: Optional[str] = None
+    shot_type: Optional[str] = None
+    shot_zone_basic: Optional[str] = None
+    shot_zone_area: Optional[str] = None
+    shot_zone_range: Optional[str] = None
+
+
+class ShotBatch(BaseModel):
+    shots: List[Shot] = Field(max_length=MAX_REQUEST_SHOTS)
+
+
+class LatencyMetrics:
+    """Latências e contadores do serviço, compartilhados entre as requisições."""
+
+    def __init__(self, window=METRICS_WINDOW):
+        self._lock = threading.Lock()
+        self._latencies = {}
+        self._window = window
+        self.started = time.perf_counter()
+        self.requests = 0
+        self.shots = 0
+        self.batches = 0
+        self.batched_rows = 0
+
+    def record_request(self, endpoint, seconds, n_shots):
+        with self._lock:
+            self._latencies.setdefault(endpoint, deque(maxlen=self._window)).append(seconds)
+            self.requests += 1
+            self.shots += n_shots
+
+    def record_batch(self, n_rows):
+        with self._lock:
+            self.batches += 1
+            self.batched_rows += n_rows
+
+    def summary(self):
+        with self._lock:
+            uptime = time.perf_counter() - self.started
+            latency = {}
+            for endpoint, values in self._latencies.items():
+                p50, p99 = np.percentile(np.fromiter(values, dtype=np.float64), [50, 99]) * 1000
+                latency[endpoint] = {'p50_ms': round(p50, 3), 'p99_ms': round(p99, 3), 'samples': len(values)}
+            return {
+                'uptime_s': round(uptime, 1),
+                'requests': self.requests,
+                'shots': self.shots,
+                'requests_per_s': round(self.requests / uptime, 1),
+                'shots_per_s': round(self.shots / uptime, 1),
+                'model_calls': self.batches,
+                'mean_batch_rows': round(self.batched_rows / self.batches, 1) if self.batches else 0.0,
+                'latency': latency,
+            }
+
+
+class MicroBatcher:
+    """Agrupa matrizes de features de requisições concorrentes em uma só chamada ao modelo.
+
+    Cada submit devolve um future; a tarefa de fundo espera a primeira matriz,
+    recolhe as que chegam até fechar a janela (ou MAX_BATCH_SIZE linhas),
+    empilha tudo, chama predict_proba em uma thread e reparte o resultado.
+    Lotes de até SMALL_BATCH_ROWS linhas vão para o small_model, se houver.
+    """
+
+    def __init__(self, model, metrics, window_ms=BATCH_WINDOW_MS, max_batch_size=MAX_BATCH_SIZE,
+                 small_model=None, small_batch_rows=SMALL_BATCH_ROWS):
+        self.model = model
+        self.small_model = small_model
+        self.small_batch_rows = small_batch_rows
+        self.metrics = metrics
+        self.window = window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self._queue = None
+        self._task = None
+
+    def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    async def submit(self, rows):
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((rows, future))
+        return await future
+
+    async def _collect(self):
+        pending = [await self._queue.get()]
+        n_rows = len(pending[0][0])
+        deadline = time.perf_counter() + self.window
+        while n_rows < self.max_batch_size:
+            try:
+                item = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            pending.append(item)
+            n_rows += len(item[0])
+        return pending
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = await self._collect()
+            matrix = pending[0][0] if len(pending) == 1 else np.concatenate([rows for rows, _ in pending])
+            try:
+                probabilities = await loop.run_in_executor(None, self._predict, matrix)
+            except Exception as error:
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(error)
+                continue
+            self.metrics.record_batch(len(matrix))
+            start = 0
+            for rows, future in pending:
+                # Requisições canceladas (cliente desconectou) são ignoradas
+                if not future.done():
+                    future.set_result(probabilities[start:start + len(rows)])
+                start += len(rows)
+
+    def _predict(self, matrix):
+        if self.small_model is not None and len(matrix) <= self.small_batch_rows:
+            return self.small_model.predict_proba(matrix)[:, 1]
+        return self.model.predict_proba(matrix)[:, 1]
+
+
+def load_artifacts(model_path=MODEL_PATH):
+    """Modelo, preditor NumPy (se exportado) e transformador, carregados uma vez por processo."""
+    model = joblib.load(model_path)
+    transformer = features.FeatureTransformer.load(features.transformer_path(model_path))
+    transformer.check_model(model)
+    predictor = tree_predictor.load_predictor(model_path)
+    return model, predictor, transformer
+
+
+@asynccontextmanager
+async def lifespan(app):
+    model, predictor, transformer = load_artifacts(MODEL_PATH)
+    metrics = LatencyMetrics()
+    batcher = MicroBatcher(model, metrics, small_model=predictor)
+    batcher.start()
+    app.state.transformer = transformer
+    app.state.metrics = metrics
+    app.state.batcher = batcher
+    app.state.model_version = f"{model_version(MODEL_PATH)}_{transformer.fingerprint()}"
+    print(f"Modelo {app.state.model_version} carregado "
+          f"(janela de {BATCH_WINDOW_MS} ms, até {MAX_BATCH_SIZE} linhas por lote, "
+          f"preditor NumPy {'ativo' if predictor is not None else 'não exportado'})")
+    yield
+    await batcher.stop()
+
+
+app = FastAPI(title="NBA Shot Prediction", lifespan=lifespan)
+
+
+@app.post('/predict')
+async def predict(shot: Shot):
+    start = time.perf_counter()
+    row = app.state.transformer.transform_one(shot.model_dump())
+    probability = await app.state.batcher.submit(row[np.newaxis, :])
+    app.state.metrics.record_request('predict', time.perf_counter() - start, 1)
+    return {'shot_probability': float(probability[0]), 'model_version': app.state.model_version}
+
+
+@app.post('/predict/batch')
+async def predict_batch(batch: ShotBatch):
+    start = time.perf_counter()
+    if not batch.shots:
+        raise HTTPException(status_code=422, detail="Lista de arremessos vazia")
+    df_shots = pd.DataFrame([shot.model_dump() for shot in batch.shots])
+    probabilities = await app.state.batcher.submit(app.state.transformer.transform(df_shots))
+    app.state.metrics.record_request('predict_batch', time.perf_counter() - start, len(df_shots))
+    return {'shot_probability': probabilities.tolist(), 'model_version': app.state.model_version}
+
+
+@app.get('/metrics')
+async def metrics():
+    return app.state.metrics.summary()
+
+
+@app.get('/health')
+async def health():
+    return {'status': 'ok', 'model_version': app.state.model_version}
@@ -0,0 +1,293 @@
+"""Armazenamento do SQLite em um arquivo por temporada, federado por um catálogo.
+
+    python src/season_store.py --list
+    python src/season_store.py --split nba_shots.legacy.sqlite
+    python src/season_store.py --seal 2022-23 2023-24
+
+nba_shots.sqlite guarda só o catálogo (tabela season_catalog); os dados de
+cada temporada ficam em seasons/nba_shots_<temporada>.sqlite, com o esquema
+completo de configs/database_setup.py (arremessos, jogos, eventos, times,
+jogadores, posições e o etl_manifest dos coletores). Coletores abrem o arquivo
+da temporada com open_season(), de modo que coletas de temporadas diferentes
+rodam em paralelo sem disputar o lock de escrita.
+
+Leitores usam connect(): a conexão anexa (ATTACH) só os arquivos das
+temporadas pedidas e cria views temporárias com os nomes das tabelas
+originais, então as consultas de queries.py funcionam sem mudança e uma
+consulta de uma temporada só toca o arquivo dela. Temporadas seladas
+(--seal) ficam somente leitura e são anexadas como imutáveis: o SQLite
+dispensa locks e detecção de mudanças, e caches derivados do arquivo nunca
+precisam ser invalidados. Um banco único no formato antigo continua
+funcionando: connect() devolve a conexão direta.
+
+Os ids de game_shot_charts são únicos dentro de cada temporada; entre
+temporadas, identifique um arremesso por (season, id).
+"""
+import argparse
+import os
+import sqlite3
+import sys
+from contextlib import closing
+from datetime import datetime, timezone
+from urllib.parse import quote
+
+import bulk_loader
+import etl_manifest
+import queries
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'configs'))
+import database_setup  # noqa: E402
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_NAME = os.path.join(BASE_DIR, '..', 'nba_shots.sqlite')
+SEASONS_DIRNAME = 'seasons'
+# Espera por locks de escrita (ex: dois coletores registrando temporadas no catálogo)
+BUSY_TIMEOUT = 30
+
+CATALOG_DDL = '''
+CREATE TABLE IF NOT EXISTS season_catalog (
+    season TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    read_only INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL,
+    sealed_at TEXT
+);'''
+
+# Tabelas dos arquivos de temporada expostas como views na conexão federada.
+# Tabelas particionadas por temporada são concatenadas; dimensões compartilhadas
+# (o mesmo jogador ou time em várias temporadas) são deduplicadas com UNION.
+FEDERATED_TABLES = {
+    'game_shot_charts': 'UNION ALL',
+    'player_positions': 'UNION ALL',
+    'etl_manifest': 'UNION ALL',
+    'games': 'UNION ALL',
+    'game_events': 'UNION ALL',
+    'teams': 'UNION',
+    'players': 'UNION',
+}
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec='seconds')
+
+
+def _schema_name(season):
+    return f"season_{season.replace('-', '_')}"
+
+
+def _uri(path, **options):
+    query = '&'.join(f"{key}={value}" for key, value in options.items())
+    return f"file:{quote(os.path.abspath(path))}" + (f"?{query}" if query else '')
+
+
+def season_path(season, db_name=DB_NAME):
+    """Arquivo da temporada, em seasons/ ao lado do catálogo."""
+    stem = os.path.splitext(os.path.basename(db_name))[0]
+    return os.path.join(os.path.dirname(os.path.abspath(db_name)), SEASONS_DIRNAME, f"{stem}_{season}.sqlite")
+
+
+def is_catalog(conn):
+    row = conn.execute("SELECT 1 FROM main.sqlite_master WHERE type = 'table' AND name = 'season_catalog'").fetchone()
+    return row is not None
+
+
+def _catalog_entries(conn, seasons=None):
+    """Linhas (season, caminho absoluto, read_only) do catálogo, em ordem de temporada."""
+    base_dir = os.path.dirname(os.path.abspath(conn.execute('PRAGMA database_list').fetchone()[2]))
+    rows = conn.execute('SELECT season, path, read_only FROM season_catalog ORDER BY season').fetchall()
+    if seasons is not None:
+        rows = [row for row in rows if row[0] in seasons]
+    return [(season, os.path.join(base_dir, path), bool(read_only)) for season, path, read_only in rows]
+
+
+def list_seasons(db_name=DB_NAME):
+    """Temporadas disponíveis: as do catálogo ou, em um banco único, as de game_shot_charts."""
+    with closing(sqlite3.connect(db_name)) as conn:
+        if is_catalog(conn):
+            return [season for season, _, _ in _catalog_entries(conn)]
+        return queries.shot_seasons(conn)
+
+
+def open_season(season, db_name=DB_NAME):
+    """Conexão de escrita ao arquivo de uma temporada, criado e registrado no catálogo se preciso.
+
+    Raises:
+        ValueError: Se a temporada está selada (somente leitura)
+    """
+    with closing(sqlite3.connect(db_name, timeout=BUSY_TIMEOUT)) as catalog:
+        catalog.execute(CATALOG_DDL)
+        row = catalog.execute('SELECT read_only FROM season_catalog WHERE season = ?', (season,)).fetchone()
+        if row is not None and row[0]:
+            raise ValueError(f"Temporada {season} está selada (somente leitura); use --unseal para reabri-la")
+        path = season_path(season, db_name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT)
+        # WAL: o dashboard e os notebooks continuam lendo a temporada durante a coleta
+        conn.execute('PRAGMA journal_mode = WAL')
+        database_setup.migrate(conn)
+        etl_manifest.ensure_manifest_table(conn)
+        if row is None:
+            with catalog:
+                catalog.execute('INSERT OR IGNORE INTO season_catalog (season, path, created_at) VALUES (?, ?, ?)',
+                                (season, os.path.relpath(path, os.path.dirname(os.path.abspath(db_name))), _now()))
+    return conn
+
+
+def _create_views(conn, schemas):
+    for table, combine in FEDERATED_TABLES.items():
+        members = [schema for schema in schemas if conn.execute(
+            f"SELECT 1 FROM {schema}.sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()]
+        if members:
+            # Arquivos selados não recebem migrações novas: a view expõe só as colunas comuns
+            member_columns = [_table_columns(conn, table, schema) for schema in members]
+            columns = [column for column in member_columns[0] if all(column in other for other in member_columns)]
+            select = f" {combine} ".join(f"SELECT {', '.join(columns)} FROM {schema}.{table}" for schema in members)
+            conn.execute(f"CREATE TEMP VIEW {table} AS {select}")
+
+
+def connect(db_name=DB_NAME, seasons=None):
+    """Conexão de leitura com as temporadas pedidas anexadas (todas, se None).
+
+    As tabelas de FEDERATED_TABLES aparecem como views temporárias sobre os
+    arquivos anexados. Temporadas fora do catálogo são ignoradas, como em um
+    filtro por temporada no banco único.
+
+    Raises:
+        ValueError: Se nenhuma temporada pedida existe, ou se são mais do que o
+            limite de ATTACH do SQLite (use iter_connections)
+    """
+    conn = sqlite3.connect(_uri(db_name, mode='rw'), uri=True, timeout=BUSY_TIMEOUT)
+    if not is_catalog(conn):
+        return conn
+    if isinstance(seasons, str):
+        seasons = [seasons]
+    entries = _catalog_entries(conn, seasons)
+    limit = conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+    if not entries or len(entries) > limit:
+        conn.close()
+        raise ValueError(f"{len(entries)} temporadas para anexar (pedidas: {seasons or 'todas'}); "
+                         f"uma conexão aceita de 1 a {limit}")
+    for season, path, read_only in entries:
+        # Temporadas seladas não mudam: immutable=1 dispensa locks e verificação de mudanças
+        uri = _uri(path, immutable=1) if read_only else _uri(path, mode='rw')
+        conn.execute(f"ATTACH DATABASE ? AS {_schema_name(season)}", (uri,))
+    _create_views(conn, [_schema_name(season) for season, _, _ in entries])
+    return conn
+
+
+def iter_connections(db_name=DB_NAME, seasons=None):
+    """Conexões federadas sobre grupos de temporadas que cabem no limite de ATTACH (uma só em banco único)."""
+    with closing(sqlite3.connect(db_name)) as conn:
+        if not is_catalog(conn):
+            groups = [seasons]
+        else:
+            available = [season for season, _, _ in _catalog_entries(conn, seasons)]
+            limit = conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+            groups = [available[i:i + limit] for i in range(0, len(available), limit)]
+    for group in groups:
+        with closing(connect(db_name, group)) as conn:
+            yield conn
+
+
+def seal(season, db_name=DB_NAME):
+    """Compacta o arquivo de uma temporada encerrada e o marca como somente leitura."""
+    path = season_path(season, db_name)
+    with closing(sqlite3.connect(path)) as conn:
+        conn.execute('ANALYZE')
+        # Sem WAL: um arquivo imutável não pode ter páginas pendentes no -wal
+        conn.execute('PRAGMA journal_mode = DELETE')
+        conn.execute('VACUUM')
+    os.chmod(path, 0o444)
+    with closing(sqlite3.connect(db_name, timeout=BUSY_TIMEOUT)) as catalog, catalog:
+        catalog.execute('UPDATE season_catalog SET read_only = 1, sealed_at = ? WHERE season = ?', (_now(), season))
+    print(f"Temporada {season} selada ({os.path.getsize(path) / 1e6:.1f} MB, somente leitura)")
+
+
+def unseal(season, db_name=DB_NAME):
+    os.chmod(season_path(season, db_name), 0o644)
+    with closing(sqlite3.connect(db_name, timeout=BUSY_TIMEOUT)) as catalog, catalog:
+        catalog.execute('UPDATE season_catalog SET read_only = 0, sealed_at = NULL WHERE season = ?', (season,))
+    print(f"Temporada {season} reaberta para escrita")
+
+
+def _table_columns(conn, table, schema='main'):
+    return [row[1] for row in conn.execute(f'PRAGMA {schema}.table_info({table})')]
+
+
+def split_database(source, db_name=DB_NAME):
+    """Copia um banco único (formato antigo) para um arquivo por temporada registrado no catálogo.
+
+    O banco de origem não é alterado; ele não pode ser o próprio catálogo.
+    """
+    if os.path.abspath(source) == os.path.abspath(db_name):
+        raise ValueError(f"Renomeie {source} antes de dividi-lo: o catálogo usa o mesmo caminho")
+    with closing(sqlite3.connect(source)) as legacy:
+        tables = {row[0] for row in legacy.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        seasons = set(queries.shot_seasons(legacy))
+        for table in ('player_positions', 'etl_manifest'):
+            if table in tables:
+                seasons |= {row[0] for row in legacy.execute(
+                    f'SELECT DISTINCT season FROM {table} WHERE season IS NOT NULL')}
+
+    # Linhas de cada tabela que pertencem à temporada (parâmetro: a temporada)
+    season_filters = {
+        'game_shot_charts': 'season = ?',
+        'player_positions': 'season = ?',
+        'etl_manifest': 'season = ?',
+        'games': 'id IN (SELECT game_id FROM legacy.game_shot_charts WHERE season = ?)',
+        'game_events': 'game_id IN (SELECT game_id FROM legacy.game_shot_charts WHERE season = ?)',
+        'empty_play_by_play': 'game_id IN (SELECT game_id FROM legacy.game_shot_charts WHERE season = ?)',
+        'teams': 'id IN (SELECT team_id FROM legacy.game_shot_charts WHERE season = ?)',
+        'players': 'id IN (SELECT player_id FROM legacy.game_shot_charts WHERE season = ?)',
+    }
+    for season in sorted(seasons):
+        conn = open_season(season, db_name)
+        conn.execute('ATTACH DATABASE ? AS legacy', (source,))
+        copied = {}
+        with bulk_loader.deferred_indexes(conn), conn:
+            for table, where in season_filters.items():
+                if table not in tables:
+                    continue
+                columns = ', '.join(column for column in _table_columns(conn, table)
+                                    if column in _table_columns(conn, table, 'legacy'))
+                cursor = conn.execute(f"INSERT OR IGNORE INTO main.{table} ({columns}) "
+                                      f"SELECT {columns} FROM legacy.{table} WHERE {where}", (season,))
+                copied[table] = cursor.rowcount
+            # Bancos anteriores à migração 5: jogos sem temporada e com a data fixa do fix_missing_data
+            conn.execute('UPDATE games SET season = ? WHERE season IS NULL', (season,))
+            if season != database_setup.LEGACY_PLACEHOLDER_SEASON:
+                conn.execute('UPDATE games SET game_date = NULL WHERE game_date = ?',
+                             (database_setup.LEGACY_PLACEHOLDER_DATE,))
+        conn.execute('DETACH DATABASE legacy')
+        # As cópias por INSERT ... SELECT não passam pelo bulk_loader: contadores refeitos uma vez
+        bulk_loader.recount(conn)
+        conn.close()
+        print(f"Temporada {season}: " + ', '.join(f"{count} {table}" for table, count in copied.items()))
+
+
+def print_catalog(db_name=DB_NAME):
+    with closing(sqlite3.connect(db_name)) as conn:
+        if not is_catalog(conn):
+            print(f"{db_name} é um banco único (sem catálogo de temporadas)")
+            return
+        for season, path, read_only in _catalog_entries(conn):
+            size = os.path.getsize(path) / 1e6 if os.path.exists(path) else 0
+            print(f"{season}  {'selada ' if read_only else 'aberta '} {size:>8.1f} MB  {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db', default=DB_NAME, help='Catálogo de temporadas')
+    parser.add_argument('--list', action='store_true')
+    parser.add_argument('--split', metavar='BANCO_UNICO', help='Divide um banco no formato antigo por temporada')
+    parser.add_argument('--seal', nargs='+', metavar='TEMPORADA')
+    parser.add_argument('--unseal', nargs='+', metavar='TEMPORADA')
+    args = parser.parse_args()
+    if args.split:
+        split_database(args.split, args.db)
+    for season in args.seal or []:
+        seal(season, args.db)
+    for season in args.unseal or []:
+        unseal(season, args.db)
+    if args.list or not (args.split or args.seal or args.unseal):
+        print_catalog(args.db)
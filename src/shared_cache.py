@@ -0,0 +1,177 @@
+"""Cache em disco, mapeado em memória, dos dados do dashboard compartilhado entre sessões.
+
+O frame de análise é gravado como arquivo Arrow IPC e a matriz de features
+como .npy float32, ambos ordenados por (time, jogador), com um índice de
+faixas de linhas (início, fim) por team_id e, dentro de cada time, por
+player_id. Colunas de texto viram categóricas (códigos inteiros + dicionário).
+Abertos com memory map, os buffers ficam no cache de páginas do sistema
+operacional e são compartilhados por todas as sessões e processos do
+Streamlit: nenhuma sessão copia os dados completos, e selecionar um time é um
+slice sem cópia da matriz e do Arrow em vez de uma máscara booleana sobre o
+frame inteiro.
+
+    data/cache/<nome>.arrow          frame de análise (Arrow IPC, sem compressão)
+    data/cache/<nome>.features.npy   matriz de features do modelo (opcional)
+    data/cache/<nome>.json           versão da fonte e faixas de linhas por time/jogador
+"""
+import json
+import os
+
+import numpy as np
+import pyarrow as pa
+
+import parquet_store
+
+CACHE_DIR = os.path.join(parquet_store.DATA_DIR, 'cache')
+TEAM_COLUMN = 'team_id'
+PLAYER_COLUMN = 'player_id'
+# Muda quando o layout dos arquivos muda; caches de outro formato são refeitos
+CACHE_FORMAT = 2
+
+
+def _paths(name, cache_dir):
+    base = os.path.join(cache_dir, name)
+    return base + '.arrow', base + '.features.npy', base + '.json'
+
+
+def _replace(write, path):
+    """Grava em um arquivo temporário e troca de uma vez: leitores nunca veem arquivo parcial."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def row_ranges(sorted_values):
+    """Faixas (início, fim) de cada valor em um array já ordenado, em O(valores distintos)."""
+    sorted_values = np.asarray(sorted_values)
+    unique_values, starts = np.unique(sorted_values, return_index=True)
+    stops = np.append(starts[1:], len(sorted_values))
+    return {value.item(): (int(start), int(stop)) for value, start, stop in zip(unique_values, starts, stops)}
+
+
+def sort_by_team_player(df):
+    """Ordem estável por (team_id, player_id) e as faixas de jogadores relativas ao início de cada time."""
+    order = np.lexsort((df[PLAYER_COLUMN].to_numpy(), df[TEAM_COLUMN].to_numpy()))
+    team_ids = df[TEAM_COLUMN].to_numpy()[order]
+    player_ids = df[PLAYER_COLUMN].to_numpy()[order]
+    team_offsets = row_ranges(team_ids)
+    player_offsets = {team_id: row_ranges(player_ids[start:stop]) for team_id, (start, stop) in team_offsets.items()}
+    return order, team_offsets, player_offsets
+
+
+class SharedDataset:
+    """Frame de análise e matriz de features mapeados em memória, com faixas de linhas por time."""
+
+    def __init__(self, table, features, offsets, player_offsets, version):
+        self.table = table
+        self.features = features
+        self.offsets = offsets
+        self.player_offsets = player_offsets
+        self.version = version
+
+    @property
+    def team_ids(self):
+        return list(self.offsets)
+
+    def team_range(self, team_id):
+        return self.offsets.get(int(team_id), (0, 0))
+
+    def team_player_ranges(self, team_id):
+        """Faixas de linhas de cada jogador dentro do frame do time (relativas a team_frame)."""
+        return self.player_offsets.get(int(team_id), {})
+
+    def team_frame(self, team_id):
+        """Linhas do time como DataFrame (só elas são convertidas, a partir do Arrow mapeado)."""
+        start, stop = self.team_range(team_id)
+        return self.table.slice(start, stop - start).to_pandas()
+
+    def team_features(self, team_id):
+        """Visão somente leitura das linhas do time na matriz de features (sem cópia)."""
+        start, stop = self.team_range(team_id)
+        return self.features[start:stop]
+
+
+def build(name, df, features=None, version='', cache_dir=CACHE_DIR):
+    """Ordena por (time, jogador), grava o Arrow, a matriz e o índice de faixas."""
+    os.makedirs(cache_dir, exist_ok=True)
+    arrow_path, features_path, meta_path = _paths(name, cache_dir)
+    order, team_offsets, player_offsets = sort_by_team_player(df)
+
+    df_sorted = df.iloc[order]
+    # Texto como categórica: o Arrow guarda códigos inteiros e um dicionário por coluna
+    text_columns = [column for column in df_sorted.columns if df_sorted[column].dtype == object]
+    df_sorted = df_sorted.astype({column: 'category' for column in text_columns})
+    table = pa.Table.from_pandas(df_sorted, preserve_index=False)
+
+    def write_arrow(path):
+        with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    _replace(write_arrow, arrow_path)
+
+    if features is not None:
+        matrix = np.ascontiguousarray(np.asarray(features, dtype=np.float32)[order])
+
+        def write_features(path):
+            with open(path, 'wb') as f:
+                np.save(f, matrix)
+        _replace(write_features, features_path)
+    elif os.path.exists(features_path):
+        os.remove(features_path)
+
+    # O índice é gravado por último: ele marca o cache como completo para a versão
+    meta = {'version': version, 'format': CACHE_FORMAT, 'rows': len(df), 'offsets': team_offsets,
+            'player_offsets': player_offsets}
+
+    def write_meta(path):
+        with open(path, 'w') as f:
+            json.dump(meta, f)
+    _replace(write_meta, meta_path)
+    return meta
+
+
+def open_dataset(name, cache_dir=CACHE_DIR):
+    """Abre o cache com memory map, ou None se ele não existe."""
+    arrow_path, features_path, meta_path = _paths(name, cache_dir)
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path) as f:
+        meta = json.load(f)
+    table = pa.ipc.open_file(pa.memory_map(arrow_path, 'r')).read_all()
+    features = np.load(features_path, mmap_mode='r') if os.path.exists(features_path) else None
+    offsets = {int(team_id): tuple(bounds) for team_id, bounds in meta['offsets'].items()}
+    player_offsets = {int(team_id): {int(player_id): tuple(bounds) for player_id, bounds in players.items()}
+                      for team_id, players in meta['player_offsets'].items()}
+    return SharedDataset(table, features, offsets, player_offsets, meta['version'])
+
+
+def cached_version(name, cache_dir=CACHE_DIR):
+    meta_path = _paths(name, cache_dir)[2]
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path) as f:
+        meta = json.load(f)
+    return meta['version'] if meta.get('format') == CACHE_FORMAT else None
+
+
+def open_or_build(name, version, build_source, cache_dir=CACHE_DIR):
+    """Abre o cache da versão informada, reconstruindo-o antes se estiver ausente ou desatualizado.
+
+    Args:
+        version (str): Identifica a fonte (ex.: mtimes dos arquivos + hash das features)
+        build_source (callable): Retorna (df, features) quando o cache precisa ser refeito
+    """
+    if cached_version(name, cache_dir) != version:
+        df, features = build_source()
+        build(name, df, features, version, cache_dir)
+    return open_dataset(name, cache_dir)
+
+
+def source_version(paths, extra=''):
+    """Versão da fonte a partir do número de arquivos e do mtime mais recente entre eles."""
+    mtimes = []
+    for path in paths:
+        if os.path.isdir(path):
+            mtimes.extend(os.path.getmtime(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files)
+        elif os.path.exists(path):
+            mtimes.append(os.path.getmtime(path))
+    return f"{len(mtimes)}_{max(mtimes, default=0):.0f}_{extra}"
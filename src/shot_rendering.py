@@ -0,0 +1,230 @@
+"""Renderização dos gráficos da aba de jogador em PNG, com cache LRU compartilhado.
+
+Os gráficos são desenhados em matplotlib.figure.Figure avulsas (fora do estado
+global do pyplot, liberadas assim que o PNG é gerado). O que não depende do
+jogador (linhas da quadra; eixos, rótulos e distribuição do time) é
+renderizado uma única vez como camada RGBA e colado com figimage, sem
+reamostragem; cada jogador só desenha os próprios pontos e curvas.
+Distribuições de distância e mapas de densidade saem de histogramas do NumPy
+suavizados por um kernel gaussiano em grade fixa, em vez de um KDE por
+renderização. O RenderCache guarda os PNGs por chave (versão do modelo, time,
+temporada, jogador, gráfico) e descarta os menos usados acima de
+MAX_CACHED_IMAGES.
+"""
+import io
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.patches import Arc, Circle, Patch, Rectangle
+
+# Meia quadra em décimos de pé, com a cesta em (0, 0)
+COURT_X = (-250, 250)
+COURT_Y = (-47.5, 422.5)
+SHOT_CHART_SIZE = (6, 5.5)
+DISTANCE_CHART_SIZE = (8, 4.5)
+DPI = 80
+# Compressão zlib rápida: o PNG fica maior, mas a codificação cai de ~30 ms para poucos ms
+PNG_COMPRESS_LEVEL = 1
+MAX_CACHED_IMAGES = 256
+
+# Cores do shot chart por (shot_made_flag, predicted_outcome)
+RESULT_COLORS = {(1, 1): 'green', (0, 0): 'red', (0, 1): 'orange', (1, 0): 'purple'}
+# Histograma de distância (pés) e grade fina da curva de densidade
+DISTANCE_BINS = np.arange(0, 92, 2)
+DISTANCE_GRID_STEP = 0.5
+DISTANCE_BANDWIDTH = 1.5
+# Grade do mapa de densidade (células de 10 x 10 décimos de pé) e suavização em células
+DENSITY_BINS = (50, 47)
+DENSITY_SIGMA = 1.5
+
+
+def draw_court(ax, color='gray', lw=2, zorder=0):
+    hoop = Circle((0, 0), radius=7.5, linewidth=lw, color=color, fill=False, zorder=zorder)
+    backboard = Rectangle((-30, -7.5), 60, -1, linewidth=lw, color=color, zorder=zorder)
+    outer_box = Rectangle((-80, -47.5), 160, 190, linewidth=lw, color=color, fill=False, zorder=zorder)
+    inner_box = Rectangle((-60, -47.5), 120, 190, linewidth=lw, color=color, fill=False, zorder=zorder)
+    three_point_arc = Arc((0, 0), 475, 475, theta1=22, theta2=158, linewidth=lw, color=color, fill=False,
+                          zorder=zorder)
+    ax.plot([-220, -220], [-47.5, 92.5], linewidth=lw, color=color, zorder=zorder)
+    ax.plot([220, 220], [-47.5, 92.5], linewidth=lw, color=color, zorder=zorder)
+    for element in [hoop, backboard, outer_box, inner_box, three_point_arc]:
+        ax.add_patch(element)
+    return ax
+
+
+def _court_axes(fig):
+    ax = fig.add_axes([0.02, 0.02, 0.96, 0.9])
+    ax.set_xlim(*COURT_X)
+    ax.set_ylim(*COURT_Y)
+    ax.set_aspect('equal')
+    ax.axis('off')
+    return ax
+
+
+def _render_layer(fig):
+    """Desenha a figura uma vez e devolve o RGBA do tamanho da figura, para reuso com figimage."""
+    canvas = FigureCanvasAgg(fig)
+    canvas.draw()
+    layer = np.asarray(canvas.buffer_rgba()).copy()
+    layer.setflags(write=False)
+    return layer
+
+
+def _to_png(fig):
+    buffer = io.BytesIO()
+    FigureCanvasAgg(fig).print_png(buffer, pil_kwargs={'compress_level': PNG_COMPRESS_LEVEL})
+    return buffer.getvalue()
+
+
+@lru_cache(maxsize=4)
+def court_background(figsize=SHOT_CHART_SIZE, dpi=DPI):
+    """Linhas da quadra renderizadas uma vez como camada RGBA transparente do tamanho da figura."""
+    fig = Figure(figsize=figsize, dpi=dpi)
+    fig.patch.set_alpha(0)
+    draw_court(_court_axes(fig))
+    return _render_layer(fig)
+
+
+def _gaussian_kernel(sigma):
+    radius = max(1, int(round(3 * sigma)))
+    offsets = np.arange(-radius, radius + 1)
+    kernel = np.exp(-0.5 * (offsets / sigma) ** 2)
+    return kernel / kernel.sum()
+
+
+def distance_profile(distances):
+    """Histograma de densidade e curva suavizada da distância dos arremessos (NumPy).
+
+    A curva é um histograma fino convoluído com um kernel gaussiano, o que
+    equivale a um KDE avaliado em grade, sem custo por ponto.
+    """
+    distances = np.asarray(distances, dtype=np.float64)
+    grid_edges = np.arange(DISTANCE_BINS[0], DISTANCE_BINS[-1] + DISTANCE_GRID_STEP, DISTANCE_GRID_STEP)
+    centers = (grid_edges[:-1] + grid_edges[1:]) / 2
+    if len(distances) == 0:
+        return {'hist': np.zeros(len(DISTANCE_BINS) - 1), 'curve_x': centers, 'curve_y': np.zeros(len(centers)),
+                'max_distance': 0.0}
+    hist, _ = np.histogram(distances, bins=DISTANCE_BINS, density=True)
+    fine, _ = np.histogram(distances, bins=grid_edges, density=True)
+    curve = np.convolve(fine, _gaussian_kernel(DISTANCE_BANDWIDTH / DISTANCE_GRID_STEP), mode='same')
+    return {'hist': hist, 'curve_x': centers, 'curve_y': curve, 'max_distance': float(distances.max())}
+
+
+def density_grid(loc_x, loc_y):
+    """Mapa de densidade dos arremessos na meia quadra: histograma 2D suavizado, normalizado em [0, 1]."""
+    grid, _, _ = np.histogram2d(np.asarray(loc_x, dtype=np.float64), np.asarray(loc_y, dtype=np.float64),
+                                bins=DENSITY_BINS, range=[COURT_X, COURT_Y])
+    kernel = _gaussian_kernel(DENSITY_SIGMA)
+    grid = np.apply_along_axis(np.convolve, 0, grid, kernel, mode='same')
+    grid = np.apply_along_axis(np.convolve, 1, grid, kernel, mode='same')
+    peak = grid.max()
+    return (grid / peak if peak > 0 else grid).T
+
+
+def render_shot_chart(loc_x, loc_y, shot_made_flag, predicted_outcome, title):
+    """Shot chart colorido pelo acerto real vs previsto, sobre o fundo de quadra em cache."""
+    fig = Figure(figsize=SHOT_CHART_SIZE, dpi=DPI)
+    fig.figimage(court_background(), origin='upper', zorder=-1)
+    ax = _court_axes(fig)
+    outcome = np.asarray(shot_made_flag) * 2 + np.asarray(predicted_outcome)
+    colors = np.array([RESULT_COLORS[(made, predicted)] for made in (0, 1) for predicted in (0, 1)])
+    ax.scatter(loc_x, loc_y, c=colors[outcome], alpha=0.8, s=40)
+    ax.set_title(title, fontsize=10)
+    return _to_png(fig)
+
+
+def render_density_chart(grid, title):
+    """Mapa de densidade (de density_grid) com as linhas da quadra em cache por cima."""
+    fig = Figure(figsize=SHOT_CHART_SIZE, dpi=DPI)
+    ax = _court_axes(fig)
+    ax.imshow(grid, extent=(*COURT_X, *COURT_Y), origin='lower', cmap='YlOrRd', alpha=0.85)
+    fig.figimage(court_background(), origin='upper', zorder=1)
+    ax.set_title(title, fontsize=10)
+    return _to_png(fig)
+
+
+class DistanceChart:
+    """Distribuição de distância do time renderizada uma vez; cada jogador só desenha a própria camada.
+
+    Eixos, rótulos, título e a distribuição do time ficam numa camada RGBA
+    fixa. O eixo y usa o maior pico entre o time e todos os jogadores, para que
+    a camada sirva a qualquer jogador (e as escalas fiquem comparáveis).
+
+    Args:
+        team_distances: shot_distance de todos os arremessos do time
+        player_ranges (dict): player_id -> (início, fim) das linhas de cada jogador em team_distances
+    """
+
+    def __init__(self, team_distances, player_ranges, team_label):
+        team_distances = np.asarray(team_distances, dtype=np.float64)
+        self.team_label = team_label
+        self.team_profile = distance_profile(team_distances)
+        self.player_profiles = {player_id: distance_profile(team_distances[start:stop])
+                                for player_id, (start, stop) in player_ranges.items()}
+        peaks = [max(profile['hist'].max(initial=0), profile['curve_y'].max(initial=0))
+                 for profile in [self.team_profile, *self.player_profiles.values()]]
+        self.xlim = (0, self.team_profile['max_distance'] + 2)
+        self.ylim = (0, max(peaks) * 1.05 or 1)
+
+        fig = Figure(figsize=DISTANCE_CHART_SIZE, dpi=DPI)
+        ax = self._axes(fig)
+        self._draw_profile(ax, self.team_profile, 'gray')
+        ax.set_title("Distribuição da Distância dos Arremessos", fontsize=10)
+        ax.set_xlabel('Distância (pés)')
+        ax.set_ylabel('Densidade')
+        self.background = _render_layer(fig)
+
+    def _axes(self, fig):
+        ax = fig.add_subplot()
+        ax.set_xlim(*self.xlim)
+        ax.set_ylim(*self.ylim)
+        return ax
+
+    @staticmethod
+    def _draw_profile(ax, profile, color):
+        ax.stairs(profile['hist'], DISTANCE_BINS, fill=True, color=color, alpha=0.4)
+        ax.plot(profile['curve_x'], profile['curve_y'], color=color)
+
+    def render(self, player_id, player_label):
+        fig = Figure(figsize=DISTANCE_CHART_SIZE, dpi=DPI)
+        fig.figimage(self.background, origin='upper', zorder=-1)
+        fig.patch.set_visible(False)
+        ax = self._axes(fig)
+        ax.axis('off')
+        self._draw_profile(ax, self.player_profiles.get(player_id) or distance_profile([]), 'blue')
+        ax.legend(handles=[Patch(color='gray', alpha=0.4, label=self.team_label),
+                           Patch(color='blue', alpha=0.4, label=player_label)], loc='upper right')
+        return _to_png(fig)
+
+
+class RenderCache:
+    """PNGs renderizados por chave, com descarte LRU; compartilhado entre sessões (thread-safe)."""
+
+    def __init__(self, max_items=MAX_CACHED_IMAGES):
+        self.max_items = max_items
+        self._images = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._images)
+
+    def get_or_render(self, key, render):
+        with self._lock:
+            if key in self._images:
+                self._images.move_to_end(key)
+                self.hits += 1
+                return self._images[key]
+        png = render()
+        with self._lock:
+            self.misses += 1
+            self._images[key] = png
+            self._images.move_to_end(key)
+            while len(self._images) > self.max_items:
+                self._images.popitem(last=False)
+        return png
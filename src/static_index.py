@@ -0,0 +1,114 @@
+"""Índice único, construído sob demanda, das entidades estáticas do nba_api (times e jogadores).
+
+As listas de players.get_players() e teams.get_teams() não mudam durante uma
+rodagem; este módulo monta os dicionários/Series de lookup uma vez por processo
+e oferece mapeamento vetorizado de ids sobre Series inteiras.
+"""
+import time
+from functools import lru_cache, wraps
+
+import pandas as pd
+from nba_api.stats.static import players, teams
+
+import instrumentation
+
+# Instrumentação: chamadas e segundos gastos em cada lookup
+LOOKUP_TIMINGS = {}
+
+
+def _timed(func):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            stats = LOOKUP_TIMINGS.setdefault(func.__name__, {'calls': 0, 'seconds': 0.0})
+            stats['calls'] += 1
+            stats['seconds'] += time.perf_counter() - start
+    return wrapper
+
+
+@lru_cache(maxsize=None)
+@instrumentation.timed('static_index_build', source='get_players')
+def _player_name_series():
+    nba_players = players.get_players()
+    return pd.Series({p['id']: p['full_name'] for p in nba_players}, name='player_name')
+
+
+@lru_cache(maxsize=None)
+def _player_name_dict():
+    return _player_name_series().to_dict()
+
+
+@lru_cache(maxsize=None)
+@instrumentation.timed('static_index_build', source='get_teams')
+def _team_frame():
+    return pd.DataFrame(teams.get_teams()).set_index('id')[['full_name', 'abbreviation']]
+
+
+@lru_cache(maxsize=None)
+def _team_ids_by_name():
+    frame = _team_frame()
+    return dict(zip(frame['full_name'], frame.index.tolist()))
+
+
+@lru_cache(maxsize=None)
+def _team_ids_by_abbreviation():
+    frame = _team_frame()
+    return pd.Series(frame.index.to_numpy(), index=frame['abbreviation'].to_numpy())
+
+
+@_timed
+def player_names():
+    """Retorna o dicionário {player_id: full_name} (construído uma vez por processo)."""
+    return _player_name_dict()
+
+
+@_timed
+def team_ids_by_name():
+    """Retorna {full_name: team_id} para todos os times da NBA."""
+    return _team_ids_by_name()
+
+
+@_timed
+def team_info(team_id):
+    """Retorna (full_name, abbreviation) do time ou None se o id não existir."""
+    frame = _team_frame()
+    if team_id not in frame.index:
+        return None
+    row = frame.loc[team_id]
+    return row['full_name'], row['abbreviation']
+
+
+@_timed
+def map_player_names(player_ids):
+    """Mapeia uma Series de player_ids para nomes (NaN para ids desconhecidos)."""
+    return player_ids.map(_player_name_series())
+
+
+@_timed
+def map_team_names(team_ids):
+    """Mapeia uma Series de team_ids para o nome completo do time."""
+    return team_ids.map(_team_frame()['full_name'])
+
+
+@_timed
+def map_team_abbreviations(team_ids):
+    """Mapeia uma Series de team_ids para a abreviação do time."""
+    return team_ids.map(_team_frame()['abbreviation'])
+
+
+@_timed
+def map_team_ids(abbreviations):
+    """Mapeia uma Series de abreviações (ex: HTM/VTM dos arremessos) para team_ids (NaN se desconhecida)."""
+    return abbreviations.map(_team_ids_by_abbreviation()).astype('Int64')
+
+
+def lookup_report():
+    """Resumo legível do tempo gasto em lookups desde o início do processo."""
+    total = sum(stats['seconds'] for stats in LOOKUP_TIMINGS.values())
+    lines = [f"Tempo total em lookups estáticos: {total:.3f}s"]
+    for name, stats in sorted(LOOKUP_TIMINGS.items()):
+        lines.append(f"  {name}: {stats['calls']} chamadas, {stats['seconds']:.3f}s")
+    return '\n'.join(lines)
@@ -0,0 +1,291 @@
+"""Treinamento do XGBoost em blocos, com memória limitada qualquer que seja o número de temporadas.
+
+    python src/streaming_training.py --train-seasons 2022-23 2023-24 --valid-seasons 2024-25
+    python src/streaming_training.py --source parquet --external-memory --output models/xgb_historico.joblib
+
+Os arremessos são lidos do SQLite (cursor em blocos) ou do dataset Parquet
+(lotes do pyarrow), codificados bloco a bloco pelo FeatureTransformer num
+buffer float32 reaproveitado e entregues ao XGBoost por um DataIter. Por
+padrão o treino usa um QuantileDMatrix, que guarda só os índices de bins
+(1 byte por valor) e nunca a matriz float completa; a fonte é lida uma única
+vez e as demais passadas do QuantileDMatrix relêem os blocos codificados de
+uma pasta temporária. Com --external-memory o XGBoost mantém as próprias
+páginas em disco (mais lento no XGBoost 2.0 em CPU).
+Sem transformador salvo ao lado do modelo de saída, vocabulários e escalas
+são ajustados numa primeira passada (partial_fit). Ao final são impressos o
+tempo total e o pico de memória residente (RSS) do processo.
+"""
+import argparse
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+import features
+import parquet_store
+import queries
+import season_store
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_NAME = os.path.join(BASE_DIR, '..', 'nba_shots.sqlite')
+OUTPUT_PATH = os.path.join(BASE_DIR, '..', 'models', 'xgb_streaming_model.joblib')
+
+# Colunas lidas da fonte: só as entradas do transformador e o alvo
+TRAINING_COLUMNS = ['period', 'minutes_remaining', 'seconds_remaining', 'loc_x', 'loc_y', 'shot_distance',
+                    features.TARGET] + features.CATEGORICAL_FEATURES
+CHUNK_ROWS = 256 * 1024
+MAX_BIN = 256
+# Hiperparâmetros do melhor modelo do notebook 03 (RandomizedSearchCV)
+DEFAULT_PARAMS = {
+    'objective': 'binary:logistic',
+    'eval_metric': 'logloss',
+    'tree_method': 'hist',
+    'max_depth': 3,
+    'learning_rate': 0.175,
+    'subsample': 0.974,
+    'colsample_bytree': 0.756,
+    'gamma': 0.125,
+    'scale_pos_weight': 1.35,
+    'seed': 42,
+}
+DEFAULT_ROUNDS = 587
+
+
+def iter_chunks(source, seasons, chunk_rows=CHUNK_ROWS, db_name=DB_NAME, data_dir=parquet_store.DATA_DIR):
+    """Arremessos das temporadas em DataFrames de cerca de chunk_rows linhas.
+
+    Lotes menores (partições pequenas do Parquet) são agrupados até chunk_rows
+    para que o XGBoost receba poucos blocos grandes.
+    """
+    if source == 'sqlite':
+        # Com o catálogo de temporadas, poucos arquivos anexados por vez (limite de ATTACH)
+        for conn in season_store.iter_connections(db_name, seasons):
+            yield from queries.iter_shots(conn, seasons, TRAINING_COLUMNS, chunk_rows)
+        return
+    pending, pending_rows = [], 0
+    for df in parquet_store.iter_batches(parquet_store.SHOTS_DATASET, TRAINING_COLUMNS, seasons,
+                                         batch_rows=chunk_rows, data_dir=data_dir):
+        pending.append(df)
+        pending_rows += len(df)
+        if pending_rows >= chunk_rows:
+            yield pd.concat(pending, ignore_index=True)
+            pending, pending_rows = [], 0
+    if pending:
+        yield pd.concat(pending, ignore_index=True)
+
+
+def fit_transformer(chunks):
+    """Ajusta vocabulários e escalas em uma passada pelos blocos."""
+    transformer = features.FeatureTransformer()
+    for df in chunks:
+        transformer.partial_fit(df)
+    return transformer
+
+
+class ShotChunkIter(xgb.DataIter):
+    """Entrega ao XGBoost um bloco codificado por vez.
+
+    O QuantileDMatrix percorre o iterador várias vezes (4 no XGBoost 2.0);
+    com spill_dir, a primeira passada grava cada bloco codificado em .npy e as
+    seguintes só o relêem do disco, sem consultar a fonte e codificar de novo.
+
+    Args:
+        make_chunks (callable): Retorna um novo iterador de DataFrames brutos
+        transformer (FeatureTransformer): Codifica cada bloco no buffer compartilhado
+        cache_prefix (str): Prefixo das páginas em disco (só no modo de memória externa)
+        spill_dir (str): Pasta temporária dos blocos codificados (None relê a fonte a cada passada)
+    """
+
+    def __init__(self, make_chunks, transformer, cache_prefix=None, spill_dir=None):
+        self.make_chunks = make_chunks
+        self.transformer = transformer
+        self.spill_dir = spill_dir
+        self.rows = 0
+        self._chunks = None
+        self._buffer = None
+        self._spilled = []
+        self._spill_complete = False
+        self._position = 0
+        super().__init__(cache_prefix=cache_prefix)
+
+    def reset(self):
+        if not self._spill_complete:
+            self._spilled = []
+        self._chunks = None
+        self._position = 0
+
+    def _next_from_source(self):
+        if self._chunks is None:
+            self._chunks = iter(self.make_chunks())
+            self.rows = 0
+        df = next(self._chunks, None)
+        if df is None:
+            self._spill_complete = self.spill_dir is not None
+            return None
+        # O XGBoost copia/quantiza o bloco antes do próximo next, então o buffer pode ser reaproveitado
+        if self._buffer is None or self._buffer.shape[0] < len(df):
+            self._buffer = self.transformer.allocate(len(df))
+        X = self.transformer.transform(df, out=self._buffer)
+        y = df[features.TARGET].to_numpy(dtype=np.float32)
+        self.rows += len(df)
+        if self.spill_dir is not None:
+            paths = tuple(os.path.join(self.spill_dir, f"{len(self._spilled):05d}_{name}.npy") for name in 'Xy')
+            np.save(paths[0], X)
+            np.save(paths[1], y)
+            self._spilled.append(paths)
+        return X, y
+
+    def next(self, input_data):
+        if self._spill_complete:
+            if self._position == len(self._spilled):
+                return 0
+            X_path, y_path = self._spilled[self._position]
+            self._position += 1
+            X, y = np.load(X_path), np.load(y_path)
+        else:
+            chunk = self._next_from_source()
+            if chunk is None:
+                return 0
+            X, y = chunk
+        input_data(data=X, label=y, feature_names=self.transformer.feature_names)
+        return 1
+
+
+def peak_rss():
+    """Pico de memória residente do processo em bytes.
+
+    No Linux usa VmHWM, que recomeça a cada exec; o ru_maxrss herda o pico do
+    processo pai quando o treino é disparado por outro script Python.
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def to_classifier(booster, params):
+    """Embrulha o booster num XGBClassifier, o formato salvo em models/ e lido pelo dashboard.
+
+    Com early stopping o booster é cortado em best_iteration: o artefato guarda
+    só as árvores que o predict_proba usa, e quem soma todas as árvores
+    (TreePredictor, SHAP) chega às mesmas probabilidades.
+    """
+    best_iteration = booster.attr('best_iteration')
+    if best_iteration is not None:
+        booster = booster[:int(best_iteration) + 1]
+    model = xgb.XGBClassifier(**{key: value for key, value in params.items() if key != 'seed'},
+                              random_state=params.get('seed'))
+    model.load_model(bytearray(booster.save_raw('json')))
+    return model
+
+
+def train_streaming(train_seasons=None, valid_seasons=None, source='sqlite', params=None, rounds=DEFAULT_ROUNDS,
+                    early_stopping_rounds=None, external_memory=False, chunk_rows=CHUNK_ROWS,
+                    output_path=OUTPUT_PATH, db_name=DB_NAME, data_dir=parquet_store.DATA_DIR):
+    """Treina o modelo a partir dos blocos da fonte e salva modelo e transformador em output_path.
+
+    Returns:
+        dict: Linhas de treino, log loss de validação, segundos e pico de RSS
+    """
+    start = time.perf_counter()
+    params = {**DEFAULT_PARAMS, **(params or {})}
+
+    def chunks(seasons):
+        return lambda: iter_chunks(source, seasons, chunk_rows, db_name, data_dir)
+
+    transformer_path = features.transformer_path(output_path)
+    if os.path.exists(transformer_path):
+        transformer = features.FeatureTransformer.load(transformer_path)
+    else:
+        transformer = fit_transformer(chunks(None)())
+        print(f"Transformador ajustado em blocos: {transformer.n_features} colunas")
+
+    # Páginas da memória externa ou blocos codificados das passadas do QuantileDMatrix
+    cache_dir = tempfile.mkdtemp(prefix='xgb_pages_')
+    try:
+        def make_iter(seasons, name):
+            if external_memory:
+                return ShotChunkIter(chunks(seasons), transformer, cache_prefix=os.path.join(cache_dir, name))
+            spill_dir = os.path.join(cache_dir, name)
+            os.makedirs(spill_dir)
+            return ShotChunkIter(chunks(seasons), transformer, spill_dir=spill_dir)
+
+        train_iter = make_iter(train_seasons, 'train')
+        if external_memory:
+            dtrain = xgb.DMatrix(train_iter)
+        else:
+            dtrain = xgb.QuantileDMatrix(train_iter, max_bin=MAX_BIN)
+        evals, dvalid = [], None
+        if valid_seasons:
+            valid_iter = make_iter(valid_seasons, 'valid')
+            # Validação com os mesmos bins do treino
+            dvalid = xgb.DMatrix(valid_iter) if external_memory else \
+                xgb.QuantileDMatrix(valid_iter, max_bin=MAX_BIN, ref=dtrain)
+            evals = [(dvalid, 'valid')]
+        print(f"Treinando com {dtrain.num_row():,} arremessos em blocos de {chunk_rows:,} "
+              f"({'memória externa' if external_memory else 'QuantileDMatrix'})")
+        evals_result = {}
+        booster = xgb.train(params, dtrain, rounds, evals=evals, evals_result=evals_result,
+                            early_stopping_rounds=early_stopping_rounds if evals else None,
+                            verbose_eval=max(rounds // 10, 1) if evals else False)
+        train_rows = dtrain.num_row()
+        # As páginas em disco só podem ser apagadas depois que as matrizes são liberadas
+        del dtrain, dvalid, evals
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    model = to_classifier(booster, params)
+    transformer.check_model(model)
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    joblib.dump(model, output_path)
+    if not os.path.exists(transformer_path):
+        transformer.save(transformer_path)
+
+    # Log loss da última rodada mantida no modelo (a melhor, com early stopping)
+    valid_logloss = evals_result['valid']['logloss'][model.get_booster().num_boosted_rounds() - 1] \
+        if evals_result else None
+    elapsed = time.perf_counter() - start
+    result = {'train_rows': train_rows, 'valid_logloss': valid_logloss, 'seconds': elapsed,
+              'peak_rss_bytes': peak_rss()}
+    print(f"Modelo salvo em {output_path}: {elapsed:.1f}s, pico de RSS {result['peak_rss_bytes'] / 1e6:.0f} MB"
+          + (f", log loss de validação {valid_logloss:.4f}" if valid_logloss is not None else ''))
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--source', choices=['sqlite', 'parquet'], default='sqlite')
+    parser.add_argument('--train-seasons', nargs='+', help='Temporadas de treino (todas menos as de validação, se omitido)')
+    parser.add_argument('--valid-seasons', nargs='+', default=[])
+    parser.add_argument('--rounds', type=int, default=DEFAULT_ROUNDS)
+    parser.add_argument('--early-stopping', type=int)
+    parser.add_argument('--external-memory', action='store_true', help='Páginas em disco em vez de QuantileDMatrix')
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    parser.add_argument('--output', default=OUTPUT_PATH)
+    parser.add_argument('--db', default=DB_NAME)
+    parser.add_argument('--data-dir', default=parquet_store.DATA_DIR)
+    args = parser.parse_args()
+
+    train_seasons = args.train_seasons
+    if train_seasons is None and args.valid_seasons:
+        if args.source == 'sqlite':
+            all_seasons = season_store.list_seasons(args.db)
+        else:
+            all_seasons = sorted({season for season, _ in
+                                  parquet_store.list_partitions(parquet_store.SHOTS_DATASET, args.data_dir)})
+        train_seasons = [season for season in all_seasons if season not in args.valid_seasons]
+    train_streaming(train_seasons, args.valid_seasons, args.source, rounds=args.rounds,
+                    early_stopping_rounds=args.early_stopping, external_memory=args.external_memory,
+                    chunk_rows=args.chunk_rows, output_path=args.output, db_name=args.db, data_dir=args.data_dir)
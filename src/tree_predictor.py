@@ -0,0 +1,205 @@
+"""Preditor leve do modelo XGBoost: árvores achatadas em arrays e avaliadas com NumPy.
+
+    python src/tree_predictor.py [--model models/xgb_best_model.joblib]
+
+Exporta o booster de xgb_best_model.joblib para
+models/xgb_best_model.trees.npz: as árvores são completadas até a profundidade
+máxima e guardadas em ordem de heap (feature, limiar e direção dos ausentes de
+cada nó interno, valor de cada folha), uma linha por árvore. Carregar o .npz
+só precisa do NumPy e leva milissegundos; a predição percorre todas as árvores
+de uma vez, um nível por iteração, sem construir DMatrix, o que reduz o custo
+por chamada em lotes pequenos. Em lotes grandes o XGBoost (C++, multithread)
+continua mais rápido. O arquivo guarda a versão (sha1) do modelo de origem, e
+load_predictor só o usa se ela bater com o modelo atual.
+"""
+import argparse
+import hashlib
+import json
+import os
+
+import numpy as np
+
+PREDICTOR_SUFFIX = '.trees.npz'
+# Linhas avaliadas por vez: matrizes (linhas x árvores) maiores saem do cache e ficam mais lentas
+CHUNK_ROWS = 256
+# As árvores são completadas até a profundidade máxima: 2**MAX_DEPTH nós por árvore
+MAX_DEPTH = 12
+
+
+def model_version(model_path):
+    """Hash curto do arquivo do modelo (muda a cada novo treinamento salvo)."""
+    with open(model_path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()[:12]
+
+
+def predictor_path(model_path):
+    """Caminho do preditor exportado ao lado do modelo (xgb_best_model.trees.npz)."""
+    return os.path.splitext(model_path)[0] + PREDICTOR_SUFFIX
+
+
+def _complete_trees(trees):
+    """Reescreve as árvores do JSON do XGBoost como árvores binárias completas.
+
+    Todas ficam com a profundidade máxima e os nós em ordem de heap (filhos de
+    i em 2i+1 e 2i+2), então o próximo nó sai de uma conta, sem buscar índices
+    de filhos. Folhas rasas viram nós que sempre descem para a esquerda
+    (limiar +inf, ausentes à esquerda) até o último nível, onde fica o valor.
+    """
+    depth = 0
+    for tree in trees:
+        if any(tree['split_type']):
+            raise ValueError("Splits categóricos não são suportados pelo preditor NumPy")
+        depth = max(depth, _tree_depth(tree['left_children'], tree['right_children']))
+    if depth > MAX_DEPTH:
+        raise ValueError(f"Profundidade {depth} acima do limite de {MAX_DEPTH} do preditor NumPy")
+    n_internal, n_leaves = 2 ** depth - 1, 2 ** depth
+    feature = np.zeros((len(trees), n_internal), dtype=np.int32)
+    threshold = np.full((len(trees), n_internal), np.inf, dtype=np.float32)
+    default_left = np.ones((len(trees), n_internal), dtype=bool)
+    leaf_value = np.zeros((len(trees), n_leaves), dtype=np.float32)
+    for position, tree in enumerate(trees):
+        stack = [(0, 0, 0)]
+        while stack:
+            node, heap_node, node_depth = stack.pop()
+            left, right = tree['left_children'][node], tree['right_children'][node]
+            if left == -1:
+                # Desce sempre à esquerda até o último nível; lá split_conditions é o valor da folha
+                leaf = (heap_node + 1) * 2 ** (depth - node_depth) - 1
+                leaf_value[position, leaf - n_internal] = tree['split_conditions'][node]
+                continue
+            feature[position, heap_node] = tree['split_indices'][node]
+            threshold[position, heap_node] = tree['split_conditions'][node]
+            default_left[position, heap_node] = bool(tree['default_left'][node])
+            stack.append((left, 2 * heap_node + 1, node_depth + 1))
+            stack.append((right, 2 * heap_node + 2, node_depth + 1))
+    return {'feature': feature, 'threshold': threshold, 'default_left': default_left,
+            'leaf_value': leaf_value, 'depth': np.int32(depth)}
+
+
+def _tree_depth(left_children, right_children):
+    depth = 0
+    stack = [(0, 0)]
+    while stack:
+        node, node_depth = stack.pop()
+        if left_children[node] == -1:
+            depth = max(depth, node_depth)
+        else:
+            stack.extend([(left_children[node], node_depth + 1), (right_children[node], node_depth + 1)])
+    return depth
+
+
+class TreePredictor:
+    """Soma das folhas de todas as árvores + margem base, com a sigmoide de binary:logistic.
+
+    Expõe predict_proba como o XGBClassifier, então pode substituí-lo no
+    dashboard, no serviço de predição e no FeatureTransformer.check_model.
+    """
+
+    def __init__(self, arrays, base_margin, feature_names, source_version=None):
+        self.arrays = arrays
+        self.base_margin = float(base_margin)
+        self.feature_names = list(feature_names)
+        self.source_version = source_version
+
+    @classmethod
+    def from_booster(cls, booster, source_version=None):
+        best_iteration = booster.attr('best_iteration')
+        if best_iteration is not None:
+            # Com early stopping o predict_proba só usa as rodadas até best_iteration; o
+            # fatiamento mantém as num_parallel_tree árvores de cada rodada
+            booster = booster[:int(best_iteration) + 1]
+        model = json.loads(booster.save_raw('json'))['learner']
+        objective = model['objective']['name']
+        if objective != 'binary:logistic':
+            raise ValueError(f"Objetivo {objective} não suportado (apenas binary:logistic)")
+        base_score = float(model['learner_model_param']['base_score'])
+        trees = model['gradient_booster']['model']['trees']
+        return cls(_complete_trees(trees), np.log(base_score / (1 - base_score)), booster.feature_names,
+                   source_version)
+
+    @property
+    def n_trees(self):
+        return len(self.arrays['feature'])
+
+    def _margin_chunk(self, X):
+        arrays = self.arrays
+        n_rows, n_features = X.shape
+        n_internal = arrays['feature'].shape[1]
+        feature, threshold = arrays['feature'].ravel(), arrays['threshold'].ravel()
+        tree_offsets = np.arange(self.n_trees)[np.newaxis, :] * n_internal
+        row_offsets = np.arange(n_rows)[:, np.newaxis] * n_features
+        values_flat = X.ravel()
+        has_missing = np.isnan(X).any()
+        # Posição de heap da linha em cada árvore; todas descem juntas, um nível por iteração
+        heap_nodes = np.zeros((n_rows, self.n_trees), dtype=np.int64)
+        for _ in range(int(arrays['depth'])):
+            nodes = heap_nodes + tree_offsets
+            values = values_flat[row_offsets + feature[nodes]]
+            # Mesmo teste do XGBoost: x < limiar vai para a esquerda; NaN segue default_left
+            go_right = ~(values < threshold[nodes])
+            if has_missing:
+                missing = np.isnan(values)
+                go_right[missing] = ~arrays['default_left'].ravel()[nodes[missing]]
+            heap_nodes = 2 * heap_nodes + 1 + go_right
+        leaves = heap_nodes - n_internal + tree_offsets + np.arange(self.n_trees)[np.newaxis, :]
+        return arrays['leaf_value'].ravel()[leaves].sum(axis=1, dtype=np.float64) + self.base_margin
+
+    def predict_margin(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[np.newaxis, :]
+        if X.shape[1] != len(self.feature_names):
+            raise ValueError(f"Esperadas {len(self.feature_names)} features, recebidas {X.shape[1]}")
+        if len(X) <= CHUNK_ROWS:
+            return self._margin_chunk(X)
+        return np.concatenate([self._margin_chunk(X[start:start + CHUNK_ROWS])
+                               for start in range(0, len(X), CHUNK_ROWS)])
+
+    def predict_proba(self, X):
+        """Matriz (n, 2) com as probabilidades de erro e de acerto, como o XGBClassifier."""
+        positive = (1 / (1 + np.exp(-self.predict_margin(X)))).astype(np.float32)
+        return np.column_stack([1 - positive, positive])
+
+    def save(self, path):
+        np.savez(path, base_margin=np.float64(self.base_margin), feature_names=np.asarray(self.feature_names),
+                 source_version=np.asarray(self.source_version or ''), **self.arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {name: data[name] for name in data.files
+                      if name not in ('base_margin', 'feature_names', 'source_version')}
+            return cls(arrays, data['base_margin'], data['feature_names'].tolist(),
+                       str(data['source_version']) or None)
+
+
+def export_predictor(model_path):
+    """Exporta o booster do modelo salvo para o .npz ao lado dele."""
+    import joblib
+    model = joblib.load(model_path)
+    predictor = TreePredictor.from_booster(model.get_booster(), model_version(model_path))
+    path = predictor_path(model_path)
+    predictor.save(path)
+    print(f"Preditor exportado: {predictor.n_trees} árvores de profundidade {int(predictor.arrays['depth'])}, "
+          f"{os.path.getsize(path) / 1e3:.0f} KB em {path}")
+    return predictor
+
+
+def load_predictor(model_path):
+    """Preditor exportado do modelo atual, ou None se ausente ou exportado de outra versão."""
+    path = predictor_path(model_path)
+    if not os.path.exists(path):
+        return None
+    predictor = TreePredictor.load(path)
+    if predictor.source_version != model_version(model_path):
+        print(f"Preditor {path} foi exportado de outra versão do modelo; ignorando")
+        return None
+    return predictor
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--model', default=os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                        '..', 'models', 'xgb_best_model.joblib'))
+    args = parser.parse_args()
+    export_predictor(args.model)
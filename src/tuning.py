@@ -0,0 +1,330 @@
+"""Busca de hiperparâmetros do XGBoost com ASHA, early stopping e cache de trials.
+
+    python src/tuning.py --train-seasons 2022-23 2023-24 --valid-seasons 2024-25 [--trials 60] [--workers 4]
+
+Substitui as três rodadas de RandomizedSearchCV do notebook 03. As features
+de treino e os folds são gravados uma vez em models/tuning/<chave>/ (.npy);
+cada processo do pool monta os DMatrix de cada fold uma única vez e os
+reaproveita em todos os trials. Os trials começam com poucas árvores e só os
+melhores 1/REDUCTION de cada degrau (ASHA assíncrono) continuam treinando, a
+partir dos boosters salvos do degrau anterior; em todo degrau o early stopping
+no fold de validação encerra trials que pararam de melhorar. Cada resultado é
+acrescentado a trials.jsonl, de modo que uma busca interrompida retoma do
+ponto em que parou. Ao final, o melhor trial é retreinado com todos os dados
+de treino e salvo como o notebook salvaria (XGBClassifier em joblib).
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import joblib
+import numpy as np
+import xgboost as xgb
+from sklearn.model_selection import StratifiedKFold
+
+import features
+import parquet_store
+import streaming_training
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SEARCH_DIR = os.path.join(BASE_DIR, '..', 'models', 'tuning')
+MODEL_PATH = os.path.join(BASE_DIR, '..', 'models', 'xgb_best_model.joblib')
+OUTPUT_PATH = os.path.join(BASE_DIR, '..', 'models', 'xgb_tuned_model.joblib')
+TRIALS_FILENAME = 'trials.jsonl'
+
+N_FOLDS = 3
+N_TRIALS = 60
+# Degraus do ASHA em número de árvores: 50, 150, 450 e 1000
+MIN_ROUNDS = 50
+MAX_ROUNDS = 1000
+REDUCTION = 3
+EARLY_STOPPING_ROUNDS = 30
+# Parâmetros fixos (os do notebook 03) e faixas da última busca do notebook
+BASE_PARAMS = {
+    'objective': 'binary:logistic',
+    'eval_metric': 'logloss',
+    'tree_method': 'hist',
+    'max_bin': streaming_training.MAX_BIN,
+    'scale_pos_weight': 1.35,
+}
+SEARCH_SPACE = {
+    'learning_rate': ('uniform', 0.01, 0.31),
+    'max_depth': ('integer', 3, 10),
+    'subsample': ('uniform', 0.6, 1.0),
+    'colsample_bytree': ('uniform', 0.6, 1.0),
+    'gamma': ('uniform', 0.0, 0.5),
+}
+
+# Estado de cada processo do pool, carregado uma única vez pelo initializer
+_worker = {}
+
+
+def rung_rounds():
+    """Número de árvores ao fim de cada degrau."""
+    rounds = [MIN_ROUNDS]
+    while rounds[-1] < MAX_ROUNDS:
+        rounds.append(min(rounds[-1] * REDUCTION, MAX_ROUNDS))
+    return rounds
+
+
+def sample_params(seed, trial_id):
+    """Hiperparâmetros do trial, determinísticos por (seed, trial_id) para a busca poder ser retomada."""
+    rng = np.random.default_rng([seed, trial_id])
+    params = {}
+    for name, (kind, low, high) in SEARCH_SPACE.items():
+        params[name] = int(rng.integers(low, high)) if kind == 'integer' else float(rng.uniform(low, high))
+    return params
+
+
+def search_key(transformer, seasons, n_rows, seed, n_folds=N_FOLDS):
+    """Hash dos dados, folds e espaço de busca: só trials com a mesma chave são reaproveitados."""
+    state = json.dumps({'features': transformer.fingerprint(), 'seasons': seasons, 'rows': n_rows, 'seed': seed,
+                        'folds': n_folds, 'base': BASE_PARAMS, 'space': SEARCH_SPACE, 'rungs': rung_rounds(),
+                        'early_stopping': EARLY_STOPPING_ROUNDS}, sort_keys=True)
+    return hashlib.sha1(state.encode('utf-8')).hexdigest()[:12]
+
+
+def prepare_search(search_dir, X, y, seed, n_folds=N_FOLDS):
+    """Grava features, alvo e o fold de cada linha; os processos do pool os abrem com memory map."""
+    os.makedirs(os.path.join(search_dir, 'boosters'), exist_ok=True)
+    if os.path.exists(os.path.join(search_dir, 'folds.npy')):
+        return
+    np.save(os.path.join(search_dir, 'X.npy'), np.ascontiguousarray(X, dtype=np.float32))
+    np.save(os.path.join(search_dir, 'y.npy'), np.asarray(y, dtype=np.float32))
+    folds = np.empty(len(y), dtype=np.int8)
+    splitter = StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=seed)
+    for fold, (_, valid_index) in enumerate(splitter.split(np.zeros(len(y)), y)):
+        folds[valid_index] = fold
+    # Gravado por último: marca os dados da busca como completos
+    np.save(os.path.join(search_dir, 'folds.npy'), folds)
+
+
+def load_trials(search_dir):
+    path = os.path.join(search_dir, TRIALS_FILENAME)
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _append_trial(search_dir, record):
+    with open(os.path.join(search_dir, TRIALS_FILENAME), 'a') as f:
+        f.write(json.dumps(record) + '\n')
+
+
+def _init_worker(search_dir, nthread):
+    X = np.load(os.path.join(search_dir, 'X.npy'), mmap_mode='r')
+    y = np.load(os.path.join(search_dir, 'y.npy'))
+    folds = np.load(os.path.join(search_dir, 'folds.npy'))
+    _worker.update(search_dir=search_dir, nthread=nthread, X=X, y=y, folds=folds, dmatrices={})
+
+
+def _fold_dmatrices(fold):
+    """DMatrix de treino e validação do fold, montados na primeira vez que o processo os usa."""
+    if fold not in _worker['dmatrices']:
+        in_valid = _worker['folds'] == fold
+        X, y, nthread = _worker['X'], _worker['y'], _worker['nthread']
+        dtrain = xgb.QuantileDMatrix(X[~in_valid], y[~in_valid], max_bin=BASE_PARAMS['max_bin'], nthread=nthread)
+        dvalid = xgb.QuantileDMatrix(X[in_valid], y[in_valid], ref=dtrain, nthread=nthread)
+        _worker['dmatrices'][fold] = (dtrain, dvalid)
+    return _worker['dmatrices'][fold]
+
+
+def booster_path(search_dir, trial_id, fold):
+    return os.path.join(search_dir, 'boosters', f"trial_{trial_id:04d}_fold_{fold}.ubj")
+
+
+def _run_job(job):
+    """Treina um trial em todos os folds até job['rounds'] árvores, continuando do degrau anterior.
+
+    Returns:
+        dict: Registro do trial no degrau (score = log loss médio na melhor iteração de cada fold)
+    """
+    start, cpu_start = time.perf_counter(), time.process_time()
+    params = {**BASE_PARAMS, **job['params'], 'nthread': _worker['nthread'], 'seed': job['trial_id']}
+    previous = job.get('previous') or {}
+    fold_scores, fold_iterations, stopped = [], [], []
+    for fold in range(len(np.unique(_worker['folds']))):
+        dtrain, dvalid = _fold_dmatrices(fold)
+        path = booster_path(_worker['search_dir'], job['trial_id'], fold)
+        # Continua o booster salvo no degrau anterior; sem ele (busca antiga), treina do zero
+        resume = bool(previous) and os.path.exists(path)
+        done_rounds = xgb.Booster(model_file=path).num_boosted_rounds() if resume else 0
+        booster = xgb.train(params, dtrain, job['rounds'] - done_rounds, evals=[(dvalid, 'valid')],
+                            early_stopping_rounds=EARLY_STOPPING_ROUNDS, xgb_model=path if resume else None,
+                            verbose_eval=False)
+        booster.save_model(path)
+        score, iteration = booster.best_score, booster.best_iteration
+        if resume and previous['fold_scores'][fold] <= score:
+            score, iteration = previous['fold_scores'][fold], previous['fold_iterations'][fold]
+        fold_scores.append(float(score))
+        fold_iterations.append(int(iteration))
+        stopped.append(booster.num_boosted_rounds() < job['rounds'])
+    return {'trial_id': job['trial_id'], 'rung': job['rung'], 'rounds': job['rounds'], 'params': job['params'],
+            'score': float(np.mean(fold_scores)), 'fold_scores': fold_scores, 'fold_iterations': fold_iterations,
+            'stopped': all(stopped), 'seconds': time.perf_counter() - start,
+            'cpu_seconds': time.process_time() - cpu_start}
+
+
+class AshaScheduler:
+    """Promoções do ASHA assíncrono: um trial sobe de degrau quando está entre os melhores 1/REDUCTION
+    dos que já terminaram aquele degrau; senão, um trial novo começa no primeiro degrau.
+    """
+
+    def __init__(self, n_trials, seed, records=()):
+        self.n_trials = n_trials
+        self.seed = seed
+        self.rungs = rung_rounds()
+        self.records = {}
+        self.running = set()
+        for record in records:
+            self.add(record)
+
+    def add(self, record):
+        self.records[(record['trial_id'], record['rung'])] = record
+        self.running.discard((record['trial_id'], record['rung']))
+
+    def _rung_records(self, rung):
+        return [record for (_, record_rung), record in self.records.items() if record_rung == rung]
+
+    def next_job(self):
+        for rung in reversed(range(len(self.rungs) - 1)):
+            finished = sorted(self._rung_records(rung), key=lambda record: record['score'])
+            for record in finished[:len(finished) // REDUCTION]:
+                key = (record['trial_id'], rung + 1)
+                if record['stopped'] or key in self.records or key in self.running:
+                    continue
+                self.running.add(key)
+                return {'trial_id': record['trial_id'], 'rung': rung + 1, 'rounds': self.rungs[rung + 1],
+                        'params': record['params'], 'previous': record}
+        started = {trial_id for trial_id, _ in self.records} | {trial_id for trial_id, _ in self.running}
+        for trial_id in range(self.n_trials):
+            if trial_id not in started:
+                self.running.add((trial_id, 0))
+                return {'trial_id': trial_id, 'rung': 0, 'rounds': self.rungs[0],
+                        'params': sample_params(self.seed, trial_id)}
+        return None
+
+    def best(self):
+        return min(self.records.values(), key=lambda record: record['score'], default=None)
+
+
+def run_search(search_dir, n_trials=N_TRIALS, workers=None, seed=42):
+    """Executa (ou retoma) a busca em um pool de processos e devolve o melhor registro."""
+    workers = workers or os.cpu_count() or 1
+    # Threads do XGBoost divididas entre os processos, sem disputar núcleos
+    nthread = max(1, (os.cpu_count() or 1) // workers)
+    records = load_trials(search_dir)
+    scheduler = AshaScheduler(n_trials, seed, records)
+    if records:
+        print(f"Retomando busca: {len(records)} resultados em cache ({len({r['trial_id'] for r in records})} trials)")
+    start = time.perf_counter()
+    completed = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(search_dir, nthread)) as executor:
+        pending = set()
+        while True:
+            while len(pending) < workers:
+                job = scheduler.next_job()
+                if job is None:
+                    break
+                pending.add(executor.submit(_run_job, job))
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                record = future.result()
+                _append_trial(search_dir, record)
+                scheduler.add(record)
+                completed += 1
+                best = scheduler.best()
+                print(f"  trial {record['trial_id']:>3} degrau {record['rung']} ({record['rounds']} árvores): "
+                      f"log loss {record['score']:.4f}{' (parou)' if record['stopped'] else ''} | "
+                      f"melhor {best['score']:.4f}")
+
+    all_records = list(scheduler.records.values())
+    cpu_seconds = sum(record['cpu_seconds'] for record in all_records)
+    print(f"Busca concluída: {completed} rodadas novas em {time.perf_counter() - start:.1f}s; "
+          f"{len(all_records)} no total, {cpu_seconds:.0f} CPU-s de treino")
+    return scheduler.best()
+
+
+def train_best(best, X, y, nthread=None):
+    """Retreina o melhor trial com todos os dados, no número médio de árvores da melhor iteração dos folds."""
+    rounds = int(np.mean(best['fold_iterations'])) + 1
+    params = {**BASE_PARAMS, **best['params'], 'seed': 42}
+    if nthread:
+        params['nthread'] = nthread
+    dtrain = xgb.QuantileDMatrix(np.asarray(X, dtype=np.float32), np.asarray(y, dtype=np.float32),
+                                 max_bin=BASE_PARAMS['max_bin'])
+    return xgb.train(params, dtrain, rounds), params
+
+
+def load_training_data(transformer, seasons, source='sqlite', db_name=streaming_training.DB_NAME,
+                       data_dir=parquet_store.DATA_DIR):
+    """Features codificadas e alvo das temporadas, lidos em blocos da fonte."""
+    blocks, targets = [], []
+    for df in streaming_training.iter_chunks(source, seasons, db_name=db_name, data_dir=data_dir):
+        blocks.append(transformer.transform(df))
+        targets.append(df[features.TARGET].to_numpy(dtype=np.float32))
+    if not blocks:
+        return np.empty((0, transformer.n_features), dtype=np.float32), np.empty(0, dtype=np.float32)
+    return np.concatenate(blocks), np.concatenate(targets)
+
+
+def tune(train_seasons, valid_seasons=None, source='sqlite', n_trials=N_TRIALS, workers=None, seed=42,
+         output_path=OUTPUT_PATH, db_name=streaming_training.DB_NAME, data_dir=parquet_store.DATA_DIR,
+         search_root=SEARCH_DIR, fresh=False):
+    """Prepara os dados, executa a busca, retreina o melhor trial e o salva em output_path."""
+    transformer_path = features.transformer_path(MODEL_PATH)
+    if os.path.exists(transformer_path):
+        transformer = features.FeatureTransformer.load(transformer_path)
+    else:
+        transformer = streaming_training.fit_transformer(
+            streaming_training.iter_chunks(source, None, db_name=db_name, data_dir=data_dir))
+    X, y = load_training_data(transformer, train_seasons, source, db_name, data_dir)
+    search_dir = os.path.join(search_root, search_key(transformer, train_seasons, len(y), seed))
+    if fresh:
+        shutil.rmtree(search_dir, ignore_errors=True)
+    prepare_search(search_dir, X, y, seed)
+    print(f"Busca em {search_dir}: {len(y):,} arremessos de treino, {N_FOLDS} folds, degraus {rung_rounds()}")
+
+    best = run_search(search_dir, n_trials, workers, seed)
+    print(f"Melhor trial {best['trial_id']}: log loss {best['score']:.4f} com {best['params']}")
+    booster, params = train_best(best, X, y)
+    del X, y
+
+    model = streaming_training.to_classifier(booster, params)
+    transformer.check_model(model)
+    if valid_seasons:
+        X_valid, y_valid = load_training_data(transformer, valid_seasons, source, db_name, data_dir)
+        probabilities = np.clip(model.predict_proba(X_valid)[:, 1], 1e-7, 1 - 1e-7)
+        valid_logloss = -np.mean(y_valid * np.log(probabilities) + (1 - y_valid) * np.log(1 - probabilities))
+        print(f"Log loss nas temporadas {valid_seasons}: {valid_logloss:.4f}")
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    joblib.dump(model, output_path)
+    if not os.path.exists(features.transformer_path(output_path)):
+        transformer.save(features.transformer_path(output_path))
+    print(f"Modelo salvo em {output_path}")
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--source', choices=['sqlite', 'parquet'], default='sqlite')
+    parser.add_argument('--train-seasons', nargs='+', default=['2022-23', '2023-24'])
+    parser.add_argument('--valid-seasons', nargs='+', default=['2024-25'])
+    parser.add_argument('--trials', type=int, default=N_TRIALS)
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default=OUTPUT_PATH)
+    parser.add_argument('--db', default=streaming_training.DB_NAME)
+    parser.add_argument('--data-dir', default=parquet_store.DATA_DIR)
+    parser.add_argument('--fresh', action='store_true', help='Descarta trials em cache da mesma chave')
+    args = parser.parse_args()
+    tune(args.train_seasons, args.valid_seasons, args.source, args.trials, args.workers, args.seed, args.output,
+         args.db, args.data_dir, fresh=args.fresh)
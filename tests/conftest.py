@@ -0,0 +1,7 @@
+"""Torna src/, configs/ e benchmarks/ importáveis pelos testes (como fazem os benchmarks)."""
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+for directory in ('src', 'configs', 'benchmarks'):
+    sys.path.append(os.path.join(BASE_DIR, '..', directory))
@@ -0,0 +1,24 @@
+"""POE único: batch_scoring.analytical_data (dashboard) e score_frame (pontuação offline) concordam."""
+import numpy as np
+import xgboost as xgb
+
+import aggregate_cube
+import batch_scoring
+import features
+from synthetic import generate_shots
+
+
+def test_analytical_data_matches_score_frame():
+    df = generate_shots(5_000, seed=11)
+    transformer = features.FeatureTransformer().fit(df)
+    X = transformer.transform(df)
+    model = xgb.XGBClassifier(n_estimators=20, max_depth=4, random_state=0)
+    model.fit(transformer.to_frame(X), df[features.TARGET])
+
+    analytical = batch_scoring.analytical_data(model, X, df.copy())
+    scored = batch_scoring.score_frame(model, transformer, df)
+    for column in ('shot_probability', 'poe', 'adjusted_poe'):
+        np.testing.assert_allclose(analytical[column], scored[column], atol=1e-6)
+    assert abs(analytical['adjusted_poe'].mean()) < 1e-9
+    expected_outcome = (analytical['shot_probability'] >= aggregate_cube.DECISION_THRESHOLD).astype(int)
+    assert (analytical['predicted_outcome'] == expected_outcome).all()
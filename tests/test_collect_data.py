@@ -0,0 +1,115 @@
+"""Pipeline de ETL contra o servidor falso (src/fake_stats_server.py): respostas vazias não são re-buscadas."""
+import contextlib
+import io
+
+import pytest
+
+import bulk_loader
+import collect_data
+import collect_games
+import collect_play_by_play
+import etl_manifest
+import fake_stats_server
+import fetch_scheduler
+import response_cache
+import season_store
+
+SEASON = '2023-24'
+EMPTY_TEAM_ID = 1610612737
+
+
+@pytest.fixture(scope='module')
+def server():
+    server, base_url = fake_stats_server.start_server()
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(fetch_scheduler, 'STATS_BASE_URL', base_url)
+        monkeypatch.setattr(collect_data, 'REQUESTS_PER_SECOND', 1000)
+        yield server
+    server.shutdown()
+
+
+def _collect(db_path, refresh_seasons, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return collect_data.run_etl_pipeline([SEASON], refresh_seasons=refresh_seasons, db_name=db_path,
+                                             cache_dir=None, **kwargs)
+
+
+def _empty_for_team(payload):
+    def empty_payload(endpoint, params):
+        result = payload(endpoint, params)
+        if result is not None and params.get('TeamID') == [str(EMPTY_TEAM_ID)]:
+            result['resultSets'][0]['rowSet'] = []
+        return result
+    return empty_payload
+
+
+def test_empty_response_clears_loaded_partition(server, tmp_path, monkeypatch):
+    db_path = str(tmp_path / 'nba_shots.sqlite')
+    _collect(db_path, [SEASON])
+    # A franquia passa a responder vazio (ex: partição carregada por engano em uma temporada sem o time)
+    monkeypatch.setattr(fake_stats_server, '_payload', _empty_for_team(fake_stats_server._payload))
+    stats = _collect(db_path, [SEASON])
+    for counts in stats.values():
+        assert (counts['empty_teams'], counts['failed_teams']) == (1, 0)
+
+    conn = season_store.open_season(SEASON, db_path)
+    try:
+        for table in ('game_shot_charts', 'player_positions'):
+            rows = conn.execute(f"SELECT COUNT(*) FROM {table} WHERE season = ? AND team_id = ?",
+                                (SEASON, EMPTY_TEAM_ID)).fetchone()[0]
+            assert rows == 0
+        manifest = conn.execute("SELECT collector, status, row_count, content_hash FROM etl_manifest "
+                                "WHERE season = ? AND team_id = ?", (SEASON, EMPTY_TEAM_ID)).fetchall()
+        assert sorted(manifest) == [(collector, etl_manifest.STATUS_DONE, 0, etl_manifest.EMPTY_CONTENT_HASH)
+                                    for collector in sorted(collect_data.COLLECTORS)]
+        total = conn.execute("SELECT COUNT(*) FROM game_shot_charts").fetchone()[0]
+        assert bulk_loader.row_counts(conn)['game_shot_charts'] == total
+    finally:
+        conn.close()
+
+    # Concluída: fora das temporadas re-coletadas, a unidade não é buscada de novo
+    requests_before = server.stats['requests']
+    _collect(db_path, [])
+    assert server.stats['requests'] == requests_before
+
+
+def test_empty_play_by_play_is_not_fetched_again(server, tmp_path, monkeypatch):
+    db_path = str(tmp_path / 'nba_shots.sqlite')
+    empty_game_id = fake_stats_server._game(SEASON, 0)[0]
+    payload = fake_stats_server._payload
+
+    def empty_play_by_play(endpoint, params):
+        result = payload(endpoint, params)
+        if endpoint == 'playbyplayv2' and params.get('GameID') == [empty_game_id]:
+            result['resultSets'][0]['rowSet'] = []
+        return result
+
+    monkeypatch.setattr(fake_stats_server, '_payload', empty_play_by_play)
+    _collect(db_path, [], play_by_play=True)
+    conn = season_store.open_season(SEASON, db_path)
+    try:
+        assert collect_play_by_play.pending_game_ids(conn) == []
+        assert conn.execute("SELECT game_id FROM empty_play_by_play").fetchall() == [(empty_game_id,)]
+    finally:
+        conn.close()
+
+    requests_before = server.stats['requests']
+    _collect(db_path, [], play_by_play=True)
+    assert server.stats['requests'] == requests_before
+
+
+def test_offline_corrupt_schedule_is_a_unit_error(tmp_path):
+    db_path = str(tmp_path / 'nba_shots.sqlite')
+    cache = response_cache.ResponseCache(str(tmp_path / 'cache'))
+    endpoint = collect_games.schedule_request(SEASON)
+    cache.put(response_cache.request_key(endpoint.endpoint, endpoint.parameters), '{"resultSets": [')
+    conn = season_store.open_season(SEASON, db_path)
+    try:
+        with conn:
+            conn.execute("INSERT INTO games (id, season) VALUES ('0022300000', ?)", (SEASON,))
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            pending = collect_data.fill_game_metadata({SEASON: conn}, cache, offline=True)
+    finally:
+        conn.close()
+    assert pending == {SEASON: 1}
+    assert f"Erro ao buscar o calendário de {SEASON}" in output.getvalue()
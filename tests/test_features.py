@@ -0,0 +1,154 @@
+"""Paridade de src/features.py com a implementação linha a linha do notebook 02."""
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import normalize
+
+import features
+from synthetic import generate_shots
+
+N_ROWS = 20_000
+
+
+def calculate_time_remaining(row):
+    """Função do notebook 02, aplicada linha a linha (referência do time_remaining_in_game vetorizado)."""
+    period = row['period']
+    minutes = row['minutes_remaining']
+    seconds = row['seconds_remaining']
+    total_seconds_in_game = 48 * 60
+    seconds_elapsed_prior_periods = (period - 1) * 12 * 60
+    seconds_elapsed_current_period = (12 * 60) - (minutes * 60 + seconds)
+    total_seconds_elapsed = seconds_elapsed_prior_periods + seconds_elapsed_current_period
+    if period > 4:
+        overtime_seconds = (period - 5) * 300 + (300 - (minutes * 60 + seconds))
+        return -overtime_seconds
+    return total_seconds_in_game - total_seconds_elapsed
+
+
+def build_features_reference(df):
+    """Pipeline do notebook 02: apply por linha, get_dummies e normalize(norm='max') do scikit-learn."""
+    df = df.copy()
+    df['time_remaining_in_game'] = df.apply(calculate_time_remaining, axis=1)
+    df['shot_angle'] = np.rad2deg(np.arctan2(df['loc_x'], df['loc_y'])) + 90
+    X = df[features.FEATURES_TO_USE]
+    y = df[features.TARGET]
+    X_encoded = pd.get_dummies(X, columns=features.CATEGORICAL_FEATURES, drop_first=True)
+    for column in features.NORMALIZED_FEATURES:
+        X_encoded[column] = normalize([X_encoded[column]], norm='max')[0]
+    return X, X_encoded, y
+
+
+@pytest.fixture(scope='module')
+def shots():
+    df = generate_shots(N_ROWS, seed=7)
+    # Nulos em categóricas precisam bater com o get_dummies
+    df.loc[df.sample(frac=0.01, random_state=1).index, 'shot_zone_area'] = None
+    return df
+
+
+def _reference_matrix(df, transformer):
+    """Matriz esperada do transformador: escalas ajustadas e get_dummies nas colunas do vocabulário."""
+    numeric = df.assign(time_remaining_in_game=df.apply(calculate_time_remaining, axis=1),
+                        shot_angle=np.rad2deg(np.arctan2(df['loc_x'], df['loc_y'])) + 90)
+    expected = pd.DataFrame(index=df.index)
+    for column in features.NORMALIZED_FEATURES:
+        expected[column] = numeric[column] / transformer.scales[column]
+    dummies = pd.get_dummies(df[features.CATEGORICAL_FEATURES])
+    return expected.join(dummies).reindex(columns=transformer.feature_names, fill_value=0) \
+        .to_numpy(dtype=np.float32)
+
+
+def test_time_remaining_matches_row_wise(shots):
+    # Todas as combinações de período (com prorrogações) e relógio
+    grid = pd.DataFrame([(period, minutes, seconds) for period in range(1, 8) for minutes in range(12)
+                         for seconds in (0, 1, 30, 59)],
+                        columns=['period', 'minutes_remaining', 'seconds_remaining'])
+    for df in (grid, shots):
+        expected = df.apply(calculate_time_remaining, axis=1).to_numpy()
+        result = features.time_remaining_in_game(df['period'], df['minutes_remaining'], df['seconds_remaining'])
+        np.testing.assert_array_equal(result, expected)
+
+
+def test_shot_angle_matches_reference(shots):
+    expected = np.rad2deg(np.arctan2(shots['loc_x'], shots['loc_y'])) + 90
+    np.testing.assert_array_equal(features.shot_angle(shots['loc_x'], shots['loc_y']), expected.to_numpy())
+
+
+def test_one_hot_encode_matches_get_dummies(shots):
+    X = features.add_engineered_features(shots)[features.FEATURES_TO_USE]
+    for drop_first in (True, False):
+        expected = pd.get_dummies(X, columns=features.CATEGORICAL_FEATURES, drop_first=drop_first)
+        pd.testing.assert_frame_equal(features.one_hot_encode(X, drop_first=drop_first), expected)
+
+
+def test_build_features_matches_notebook(shots):
+    expected_X, expected_encoded, expected_y = build_features_reference(shots)
+    X, X_encoded, y = features.build_features(shots)
+    pd.testing.assert_frame_equal(X, expected_X, check_dtype=False)
+    pd.testing.assert_frame_equal(X_encoded, expected_encoded, check_dtype=False, rtol=1e-12)
+    pd.testing.assert_series_equal(y, expected_y)
+
+
+def test_transformer_matches_build_features(shots):
+    _, X_encoded, _ = features.build_features(shots)
+    expected = X_encoded.drop(columns=features.ID_COLUMNS)
+    transformer = features.FeatureTransformer().fit(shots)
+    assert transformer.feature_names == list(expected.columns)
+    np.testing.assert_array_equal(transformer.transform(shots), expected.to_numpy(dtype=np.float32))
+
+
+def test_transformer_unseen_categories(shots):
+    # Ajustado sem uma action_type e sem uma zona: no transform elas não têm coluna
+    seen = shots[(shots['action_type'] != 'Dunk Shot') & (shots['shot_zone_basic'] != 'Backcourt')]
+    transformer = features.FeatureTransformer().fit(seen)
+    assert 'action_type_Dunk Shot' not in transformer.feature_names
+
+    unseen = shots[(shots['action_type'] == 'Dunk Shot') | (shots['shot_zone_basic'] == 'Backcourt')]
+    unseen = unseen.assign(shot_zone_range='Categoria nova')
+    result = transformer.transform(unseen)
+    np.testing.assert_array_equal(result, _reference_matrix(unseen, transformer))
+    range_columns = [position for position, name in enumerate(transformer.feature_names)
+                     if name.startswith('shot_zone_range_')]
+    assert not result[:, range_columns].any()
+
+    for index, shot in unseen.head(50).iterrows():
+        np.testing.assert_array_equal(transformer.transform_one(shot.to_dict()),
+                                      result[unseen.index.get_loc(index)])
+
+
+def test_transform_reuses_out_buffer(shots):
+    transformer = features.FeatureTransformer().fit(shots)
+    buffer = transformer.allocate(1024)
+    buffer[:] = np.nan  # lixo de um lote anterior não pode vazar
+    for start, size in [(0, 1024), (1024, 1024), (5000, 300)]:
+        batch = shots.iloc[start:start + size]
+        result = transformer.transform(batch, out=buffer)
+        assert result.shape == (size, transformer.n_features)
+        assert np.shares_memory(result, buffer)
+        np.testing.assert_array_equal(result, _reference_matrix(batch, transformer))
+
+    row = np.full(transformer.n_features, np.nan, dtype=np.float32)
+    for index, shot in shots.head(20).iterrows():
+        transformer.transform_one(shot.to_dict(), out=row)
+        np.testing.assert_array_equal(row, _reference_matrix(shots.loc[[index]], transformer)[0])
+
+    with pytest.raises(ValueError):
+        transformer.transform(shots.head(2000), out=buffer)
+    with pytest.raises(ValueError):
+        transformer.transform(shots.head(10), out=buffer.astype(np.float64))
+
+
+def test_shipped_transformer_matches_shipped_model():
+    model_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'models', 'xgb_best_model.joblib')
+    transformer = features.FeatureTransformer.load(features.transformer_path(model_path))
+    transformer.check_model(joblib.load(model_path))
+    # Primeiro arremesso do notebook 02, já normalizado na saída da célula de normalização
+    shot = {'loc_x': -168, 'loc_y': 205, 'shot_distance': 26, 'period': 1, 'minutes_remaining': 11,
+            'seconds_remaining': 43, 'action_type': 'Jump Shot', 'shot_type': '3PT Field Goal',
+            'shot_zone_basic': 'Above the Break 3', 'shot_zone_area': 'Left Side Center(LC)',
+            'shot_zone_range': '24+ ft.'}
+    np.testing.assert_allclose(transformer.transform_one(shot)[:len(features.NORMALIZED_FEATURES)],
+                               [-0.672, 0.243468, 0.305882, 0.994097, 0.187648], atol=1e-6)
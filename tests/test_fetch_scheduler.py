@@ -0,0 +1,117 @@
+"""FetchScheduler: rate limit por requisição HTTP (contra src/fake_stats_server.py), backoff e cancelamento."""
+import time
+
+import pytest
+
+import collect_roster
+import collect_shotchart
+import fake_stats_server
+import fetch_scheduler
+import response_cache
+
+TEAM_IDS = list(range(1610612737, 1610612747))
+SEASON = '2023-24'
+
+
+class CountingBucket(fetch_scheduler.TokenBucket):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.acquired = 0
+
+    def acquire(self):
+        super().acquire()
+        self.acquired += 1
+
+
+@pytest.fixture(scope='module')
+def server(monkeypatch_module):
+    server, base_url = fake_stats_server.start_server()
+    monkeypatch_module.setattr(fetch_scheduler, 'STATS_BASE_URL', base_url)
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture(scope='module')
+def monkeypatch_module():
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        yield monkeypatch
+
+
+def _collect(scheduler, cache):
+    """Uma unidade por time, com as duas requisições da passada única (arremessos e elenco)."""
+    def fetch(team_id):
+        return (collect_shotchart.fetch_shot_data_for_team(team_id, SEASON, cache=cache),
+                collect_roster.fetch_roster_for_team(team_id, SEASON, cache=cache))
+
+    errors = []
+    scheduler.run(TEAM_IDS, fetch, lambda unit, result, error: errors.append(error) if error else None)
+    assert not errors
+
+
+def test_one_token_per_http_request(server, tmp_path):
+    cache = response_cache.ResponseCache(str(tmp_path))
+    scheduler = fetch_scheduler.FetchScheduler(max_workers=4, rate=1000)
+    scheduler.bucket = CountingBucket(1000, capacity=2)
+
+    requests_before = server.stats['requests']
+    _collect(scheduler, cache)
+    assert server.stats['requests'] - requests_before == 2 * len(TEAM_IDS)
+    assert scheduler.bucket.acquired == 2 * len(TEAM_IDS)
+
+    # Respostas do cache não vão à rede e não consomem tokens
+    scheduler.bucket.acquired = 0
+    _collect(scheduler, cache)
+    assert server.stats['requests'] - requests_before == 2 * len(TEAM_IDS)
+    assert scheduler.bucket.acquired == 0
+
+
+def test_rate_limits_requests_not_units(server, tmp_path):
+    rate, burst = 40.0, 2
+    scheduler = fetch_scheduler.FetchScheduler(max_workers=4, rate=rate, burst=burst)
+    start = time.perf_counter()
+    _collect(scheduler, response_cache.ResponseCache(str(tmp_path)))
+    elapsed = time.perf_counter() - start
+    # 2 requisições por unidade: as que passam do burst esperam 1/rate cada
+    assert elapsed >= (2 * len(TEAM_IDS) - burst) / rate * 0.95
+
+
+def test_requests_outside_a_scheduler_are_not_throttled(server):
+    assert getattr(fetch_scheduler._rate_limit, 'bucket', None) is None
+    bucket = CountingBucket(1000, capacity=2)
+    with fetch_scheduler.rate_limited(bucket):
+        collect_roster.fetch_roster_for_team(TEAM_IDS[0], SEASON)
+    collect_roster.fetch_roster_for_team(TEAM_IDS[0], SEASON)
+    assert bucket.acquired == 1
+
+
+def test_no_backoff_after_last_attempt(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(fetch_scheduler.time, 'sleep', sleeps.append)
+    scheduler = fetch_scheduler.FetchScheduler(rate=1000, max_retries=3, base_backoff=10.0)
+
+    def fetch(unit):
+        raise fetch_scheduler.RetryableFetchError('HTTP 503', status_code=503)
+
+    result, error = scheduler._fetch_with_retry('unidade', fetch)
+    assert result is None and isinstance(error, fetch_scheduler.RetryableFetchError)
+    # Backoff só entre tentativas: 3 tentativas, 2 esperas
+    assert len(sleeps) == 2
+
+
+def test_consume_error_cancels_pending_fetches():
+    fetched = []
+
+    def fetch(unit):
+        fetched.append(unit)
+        time.sleep(0.01)
+        return unit
+
+    def consume(unit, result, error):
+        raise RuntimeError('falha na carga')
+
+    scheduler = fetch_scheduler.FetchScheduler(max_workers=2, rate=1000)
+    with pytest.raises(RuntimeError):
+        scheduler.run(list(range(200)), fetch, consume)
+    time.sleep(0.1)
+    # Só as buscas já em andamento terminam; as da fila são canceladas
+    assert len(fetched) < 10
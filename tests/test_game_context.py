@@ -0,0 +1,50 @@
+"""Placar e momento de cada arremesso (features.game_context) em um jogo montado à mão."""
+import numpy as np
+import pandas as pd
+
+import collect_play_by_play
+import features
+
+GAME_ID = '0022400001'
+HOME, VISITOR = 1610612737, 1610612738
+
+
+def test_running_score_margin():
+    # SCOREMARGIN só vem nos eventos que mudam o placar; "TIE" no empate
+    score_margin = pd.Series([None, '2', '-1', None, 'TIE', None, '-3'], dtype=object)
+    assert collect_play_by_play.running_score_margin(score_margin).tolist() == [0, 2, -1, -1, 0, 0, -3]
+
+
+def test_game_context_by_hand():
+    # Placar (mandante - visitante) depois de cada evento
+    events = pd.DataFrame({
+        'game_id': GAME_ID,
+        'event_number': [1, 2, 3, 4, 5, 6],
+        'score_margin': collect_play_by_play.running_score_margin(
+            pd.Series([None, '2', '-1', None, 'TIE', None], dtype=object)),
+    })
+    games = pd.DataFrame({'id': [GAME_ID], 'home_team_id': [HOME], 'visitor_team_id': [VISITOR]})
+    shots = pd.DataFrame([
+        # evento, time, período, min, seg, acerto, tipo
+        (2, HOME, 1, 11, 30, 1, '2PT Field Goal'),     # mandante converte: 0 x 0 antes
+        (3, VISITOR, 1, 11, 0, 1, '3PT Field Goal'),   # visitante converte de 3: perdia por 2 antes
+        (4, HOME, 1, 10, 40, 0, '2PT Field Goal'),     # mandante erra: perde por 1
+        (6, VISITOR, 4, 0, 30, 0, '3PT Field Goal'),   # depois do empate (TIE), no fim do 4º período
+        (99, HOME, 4, 0, 10, 1, '2PT Field Goal'),     # evento ausente do lance a lance
+    ], columns=['game_event_id', 'team_id', 'period', 'minutes_remaining', 'seconds_remaining',
+                'shot_made_flag', 'shot_type']).assign(game_id=GAME_ID)
+    # Jogo sem mandante/visitante conhecidos
+    shots.loc[len(shots)] = {'game_event_id': 2, 'team_id': HOME, 'period': 1, 'minutes_remaining': 11,
+                             'seconds_remaining': 30, 'shot_made_flag': 1, 'shot_type': '2PT Field Goal',
+                             'game_id': '0022400002'}
+    shots.index = shots.index + 100
+
+    context = features.game_context(shots, events, games)
+    assert context.index.equals(shots.index)
+    np.testing.assert_array_equal(context['score_margin'], [0, -2, -1, 0, np.nan, np.nan])
+    assert context['is_trailing'].tolist() == [False, True, True, False, False, False]
+    assert context['is_clutch'].tolist() == [False, False, False, True, False, False]
+
+    # Eventos fora de ordem dão o mesmo resultado
+    shuffled = events.sample(frac=1, random_state=0)
+    pd.testing.assert_frame_equal(features.game_context(shots, shuffled, games), context)
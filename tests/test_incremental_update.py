@@ -0,0 +1,94 @@
+"""Continuação do boosting de modelos com early stopping e a recusa de candidatos idênticos ao pai."""
+import sqlite3
+
+import joblib
+import numpy as np
+import pytest
+import xgboost as xgb
+
+import bulk_loader
+import features
+import incremental_update
+import tree_predictor
+from database_setup import create_database
+from synthetic import generate_shots
+
+
+@pytest.fixture(scope='module')
+def shots():
+    return generate_shots(40_000, seed=13)
+
+
+def _early_stopped_model(transformer, df):
+    X = transformer.to_frame(transformer.transform(df))
+    y = df[features.TARGET].to_numpy()
+    # Taxa de aprendizado alta: a validação piora logo e sobram rodadas depois da melhor
+    model = xgb.XGBClassifier(n_estimators=200, learning_rate=1.0, max_depth=4, early_stopping_rounds=5,
+                              random_state=0)
+    split = len(X) * 3 // 4
+    model.fit(X.iloc[:split], y[:split], eval_set=[(X.iloc[split:], y[split:])], verbose=False)
+    assert model.best_iteration + 1 < model.get_booster().num_boosted_rounds()
+    return model
+
+
+def test_continue_boosting_after_early_stopping(shots):
+    df_base = shots[shots['season'].isin(incremental_update.BASE_SEASONS)]
+    df_new = shots[shots['season'] == '2024-25']
+    transformer = features.FeatureTransformer().fit(df_base)
+    model = _early_stopped_model(transformer, df_base)
+
+    X_new = transformer.transform(df_new)
+    candidate = incremental_update.continue_boosting(model, X_new, df_new[features.TARGET].to_numpy(), rounds=10)
+    booster = candidate.get_booster()
+    assert booster.num_boosted_rounds() == model.best_iteration + 1 + 10
+    assert booster.attr('best_iteration') is None
+    # As árvores novas mudam as probabilidades, e o predict_proba usa todas
+    assert np.abs(candidate.predict_proba(X_new) - model.predict_proba(X_new)).max() > 1e-3
+    predictor = tree_predictor.TreePredictor.from_booster(booster)
+    np.testing.assert_allclose(predictor.predict_proba(X_new), candidate.predict_proba(X_new), atol=1e-5)
+    # O prefixo do candidato é exatamente o modelo que o pai usava
+    np.testing.assert_allclose(booster[:model.best_iteration + 1].predict(xgb.DMatrix(transformer.to_frame(X_new))),
+                               model.predict_proba(X_new)[:, 1], atol=1e-6)
+
+
+def _insert_shots(db_path, df):
+    conn = sqlite3.connect(db_path)
+    with bulk_loader.bulk_load_session(conn):
+        for (season, team_id), df_partition in df.groupby(['season', 'team_id'], sort=False):
+            bulk_loader.load_partition(conn, season, int(team_id),
+                                       bulk_loader.to_rows(df_partition, bulk_loader.SHOT_COLUMNS), replace=False)
+    conn.close()
+
+
+def _prepare(tmp_path, shots):
+    df_base = shots[shots['season'].isin(incremental_update.BASE_SEASONS)]
+    db_path = str(tmp_path / 'shots.sqlite')
+    model_path = str(tmp_path / 'xgb_best_model.joblib')
+    create_database(db_path)
+    _insert_shots(db_path, shots)
+    transformer = features.FeatureTransformer().fit(df_base)
+    joblib.dump(_early_stopped_model(transformer, df_base), model_path)
+    transformer.save(features.transformer_path(model_path))
+    return db_path, model_path, str(tmp_path / 'versions')
+
+
+def test_run_update_continues_early_stopped_parent(tmp_path, shots):
+    db_path, model_path, registry_dir = _prepare(tmp_path, shots)
+    parent = joblib.load(model_path)
+    entry = incremental_update.run_update(db_path, model_path, ['2024-25'], rounds=10, registry_dir=registry_dir)
+    assert not entry['unchanged']
+    assert entry['metrics']['new_train']['candidate']['log_loss'] != entry['metrics']['new_train']['current']['log_loss']
+    candidate = joblib.load(tmp_path / 'versions' / entry['id'] / 'xgb_best_model.joblib')
+    assert candidate.get_booster().num_boosted_rounds() == parent.best_iteration + 1 + 10
+
+
+def test_run_update_rejects_unchanged_candidate(tmp_path, shots, monkeypatch):
+    db_path, model_path, registry_dir = _prepare(tmp_path, shots)
+    parent_version = tree_predictor.model_version(model_path)
+    # Candidato sem efeito: o próprio modelo atual
+    monkeypatch.setattr(incremental_update, 'continue_boosting', lambda model, X, y, rounds: model)
+    entry = incremental_update.run_update(db_path, model_path, ['2024-25'], rounds=10, registry_dir=registry_dir)
+    assert entry['unchanged']
+    assert entry['status'] == 'rejected'
+    assert tree_predictor.model_version(model_path) == parent_version
+    assert incremental_update.load_registry(registry_dir)['current'] == 'v0000'
@@ -0,0 +1,40 @@
+"""Endpoint /metrics: só a máquina local por padrão, outra interface apenas quando pedida."""
+import urllib.request
+
+import pytest
+
+import instrumentation
+
+
+@pytest.fixture
+def metrics_server():
+    servers = []
+
+    def start(*args, **kwargs):
+        instrumentation._metrics_server = None
+        server = instrumentation.start_metrics_server(*args, **kwargs)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+    instrumentation._metrics_server = None
+
+
+def test_binds_loopback_by_default(metrics_server, monkeypatch):
+    monkeypatch.delenv('NBA_METRICS_HOST', raising=False)
+    server = metrics_server(0)
+    host, port = server.server_address[:2]
+    assert host == instrumentation.METRICS_HOST == '127.0.0.1'
+    instrumentation.count('test_requests')
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+        assert 'test_requests' in response.read().decode('utf-8')
+
+
+def test_host_from_argument_or_env(metrics_server, monkeypatch):
+    monkeypatch.setenv('NBA_METRICS_HOST', '0.0.0.0')
+    assert metrics_server(0).server_address[0] == '0.0.0.0'
+    # host explícito vale mais que a variável
+    assert metrics_server(0, host='127.0.0.1').server_address[0] == '127.0.0.1'
@@ -0,0 +1,68 @@
+"""Modelos com early stopping salvos pelo streaming_training: só as árvores até best_iteration."""
+import joblib
+import numpy as np
+import pytest
+import xgboost as xgb
+
+import features
+import parquet_store
+import streaming_training
+import tree_predictor
+from synthetic import generate_shots
+
+PROBABILITY_TOLERANCE = 1e-5
+# Taxa de aprendizado alta: a validação piora logo e sobram rodadas depois da melhor
+EARLY_STOPPING_PARAMS = {'learning_rate': 1.0, 'max_depth': 4}
+
+
+@pytest.fixture(scope='module')
+def shots():
+    return generate_shots(30_000, seed=5)
+
+
+def _assert_same_probabilities(model, X):
+    expected = model.predict_proba(X)
+    # Soma de todas as árvores do artefato, sem best_iteration
+    predictor = tree_predictor.TreePredictor.from_booster(model.get_booster())
+    np.testing.assert_allclose(predictor.predict_proba(X), expected, atol=PROBABILITY_TOLERANCE)
+    all_trees = model.get_booster().predict(xgb.DMatrix(X), iteration_range=(0, 0))
+    np.testing.assert_allclose(all_trees, expected[:, 1], atol=PROBABILITY_TOLERANCE)
+
+
+def test_to_classifier_keeps_rounds_up_to_best_iteration(shots):
+    transformer = features.FeatureTransformer().fit(shots)
+    X = transformer.to_frame(transformer.transform(shots))
+    y = shots[features.TARGET].to_numpy()
+    dtrain, dvalid = xgb.DMatrix(X.iloc[:20_000], y[:20_000]), xgb.DMatrix(X.iloc[20_000:], y[20_000:])
+    params = {**streaming_training.DEFAULT_PARAMS, **EARLY_STOPPING_PARAMS}
+    booster = xgb.train(params, dtrain, 200, evals=[(dvalid, 'valid')], early_stopping_rounds=5,
+                        verbose_eval=False)
+    assert booster.best_iteration + 1 < booster.num_boosted_rounds()
+
+    model = streaming_training.to_classifier(booster, params)
+    assert model.get_booster().num_boosted_rounds() == booster.best_iteration + 1
+    assert model.get_booster().attr('best_iteration') is None
+    expected = booster.predict(xgb.DMatrix(X), iteration_range=(0, booster.best_iteration + 1))
+    np.testing.assert_allclose(model.predict_proba(X)[:, 1], expected, atol=PROBABILITY_TOLERANCE)
+    _assert_same_probabilities(model, X)
+
+
+def test_train_streaming_saves_truncated_model(shots, tmp_path):
+    parquet_store.write_dataset(shots, parquet_store.SHOTS_DATASET, data_dir=str(tmp_path))
+    output_path = str(tmp_path / 'model.joblib')
+    result = streaming_training.train_streaming(
+        ['2022-23', '2023-24'], ['2024-25'], source='parquet', params=EARLY_STOPPING_PARAMS, rounds=200,
+        early_stopping_rounds=5, chunk_rows=8 * 1024, output_path=output_path, data_dir=str(tmp_path))
+
+    model = joblib.load(output_path)
+    assert model.get_booster().num_boosted_rounds() < 200
+    transformer = features.FeatureTransformer.load(features.transformer_path(output_path))
+    valid = shots[shots['season'] == '2024-25']
+    X = transformer.to_frame(transformer.transform(valid))
+    _assert_same_probabilities(model, X)
+
+    # O log loss informado é o do modelo salvo, não o da última rodada treinada
+    y = valid[features.TARGET].to_numpy()
+    probabilities = model.predict_proba(X)[:, 1].astype(np.float64)
+    logloss = -np.mean(y * np.log(probabilities) + (1 - y) * np.log(1 - probabilities))
+    assert result['valid_logloss'] == pytest.approx(logloss, abs=1e-4)
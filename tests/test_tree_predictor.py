@@ -0,0 +1,62 @@
+"""Paridade do TreePredictor (NumPy) com o predict_proba do XGBoost, inclusive com early stopping."""
+import numpy as np
+import pytest
+import xgboost as xgb
+
+import features
+import tree_predictor
+from synthetic import generate_shots
+
+# Mesma tolerância de benchmarks/bench_tree_predictor.py (somas em float32 no XGBoost)
+PROBABILITY_TOLERANCE = 1e-5
+
+
+@pytest.fixture(scope='module')
+def encoded():
+    df = generate_shots(12_000, seed=3)
+    transformer = features.FeatureTransformer().fit(df)
+    X = transformer.to_frame(transformer.transform(df))
+    # Ausentes em colunas aleatórias exercitam default_left
+    rng = np.random.default_rng(0)
+    rows = rng.choice(len(X), len(X) // 3, replace=False)
+    X.values[rows, rng.integers(0, X.shape[1], len(rows))] = np.nan
+    return X, df[features.TARGET].to_numpy()
+
+
+def _fit(X, y, **params):
+    model = xgb.XGBClassifier(max_depth=4, random_state=0, **params)
+    eval_set = [(X.iloc[8_000:], y[8_000:])]
+    model.fit(X.iloc[:8_000], y[:8_000], eval_set=eval_set, verbose=False)
+    return model
+
+
+def _assert_parity(model, predictor, X):
+    max_diff = np.abs(model.predict_proba(X) - predictor.predict_proba(X)).max()
+    assert max_diff <= PROBABILITY_TOLERANCE, f"Diferença máxima {max_diff:.2e}"
+
+
+def test_parity_without_early_stopping(encoded, tmp_path):
+    X, y = encoded
+    model = _fit(X, y, n_estimators=30)
+    predictor = tree_predictor.TreePredictor.from_booster(model.get_booster())
+    assert predictor.n_trees == 30
+    _assert_parity(model, predictor, X)
+
+    path = tmp_path / ('model' + tree_predictor.PREDICTOR_SUFFIX)
+    predictor.save(path)
+    _assert_parity(model, tree_predictor.TreePredictor.load(path), X)
+
+
+@pytest.mark.parametrize('num_parallel_tree', [1, 2])
+def test_parity_with_early_stopping(encoded, num_parallel_tree):
+    X, y = encoded
+    # Taxa de aprendizado alta: a validação piora logo e sobram rodadas depois da melhor
+    model = _fit(X, y, n_estimators=200, learning_rate=1.0, early_stopping_rounds=5,
+                 num_parallel_tree=num_parallel_tree)
+    booster = model.get_booster()
+    assert model.best_iteration + 1 < booster.num_boosted_rounds()
+
+    predictor = tree_predictor.TreePredictor.from_booster(booster)
+    assert predictor.n_trees == (model.best_iteration + 1) * num_parallel_tree
+    assert predictor.feature_names == booster.feature_names
+    _assert_parity(model, predictor, X)